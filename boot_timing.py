@@ -0,0 +1,49 @@
+"""
+Tiempos del arranque del bot, por fase.
+
+Cada fase se mide desde el final de la anterior: dependencias, imports,
+configuración, conexión (login), carga de datos y sincronización de
+comandos. El resumen se imprime una vez, al terminar el primer on_ready.
+"""
+
+import time
+from typing import List, Tuple
+
+PHASE_LABELS = {
+    'dependencies': "dependencias",
+    'imports': "imports",
+    'config': "configuración",
+    'login': "conexión",
+    'state': "datos",
+    'command_sync': "sincronización de comandos",
+}
+
+
+class BootTimings:
+    """Duración de cada fase del arranque"""
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self._last = self.started
+        self.phases: List[Tuple[str, float]] = []
+        self.reported = False
+
+    def mark(self, phase: str) -> None:
+        """Cerrar una fase (si ya se marcó antes, no se vuelve a contar)"""
+        if self.reported or any(name == phase for name, _ in self.phases):
+            return
+        now = time.perf_counter()
+        self.phases.append((phase, now - self._last))
+        self._last = now
+
+    def report(self) -> None:
+        """Imprimir el resumen una sola vez"""
+        if self.reported:
+            return
+        self.reported = True
+        total = self._last - self.started
+        parts = [f"{PHASE_LABELS.get(name, name)} {seconds:.2f}s" for name, seconds in self.phases]
+        print(f"⏱️ Arranque en {total:.2f}s: {', '.join(parts)}")
+
+
+boot = BootTimings()
@@ -1,55 +1,38 @@
 #!/usr/bin/env python3
 
-# Auto-instalación de dependencias si no están disponibles
-try:
-    import discord
-except ImportError:
-    print("📦 discord.py no encontrado. Instalando automáticamente...")
-    import subprocess
-    import sys
-
-    # Intentar instalar discord.py
-    install_methods = [
-        [sys.executable, "-m", "pip", "install", "discord.py"],
-        [sys.executable, "-m", "pip", "install", "--user", "discord.py"],
-        ["pip3", "install", "discord.py"],
-        [sys.executable, "-m", "pip", "install", "--break-system-packages", "discord.py"],
-    ]
-
-    installed = False
-    for method in install_methods:
-        try:
-            result = subprocess.run(method, capture_output=True, text=True, timeout=300)
-            if result.returncode == 0:
-                print(f"✅ discord.py instalado con: {' '.join(method)}")
-                installed = True
-                break
-        except:
-            continue
-
-    if not installed:
-        print("❌ No se pudo instalar discord.py automáticamente")
-        print("🔧 Instala manualmente con: pip install discord.py")
-        exit(1)
+from boot_timing import boot
 
-    # Intentar importar después de la instalación
-    try:
-        import discord
-        print("✅ discord.py importado correctamente")
-    except ImportError:
-        print("❌ Error: discord.py instalado pero no se puede importar")
-        print("🔧 Reinicia el bot o instala manualmente")
-        exit(1)
+if __name__ == "__main__":
+    # python bot.py arranca igual que start.py: launcher verifica las dependencias,
+    # importa este archivo como módulo "bot" y lo ejecuta (aquí no se carga nada más)
+    import sys
+    from launcher import main
+    sys.exit(main())
 
+import discord
 from discord.ext import commands
 import json
 import os
 from datetime import datetime, timedelta
 import asyncio
+import re
 import pytz
 from zoneinfo import ZoneInfo
 
-from time_tracker import TimeTracker
+from persistence import shared_writer
+from time_tracker import GuildTrackers, TimeTracker, TransitionResult
+from command_sync import CommandSyncState
+from tier_index import TierMembershipIndex
+from rollups import Rollups
+from tier_rules import TierRules
+from member_cache import MemberMissCache, client_options, warm_members
+from shard_metrics import ShardMetrics, ShardMetricsMixin
+from tracker_worker import RemoteGuildTrackers, WorkerClient, guild_schedule
+from voice_tracking import JOIN, LEAVE, VoiceTransitionDebouncer
+from view_state import (MESSAGE_EMBEDS_TOTAL_LIMIT, EMBED_DESCRIPTION_LIMIT, RowRenderCache,
+                        SnapshotCache, ViewState, ViewStateRegistry, pack_pages, page_digest)
+
+boot.mark('imports')
 
 # Configuración del bot
 intents = discord.Intents.default()
@@ -58,8 +41,41 @@ intents.guilds = True
 intents.members = True
 intents.message_content = True
 
-bot = commands.Bot(command_prefix='!', intents=intents)
-time_tracker = TimeTracker()
+# Tiempo que un comando espera a que terminen de cargarse los datos antes de responder "cargando"
+STATE_READY_WAIT_SECONDS = 2.5
+state_load_task = None
+
+async def ensure_state_ready(interaction: discord.Interaction) -> bool:
+    """Esperar brevemente a los datos; si siguen cargando, avisar y no ejecutar la interacción"""
+    if await trackers.wait_ready(timeout=STATE_READY_WAIT_SECONDS, guild=interaction.guild):
+        return True
+    if interaction.type == discord.InteractionType.autocomplete:
+        await interaction.response.autocomplete([])
+    else:
+        await interaction.response.send_message(
+            "⏳ El bot está cargando los datos, intenta de nuevo en unos segundos", ephemeral=True
+        )
+    return False
+
+class TrackerCommandTree(discord.app_commands.CommandTree):
+    """Árbol de comandos que espera a que los datos estén cargados"""
+
+    async def interaction_check(self, interaction: discord.Interaction) -> bool:
+        return await ensure_state_ready(interaction)
+
+class TrackerBot(ShardMetricsMixin, commands.Bot):
+    """Bot con una sola conexión al gateway"""
+    shard_metrics = ShardMetrics()
+
+class ShardedTrackerBot(ShardMetricsMixin, commands.AutoShardedBot):
+    """Bot con varias conexiones al gateway (shards)"""
+    shard_metrics = ShardMetrics()
+
+# Registro de vistas paginadas: cada mensaje guarda solo su estado mínimo y
+# las filas se comparten entre vistas a través de snapshots con límite LRU/TTL
+view_registry = ViewStateRegistry(SnapshotCache(max_entries=32, ttl_seconds=300), max_views=500, ttl_seconds=300)
+# Líneas de la lista de tiempos ya renderizadas, por usuario y versión
+row_cache = RowRenderCache(max_entries=5000)
 
 # Variables para IDs de canales de notificación
 NOTIFICATION_CHANNEL_ID = 1382195219939852479
@@ -117,12 +133,102 @@ except Exception as e:
     GOLD_ROLE_ID = 1382198935971430440
     RECLUTA_ROLE_ID = 1366550916752216222
 
+# Niveles (Gold, Recluta, ...) con sus límites, milestones y créditos
+tier_rules = TierRules.from_config(config)
+print(f"✅ Niveles: {', '.join(f'{tier.label} ({tier.max_hours} h)' for tier in tier_rules.tiers)}")
+
+# Conexión al gateway: AutoShardedBot si está habilitado en config.json
+# Perfil de memoria: "lean" descarta intents y caché de miembros que el bot no necesita
+memory_profile = config.get('memory_profile', {})
+LEAN_MEMORY = memory_profile.get('mode', 'default') == 'lean'
+bot_options = client_options(memory_profile, intents)
+member_misses = MemberMissCache(memory_profile.get('miss_ttl_seconds', 300))
+
+sharding = config.get('sharding', {})
+if sharding.get('enabled'):
+    bot = ShardedTrackerBot(
+        command_prefix='!',
+        tree_cls=TrackerCommandTree,
+        **bot_options,
+        shard_count=sharding.get('shard_count'),
+        shard_ids=sharding.get('shard_ids')
+    )
+    print(f"✅ Sharding habilitado: shards {sharding.get('shard_ids') or 'automáticos'} de {sharding.get('shard_count') or 'auto'}")
+else:
+    bot = TrackerBot(command_prefix='!', tree_cls=TrackerCommandTree, **bot_options)
+if LEAN_MEMORY:
+    print("✅ Perfil de memoria lean: sin eventos de mensajes y caché de miembros bajo demanda")
+
+# Particiones del tracker por servidor; el principal conserva los archivos originales.
+# Con el worker habilitado, los datos viven en otro proceso y aquí hay réplicas.
+worker_settings = config.get('worker', {})
+worker_process = None
+if worker_settings.get('enabled'):
+    trackers = RemoteGuildTrackers(WorkerClient(worker_settings.get('socket_path', 'tracker_worker.sock')))
+    print(f"✅ Modo worker: datos servidos por {trackers.client.socket_path}")
+else:
+    trackers = GuildTrackers(config.get('primary_guild_id'))
+worker_follow_task = None
+
+# Nivel de los miembros con rol de nivel por servidor, mantenido con eventos de miembros y roles
+# (en el perfil lean la caché es parcial: los usuarios que falten se buscan uno por uno)
+tier_index = TierMembershipIndex(tier_rules, partial_seeds=LEAN_MEMORY)
+
+# Hashes de la última sincronización de comandos (global y por servidor)
+command_sync = CommandSyncState()
+
+boot.mark('config')
+
 # Task para verificar milestones periódicamente
 milestone_check_task = None
 
+# Seguimiento automático por canales de voz (opcional, en config.json)
+voice_settings = config.get('voice_tracking', {})
+VOICE_TRACKING_CHANNELS = {int(channel_id) for channel_id in voice_settings.get('channel_ids', [])}
+voice_debouncer = VoiceTransitionDebouncer(voice_settings.get('debounce_seconds', 5))
+voice_task = None
+member_warmup_task = None
+
+@bot.event
+async def setup_hook():
+    """Registrar vistas persistentes y cargar los datos mientras se abre la conexión al gateway"""
+    global state_load_task
+    bot.add_view(PaymentMainView())
+    bot.add_dynamic_items(ListButton, ListSelect)
+    print("✅ Vistas persistentes registradas")
+    if state_load_task is None:
+        state_load_task = asyncio.create_task(trackers.preload())
+
 @bot.event
 async def on_ready():
+    global worker_follow_task
     print(f'{bot.user} se ha conectado a Discord!')
+    boot.mark('login')
+
+    # La carga empezó en setup_hook; normalmente ya terminó durante la conexión
+    await trackers.wait_ready()
+
+    # El primer servidor conocido se queda con los datos originales
+    if bot.guilds:
+        await trackers.claim_primary(bot.guilds[0].id)
+
+    # Cargar las particiones que no precargó setup_hook (en un hilo o desde el
+    # worker) sin bloquear el heartbeat
+    await trackers.load_guilds(guild.id for guild in bot.guilds)
+
+    # Sembrar el índice de niveles de cada servidor
+    if not LEAN_MEMORY:
+        for guild in bot.guilds:
+            tier_index.seed(guild)
+    print(f'✅ Particiones de datos cargadas: {len(trackers.loaded())}')
+    boot.mark('state')
+
+    # El worker ejecuta el inicio/detención automáticos de los servidores de este gateway
+    if isinstance(trackers, RemoteGuildTrackers):
+        await trackers.attach(guild.id for guild in local_guilds())
+        if worker_follow_task is None:
+            worker_follow_task = bot.loop.create_task(trackers.follow_changes())
+    print(f'✅ Índice de niveles: {sum(tier_index.stats().values())} miembros en {len(bot.guilds)} servidores')
 
     # Verificar que el canal de notificaciones existe
     channel = bot.get_channel(NOTIFICATION_CHANNEL_ID)
@@ -135,21 +241,26 @@ async def on_ready():
         print(f'⚠️ Canal de notificaciones no encontrado con ID: {NOTIFICATION_CHANNEL_ID}')
 
     try:
-        # Sincronización global primero
-        print("🔄 Sincronizando comandos globalmente...")
-        synced_global = await bot.tree.sync()
-        print(f'✅ Sincronizados {len(synced_global)} comando(s) slash globalmente')
+        # Sincronización global primero (solo si los comandos cambiaron desde la última vez)
+        synced_global = await command_sync.sync(bot.tree)
+        if synced_global is None:
+            print("✅ Comandos globales sin cambios, no se sincronizan")
+        else:
+            print(f'✅ Sincronizados {len(synced_global)} comando(s) slash globalmente')
 
         # Sincronización específica del guild si hay guilds
         if bot.guilds:
             for guild in bot.guilds:
                 try:
-                    print(f"🔄 Sincronizando comandos en {guild.name} (ID: {guild.id})...")
-                    synced_guild = await bot.tree.sync(guild=guild)
-                    print(f'✅ Sincronizados {len(synced_guild)} comando(s) en {guild.name}')
+                    synced_guild = await command_sync.sync(bot.tree, guild=guild)
+                    if synced_guild is not None:
+                        print(f'✅ Sincronizados {len(synced_guild)} comando(s) en {guild.name}')
                 except Exception as guild_error:
                     print(f'⚠️ Error sincronizando en {guild.name}: {guild_error}')
 
+        boot.mark('command_sync')
+        boot.report()
+
         # Listar todos los comandos registrados
         commands = [cmd.name for cmd in bot.tree.get_commands()]
         print(f'📋 Comandos registrados ({len(commands)}): {", ".join(commands)}')
@@ -158,6 +269,7 @@ async def on_ready():
         print("   • Espera 1-5 minutos para que Discord los propague")
         print("   • Reinicia tu cliente de Discord")
         print("   • Verifica que el bot tenga permisos de 'applications.commands'")
+        print("   • Usa /sincronizar_comandos para forzar la sincronización")
 
     except Exception as e:
         print(f'❌ Error al sincronizar comandos: {e}')
@@ -169,8 +281,10 @@ def is_admin():
             if not hasattr(interaction, 'guild') or not interaction.guild:
                 return False
 
-            member = interaction.guild.get_member(interaction.user.id)
-            if not member:
+            # interaction.user ya es el Member en interacciones de servidor; con la
+            # caché de miembros parcial guild.get_member() no lo encontraría
+            member = interaction.user
+            if not isinstance(member, discord.Member):
                 return False
 
             if member.bot:
@@ -198,79 +312,74 @@ def load_config():
 
 
 def calculate_credits(total_seconds: float, role_type: str = "normal") -> int:
-    """Calcular créditos basado en el tiempo total y el rol - SISTEMA SIMPLIFICADO"""
+    """Calcular créditos según el tiempo total y el nivel (tabla "tiers" de config.json)"""
     try:
         if not isinstance(total_seconds, (int, float)) or total_seconds < 0:
             return 0
-
-        total_hours = total_seconds / 3600
-
-        if role_type == "gold":
-            if total_hours >= 2.0:
-                return 10  # 2 horas = 10 créditos
-            elif total_hours >= 1.0:
-                return 5   # 1 hora = 5 créditos
-            else:
-                return 0   # Menos de 1 hora = 0 créditos
-        else:
-            # Usuarios sin rol específico (normal)
-            if total_hours >= 1.0:
-                return 3   # 1 hora = 3 créditos
-            else:
-                return 0   # Menos de 1 hora = 0 créditos
+        return tier_rules.tier(role_type).credits_for(total_seconds)
 
     except Exception as e:
         print(f"Error calculando créditos: {e}")
         return 0
 
-def get_user_role_type(member: discord.Member) -> str:
-    """Determina el tipo de rol del usuario - SISTEMA SIMPLIFICADO"""
-    if not member:
-        return "normal"
-
-    # Verificar Gold por ID específico (prioritario)
-    gold_role_ids = [GOLD_ROLE_ID, 1382198935971430440]  # Config + hardcoded
+def time_limit_reached(user_data: dict, total_time: float, role_type: str) -> bool:
+    """Si el usuario ya completó su tiempo máximo (marcado o por el límite de su nivel)"""
+    return user_data.get("milestone_completed", False) or tier_rules.tier(role_type).limit_reached(total_time)
 
-    for role in member.roles:
-        # Verificar si tiene rol Gold por ID
-        if role.id in gold_role_ids:
-            return "gold"
-        # También verificar por nombre que contenga "gold" (case insensitive)
-        if "gold" in role.name.lower():
-            return "gold"
+def format_hours(hours) -> str:
+    return f"{hours:g} hora{'s' if hours != 1 else ''}"
 
-    return "normal"
+def get_user_role_type(member: discord.Member) -> str:
+    """Nivel del usuario según sus roles (nombre del nivel en la tabla de niveles)"""
+    return tier_rules.tier_for_member(member).name
 
 def get_role_info(member: discord.Member) -> str:
     """Obtiene la información del rol simplificada del usuario"""
-    if not member:
-        return " (Recluta)"
-
-    # Verificar si es Gold con más detalle
-    role_type = get_user_role_type(member)
-    if role_type == "gold":
-        # Encontrar el nombre específico del rol Gold
-        gold_role_ids = [GOLD_ROLE_ID, 1382198935971430440]
-        for role in member.roles:
-            if role.id in gold_role_ids or "gold" in role.name.lower():
-                return f" (Gold - {role.name})"
-        return " (Gold)"
-    else:
-        return " (Recluta)"
+    tier = tier_rules.tier_for_member(member)
+    if tier is tier_rules.default:
+        return f" ({tier.label})"
+
+    # Nombre del rol que da el nivel
+    for role in member.roles:
+        if tier.matches(role):
+            return f" ({tier.label} - {role.name})"
+    return f" ({tier.label})"
 
 def has_unlimited_time_role(member: discord.Member) -> bool:
-    """Verificar si el usuario tiene un rol que le otorga tiempo ilimitado (rol Gold)"""
+    """Verificar si el usuario tiene un rol de nivel (más tiempo que el nivel predeterminado)"""
     if not member:
         return False
-
-    # En este sistema, el rol Gold otorga "tiempo ilimitado" (2 horas en lugar de 1)
-    role_type = get_user_role_type(member)
-    return role_type == "gold"
+    return tier_rules.tier_for_member(member) is not tier_rules.default
+
+def pause_call(member: discord.Member):
+    """Llamada a pause_tracking con el nivel del miembro y su límite de pausas"""
+    tier = tier_rules.tier_for_member(member)
+    return 'pause_tracking', (member.id, tier.name, tier.max_pauses)
+
+def start_call(member: discord.Member, before_start: bool, initiator=None):
+    """Llamada para iniciar (o pre-registrar antes de la hora de inicio) con el límite del nivel"""
+    limit_seconds = tier_rules.tier_for_member(member).limit_seconds
+    if before_start:
+        admin_id, admin_name = (initiator.id, initiator.display_name) if initiator else (None, None)
+        return 'pre_register_user', (member.id, member.display_name, limit_seconds, admin_id, admin_name)
+    return 'start_tracking', (member.id, member.display_name, limit_seconds)
+
+def paused_mention(member: discord.Member, result) -> str:
+    """Mención de un usuario pausado con su contador de pausas (si su nivel las cuenta)"""
+    tier = tier_rules.tier_for_member(member)
+    if tier.max_pauses is None:
+        return member.mention
+    return f"{member.mention} ({result.pause_count}/{tier.max_pauses})"
+
+def pause_limit_text(tier) -> str:
+    """Pausas usadas de un nivel para mostrar junto al contador"""
+    return "Ilimitadas" if tier.max_pauses is None else f"{tier.max_pauses} máximo"
 
 @bot.tree.command(name="iniciar_tiempo", description="Iniciar el seguimiento de tiempo para un usuario")
 @discord.app_commands.describe(usuario="El usuario para quien iniciar el seguimiento de tiempo")
 @is_admin()
 async def iniciar_tiempo(interaction: discord.Interaction, usuario: discord.Member):
+    tracker = trackers.for_guild(interaction.guild)
     if usuario.bot:
         await interaction.response.send_message("❌ No se puede rastrear el tiempo de bots.", ephemeral=True)
         return
@@ -305,123 +414,89 @@ async def iniciar_tiempo(interaction: discord.Interaction, usuario: discord.Memb
         )
         return
 
-    role_type = get_user_role_type(usuario)
-
-    # Verificar si el usuario ya ha completado sus horas máximas
-    user_data = time_tracker.get_user_data(usuario.id)
-    if user_data:
-        total_time = time_tracker.get_total_time(usuario.id)
-        total_hours = total_time / 3600
-
-        # Verificar límites según el tipo de rol
-        if user_data.get("milestone_completed", False):
-            await interaction.response.send_message(
-                f"❌ {usuario.mention} ya ha completado su tiempo máximo y no puede iniciar tiempo nuevamente."
-            )
-            return
-        elif role_type == "gold" and total_hours >= 2.0:
-            await interaction.response.send_message(
-                f"❌ {usuario.mention} ya ha completado sus 2 horas máximas (Gold) y no puede iniciar tiempo nuevamente."
-            )
-            return
-        elif role_type == "normal" and total_hours >= 1.0:
-            await interaction.response.send_message(
-                f"❌ {usuario.mention} ya ha completado su 1 hora máxima (Recluta) y no puede iniciar tiempo nuevamente."
-            )
-            return
+    tier = tier_rules.tier_for_member(usuario)
 
-    # Verificar si el usuario tiene tiempo pausado
-    if user_data and user_data.get('is_paused', False):
-        await interaction.response.send_message(
-            f"⚠️ {usuario.mention} tiene tiempo pausado. Usa `/despausar_tiempo` para continuar el tiempo."
-        )
-        return
+    # Verificar si es antes de la hora de inicio del servidor (19:00 por defecto)
+    (start_hour, start_minute), _ = get_guild_schedule(interaction.guild.id)
+    is_before_start_time = (current_hour < start_hour) or (current_hour == start_hour and current_minute < start_minute)
 
-    # Verificar si es antes de la hora configurada (19:00)
-    is_before_start_time = (current_hour < START_TIME_HOUR) or (current_hour == START_TIME_HOUR and current_minute < START_TIME_MINUTE)
+    # El tracker comprueba límite, pausa y estado con el candado del usuario y lo suelta al volver
+    result = await tracker.call(*start_call(usuario, is_before_start_time, interaction.user))
 
-    if is_before_start_time:
-        # Pre-registro: registrar usuario pero no iniciar cronómetro
-        success = time_tracker.pre_register_user(usuario.id, usuario.display_name)
-        if success:
-            # Guardar quién hizo el pre-registro
-            time_tracker.set_pre_register_initiator(usuario.id, interaction.user.id, interaction.user.display_name)
+    if result:
+        if result.action == 'pre_registered':
             await interaction.response.send_message(
                 f"📝 El tiempo de {usuario.mention} ha sido registrado por {interaction.user.mention}"
             )
         else:
-            await interaction.response.send_message(f"⚠️ {usuario.mention} ya está pre-registrado", ephemeral=True)
-    else:
-        # Hora configurada o después: iniciar normally
-        success = time_tracker.start_tracking(usuario.id, usuario.display_name)
-        if success:
             await interaction.response.send_message(f"⏰ El tiempo de {usuario.mention} ha sido iniciado por {interaction.user.mention}")
-        else:
-            await interaction.response.send_message(f"⚠️ El tiempo de {usuario.mention} ya está activo", ephemeral=True)
+    elif result.action == 'completed':
+        await interaction.response.send_message(
+            f"❌ {usuario.mention} ya ha completado su tiempo máximo y no puede iniciar tiempo nuevamente."
+        )
+    elif result.action == 'limit_reached':
+        await interaction.response.send_message(
+            f"❌ {usuario.mention} ya ha completado su límite de {format_hours(tier.max_hours)} ({tier.label}) y no puede iniciar tiempo nuevamente."
+        )
+    elif result.action == 'paused':
+        await interaction.response.send_message(
+            f"⚠️ {usuario.mention} tiene tiempo pausado. Usa `/despausar_tiempo` para continuar el tiempo."
+        )
+    elif result.action == 'already_registered':
+        await interaction.response.send_message(f"⚠️ {usuario.mention} ya está pre-registrado", ephemeral=True)
+    else:
+        await interaction.response.send_message(f"⚠️ El tiempo de {usuario.mention} ya está activo", ephemeral=True)
 
 @bot.tree.command(name="pausar_tiempo", description="Pausar el tiempo de un usuario")
 @discord.app_commands.describe(usuario="El usuario para quien pausar el tiempo")
 @is_admin()
 async def pausar_tiempo(interaction: discord.Interaction, usuario: discord.Member):
-    user_data = time_tracker.get_user_data(usuario.id)
-    total_time_before = time_tracker.get_total_time(usuario.id)
+    tracker = trackers.for_guild(interaction.guild)
 
-    # Obtener el tipo de rol del usuario para pasarlo a pause_tracking
-    role_type = get_user_role_type(usuario)
-    success = time_tracker.pause_tracking(usuario.id, user_role_type=role_type) # Pasar el tipo de rol
+    # El nivel del usuario decide si la pausa cuenta para la cancelación automática
+    tier = tier_rules.tier_for_member(usuario)
 
-    if success:
-        # Obtener el tiempo total después de pausar para la notificación
-        total_time_after = time_tracker.get_total_time(usuario.id)
-        session_time = total_time_after - total_time_before
-        pause_count = time_tracker.get_pause_count(usuario.id) # Obtener el nuevo contador de pausas
-
-        formatted_total_time = time_tracker.format_time_human(total_time_after)
-        formatted_session_time = time_tracker.format_time_human(session_time) if session_time > 0 else "0 Segundos"
-
-        # Verificar si el usuario fue cancelado automáticamente por llegar a 3 pausas
-        user_data_updated = time_tracker.get_user_data(usuario.id)
-        was_auto_cancelled = (user_data_updated and
-                             user_data_updated.get('pause_count', 0) == 0 and
-                             not user_data_updated.get('is_paused', False) and
-                             not user_data_updated.get('is_active', False) and
-                             role_type != "gold")
-
-        if was_auto_cancelled:
-            # Usuario cancelado automáticamente por 3 pausas
-            time_lost = user_data.get('time_lost_on_cancellation', 0) if user_data else 0
-            formatted_time_lost = time_tracker.format_time_human(time_lost) if time_lost > 0 else "0 Segundos"
+    # El candado del usuario se suelta al volver del tracker; las respuestas usan el resultado
+    result = await tracker.call(*pause_call(usuario))
 
-            await interaction.response.send_message(
-                f"🚫 **{usuario.mention} ha alcanzado el límite de 3 pausas y su tiempo ha sido cancelado automáticamente.**\n"
-                f"🕐 **Tiempo conservado:** {formatted_total_time} (solo horas completas)\n"
-                f"❌ **Tiempo perdido:** {formatted_time_lost}"
-            )
+    if not result:
+        await interaction.response.send_message(f"⚠️ No hay tiempo activo para {usuario.mention}", ephemeral=True)
+        return
 
-            # Enviar notificación SOLO al canal de cancelaciones (NO al de pausas)
-            await send_auto_cancellation_notification(usuario.display_name, formatted_total_time, interaction.user.mention, 3, time_lost)
-        else:
-            # Pausa normal (usuarios Gold o pausas 1/3, 2/3 para reclutas)
-            await interaction.response.send_message(f"⏸️ El tiempo de {usuario.mention} ha sido pausado")
+    formatted_total_time = tracker.format_time_human(result.total_after)
+    formatted_session_time = tracker.format_time_human(result.session_time) if result.session_time > 0 else "0 Segundos"
+
+    if result.action == 'auto_cancelled':
+        # Usuario cancelado automáticamente al llegar al límite de pausas de su nivel
+        formatted_time_lost = tracker.format_time_human(result.time_lost) if result.time_lost > 0 else "0 Segundos"
 
-            # Enviar notificación al canal de pausas SOLO si NO fue cancelado automáticamente
-            await send_pause_notification(usuario.display_name, total_time_after, interaction.user.mention, formatted_session_time, pause_count, role_type)
+        await interaction.response.send_message(
+            f"🚫 **{usuario.mention} ha alcanzado el límite de {result.pause_count} pausas y su tiempo ha sido cancelado automáticamente.**\n"
+            f"🕐 **Tiempo conservado:** {formatted_total_time} (solo horas completas)\n"
+            f"❌ **Tiempo perdido:** {formatted_time_lost}"
+        )
+
+        # Enviar notificación SOLO al canal de cancelaciones (NO al de pausas)
+        await send_auto_cancellation_notification(usuario.display_name, formatted_total_time, interaction.user.mention, result.pause_count, result.time_lost)
     else:
-        await interaction.response.send_message(f"⚠️ No hay tiempo activo para {usuario.mention}", ephemeral=True)
+        # Pausa normal (sin límite o todavía por debajo del límite del nivel)
+        await interaction.response.send_message(f"⏸️ El tiempo de {usuario.mention} ha sido pausado")
+
+        # Enviar notificación al canal de pausas SOLO si NO fue cancelado automáticamente
+        await send_pause_notification(usuario.display_name, result.total_after, interaction.user.mention, formatted_session_time, result.pause_count, tier.name)
 
 @bot.tree.command(name="despausar_tiempo", description="Despausar el tiempo de un usuario")
 @discord.app_commands.describe(usuario="El usuario para quien despausar el tiempo")
 @is_admin()
 async def despausar_tiempo(interaction: discord.Interaction, usuario: discord.Member):
-    paused_duration = time_tracker.get_paused_duration(usuario.id)
-    success = time_tracker.resume_tracking(usuario.id)
-    if success:
-        total_time = time_tracker.get_total_time(usuario.id)
-        formatted_paused_duration = time_tracker.format_time_human(paused_duration) if paused_duration > 0 else "0 Segundos"
+    tracker = trackers.for_guild(interaction.guild)
+    result = await tracker.call('resume_tracking', usuario.id)
+    if result:
+        formatted_paused_duration = tracker.format_time_human(result.paused_duration) if result.paused_duration > 0 else "0 Segundos"
         await interaction.response.send_message(
             f"▶️ El tiempo de {usuario.mention} ha sido despausado"
         )
-        await send_unpause_notification(usuario.display_name, total_time, interaction.user.mention, formatted_paused_duration)
+        await send_unpause_notification(usuario.display_name, result.total_after, interaction.user.mention, formatted_paused_duration)
     else:
         await interaction.response.send_message(f"⚠️ No se puede despausar - {usuario.mention} no tiene tiempo pausado", ephemeral=True)
 
@@ -432,19 +507,19 @@ async def despausar_tiempo(interaction: discord.Interaction, usuario: discord.Me
 )
 @is_admin()
 async def sumar_minutos(interaction: discord.Interaction, usuario: discord.Member, minutos: int):
+    tracker = trackers.for_guild(interaction.guild)
     if minutos <= 0:
         await interaction.response.send_message("❌ La cantidad de minutos debe ser positiva", ephemeral=True)
         return
 
-    success = time_tracker.add_minutes(usuario.id, usuario.display_name, minutos)
-    if success:
-        total_time = time_tracker.get_total_time(usuario.id)
-        formatted_time = time_tracker.format_time_human(total_time)
+    result = await tracker.call('add_minutes', usuario.id, usuario.display_name, minutos)
+    if result:
+        formatted_time = tracker.format_time_human(result.total_after)
         await interaction.response.send_message(
             f"✅ Sumados {minutos} minutos a {usuario.mention} por {interaction.user.mention}\n"
             f"⏱️ Tiempo total: {formatted_time}"
         )
-        await check_time_milestone(usuario.id, usuario.display_name)
+        await check_time_milestone(interaction.guild, usuario.id, usuario.display_name)
     else:
         await interaction.response.send_message(f"❌ Error al sumar tiempo para {usuario.mention}", ephemeral=True)
 
@@ -455,14 +530,14 @@ async def sumar_minutos(interaction: discord.Interaction, usuario: discord.Membe
 )
 @is_admin()
 async def restar_minutos(interaction: discord.Interaction, usuario: discord.Member, minutos: int):
+    tracker = trackers.for_guild(interaction.guild)
     if minutos <= 0:
         await interaction.response.send_message("❌ La cantidad de minutos debe ser positiva", ephemeral=True)
         return
 
-    success = time_tracker.subtract_minutes(usuario.id, minutos)
-    if success:
-        total_time = time_tracker.get_total_time(usuario.id)
-        formatted_time = time_tracker.format_time_human(total_time)
+    result = await tracker.call('subtract_minutes', usuario.id, minutos)
+    if result:
+        formatted_time = tracker.format_time_human(result.total_after)
         await interaction.response.send_message(
             f"➖ Restados {minutos} minutos de {usuario.mention} por {interaction.user.mention}\n"
             f"⏱️ Tiempo total: {formatted_time}"
@@ -470,275 +545,477 @@ async def restar_minutos(interaction: discord.Interaction, usuario: discord.Memb
     else:
         await interaction.response.send_message(f"❌ Error al restar tiempo para {usuario.mention}", ephemeral=True)
 
-# Clase para manejar la paginación
-class TimesView(discord.ui.View):
-    def __init__(self, sorted_users, guild, max_per_page=20, search_term=None, filter_status=None):
-        super().__init__(timeout=300)
-        self.sorted_users = sorted_users
-        self.guild = guild
-        self.max_per_page = max_per_page
-        self.current_page = 0
-        self.total_pages = (len(sorted_users) + max_per_page - 1) // max_per_page if sorted_users else 1
-        self.search_term = search_term
-        self.filter_status = filter_status
+def build_times_rows(tracked_users, guild, search_term=None, filter_status=None):
+    """Filtrar y ordenar usuarios para /ver_tiempos (solo se guardan los IDs)"""
+    tracker = trackers.for_guild(guild)
+    filtered_users = []
 
-        # Actualizar estado inicial de botones
-        self.update_buttons()
+    for user_id, data in tracked_users.items():
+        user_name = data.get('name', f'Usuario {user_id}')
 
-    def get_embed(self):
-        """Crear embed para la página actual"""
-        start_idx = self.current_page * self.max_per_page
-        end_idx = min(start_idx + self.max_per_page, len(self.sorted_users))
-        current_users = self.sorted_users[start_idx:end_idx]
-        user_list = []
+        # Aplicar filtro de búsqueda
+        if search_term and search_term.lower() not in user_name.lower():
+            continue
 
-        for _, user_id, data in current_users:
+        # Aplicar filtro de estado
+        if filter_status:
             try:
                 user_id_int = int(user_id)
-                member = self.guild.get_member(user_id_int) if self.guild else None
-
-                if member:
-                    user_mention = member.mention
-                    role_type = get_user_role_type(member)
-                else:
-                    user_name = data.get('name', f'Usuario {user_id}')
-                    user_mention = f"**{user_name}** `(ID: {user_id})`"
-                    role_type = "normal"
-
-                total_time = time_tracker.get_total_time(user_id_int)
-                formatted_time = time_tracker.format_time_human(total_time)
+                member = guild.get_member(user_id_int) if guild else None
+                total_time = tracker.get_total_time(user_id_int)
 
-                # Determinar estado del usuario
-                total_hours = total_time / 3600
-                role_type = get_user_role_type(member) if member else "normal"
+                # Determinar estado actual
+                role_type = get_user_role_type(member)
 
-                # Verificar si ha completado su tiempo máximo
-                is_finished = (data.get("milestone_completed", False) or
-                             (role_type == "gold" and total_hours >= 2.0) or
-                             (role_type == "normal" and total_hours >= 1.0))
+                # Determinar si está terminado (ha alcanzado su límite máximo)
+                is_finished = time_limit_reached(data, total_time, role_type)
 
                 if data.get('is_active', False):
-                    status = "🟢 Activo"
+                    status = "active"
                 elif is_finished:
-                    status = "✅ Terminado"
+                    status = "finished"
                 elif data.get('is_paused', False):
-                    status = "⏸️ Pausado"
+                    status = "paused"
                 else:
-                    status = "🔴 Inactivo"
+                    status = "inactive"
 
-                credits = calculate_credits(total_time, role_type)
-                credit_info = f" 💰 {credits} Créditos" if credits > 0 else ""
-                role_info = get_role_info(member) if member else ""
-                user_list.append(f"📌 {user_mention}{role_info} - ⏱️ {formatted_time}{credit_info} {status}")
+                # Filtrar por estado
+                if filter_status != status:
+                    continue
 
             except Exception as e:
-                print(f"Error procesando usuario {user_id}: {e}")
+                print(f"Error filtrando usuario {user_id}: {e}")
                 continue
 
-        # Título con información de búsqueda y filtros
+        filtered_users.append((user_name.lower(), user_id))
+
+    filtered_users.sort(key=lambda x: x[0])
+    return [user_id for _, user_id in filtered_users]
+
+# =================== VISTAS PERSISTENTES (custom_id) ===================
+
+class ListButton(discord.ui.DynamicItem[discord.ui.Button], template=r'rtb:(?P<kind>[tp]):(?P<action>[a-z]+):(?P<token>.*)'):
+    """Botón de lista paginada con el estado codificado en su custom_id"""
+
+    def __init__(self, kind: str, action: str, token: str, label: str,
+                 style: discord.ButtonStyle = discord.ButtonStyle.secondary, disabled: bool = False, row=None):
+        super().__init__(
+            discord.ui.Button(label=label, style=style, disabled=disabled, custom_id=f"rtb:{kind}:{action}:{token}"),
+            row=row
+        )
+        self.kind = kind
+        self.action = action
+        self.token = token
+
+    @classmethod
+    async def from_custom_id(cls, interaction: discord.Interaction, item: discord.ui.Button, match, /):
+        return cls(match['kind'], match['action'], match['token'], item.label, item.style, item.disabled)
+
+    async def callback(self, interaction: discord.Interaction):
+        if not await ensure_state_ready(interaction):
+            return
+        view_cls = TimesView if self.kind == "t" else PaymentView
+        view = view_cls.restore(interaction, self.token)
+        await view.handle_action(interaction, self.action)
+
+class ListSelect(discord.ui.DynamicItem[discord.ui.Select], template=r'rts:(?P<kind>[tp]):(?P<action>[a-z]+):(?P<token>.*)'):
+    """Menú desplegable de lista paginada con el estado codificado en su custom_id"""
+
+    def __init__(self, kind: str, action: str, token: str, placeholder: str, options, row=None):
+        super().__init__(
+            discord.ui.Select(placeholder=placeholder, options=options, custom_id=f"rts:{kind}:{action}:{token}"),
+            row=row
+        )
+        self.kind = kind
+        self.action = action
+        self.token = token
+
+    @classmethod
+    async def from_custom_id(cls, interaction: discord.Interaction, item: discord.ui.Select, match, /):
+        return cls(match['kind'], match['action'], match['token'], item.placeholder, item.options)
+
+    async def callback(self, interaction: discord.Interaction):
+        if not await ensure_state_ready(interaction):
+            return
+        view_cls = TimesView if self.kind == "t" else PaymentView
+        view = view_cls.restore(interaction, self.token)
+        await view.handle_select(interaction, self.action, self.item.values[0])
+
+def restore_list_state(kind: str, interaction: discord.Interaction, token: str):
+    """Obtener el estado de una lista desde el registro o desde su custom_id"""
+    tracker = trackers.for_guild(interaction.guild)
+    guild_id = interaction.guild.id if interaction.guild else None
+    decoded = ViewState.from_token(kind, guild_id, tracker.generation, token)
+    message_id = interaction.message.id if interaction.message else None
+
+    state = view_registry.get(message_id) if message_id else None
+    if state is None or state.kind != kind:
+        # Tras un reinicio o expiración: reconstruir desde el custom_id y el snapshot actual
+        state = decoded
+    else:
+        # El custom_id es la fuente de verdad de página, filtro y búsqueda
+        state.page = decoded.page
+        state.filter_status = decoded.filter_status
+        state.search_term = decoded.search_term
+
+    if message_id:
+        view_registry.open(state, key=message_id)
+    return state
+
+def register_list_message(view, message) -> None:
+    """Asociar el estado de una lista al mensaje que la muestra"""
+    if message is not None:
+        view_registry.open(view.state, key=message.id)
+
+# Margen por fila al empaquetar páginas: los tiempos activos siguen creciendo
+# (y pueden cambiar estado o créditos) después de calcular los límites
+ACTIVE_ROW_SLACK = 40
+STATIC_ROW_SLACK = 16
+# Reserva para pie de página, marcas de tiempo y campos fijos de cada página
+PAGE_FOOTER_RESERVE = 120
+
+def build_list_embeds(title, chunks, color, footer_text, empty_text, fields=()):
+    """Construir los embeds de una página sin pasar los límites de Discord.
+
+    chunks es una lista de listas de líneas, una por embed. Si alguna fila
+    creció más que el margen previsto, se corta la página en lugar de fallar.
+    """
+    remaining = MESSAGE_EMBEDS_TOTAL_LIMIT - len(title) - len(footer_text)
+    remaining -= sum(len(name) + len(value) for name, value in fields)
+
+    embeds = []
+    truncated = False
+    for lines in chunks:
+        description = []
+        used = 0
+        for line in lines:
+            cost = len(line) + 1
+            if used + cost > EMBED_DESCRIPTION_LIMIT or cost > remaining:
+                truncated = True
+                break
+            description.append(line)
+            used += cost
+            remaining -= cost
+        if description:
+            embeds.append(discord.Embed(description="\n".join(description), color=color))
+        if truncated:
+            break
+
+    if not embeds:
+        embeds.append(discord.Embed(description=empty_text, color=color))
+    if truncated:
+        footer_text += " • Página recortada, pulsa Actualizar"
+
+    embeds[0].title = title
+    for name, value in fields:
+        embeds[-1].add_field(name=name, value=value, inline=True)
+    embeds[-1].set_footer(text=footer_text)
+    embeds[-1].timestamp = datetime.now()
+    return embeds
+
+TIMES_FILTER_OPTIONS = [
+    discord.SelectOption(label="Todos los usuarios", value="all", emoji="📋"),
+    discord.SelectOption(label="Solo Activos", value="active", emoji="🟢"),
+    discord.SelectOption(label="Solo Pausados", value="paused", emoji="⏸️"),
+    discord.SelectOption(label="Solo Terminados", value="finished", emoji="✅"),
+    discord.SelectOption(label="Solo Inactivos", value="inactive", emoji="🔴")
+]
+
+def render_times_row(user_id, guild):
+    """Renderizar la línea de un usuario en la lista de tiempos (None si ya no existe)"""
+    tracker = trackers.for_guild(guild)
+    try:
+        user_id_int = int(user_id)
+        data = tracker.get_user_data(user_id_int)
+        if data is None:
+            return None
+        member = guild.get_member(user_id_int) if guild else None
+
+        if member:
+            user_mention = member.mention
+        else:
+            user_name = data.get('name', f'Usuario {user_id}')
+            user_mention = f"**{user_name}** `(ID: {user_id})`"
+
+        total_time = tracker.get_total_time(user_id_int)
+        formatted_time = tracker.format_time_human(total_time)
+
+        # Determinar estado del usuario
+        role_type = get_user_role_type(member)
+
+        # Verificar si ha completado su tiempo máximo
+        is_finished = time_limit_reached(data, total_time, role_type)
+
+        if data.get('is_active', False):
+            status = "🟢 Activo"
+        elif is_finished:
+            status = "✅ Terminado"
+        elif data.get('is_paused', False):
+            status = "⏸️ Pausado"
+        else:
+            status = "🔴 Inactivo"
+
+        credits = calculate_credits(total_time, role_type)
+        credit_info = f" 💰 {credits} Créditos" if credits > 0 else ""
+        role_info = get_role_info(member) if member else ""
+        return f"📌 {user_mention}{role_info} - ⏱️ {formatted_time}{credit_info} {status}"
+
+    except Exception as e:
+        print(f"Error procesando usuario {user_id}: {e}")
+        return None
+
+def member_fingerprint(member):
+    """Datos del miembro que afectan a su línea renderizada"""
+    if member is None:
+        return None
+    return tuple(role.id for role in member.roles)
+
+def cached_times_row(user_id, guild):
+    """Línea de la lista de tiempos, reutilizada mientras el usuario no cambie"""
+    tracker = trackers.for_guild(guild)
+    data = tracker.get_user_data(int(user_id))
+    if data is None:
+        return None
+    if data.get('is_active', False):
+        # El cronómetro de los usuarios activos cambia en cada render
+        return render_times_row(user_id, guild)
+
+    member = guild.get_member(int(user_id)) if guild else None
+    version = (tracker.get_user_version(user_id), member_fingerprint(member))
+    guild_id = guild.id if guild else None
+    return row_cache.get_or_render(("t", guild_id, user_id), version, lambda: render_times_row(user_id, guild))
+
+# Clase para manejar la paginación
+class TimesView(discord.ui.View):
+    """Lista de tiempos persistente: sobrevive reinicios porque su estado va en los custom_id"""
+
+    kind = "t"
+
+    def __init__(self, state, guild):
+        super().__init__(timeout=None)
+        self.state = state
+        self.guild = guild
+
+        # Actualizar estado inicial de botones
+        self.update_buttons()
+
+    @classmethod
+    def open(cls, guild, search_term=None, filter_status=None, tracked_users=None):
+        """Crear el estado de una nueva lista y su vista"""
+        tracker = trackers.for_guild(guild)
+        state = ViewState("tiempos", guild.id if guild else None, tracker.generation,
+                          filter_status=filter_status, search_term=search_term)
+        if tracked_users is None:
+            tracked_users = tracker.get_all_tracked_users()
+        view_registry.resolve(state, lambda: build_times_rows(tracked_users, guild, search_term, filter_status))
+        return cls(state, guild)
+
+    @classmethod
+    def restore(cls, interaction: discord.Interaction, token: str):
+        """Reconstruir la vista de un mensaje existente a partir de su custom_id"""
+        state = restore_list_state("tiempos", interaction, token)
+        return cls(state, interaction.guild)
+
+    @property
+    def tracker(self):
+        return trackers.for_guild(self.guild)
+
+    @property
+    def search_term(self):
+        return self.state.search_term
+
+    @property
+    def filter_status(self):
+        return self.state.filter_status
+
+    @property
+    def current_page(self):
+        return self.state.page
+
+    @current_page.setter
+    def current_page(self, page):
+        self.state.page = page
+
+    @property
+    def total_pages(self):
+        return max(1, len(self.get_page_bounds()))
+
+    def get_title(self):
+        """Título con información de búsqueda y filtros"""
         title = "⏰ Tiempos Registrados"
         if self.search_term:
             title += f" (Búsqueda: '{self.search_term}')"
         if self.filter_status:
             title += f" (Filtro: {self.filter_status})"
-
-        embed = discord.Embed(
-            title=title,
-            description="\n".join(user_list) if user_list else "No hay usuarios en esta página",
-            color=discord.Color.blue(),
-            timestamp=datetime.now()
+        return title
+
+    def get_page_bounds(self):
+        """Límites de página del snapshot, empaquetando tantas filas como quepan"""
+        def estimate_length(user_id):
+            line = cached_times_row(user_id, self.guild)
+            if line is None:
+                return 0
+            data = self.tracker.get_user_data(int(user_id)) or {}
+            return len(line) + (ACTIVE_ROW_SLACK if data.get('is_active', False) else STATIC_ROW_SLACK)
+
+        page_budget = MESSAGE_EMBEDS_TOTAL_LIMIT - len(self.get_title()) - PAGE_FOOTER_RESERVE
+        return view_registry.page_bounds(
+            self.state, self.get_rows(),
+            lambda rows: pack_pages((estimate_length(user_id) for user_id in rows), page_budget)
         )
 
-        footer_text = f"Página {self.current_page + 1}/{self.total_pages} • Total: {len(self.sorted_users)} usuarios"
+    def get_rows(self, refresh=False, tracked_users=None):
+        """Resolver los IDs de usuario de esta vista desde el snapshot compartido"""
+        state = self.state
+
+        def builder():
+            users = tracked_users if tracked_users is not None else self.tracker.get_all_tracked_users()
+            return build_times_rows(users, self.guild, state.search_term, state.filter_status)
+
+        return view_registry.resolve(state, builder, current_generation=self.tracker.generation, refresh=refresh)
+
+    def get_embeds(self):
+        """Crear los embeds de la página actual"""
+        rows = self.get_rows()
+        bounds = self.get_page_bounds()
+        page = bounds[self.current_page] if self.current_page < len(bounds) else ()
+
+        chunks = []
+        for chunk_start, chunk_end in page:
+            lines = [cached_times_row(user_id, self.guild) for user_id in rows[chunk_start:chunk_end]]
+            chunks.append([line for line in lines if line is not None])
+
+        footer_text = f"Página {self.current_page + 1}/{self.total_pages} • Total: {len(rows)} usuarios"
         if self.search_term:
             footer_text += f" encontrados"
 
-        embed.set_footer(text=footer_text)
-        return embed
-
-    @discord.ui.button(label='◀️ Anterior', style=discord.ButtonStyle.secondary)
-    async def previous_page(self, interaction: discord.Interaction, button: discord.ui.Button):
+        embeds = build_list_embeds(self.get_title(), chunks, discord.Color.blue(), footer_text,
+                                   "No hay usuarios en esta página")
+        self.state.rendered_digest = page_digest(embeds)
+        return embeds
+
+    async def handle_action(self, interaction: discord.Interaction, action: str):
+        """Ejecutar la acción de un botón de la lista"""
+        if action == "prev":
+            await self.previous_page(interaction)
+        elif action == "next":
+            await self.next_page(interaction)
+        elif action == "goto":
+            await self.go_to_page(interaction)
+        elif action == "search":
+            await self.search_user(interaction)
+        elif action == "refresh":
+            await self.refresh_data(interaction)
+
+    async def handle_select(self, interaction: discord.Interaction, action: str, value: str):
+        """Ejecutar la acción de un menú desplegable de la lista"""
+        if action == "filter":
+            await self.filter_select(interaction, value)
+
+    async def previous_page(self, interaction: discord.Interaction):
         if self.current_page > 0:
             self.current_page -= 1
         self.update_buttons()
-        embed = self.get_embed()
-        await interaction.response.edit_message(embed=embed, view=self)
+        embeds = self.get_embeds()
+        await interaction.response.edit_message(embeds=embeds, view=self)
 
-    @discord.ui.button(label='▶️ Siguiente', style=discord.ButtonStyle.secondary)
-    async def next_page(self, interaction: discord.Interaction, button: discord.ui.Button):
+    async def next_page(self, interaction: discord.Interaction):
         if self.current_page < self.total_pages - 1:
             self.current_page += 1
         self.update_buttons()
-        embed = self.get_embed()
-        await interaction.response.edit_message(embed=embed, view=self)
+        embeds = self.get_embeds()
+        await interaction.response.edit_message(embeds=embeds, view=self)
 
-    @discord.ui.button(label='📄 Ir a página', style=discord.ButtonStyle.primary)
-    async def go_to_page(self, interaction: discord.Interaction, button: discord.ui.Button):
+    async def go_to_page(self, interaction: discord.Interaction):
         modal = PageModal(self)
         await interaction.response.send_modal(modal)
 
-    @discord.ui.button(label='🔍 Buscar', style=discord.ButtonStyle.secondary)
-    async def search_user(self, interaction: discord.Interaction, button: discord.ui.Button):
+    async def search_user(self, interaction: discord.Interaction):
         modal = SearchModal(self)
         await interaction.response.send_modal(modal)
 
-    @discord.ui.button(label='🔄 Actualizar', style=discord.ButtonStyle.success)
-    async def refresh_data(self, interaction: discord.Interaction, button: discord.ui.Button):
+    async def refresh_data(self, interaction: discord.Interaction):
         try:
             await interaction.response.defer()
 
-            # Recargar datos con timeout extendido para muchos usuarios
-            tracked_users = await asyncio.wait_for(
-                asyncio.to_thread(time_tracker.get_all_tracked_users),
-                timeout=15.0
-            )
-
-            # Aplicar filtros existentes con timeout
-            filtered_users = await asyncio.wait_for(
-                self._apply_filters(tracked_users),
-                timeout=10.0
-            )
+            # Solo recargar, filtrar y ordenar si los datos cambiaron desde el snapshot
+            if self.state.generation != self.tracker.generation:
+                # Recargar datos con timeout extendido para muchos usuarios
+                tracked_users = await asyncio.wait_for(
+                    asyncio.to_thread(self.tracker.get_all_tracked_users),
+                    timeout=15.0
+                )
 
-            # Actualizar datos internos
-            self.sorted_users = filtered_users
-            self.total_pages = (len(filtered_users) + self.max_per_page - 1) // self.max_per_page if filtered_users else 1
+                # Reconstruir el snapshot de esta vista con los datos actuales
+                await load_tracked_members(self.guild, tracked_users)
+                self.get_rows(refresh=True, tracked_users=tracked_users)
 
             # Asegurar que la página actual sea válida
             if self.current_page >= self.total_pages:
                 self.current_page = max(0, self.total_pages - 1)
 
-            # Rehabilitar botones de navegación si hay múltiples páginas
-            if self.total_pages > 1:
-                for item in self.children:
-                    if isinstance(item, discord.ui.Button) and item.label in ['◀️ Anterior', '▶️ Siguiente', '📄 Ir a página']:
-                        # Rehabilitar botones que podrían haberse deshabilitado incorrectamente
-                        if item.label == '📄 Ir a página':
-                            item.disabled = False
-                        elif item.label == '◀️ Anterior':
-                            item.disabled = (self.current_page == 0)
-                        elif item.label == '▶️ Siguiente':
-                            item.disabled = (self.current_page >= self.total_pages - 1)
+            # Obtener embed actualizado; solo se vuelven a renderizar las filas
+            # que cambiaron y los cronómetros activos
+            previous_digest = self.state.rendered_digest
+            embeds = self.get_embeds()
+            if self.state.rendered_digest == previous_digest:
+                # La página es idéntica a la del mensaje: no gastar una edición
+                return
 
-            # Actualizar botones
+            # Actualizar botones (los custom_id llevan la página actual)
             self.update_buttons()
 
-            # Obtener embed actualizado
-            embed = self.get_embed()
-
             # Actualizar el mensaje existente
-            await interaction.edit_original_response(embed=embed, view=self)
+            await interaction.edit_original_response(embeds=embeds, view=self)
 
         except asyncio.TimeoutError:
             await interaction.edit_original_response(content="⚠️ Timeout al actualizar datos. Intenta de nuevo.")
         except Exception as e:
             await interaction.edit_original_response(content=f"❌ Error al actualizar: {e}")
 
-    @discord.ui.select(
-        placeholder="Filtrar por estado...",
-        options=[
-            discord.SelectOption(label="Todos los usuarios", value="all", emoji="📋"),
-            discord.SelectOption(label="Solo Activos", value="active", emoji="🟢"),
-            discord.SelectOption(label="Solo Pausados", value="paused", emoji="⏸️"),
-            discord.SelectOption(label="Solo Terminados", value="finished", emoji="✅"),
-            discord.SelectOption(label="Solo Inactivos", value="inactive", emoji="🔴")
-        ]
-    )
-    async def filter_select(self, interaction: discord.Interaction, select: discord.ui.Select):
-        selected_filter = select.values[0]
-
+    async def filter_select(self, interaction: discord.Interaction, selected_filter: str):
         try:
-            # Recargar datos
-            tracked_users = await asyncio.wait_for(
-                asyncio.to_thread(time_tracker.get_all_tracked_users),
-                timeout=5.0
-            )
-
-            # Aplicar filtro seleccionado
-            self.filter_status = selected_filter if selected_filter != "all" else None
-            filtered_users = await self._apply_filters(tracked_users)
+            await interaction.response.defer()
 
-            # Actualizar datos y resetear página
-            self.sorted_users = filtered_users
-            self.current_page = 0
-            self.total_pages = (len(filtered_users) + self.max_per_page - 1) // self.max_per_page if filtered_users else 1
+            # Aplicar filtro seleccionado y resetear página; el snapshot se
+            # comparte con otras vistas que usen el mismo filtro
+            self.state.filter_status = selected_filter if selected_filter != "all" else None
+            self.state.page = 0
+            if self.state.filter_status:
+                # El estado "terminado" depende del nivel de cada miembro
+                await load_tracked_members(self.guild, self.tracker.get_all_tracked_users())
+            self.get_rows()
 
             # Actualizar botones según nueva paginación
             self.update_buttons()
 
             # Obtener embed actualizado
-            embed = self.get_embed()
+            embeds = self.get_embeds()
 
             # Actualizar el mensaje existente
-            await interaction.response.edit_message(embed=embed, view=self)
+            await interaction.edit_original_response(embeds=embeds, view=self)
 
         except Exception as e:
-            await interaction.response.send_message(f"❌ Error aplicando filtro: {e}", ephemeral=True)
-
-    async def _apply_filters(self, tracked_users):
-        """Aplicar filtros de búsqueda y estado"""
-        filtered_users = []
-
-        for user_id, data in tracked_users.items():
-            user_name = data.get('name', f'Usuario {user_id}')
-
-            # Aplicar filtro de búsqueda
-            if self.search_term and self.search_term.lower() not in user_name.lower():
-                continue
-
-            # Aplicar filtro de estado
-            if self.filter_status:
-                try:
-                    user_id_int = int(user_id)
-                    member = self.guild.get_member(user_id_int) if self.guild else None
-                    total_time = time_tracker.get_total_time(user_id_int)
-
-                    # Determinar estado actual
-                    total_hours = total_time / 3600
-                    role_type = get_user_role_type(member) if member else "normal"
-
-                    # Determinar si está terminado (ha alcanzado su límite máximo)
-                    is_finished = (data.get("milestone_completed", False) or
-                                 (role_type == "gold" and total_hours >= 2.0) or
-                                 (role_type == "normal" and total_hours >= 1.0))
-
-                    if data.get('is_active', False):
-                        status = "active"
-                    elif is_finished:
-                        status = "finished"
-                    elif data.get('is_paused', False):
-                        status = "paused"
-                    else:
-                        status = "inactive"
-
-                    # Filtrar por estado
-                    if self.filter_status != status:
-                        continue
-
-                except Exception as e:
-                    print(f"Error filtrando usuario {user_id}: {e}")
-                    continue
-
-            filtered_users.append((user_name.lower(), user_id, data))
-
-        filtered_users.sort(key=lambda x: x[0])
-        return filtered_users
+            await interaction.followup.send(f"❌ Error aplicando filtro: {e}", ephemeral=True)
 
     def update_buttons(self):
-        """Actualizar estado de los botones según la página actual"""
-        # Buscar los botones de navegación por su label
-        for item in self.children:
-            if isinstance(item, discord.ui.Button):
-                if item.label == '◀️ Anterior':
-                    item.disabled = (self.current_page == 0)
-                elif item.label == '▶️ Siguiente':
-                    item.disabled = (self.current_page >= self.total_pages - 1)
-                elif item.label == '📄 Ir a página':
-                    item.disabled = (self.total_pages <= 1)
-
-    async def on_timeout(self):
-        """Deshabilitar botones cuando expire el timeout"""
-        for item in self.children:
-            item.disabled = True
+        """Reconstruir los componentes con la página actual codificada en sus custom_id"""
+        total_pages = self.total_pages
+        token = self.state.to_token()
+
+        self.clear_items()
+        self.add_item(ListButton(self.kind, "prev", token, '◀️ Anterior', disabled=(self.current_page == 0)))
+        self.add_item(ListButton(self.kind, "next", token, '▶️ Siguiente',
+                                 disabled=(self.current_page >= total_pages - 1)))
+        self.add_item(ListButton(self.kind, "goto", token, '📄 Ir a página', discord.ButtonStyle.primary,
+                                 disabled=(total_pages <= 1)))
+        self.add_item(ListButton(self.kind, "search", token, '🔍 Buscar'))
+        self.add_item(ListButton(self.kind, "refresh", token, '🔄 Actualizar', discord.ButtonStyle.success))
+        self.add_item(ListSelect(self.kind, "filter", token, "Filtrar por estado...", TIMES_FILTER_OPTIONS))
+
+        # Las interacciones se enrutan por custom_id (add_dynamic_items), así que
+        # la vista no debe quedar retenida en el ViewStore del bot
+        self.stop()
 
 class PageModal(discord.ui.Modal):
     def __init__(self, view):
@@ -758,8 +1035,8 @@ class PageModal(discord.ui.Modal):
             if 1 <= page <= self.view.total_pages:
                 self.view.current_page = page - 1
                 self.view.update_buttons()
-                embed = self.view.get_embed()
-                await interaction.response.edit_message(embed=embed, view=self.view)
+                embeds = self.view.get_embeds()
+                await interaction.response.edit_message(embeds=embeds, view=self.view)
             else:
                 await interaction.response.send_message(
                     f"❌ Página inválida. Debe estar entre 1 y {self.view.total_pages}",
@@ -781,44 +1058,38 @@ class SearchModal(discord.ui.Modal):
     )
 
     async def on_submit(self, interaction: discord.Interaction):
-        search_term = self.search_term.value.lower().strip()
-
         # Obtener todos los usuarios sin filtro
         try:
+            await interaction.response.defer()
             tracked_users = await asyncio.wait_for(
-                asyncio.to_thread(time_tracker.get_all_tracked_users),
+                asyncio.to_thread(self.view.tracker.get_all_tracked_users),
                 timeout=2.0
             )
 
-            # Filtrar usuarios
-            filtered_users = []
-            for user_id, data in tracked_users.items():
-                user_name = data.get('name', f'Usuario {user_id}').lower()
-                if search_term in user_name:
-                    filtered_users.append((user_name, user_id, data))
-
-            filtered_users.sort(key=lambda x: x[0])
+            # Crear nueva vista con resultados filtrados (snapshot compartido)
+            await load_tracked_members(self.view.guild, tracked_users)
+            new_view = TimesView.open(self.view.guild, search_term=self.search_term.value,
+                                      filter_status=self.view.filter_status, tracked_users=tracked_users)
 
-            if not filtered_users:
-                await interaction.response.send_message(
+            if not new_view.get_rows():
+                await interaction.followup.send(
                     f"❌ No se encontraron usuarios con '{self.search_term.value}' en su nombre",
                     ephemeral=True
                 )
                 return
 
-            # Crear nueva vista con resultados filtrados
-            new_view = TimesView(filtered_users, self.view.guild, max_per_page=self.view.max_per_page,
-                               search_term=self.search_term.value, filter_status=self.view.filter_status)
-            embed = new_view.get_embed()
+            embeds = new_view.get_embeds()
 
-            await interaction.response.edit_message(embed=embed, view=new_view)
+            message = await interaction.edit_original_response(embeds=embeds, view=new_view)
+            register_list_message(new_view, message)
 
         except Exception as e:
-            await interaction.response.send_message(f"❌ Error en búsqueda: {e}", ephemeral=True)
+            await interaction.followup.send(f"❌ Error en búsqueda: {e}", ephemeral=True)
 
 @bot.tree.command(name="ver_tiempos", description="Ver todos los tiempos registrados con filtros y actualización en tiempo real")
 @is_admin()
 async def ver_tiempos(interaction: discord.Interaction):
+    tracker = trackers.for_guild(interaction.guild)
     try:
         await interaction.response.defer(ephemeral=False)
     except Exception as e:
@@ -830,7 +1101,7 @@ async def ver_tiempos(interaction: discord.Interaction):
 
     try:
         tracked_users = await asyncio.wait_for(
-            asyncio.to_thread(time_tracker.get_all_tracked_users),
+            asyncio.to_thread(tracker.get_all_tracked_users),
             timeout=5.0
         )
 
@@ -844,22 +1115,18 @@ async def ver_tiempos(interaction: discord.Interaction):
                 print(f"Error enviando mensaje de sin usuarios: {e}")
             return
 
-        # Ordenar usuarios alfabéticamente por nombre
-        sorted_users = []
-        for user_id, data in tracked_users.items():
-            user_name = data.get('name', f'Usuario {user_id}')
-            sorted_users.append((user_name.lower(), user_id, data))
-
-        sorted_users.sort(key=lambda x: x[0])
-
-        # Usar paginación con filtrado mejorado y botones de actualización
-        view = TimesView(sorted_users, interaction.guild, max_per_page=20)
-        embed = view.get_embed()
+        # Usar paginación con filtrado mejorado y botones de actualización;
+        # la lista ordenada alfabéticamente se comparte entre vistas
+        await load_tracked_members(interaction.guild, tracked_users)
+        view = TimesView.open(interaction.guild, tracked_users=tracked_users)
+        embeds = view.get_embeds()
 
         if not interaction.response.is_done():
-            await interaction.response.send_message(embed=embed, view=view)
+            await interaction.response.send_message(embeds=embeds, view=view)
+            message = await interaction.original_response()
         else:
-            await interaction.followup.send(embed=embed, view=view)
+            message = await interaction.followup.send(embeds=embeds, view=view, wait=True)
+        register_list_message(view, message)
 
     except asyncio.TimeoutError:
         error_msg = "❌ Timeout al obtener usuarios. Intenta de nuevo."
@@ -885,12 +1152,119 @@ async def ver_tiempos(interaction: discord.Interaction):
         except Exception as e2:
             print(f"No se pudo enviar mensaje de error final: {e2}")
 
+@bot.tree.command(name="estado_vistas", description="Ver la memoria usada por las listas paginadas abiertas")
+@is_admin()
+async def estado_vistas(interaction: discord.Interaction):
+    report = view_registry.memory_report()
+
+    embed = discord.Embed(
+        title="🧠 Estado de Vistas Paginadas",
+        color=discord.Color.blue(),
+        timestamp=datetime.now()
+    )
+    embed.add_field(name="📋 Vistas abiertas", value=str(report['open_views']), inline=True)
+    embed.add_field(name="🗂️ Snapshots en caché", value=str(report['snapshots']), inline=True)
+    embed.add_field(name="👥 Filas compartidas", value=str(report['snapshot_rows']), inline=True)
+    embed.add_field(
+        name="💾 Memoria aproximada",
+        value=f"Estados: {report['state_bytes'] / 1024:.1f} KB\n"
+              f"Snapshots: {report['snapshot_bytes'] / 1024:.1f} KB\n"
+              f"Total: {report['total_bytes'] / 1024:.1f} KB",
+        inline=False
+    )
+    embed.add_field(
+        name="🎯 Caché",
+        value=f"Aciertos: {report['cache_hits']}\nReconstrucciones: {report['cache_misses']}",
+        inline=False
+    )
+    embed.add_field(
+        name="🧾 Filas renderizadas",
+        value=f"En caché: {len(row_cache)}\nReutilizadas: {row_cache.hits}\nRenderizadas: {row_cache.misses}",
+        inline=False
+    )
+    embed.add_field(
+        name="👥 Miembros en caché",
+        value=f"{sum(len(guild.members) for guild in bot.guilds)} en caché\n"
+              f"Búsquedas a la API: {member_misses.fetches}\n"
+              f"No encontrados recordados: {len(member_misses)} (evitados: {member_misses.skipped})",
+        inline=False
+    )
+    writer_stats = shared_writer().stats()
+    embed.add_field(
+        name="💽 Escritura a disco",
+        value=f"Escrituras: {writer_stats['commits']} (fallidas: {writer_stats['failures']})\n"
+              f"Pendientes: {writer_stats['pending']}\n"
+              f"Latencia: última {writer_stats['last_latency_ms']:.1f} ms, "
+              f"media {writer_stats['avg_latency_ms']:.1f} ms, máx {writer_stats['max_latency_ms']:.1f} ms",
+        inline=False
+    )
+    embed.set_footer(text="Los estados sin uso se liberan a los 5 minutos; las listas se reconstruyen desde sus botones")
+
+    await interaction.response.send_message(embed=embed, ephemeral=True)
+
+@bot.tree.command(name="estado_shards", description="Ver latencia y eventos por shard de la conexión al gateway")
+@is_admin()
+async def estado_shards(interaction: discord.Interaction):
+    if isinstance(bot, commands.AutoShardedBot):
+        latencies = bot.latencies
+    else:
+        latencies = [(0, bot.latency)]
+
+    guild_counts = {}
+    for guild in bot.guilds:
+        guild_counts[guild.shard_id] = guild_counts.get(guild.shard_id, 0) + 1
+
+    report = bot.shard_metrics.report(latencies, guild_counts)
+
+    embed = discord.Embed(
+        title="🛰️ Estado de Shards",
+        description=f"Shards en este proceso: {len(report)} de {bot.shard_count or 1}",
+        color=discord.Color.blue(),
+        timestamp=datetime.now()
+    )
+
+    # Discord permite hasta 25 campos por embed
+    for row in report[:25]:
+        shard = bot.get_shard(row['shard_id']) if isinstance(bot, commands.AutoShardedBot) else None
+        is_down = shard is not None and shard.is_closed()
+        latency = f"{row['latency_ms']:.0f} ms" if row['latency_ms'] is not None else "Sin datos"
+        embed.add_field(
+            name=f"{'🔴' if is_down else '🟢'} Shard {row['shard_id']}",
+            value=f"Latencia: {latency}\n"
+                  f"Servidores: {row['guilds']}\n"
+                  f"Eventos/min: {row['events_per_minute']:.0f}\n"
+                  f"Reconexiones: {row['connects']} • Reanudaciones: {row['resumes']}",
+            inline=True
+        )
+
+    embed.set_footer(text="Eventos contados en el último minuto")
+    await interaction.response.send_message(embed=embed, ephemeral=True)
+
+@bot.tree.command(name="sincronizar_comandos", description="Forzar la sincronización de los comandos slash con Discord")
+@is_admin()
+async def sincronizar_comandos(interaction: discord.Interaction):
+    await interaction.response.defer(ephemeral=True, thinking=True)
+    try:
+        synced_global = await command_sync.sync(bot.tree, force=True)
+        synced_guild = await command_sync.sync(bot.tree, guild=interaction.guild, force=True)
+        await interaction.followup.send(
+            f"✅ Comandos sincronizados: {len(synced_global)} globales y {len(synced_guild)} de este servidor\n"
+            f"💡 Pueden tardar unos minutos en aparecer en Discord",
+            ephemeral=True
+        )
+    except Exception as e:
+        print(f"❌ Error al sincronizar comandos: {e}")
+        await interaction.followup.send(f"❌ Error al sincronizar comandos: {e}", ephemeral=True)
+
 @bot.tree.command(name="reiniciar_tiempo", description="Reiniciar el tiempo de un usuario a cero")
 @discord.app_commands.describe(usuario="El usuario cuyo tiempo se reiniciará")
 @is_admin()
 async def reiniciar_tiempo(interaction: discord.Interaction, usuario: discord.Member):
-    success = time_tracker.reset_user_time(usuario.id)
+    tracker = trackers.for_guild(interaction.guild)
+    success = await tracker.call('reset_user_time', usuario.id)
     if success:
+        if not await tracker.flush():
+            print(f"⚠️ El reinicio de {usuario.display_name} no se pudo confirmar en disco")
         await interaction.response.send_message(f"🔄 Tiempo reiniciado para {usuario.mention} por {interaction.user.mention}")
     else:
         await interaction.response.send_message(f"❌ No se encontró registro de tiempo para {usuario.mention}", ephemeral=True)
@@ -898,7 +1272,12 @@ async def reiniciar_tiempo(interaction: discord.Interaction, usuario: discord.Me
 @bot.tree.command(name="reiniciar_todos_tiempos", description="Reiniciar todos los tiempos de todos los usuarios")
 @is_admin()
 async def reiniciar_todos_tiempos(interaction: discord.Interaction):
-    usuarios_reiniciados = time_tracker.reset_all_user_times()
+    tracker = trackers.for_guild(interaction.guild)
+    usuarios_reiniciados = await tracker.call('reset_all_user_times')
+    # Reinicio de pagos: confirmar que quedó en disco antes de responder
+    if usuarios_reiniciados > 0 and not await tracker.flush():
+        await interaction.response.send_message("❌ Los tiempos se reiniciaron pero no se pudieron guardar en disco; revisa los logs", ephemeral=True)
+        return
     if usuarios_reiniciados > 0:
         await interaction.response.send_message(f"🔄 Tiempos reiniciados para {usuarios_reiniciados} usuario(s)")
     else:
@@ -907,7 +1286,8 @@ async def reiniciar_todos_tiempos(interaction: discord.Interaction):
 @bot.tree.command(name="limpiar_base_datos", description="ELIMINAR COMPLETAMENTE todos los usuarios registrados de la base de datos")
 @is_admin()
 async def limpiar_base_datos(interaction: discord.Interaction):
-    tracked_users = time_tracker.get_all_tracked_users()
+    tracker = trackers.for_guild(interaction.guild)
+    tracked_users = tracker.get_all_tracked_users()
     user_count = len(tracked_users)
 
     if user_count == 0:
@@ -950,18 +1330,19 @@ async def limpiar_base_datos(interaction: discord.Interaction):
 @discord.app_commands.describe(confirmar="Escribe 'SI' para confirmar la eliminación completa")
 @is_admin()
 async def limpiar_base_datos_confirmar(interaction: discord.Interaction, confirmar: str):
+    tracker = trackers.for_guild(interaction.guild)
     if confirmar.upper() != "SI":
         await interaction.response.send_message("❌ Operación cancelada. Debes escribir 'SI' para confirmar", ephemeral=True)
         return
 
-    tracked_users = time_tracker.get_all_tracked_users()
+    tracked_users = tracker.get_all_tracked_users()
     user_count = len(tracked_users)
 
     if user_count == 0:
         await interaction.response.send_message("❌ No hay usuarios registrados en la base de datos", ephemeral=True)
         return
 
-    success = time_tracker.clear_all_data()
+    success = await tracker.call('clear_all_data') and await tracker.flush()
 
     if success:
         embed = discord.Embed(
@@ -994,40 +1375,30 @@ async def limpiar_base_datos_confirmar(interaction: discord.Interaction, confirm
 @discord.app_commands.describe(usuario="El usuario cuyo tiempo se cancelará (conserva horas completas)")
 @is_admin()
 async def cancelar_tiempo(interaction: discord.Interaction, usuario: discord.Member):
-    user_data = time_tracker.get_user_data(usuario.id)
-    total_time = time_tracker.get_total_time(usuario.id)
-    user_id = usuario.id
-
-    if user_data:
-        # Calcular horas completas y tiempo perdido
-        total_hours = int(total_time // 3600)
-        hours_time = total_hours * 3600  # Solo horas completas en segundos
-        lost_time = total_time - hours_time  # Tiempo perdido (minutos/segundos)
-
-        formatted_total_time = time_tracker.format_time_human(total_time)
-        formatted_hours_time = time_tracker.format_time_human(hours_time)
-        formatted_lost_time = time_tracker.format_time_human(lost_time)
-
-        # Usar la nueva función de cancelación que conserva horas
-        success = time_tracker.cancel_user_tracking_keep_hours(user_id)
-        if success:
-            if lost_time > 0:
-                await interaction.response.send_message(
-                    f"🗑️ El tiempo de {usuario.mention} ha sido cancelado\n"
-                    f"✅ **Tiempo conservado:** {formatted_hours_time} (horas completas)\n"
-                    f"❌ **Tiempo perdido:** {formatted_lost_time}"
-                )
-                await send_cancellation_notification(usuario.display_name, interaction.user.mention, formatted_total_time, formatted_hours_time, formatted_lost_time)
-            else:
-                await interaction.response.send_message(
-                    f"🗑️ El tiempo de {usuario.mention} ha sido cancelado\n"
-                    f"✅ **Tiempo conservado:** {formatted_hours_time}"
-                )
-                await send_cancellation_notification(usuario.display_name, interaction.user.mention, formatted_total_time, formatted_hours_time)
-        else:
-            await interaction.response.send_message(f"❌ Error al cancelar el tiempo para {usuario.mention}", ephemeral=True)
-    else:
+    tracker = trackers.for_guild(interaction.guild)
+    # Conserva las horas completas; el resultado trae el tiempo antes y después
+    result = await tracker.call('cancel_user_tracking_keep_hours', usuario.id)
+    if not result:
         await interaction.response.send_message(f"❌ No se encontró registro de tiempo para {usuario.mention}", ephemeral=True)
+        return
+
+    formatted_total_time = tracker.format_time_human(result.total_before)
+    formatted_hours_time = tracker.format_time_human(result.total_after)
+    formatted_lost_time = tracker.format_time_human(result.time_lost)
+
+    if result.time_lost > 0:
+        await interaction.response.send_message(
+            f"🗑️ El tiempo de {usuario.mention} ha sido cancelado\n"
+            f"✅ **Tiempo conservado:** {formatted_hours_time} (horas completas)\n"
+            f"❌ **Tiempo perdido:** {formatted_lost_time}"
+        )
+        await send_cancellation_notification(usuario.display_name, interaction.user.mention, formatted_total_time, formatted_hours_time, formatted_lost_time)
+    else:
+        await interaction.response.send_message(
+            f"🗑️ El tiempo de {usuario.mention} ha sido cancelado\n"
+            f"✅ **Tiempo conservado:** {formatted_hours_time}"
+        )
+        await send_cancellation_notification(usuario.display_name, interaction.user.mention, formatted_total_time, formatted_hours_time)
 
 # Comandos de configuración de canales removidos - ahora se configuran directamente en config.json
 
@@ -1035,14 +1406,15 @@ async def cancelar_tiempo(interaction: discord.Interaction, usuario: discord.Mem
 @discord.app_commands.describe(usuario="El usuario del que ver estadísticas")
 @is_admin()
 async def ver_tiempo(interaction: discord.Interaction, usuario: discord.Member):
-    user_data = time_tracker.get_user_data(usuario.id)
+    tracker = trackers.for_guild(interaction.guild)
+    user_data = tracker.get_user_data(usuario.id)
 
     if not user_data:
         await interaction.response.send_message(f"❌ No se encontraron datos para {usuario.mention}", ephemeral=True)
         return
 
-    total_time = time_tracker.get_total_time(usuario.id)
-    formatted_time = time_tracker.format_time_human(total_time)
+    total_time = tracker.get_total_time(usuario.id)
+    formatted_time = tracker.format_time_human(total_time)
 
     embed = discord.Embed(
         title=f"📊 Estadísticas de {usuario.display_name}",
@@ -1053,13 +1425,10 @@ async def ver_tiempo(interaction: discord.Interaction, usuario: discord.Member):
     embed.add_field(name="⏱️ Tiempo Total", value=formatted_time, inline=True)
 
     # Determinar estado del usuario
-    total_hours = total_time / 3600
     role_type = get_user_role_type(usuario)
 
     # Verificar si ha completado su tiempo máximo
-    is_finished = (user_data.get("milestone_completed", False) or
-                  (role_type == "gold" and total_hours >= 2.0) or
-                  (role_type == "normal" and total_hours >= 1.0))
+    is_finished = time_limit_reached(user_data, total_time, role_type)
 
     if user_data.get('is_active', False):
         status = "🟢 Activo"
@@ -1072,17 +1441,14 @@ async def ver_tiempo(interaction: discord.Interaction, usuario: discord.Member):
 
     embed.add_field(name="📍 Estado", value=status, inline=True)
 
-    # Mostrar tipo de rol del usuario
-    role_type = get_user_role_type(usuario)
-    if role_type == "gold":
-        embed.add_field(name="🎭 Tipo de Usuario", value="🏆 Gold - Límite: 2 horas", inline=True)
-    else:
-        embed.add_field(name="🎭 Tipo de Usuario", value="👤 Recluta - Límite: 1 hora", inline=True)
+    # Mostrar el nivel del usuario
+    tier = tier_rules.tier(role_type)
+    embed.add_field(name="🎭 Tipo de Usuario", value=f"{tier.emoji} {tier.label} - Límite: {format_hours(tier.max_hours)}", inline=True)
 
     # Mostrar tiempo pausado si aplica
     if user_data.get('is_paused', False):
-        paused_duration = time_tracker.get_paused_duration(usuario.id)
-        formatted_paused_time = time_tracker.format_time_human(paused_duration) if paused_duration > 0 else "0 Segundos"
+        paused_duration = tracker.get_paused_duration(usuario.id)
+        formatted_paused_time = tracker.format_time_human(paused_duration) if paused_duration > 0 else "0 Segundos"
         embed.add_field(
             name="⏸️ Tiempo Pausado",
             value=formatted_paused_time,
@@ -1090,18 +1456,18 @@ async def ver_tiempo(interaction: discord.Interaction, usuario: discord.Member):
         )
 
     # Mostrar contador de pausas
-    pause_count = time_tracker.get_pause_count(usuario.id)
-    if role_type == "gold":
+    pause_count = tracker.get_pause_count(usuario.id)
+    if tier.max_pauses is None:
         embed.add_field(
             name="📊 Pausas",
-            value="Ilimitadas (Gold)",
+            value=f"Ilimitadas ({tier.label})",
             inline=True
         )
     else:
         pause_text = "pausa" if pause_count == 1 else "pausas"
         embed.add_field(
             name="📊 Pausas",
-            value=f"{pause_count} {pause_text} de 3 máximo",
+            value=f"{pause_count} {pause_text} de {tier.max_pauses} máximo",
             inline=True
         )
 
@@ -1143,18 +1509,17 @@ async def ver_roles_usuario(interaction: discord.Interaction, usuario: discord.M
 
         embed.set_thumbnail(url=usuario.avatar.url if usuario.avatar else usuario.default_avatar.url)
 
-        # Verificar si tiene rol Gold
-        role_type = get_user_role_type(usuario)
-        if role_type == "gold":
-            gold_roles = [role for role in user_roles if "gold" in role.name.lower()]
-            if gold_roles:
-                gold_text = ""
-                for role in gold_roles:
-                    gold_text += f"🏆 **{role.name}**\n"
-                embed.add_field(name="⭐ Rol Gold", value=gold_text, inline=False)
+        # Roles que dan el nivel del usuario
+        tier = tier_rules.tier_for_member(usuario)
+        tier_roles = [role for role in user_roles if tier.matches(role)]
+        if tier_roles:
+            tier_text = ""
+            for role in tier_roles:
+                tier_text += f"{tier.emoji} **{role.name}**\n"
+            embed.add_field(name=f"⭐ Rol {tier.label}", value=tier_text, inline=False)
 
         # Otros roles
-        other_roles = [role for role in user_roles if "gold" not in role.name.lower()]
+        other_roles = [role for role in user_roles if role not in tier_roles]
         if other_roles:
             otros_text = ""
             for role in other_roles[:10]:  # Limitar a 10 roles
@@ -1176,14 +1541,16 @@ async def ver_roles_usuario(interaction: discord.Interaction, usuario: discord.M
 @is_admin()
 async def ver_pre_registrados(interaction: discord.Interaction):
     """Mostrar usuarios que están pre-registrados"""
+    tracker = trackers.for_guild(interaction.guild)
     try:
-        pre_registered_users = time_tracker.get_pre_registered_users()
+        pre_registered_users = tracker.get_pre_registered_users()
 
         if not pre_registered_users:
             await interaction.response.send_message("📋 No hay usuarios pre-registrados actualmente", ephemeral=True)
             return
 
         mexico_now = datetime.now(MEXICO_TZ)
+        (start_hour, start_minute), _ = get_guild_schedule(interaction.guild.id)
 
         embed = discord.Embed(
             title="📋 Usuarios Pre-registrados",
@@ -1235,11 +1602,11 @@ async def ver_pre_registrados(interaction: discord.Interaction):
 
         embed.add_field(
             name="🕐 Próximo inicio",
-            value=f"{START_TIME_HOUR}:{START_TIME_MINUTE:02d} México",
+            value=f"{start_hour}:{start_minute:02d} México",
             inline=True
         )
 
-        embed.set_footer(text=f"Los tiempos se iniciarán automáticamente a las {START_TIME_HOUR}:{START_TIME_MINUTE:02d} México")
+        embed.set_footer(text=f"Los tiempos se iniciarán automáticamente a las {start_hour}:{start_minute:02d} México")
 
         await interaction.response.send_message(embed=embed)
 
@@ -1250,9 +1617,10 @@ async def ver_pre_registrados(interaction: discord.Interaction):
 @bot.tree.command(name="mi_tiempo", description="Ver tu propio tiempo registrado")
 async def mi_tiempo(interaction: discord.Interaction):
     """Comando para que los usuarios vean su propio tiempo"""
+    tracker = trackers.for_guild(interaction.guild)
     try:
         user_id = interaction.user.id
-        user_data = time_tracker.get_user_data(user_id)
+        user_data = tracker.get_user_data(user_id)
 
         if not user_data:
             await interaction.response.send_message(
@@ -1261,12 +1629,12 @@ async def mi_tiempo(interaction: discord.Interaction):
             )
             return
 
-        total_time = time_tracker.get_total_time(user_id)
-        formatted_time = time_tracker.format_time_human(total_time)
+        total_time = tracker.get_total_time(user_id)
+        formatted_time = tracker.format_time_human(total_time)
 
         # Obtener tipo de rol del usuario
-        member = interaction.guild.get_member(user_id) if interaction.guild else None
-        role_type = get_user_role_type(member) if member else "normal"
+        member = interaction.user if isinstance(interaction.user, discord.Member) else None
+        role_type = get_user_role_type(member)
 
         # Crear embed con información del usuario
         embed = discord.Embed(
@@ -1278,12 +1646,9 @@ async def mi_tiempo(interaction: discord.Interaction):
         embed.add_field(name="⏱️ Tiempo Total", value=formatted_time, inline=True)
 
         # Determinar estado
-        total_hours = total_time / 3600
 
         # Verificar si ha completado su tiempo máximo
-        is_finished = (user_data.get("milestone_completed", False) or
-                      (role_type == "gold" and total_hours >= 2.0) or
-                      (role_type == "normal" and total_hours >= 1.0))
+        is_finished = time_limit_reached(user_data, total_time, role_type)
 
         if user_data.get('is_active', False):
             status = "🟢 Activo"
@@ -1298,8 +1663,8 @@ async def mi_tiempo(interaction: discord.Interaction):
 
         # Mostrar tiempo pausado si aplica
         if user_data.get('is_paused', False):
-            paused_duration = time_tracker.get_paused_duration(user_id)
-            formatted_paused_time = time_tracker.format_time_human(paused_duration) if paused_duration > 0 else "0 Segundos"
+            paused_duration = tracker.get_paused_duration(user_id)
+            formatted_paused_time = tracker.format_time_human(paused_duration) if paused_duration > 0 else "0 Segundos"
             embed.add_field(
                 name="⏸️ Tiempo Pausado",
                 value=formatted_paused_time,
@@ -1307,12 +1672,12 @@ async def mi_tiempo(interaction: discord.Interaction):
             )
 
         # Mostrar contador de pausas si hay
-        pause_count = time_tracker.get_pause_count(user_id)
+        pause_count = tracker.get_pause_count(user_id)
         if pause_count > 0:
             pause_text = "pausa" if pause_count == 1 else "pausas"
             embed.add_field(
                 name="📊 Pausas",
-                value=f"{pause_count} {pause_text} de 3 máximo",
+                value=f"{pause_count} {pause_text} de {pause_limit_text(tier_rules.tier(role_type))}",
                 inline=True
             )
 
@@ -1324,19 +1689,13 @@ async def mi_tiempo(interaction: discord.Interaction):
             inline=True
         )
 
-        # Mostrar límites según rol
-        if role_type == "gold":
-            embed.add_field(
-                name="🎭 Tu Rol",
-                value="🏆 Gold - Límite: 2 horas",
-                inline=False
-            )
-        else:
-            embed.add_field(
-                name="🎭 Tu Rol",
-                value="👤 Recluta - Límite: 1 hora",
-                inline=False
-            )
+        # Mostrar límites según el nivel
+        tier = tier_rules.tier(role_type)
+        embed.add_field(
+            name="🎭 Tu Rol",
+            value=f"{tier.emoji} {tier.label} - Límite: {format_hours(tier.max_hours)}",
+            inline=False
+        )
 
         embed.set_thumbnail(url=interaction.user.avatar.url if interaction.user.avatar else interaction.user.default_avatar.url)
         embed.set_footer(text="Tu información personal de tiempo")
@@ -1349,29 +1708,393 @@ async def mi_tiempo(interaction: discord.Interaction):
 
 
 
+# =================== COMANDOS CON AUTOCOMPLETADO ===================
+
+# Variantes de los comandos de tiempo que sugieren usuarios registrados en lugar del
+# selector de miembros. Las sugerencias salen del índice de nombres en memoria del tracker.
+tiempo_group = discord.app_commands.Group(name="tiempo", description="Comandos de tiempo con autocompletado de usuarios registrados")
+
+def tracked_user_choices(interaction: discord.Interaction, current: str, state=None):
+    """Opciones de autocompletado para usuarios registrados del servidor"""
+    tracker = trackers.for_guild(interaction.guild)
+    return [
+        discord.app_commands.Choice(name=name[:100], value=user_id)
+        for user_id, name in tracker.search_users(current, state=state, limit=25)
+    ]
+
+async def autocomplete_tracked_users(interaction: discord.Interaction, current: str):
+    return tracked_user_choices(interaction, current)
+
+async def autocomplete_active_users(interaction: discord.Interaction, current: str):
+    return tracked_user_choices(interaction, current, state="active")
+
+async def autocomplete_paused_users(interaction: discord.Interaction, current: str):
+    return tracked_user_choices(interaction, current, state="paused")
+
+async def autocomplete_inactive_users(interaction: discord.Interaction, current: str):
+    return tracked_user_choices(interaction, current, state="inactive")
+
+async def resolve_autocomplete_member(interaction: discord.Interaction, value: str):
+    """Obtener el miembro elegido en el autocompletado (ID) o escrito a mano (nombre)"""
+    tracker = trackers.for_guild(interaction.guild)
+    if not interaction.guild:
+        return None
+
+    if not value.isdigit():
+        matches = tracker.search_users(value, limit=1)
+        if not matches:
+            return None
+        value = matches[0][0]
+
+    return await get_or_fetch_member(interaction.guild, int(value))
+
+async def send_member_not_found(interaction: discord.Interaction, value: str):
+    await interaction.response.send_message(f"❌ No se encontró al usuario `{value}` en el servidor", ephemeral=True)
+
+@tiempo_group.command(name="iniciar", description="Iniciar el tiempo de un usuario registrado")
+@discord.app_commands.describe(usuario="Usuario registrado (escribe para buscar)")
+@discord.app_commands.autocomplete(usuario=autocomplete_inactive_users)
+@is_admin()
+async def tiempo_iniciar(interaction: discord.Interaction, usuario: str):
+    member = await resolve_autocomplete_member(interaction, usuario)
+    if not member:
+        await send_member_not_found(interaction, usuario)
+        return
+    await iniciar_tiempo.callback(interaction, member)
+
+@tiempo_group.command(name="pausar", description="Pausar el tiempo de un usuario activo")
+@discord.app_commands.describe(usuario="Usuario con tiempo activo (escribe para buscar)")
+@discord.app_commands.autocomplete(usuario=autocomplete_active_users)
+@is_admin()
+async def tiempo_pausar(interaction: discord.Interaction, usuario: str):
+    member = await resolve_autocomplete_member(interaction, usuario)
+    if not member:
+        await send_member_not_found(interaction, usuario)
+        return
+    await pausar_tiempo.callback(interaction, member)
+
+@tiempo_group.command(name="despausar", description="Despausar el tiempo de un usuario pausado")
+@discord.app_commands.describe(usuario="Usuario con tiempo pausado (escribe para buscar)")
+@discord.app_commands.autocomplete(usuario=autocomplete_paused_users)
+@is_admin()
+async def tiempo_despausar(interaction: discord.Interaction, usuario: str):
+    member = await resolve_autocomplete_member(interaction, usuario)
+    if not member:
+        await send_member_not_found(interaction, usuario)
+        return
+    await despausar_tiempo.callback(interaction, member)
+
+@tiempo_group.command(name="ver", description="Ver estadísticas detalladas de un usuario registrado")
+@discord.app_commands.describe(usuario="Usuario registrado (escribe para buscar)")
+@discord.app_commands.autocomplete(usuario=autocomplete_tracked_users)
+@is_admin()
+async def tiempo_ver(interaction: discord.Interaction, usuario: str):
+    member = await resolve_autocomplete_member(interaction, usuario)
+    if not member:
+        await send_member_not_found(interaction, usuario)
+        return
+    await ver_tiempo.callback(interaction, member)
+
+@tiempo_group.command(name="sumar", description="Sumar minutos al tiempo de un usuario registrado")
+@discord.app_commands.describe(
+    usuario="Usuario registrado (escribe para buscar)",
+    minutos="Cantidad de minutos a sumar"
+)
+@discord.app_commands.autocomplete(usuario=autocomplete_tracked_users)
+@is_admin()
+async def tiempo_sumar(interaction: discord.Interaction, usuario: str, minutos: int):
+    member = await resolve_autocomplete_member(interaction, usuario)
+    if not member:
+        await send_member_not_found(interaction, usuario)
+        return
+    await sumar_minutos.callback(interaction, member, minutos)
+
+bot.tree.add_command(tiempo_group)
+
+# =================== COMANDOS MASIVOS ===================
+
+masivo_group = discord.app_commands.Group(name="masivo", description="Iniciar, pausar o despausar el tiempo de varios usuarios a la vez")
+
+MAX_BULK_MEMBERS = 100
+MENTION_PATTERN = re.compile(r"<@!?(\d+)>|\b(\d{15,20})\b")
+
+async def collect_bulk_members(interaction: discord.Interaction, rol, canal, usuarios):
+    """Miembros indicados por rol, canal de voz y/o menciones (sin bots ni duplicados)"""
+    guild = interaction.guild
+    members = {}
+    not_found = []
+
+    if rol:
+        for member in rol.members:
+            members[member.id] = member
+    if canal:
+        for member in canal.members:
+            members[member.id] = member
+    if usuarios:
+        user_ids = [int(mention_id or raw_id) for mention_id, raw_id in MENTION_PATTERN.findall(usuarios)]
+        if guild and any(guild.get_member(user_id) is None for user_id in user_ids):
+            # Buscar los que no están en caché puede tardar más que el plazo de respuesta
+            await interaction.response.defer(thinking=True)
+            await load_missing_members(guild, user_ids)
+        for user_id in user_ids:
+            member = guild.get_member(user_id) if guild else None
+            if member:
+                members[member.id] = member
+            else:
+                not_found.append(user_id)
+
+    selected = sorted((member for member in members.values() if not member.bot), key=lambda member: member.id)
+    return selected, not_found
+
+def start_rejection_reason(member: discord.Member):
+    """Motivo por el que no se puede iniciar el tiempo de un miembro por sus roles (None si se puede)"""
+    if not any(role.id == 1366550916752216221 for role in member.roles):
+        return "no tiene el rol de Verificado"
+    return None
+
+def start_result_reason(member: discord.Member, result) -> str:
+    """Motivo de un inicio o pre-registro que el tracker rechazó"""
+    if result.action == 'completed':
+        return "ya completó su tiempo máximo"
+    if result.action == 'limit_reached':
+        tier = tier_rules.tier_for_member(member)
+        return f"ya completó su límite de {format_hours(tier.max_hours)} ({tier.label})"
+    if result.action == 'paused':
+        return "tiene tiempo pausado"
+    if result.action == 'already_registered':
+        return "ya está pre-registrado"
+    return "ya tiene tiempo activo"
+
+def bulk_summary_embed(title: str, groups, not_found, color):
+    """Resumen de un comando masivo: una sección por resultado"""
+    embed = discord.Embed(title=title, color=color, timestamp=datetime.now())
+    for name, entries in groups:
+        if not entries:
+            continue
+        lines = []
+        length = 0
+        for entry in entries:
+            line = f"• {entry}"
+            # Límite de 1024 caracteres por campo
+            if length + len(line) + 1 > 1000:
+                lines.append(f"… y {len(entries) - len(lines)} más")
+                break
+            lines.append(line)
+            length += len(line) + 1
+        embed.add_field(name=f"{name} ({len(entries)})", value="\n".join(lines), inline=False)
+    if not_found:
+        embed.add_field(name=f"❓ No encontrados ({len(not_found)})",
+                        value=", ".join(str(user_id) for user_id in not_found[:30]), inline=False)
+    if not embed.fields:
+        embed.description = "No se indicó ningún usuario"
+    return embed
+
+async def apply_batch(tracker: TimeTracker, members, plan):
+    """Aplicar una modificación a varios miembros en un solo lote
+
+    plan(tracker, member) devuelve la llamada (método, argumentos) o None si no hay nada que hacer;
+    el resultado de cada miembro es el de su llamada (None si no hubo). call_many toma los
+    candados de los usuarios y los suelta al volver.
+    """
+    members = sorted(members, key=lambda member: member.id)
+    planned = [(member, plan(tracker, member)) for member in members]
+    calls = [call for _, call in planned if call]
+    results = iter(await tracker.call_many(calls) if calls else [])
+    return [(member, next(results) if call else None) for member, call in planned]
+
+async def run_bulk(interaction: discord.Interaction, rol, canal, usuarios, plan):
+    """Validar y aplicar un comando masivo con un solo guardado y una sola respuesta"""
+    tracker = trackers.for_guild(interaction.guild)
+    members, not_found = await collect_bulk_members(interaction, rol, canal, usuarios)
+
+    if not members and not not_found:
+        await interaction.response.send_message("❌ Indica un rol, un canal de voz o menciones de usuarios", ephemeral=True)
+        return None, tracker
+    if len(members) > MAX_BULK_MEMBERS:
+        message = f"❌ Son {len(members)} usuarios; el máximo por comando es {MAX_BULK_MEMBERS}"
+        if interaction.response.is_done():
+            await interaction.followup.send(message)
+        else:
+            await interaction.response.send_message(message, ephemeral=True)
+        return None, tracker
+
+    if not interaction.response.is_done():
+        await interaction.response.defer(thinking=True)
+    results = await apply_batch(tracker, members, plan)
+    return (results, not_found), tracker
+
+@masivo_group.command(name="iniciar", description="Iniciar el tiempo de varios usuarios")
+@discord.app_commands.describe(
+    rol="Iniciar a todos los miembros con este rol",
+    canal="Iniciar a todos los miembros conectados a este canal de voz",
+    usuarios="Menciones o IDs de usuarios separados por espacios"
+)
+@is_admin()
+async def masivo_iniciar(interaction: discord.Interaction, rol: discord.Role = None,
+                         canal: discord.VoiceChannel = None, usuarios: str = None):
+    mexico_now = datetime.now(MEXICO_TZ)
+    if (mexico_now.hour, mexico_now.minute) >= (20, 20):
+        await interaction.response.send_message(
+            f"❌ No se pueden iniciar tiempos después de las 20:20 hora México.\n"
+            f"⏰ Hora actual: {mexico_now.strftime('%H:%M')} México",
+            ephemeral=True
+        )
+        return
+
+    start, _ = get_guild_schedule(interaction.guild.id)
+    before_start = (mexico_now.hour, mexico_now.minute) < start
+
+    reasons = {}
+
+    def plan(tracker, member):
+        reasons[member.id] = start_rejection_reason(member)
+        if reasons[member.id]:
+            return None
+        return start_call(member, before_start, interaction.user)
+
+    outcome, tracker = await run_bulk(interaction, rol, canal, usuarios, plan)
+    if outcome is None:
+        return
+    applied, not_found = outcome
+
+    results = []
+    for member, result in applied:
+        if reasons[member.id]:
+            results.append((member, ('rejected', reasons[member.id])))
+        elif not result:
+            results.append((member, ('rejected', start_result_reason(member, result))))
+        else:
+            results.append((member, (result.action, None)))
+
+    embed = bulk_summary_embed("⏰ Inicio masivo de tiempos", [
+        ("✅ Iniciados", [member.mention for member, (status, _) in results if status == 'started']),
+        ("📝 Pre-registrados", [member.mention for member, (status, _) in results if status == 'pre_registered']),
+        ("⚠️ Rechazados", [f"{member.mention}: {reason}" for member, (status, reason) in results if status == 'rejected']),
+    ], not_found, discord.Color.green())
+    embed.set_footer(text=f"Solicitado por {interaction.user.display_name}")
+    await interaction.followup.send(embed=embed)
+
+@masivo_group.command(name="pausar", description="Pausar el tiempo de varios usuarios")
+@discord.app_commands.describe(
+    rol="Pausar a todos los miembros con este rol",
+    canal="Pausar a todos los miembros conectados a este canal de voz",
+    usuarios="Menciones o IDs de usuarios separados por espacios"
+)
+@is_admin()
+async def masivo_pausar(interaction: discord.Interaction, rol: discord.Role = None,
+                        canal: discord.VoiceChannel = None, usuarios: str = None):
+    def plan(tracker, member):
+        return pause_call(member)
+
+    outcome, tracker = await run_bulk(interaction, rol, canal, usuarios, plan)
+    if outcome is None:
+        return
+    results, not_found = outcome
+
+    paused = [paused_mention(member, result) for member, result in results if result.action == 'paused']
+    cancelled = [member for member, result in results if result.action == 'auto_cancelled']
+    rejected = [member.mention for member, result in results if not result]
+
+    embed = bulk_summary_embed("⏸️ Pausa masiva de tiempos", [
+        ("⏸️ Pausados", paused),
+        ("🚫 Cancelados por límite de pausas", [member.mention for member in cancelled]),
+        ("⚠️ Sin tiempo activo", rejected),
+    ], not_found, discord.Color.orange())
+    embed.set_footer(text=f"Solicitado por {interaction.user.display_name}")
+    await interaction.followup.send(embed=embed)
+
+    # Un resumen por canal de notificaciones: las pausas al de pausas y las
+    # cancelaciones automáticas al de cancelaciones, como en /pausar_tiempo
+    paused_lines = []
+    cancelled_lines = []
+    for member, result in results:
+        if result.action == 'paused':
+            line = f"**{member.display_name}** - Total: {tracker.format_time_human(result.total_after)}"
+            tier = tier_rules.tier_for_member(member)
+            if tier.max_pauses is not None:
+                line += f" - {result.pause_count}/{tier.max_pauses} pausas"
+                if result.pause_count == tier.max_pauses - 1:
+                    line += " ⚠️"
+            paused_lines.append(line)
+        elif result.action == 'auto_cancelled':
+            cancelled_lines.append(
+                f"**{member.display_name}** - Conservado: {tracker.format_time_human(result.total_after)}"
+                f" - Perdido: {tracker.format_time_human(result.time_lost)}"
+            )
+    await send_bulk_notification(PAUSE_NOTIFICATION_CHANNEL_ID, "pausas", "⏸️ Pausa masiva",
+                                 "⏸️ Pausados", paused_lines, interaction.user.mention, discord.Color.orange())
+    await send_bulk_notification(CANCELLATION_NOTIFICATION_CHANNEL_ID, "cancelaciones", "🚫 Tiempo Cancelado Automáticamente",
+                                 "🚫 Cancelados por límite de pausas", cancelled_lines, interaction.user.mention,
+                                 discord.Color.red())
+
+@masivo_group.command(name="despausar", description="Despausar el tiempo de varios usuarios")
+@discord.app_commands.describe(
+    rol="Despausar a todos los miembros con este rol",
+    canal="Despausar a todos los miembros conectados a este canal de voz",
+    usuarios="Menciones o IDs de usuarios separados por espacios"
+)
+@is_admin()
+async def masivo_despausar(interaction: discord.Interaction, rol: discord.Role = None,
+                           canal: discord.VoiceChannel = None, usuarios: str = None):
+    def plan(tracker, member):
+        return 'resume_tracking', (member.id,)
+
+    outcome, tracker = await run_bulk(interaction, rol, canal, usuarios, plan)
+    if outcome is None:
+        return
+    results, not_found = outcome
+
+    embed = bulk_summary_embed("▶️ Despausa masiva de tiempos", [
+        ("▶️ Despausados", [member.mention for member, result in results if result]),
+        ("⚠️ Sin tiempo pausado", [member.mention for member, result in results if not result]),
+    ], not_found, discord.Color.blue())
+    embed.set_footer(text=f"Solicitado por {interaction.user.display_name}")
+    await interaction.followup.send(embed=embed)
+
+    # Un solo resumen al canal de pausas, como /despausar_tiempo con cada usuario
+    unpaused_lines = [
+        f"**{member.display_name}** - Total: {tracker.format_time_human(result.total_after)}"
+        f" - Pausado: {tracker.format_time_human(result.paused_duration)}"
+        for member, result in results if result
+    ]
+    await send_bulk_notification(PAUSE_NOTIFICATION_CHANNEL_ID, "pausas", "▶️ Despausa masiva",
+                                 "▶️ Despausados", unpaused_lines, interaction.user.mention, discord.Color.blue())
+
+bot.tree.add_command(masivo_group)
+
+
 # =================== COMANDOS DE PAGO SIMPLIFICADOS ===================
 
+def payment_type_options():
+    """Una opción del menú de pagos por nivel de la tabla de niveles"""
+    options = []
+    for tier in tier_rules.tiers:
+        if tier.has_roles:
+            description = f"Ver usuarios con rol {tier.label}"
+        else:
+            description = "Ver usuarios sin rol de nivel"
+        options.append(discord.SelectOption(label=tier.label, value=tier.name,
+                                            description=description, emoji=tier.emoji))
+    return options
+
+def payment_tier(name: str):
+    """Nivel de una lista de pagos (acepta también la etiqueta, que guardaban los mensajes antiguos)"""
+    for tier in tier_rules.tiers:
+        if name in (tier.name, tier.label):
+            return tier
+    return tier_rules.default
+
 class PaymentMainView(discord.ui.View):
-    def __init__(self, guild):
-        super().__init__(timeout=300)
+    """Menú principal de pagos: no tiene estado, se registra con bot.add_view al iniciar"""
+
+    def __init__(self, guild=None):
+        super().__init__(timeout=None)
         self.guild = guild
 
     @discord.ui.select(
+        custom_id="rt:pagos:menu",
         placeholder="Selecciona el tipo de usuarios a ver...",
-        options=[
-            discord.SelectOption(
-                label="Reclutas (Sin Rol)",
-                value="reclutas",
-                description="Ver usuarios sin rol específico",
-                emoji="👤"
-            ),
-            discord.SelectOption(
-                label="Gold",
-                value="gold",
-                description="Ver usuarios con rol Gold",
-                emoji="🏆"
-            )
-        ]
+        options=payment_type_options()
     )
     async def select_payment_type(self, interaction: discord.Interaction, select: discord.ui.Select):
         selected_type = select.values[0]
@@ -1379,45 +2102,23 @@ class PaymentMainView(discord.ui.View):
         try:
             await interaction.response.defer()
 
-            if selected_type == "reclutas":
-                # Lógica de reclutas
-                def filter_normal_users(member, data):
-                    if not member:
-                        return True
-                    role_type = get_user_role_type(member)
-                    return role_type == "normal"
-
-                filtered_users = get_users_by_role_filter(filter_normal_users, "Reclutas (Sin Rol)", interaction)
-                role_name = "Reclutas (Sin Rol)"
-
-            else:  # reclutas
-                # Lógica de Gold
-                def filter_gold_users(member, data):
-                    if not member:
-                        return False
-                    if GOLD_ROLE_ID:
-                        for role in member.roles:
-                            if role.id == GOLD_ROLE_ID:
-                                return True
-                    role_type = get_user_role_type(member)
-                    return role_type == "gold"
-
-                filtered_users = get_users_by_role_filter(filter_gold_users, "Gold", interaction)
-                role_name = "Gold"
-
-            if not filtered_users:
+            tier = payment_tier(selected_type)
+            await complete_tier_index(interaction.guild)
+            view = PaymentView.open(interaction.guild, tier.name)
+
+            if not view.get_rows():
                 error_embed = discord.Embed(
                     title="❌ Sin Resultados",
-                    description=f"No se encontraron usuarios para {role_name} con tiempo registrado",
+                    description=f"No se encontraron usuarios para {tier.label} con tiempo registrado",
                     color=discord.Color.red()
                 )
                 await interaction.edit_original_response(embed=error_embed, view=self)
                 return
 
             # Crear vista con resultados y actualizar mensaje existente
-            view = PaymentView(filtered_users, role_name, self.guild)
-            embed = view.get_embed()
-            await interaction.edit_original_response(embed=embed, view=view)
+            embeds = view.get_embeds()
+            message = await interaction.edit_original_response(embeds=embeds, view=view)
+            register_list_message(view, message)
 
         except Exception as e:
             error_embed = discord.Embed(
@@ -1427,206 +2128,230 @@ class PaymentMainView(discord.ui.View):
             )
             await interaction.edit_original_response(embed=error_embed, view=self)
 
-    @discord.ui.button(label='🔄 Actualizar', style=discord.ButtonStyle.success)
+    @discord.ui.button(label='🔄 Actualizar', style=discord.ButtonStyle.success, custom_id="rt:pagos:actualizar")
     async def refresh_main(self, interaction: discord.Interaction, button: discord.ui.Button):
         # Solo actualizar la vista principal, no recargar datos hasta que seleccionen una opción
         await interaction.response.edit_message(view=self)
 
-    async def on_timeout(self):
-        for item in self.children:
-            item.disabled = True
-
-class PaymentView(discord.ui.View):
-    def __init__(self, filtered_users, role_name, guild, search_term=None):
-        super().__init__(timeout=300)
-        self.filtered_users = filtered_users
-        self.role_name = role_name
-        self.guild = guild
-        self.search_term = search_term
-        self.current_page = 0
-        self.max_per_page = 15
-        self.total_pages = (len(filtered_users) + self.max_per_page - 1) // self.max_per_page if filtered_users else 1
-
-        if self.total_pages <= 1:
-            for item in self.children:
-                if isinstance(item, discord.ui.Button) and item.label in ['◀️ Anterior', '▶️ Siguiente']:
-                    item.disabled = True
-
-    def get_embed(self):
-        """Crear embed para la página actual"""
-        start_idx = self.current_page * self.max_per_page
-        end_idx = min(start_idx + self.max_per_page, len(self.filtered_users))
-        current_users = self.filtered_users[start_idx:end_idx]
-
-        role_emoji = "👤"
-        if "Gold" in self.role_name:
-            role_emoji = "🏆"
-
-        title = f"{role_emoji} Pago - {self.role_name}"
-        if self.search_term:
-            title += f" (Búsqueda: '{self.search_term}')"
-
-        embed = discord.Embed(
-            title=title,
-            color=discord.Color.gold(),
-            timestamp=datetime.now()
-        )
+PAYMENT_TYPE_OPTIONS = payment_type_options()
 
-        if not current_users:
-            embed.description = f"No se encontraron usuarios para {self.role_name}"
-            if self.search_term:
-                embed.description += f" con el término '{self.search_term}'"
-            embed.set_footer(text="No hay datos para mostrar")
-            return embed
+def render_payment_row(row, guild):
+    """Renderizar la línea de un usuario en la lista de pagos"""
+    tracker = trackers.for_guild(guild)
+    user_id, user_name, total_time, credits, role_type = row
+    member = guild.get_member(user_id) if guild else None
 
-        user_list = []
-        total_credits = 0
-
-        for user_data in current_users:
-            try:
-                user_id = user_data['user_id']
-                member = self.guild.get_member(user_id) if self.guild else None
-
-                if member:
-                    user_mention = member.mention
-                else:
-                    user_name = user_data.get('name', f'Usuario {user_id}')
-                    user_mention = f"**{user_name}** `(ID: {user_id})`"
-
-                total_time = user_data['total_time']
-                formatted_time = time_tracker.format_time_human(total_time)
-                credits = user_data['credits']
-                total_credits += credits
+    if member:
+        user_mention = member.mention
+    else:
+        user_mention = f"**{user_name}** `(ID: {user_id})`"
 
-                data = user_data.get('data', {})
-                status = "🔴 Inactivo"
-                if data.get('is_active', False):
-                    status = "🟢 Activo"
-                elif data.get('is_paused', False):
-                    total_hours = total_time / 3600
-                    role_type = get_user_role_type(member) if member else "normal"
+    formatted_time = tracker.format_time_human(total_time)
 
-                    if (data.get("milestone_completed", False) or
-                        (role_type == "gold" and total_hours >= 2.0) or
-                        (role_type == "normal" and total_hours >= 1.0)):
-                        status = "✅ Terminado"
-                    else:
-                        status = "⏸️ Pausado"
-                else:
-                    # Verificar si está terminado aunque no esté pausado
-                    total_hours = total_time / 3600
-                    role_type = get_user_role_type(member) if member else "normal"
+    data = tracker.get_user_data(user_id) or {}
+    status = "🔴 Inactivo"
+    if data.get('is_active', False):
+        status = "🟢 Activo"
+    else:
+        # Verificar si está terminado (pausado o no)
+        if time_limit_reached(data, total_time, role_type):
+            status = "✅ Terminado"
+        elif data.get('is_paused', False):
+            status = "⏸️ Pausado"
 
-                    if (data.get("milestone_completed", False) or
-                        (role_type == "gold" and total_hours >= 2.0) or
-                        (role_type == "normal" and total_hours >= 1.0)):
-                        status = "✅ Terminado"
+    return f"📌 {user_mention} - ⏱️ {formatted_time} - 💰 {credits} Créditos {status}"
 
+class PaymentView(discord.ui.View):
+    """Lista de pagos persistente: sobrevive reinicios porque su estado va en los custom_id"""
 
-                user_list.append(f"📌 {user_mention} - ⏱️ {formatted_time} - 💰 {credits} Créditos {status}")
+    kind = "p"
 
-            except Exception as e:
-                print(f"Error procesando usuario en pago: {e}")
-                continue
+    def __init__(self, state, guild):
+        super().__init__(timeout=None)
+        self.state = state
+        self.guild = guild
+        self.update_buttons()
 
-        embed.description = "\n".join(user_list)
+    @classmethod
+    def open(cls, guild, tier_name, search_term=None, base_rows=None):
+        """Crear el estado de una lista de pagos y su vista"""
+        tracker = trackers.for_guild(guild)
+        state = ViewState("pagos", guild.id if guild else None, tracker.generation,
+                          filter_status=tier_name, search_term=search_term)
+        view_registry.resolve(state, lambda: build_payment_rows(guild, tier_name, search_term, base_rows))
+        return cls(state, guild)
+
+    @classmethod
+    def restore(cls, interaction: discord.Interaction, token: str):
+        """Reconstruir la vista de un mensaje existente a partir de su custom_id"""
+        state = restore_list_state("pagos", interaction, token)
+        state.filter_status = payment_tier(state.filter_status).name
+        return cls(state, interaction.guild)
+
+    @property
+    def tracker(self):
+        return trackers.for_guild(self.guild)
+
+    @property
+    def tier(self):
+        return payment_tier(self.state.filter_status)
+
+    @property
+    def role_name(self):
+        return self.tier.label
+
+    @property
+    def search_term(self):
+        return self.state.search_term
+
+    @property
+    def current_page(self):
+        return self.state.page
+
+    @current_page.setter
+    def current_page(self, page):
+        self.state.page = page
+
+    @property
+    def total_pages(self):
+        return max(1, len(self.get_page_bounds()))
+
+    def get_title(self):
+        title = f"{self.tier.emoji} Pago - {self.role_name}"
+        if self.search_term:
+            title += f" (Búsqueda: '{self.search_term}')"
+        return title
+
+    def get_page_bounds(self):
+        """Límites de página del snapshot, empaquetando tantas filas como quepan"""
+        def estimate_length(row):
+            data = self.tracker.get_user_data(row[0]) or {}
+            slack = ACTIVE_ROW_SLACK if data.get('is_active', False) else STATIC_ROW_SLACK
+            return len(render_payment_row(row, self.guild)) + slack
+
+        # Los campos de resumen ocupan espacio fijo en cada página
+        page_budget = MESSAGE_EMBEDS_TOTAL_LIMIT - len(self.get_title()) - 2 * PAGE_FOOTER_RESERVE
+        return view_registry.page_bounds(
+            self.state, self.get_rows(),
+            lambda rows: pack_pages((estimate_length(row) for row in rows), page_budget)
+        )
 
-        embed.add_field(
-            name="📊 Resumen de Página",
-            value=f"Usuarios: {len(current_users)}\nCréditos en página: {total_credits}",
-            inline=True
+    def get_rows(self, refresh=False):
+        """Resolver las filas de pago de esta vista desde el snapshot compartido"""
+        state = self.state
+        return view_registry.resolve(
+            state,
+            lambda: build_payment_rows(self.guild, state.filter_status, state.search_term),
+            current_generation=self.tracker.generation,
+            refresh=refresh
         )
 
-        total_users = len(self.filtered_users)
-        total_all_credits = sum(user['credits'] for user in self.filtered_users)
+    def get_embeds(self):
+        """Crear los embeds de la página actual"""
+        rows = self.get_rows()
+        bounds = self.get_page_bounds()
+        page = bounds[self.current_page] if self.current_page < len(bounds) else ()
 
-        embed.add_field(
-            name="🎯 Total General",
-            value=f"Usuarios: {total_users}\nCréditos totales: {total_all_credits}",
-            inline=True
+        title = self.get_title()
+        if not page:
+            description = f"No se encontraron usuarios para {self.role_name}"
+            if self.search_term:
+                description += f" con el término '{self.search_term}'"
+            embed = discord.Embed(title=title, description=description,
+                                  color=discord.Color.gold(), timestamp=datetime.now())
+            embed.set_footer(text="No hay datos para mostrar")
+            self.state.rendered_digest = page_digest([embed])
+            return [embed]
+
+        chunks = []
+        page_users = 0
+        page_credits = 0
+        for chunk_start, chunk_end in page:
+            current_users = rows[chunk_start:chunk_end]
+            chunks.append([render_payment_row(row, self.guild) for row in current_users])
+            page_users += len(current_users)
+            page_credits += sum(row[3] for row in current_users)
+
+        total_users = len(rows)
+        total_all_credits = sum(row[3] for row in rows)
+        fields = (
+            ("📊 Resumen de Página", f"Usuarios: {page_users}\nCréditos en página: {page_credits}"),
+            ("🎯 Total General", f"Usuarios: {total_users}\nCréditos totales: {total_all_credits}"),
         )
 
-        embed.set_footer(text=f"Página {self.current_page + 1}/{self.total_pages} • {total_users} usuarios en total")
-        return embed
-
-    @discord.ui.button(label='◀️ Anterior', style=discord.ButtonStyle.secondary)
-    async def previous_page(self, interaction: discord.Interaction, button: discord.ui.Button):
+        footer_text = f"Página {self.current_page + 1}/{self.total_pages} • {total_users} usuarios en total"
+        embeds = build_list_embeds(title, chunks, discord.Color.gold(), footer_text,
+                                   f"No se encontraron usuarios para {self.role_name}", fields)
+        self.state.rendered_digest = page_digest(embeds)
+        return embeds
+
+    async def handle_action(self, interaction: discord.Interaction, action: str):
+        """Ejecutar la acción de un botón de la lista"""
+        if action == "prev":
+            await self.previous_page(interaction)
+        elif action == "next":
+            await self.next_page(interaction)
+        elif action == "search":
+            await self.search_user(interaction)
+        elif action == "refresh":
+            await self.refresh_payment(interaction)
+        elif action == "clear":
+            await self.clear_search(interaction)
+        elif action == "back":
+            await self.back_to_menu(interaction)
+
+    async def handle_select(self, interaction: discord.Interaction, action: str, value: str):
+        """Ejecutar la acción de un menú desplegable de la lista"""
+        if action == "type":
+            await self.select_payment_type(interaction, value)
+
+    async def previous_page(self, interaction: discord.Interaction):
         if self.current_page > 0:
             self.current_page -= 1
         self.update_buttons()
-        embed = self.get_embed()
-        await interaction.response.edit_message(embed=embed, view=self)
+        embeds = self.get_embeds()
+        await interaction.response.edit_message(embeds=embeds, view=self)
 
-    @discord.ui.button(label='▶️ Siguiente', style=discord.ButtonStyle.secondary)
-    async def next_page(self, interaction: discord.Interaction, button: discord.ui.Button):
+    async def next_page(self, interaction: discord.Interaction):
         if self.current_page < self.total_pages - 1:
             self.current_page += 1
         self.update_buttons()
-        embed = self.get_embed()
-        await interaction.response.edit_message(embed=embed, view=self)
+        embeds = self.get_embeds()
+        await interaction.response.edit_message(embeds=embeds, view=self)
 
-    @discord.ui.button(label='🔍 Buscar Usuario', style=discord.ButtonStyle.primary)
-    async def search_user(self, interaction: discord.Interaction, button: discord.ui.Button):
+    async def search_user(self, interaction: discord.Interaction):
         modal = SearchUserModal(self)
         await interaction.response.send_modal(modal)
 
-    @discord.ui.button(label='🔄 Actualizar', style=discord.ButtonStyle.success)
-    async def refresh_payment(self, interaction: discord.Interaction, button: discord.ui.Button):
+    async def refresh_payment(self, interaction: discord.Interaction):
         try:
             await interaction.response.defer()
 
-            # Determinar el tipo de filtro basado en el nombre del rol
-            if "Gold" in self.role_name:
-                def filter_func(member, data):
-                    if not member:
-                        return False
-                    if GOLD_ROLE_ID:
-                        for role in member.roles:
-                            if role.id == GOLD_ROLE_ID:
-                                return True
-                    role_type = get_user_role_type(member)
-                    return role_type == "gold"
-            else:  # Reclutas
-                def filter_func(member, data):
-                    if not member:
-                        return True
-                    role_type = get_user_role_type(member)
-                    return role_type == "normal"
-
-            # Recargar datos
-            refreshed_users = get_users_by_role_filter(filter_func, self.role_name, interaction)
-
-            # Aplicar filtro de búsqueda si existe
-            if self.search_term and refreshed_users:
-                search_filtered = []
-                for user_data in refreshed_users:
-                    user_name = user_data.get('name', '').lower()
-                    if self.search_term.lower() in user_name:
-                        search_filtered.append(user_data)
-                refreshed_users = search_filtered
-
-            # Actualizar datos internos
-            self.filtered_users = refreshed_users
-            self.total_pages = (len(refreshed_users) + self.max_per_page - 1) // self.max_per_page if refreshed_users else 1
+            # Recargar datos (aplica el filtro de búsqueda si existe)
+            await complete_tier_index(self.guild)
+            self.get_rows(refresh=True)
 
             # Asegurar que la página actual sea válida
             if self.current_page >= self.total_pages:
                 self.current_page = max(0, self.total_pages - 1)
 
+            # Obtener embed actualizado
+            previous_digest = self.state.rendered_digest
+            embeds = self.get_embeds()
+            if self.state.rendered_digest == previous_digest:
+                # La página es idéntica a la del mensaje: no gastar una edición
+                return
+
             # Actualizar botones
             self.update_buttons()
 
-            # Obtener embed actualizado
-            embed = self.get_embed()
-
             # Actualizar mensaje existente sin reenviar
-            await interaction.edit_original_response(embed=embed, view=self)
+            await interaction.edit_original_response(embeds=embeds, view=self)
 
         except Exception as e:
             await interaction.followup.send(f"❌ Error al actualizar: {e}", ephemeral=True)
 
-    @discord.ui.button(label='🔄 Limpiar búsqueda', style=discord.ButtonStyle.secondary)
-    async def clear_search(self, interaction: discord.Interaction, button: discord.ui.Button):
+    async def clear_search(self, interaction: discord.Interaction):
         if not self.search_term:
             await interaction.response.send_message("❌ No hay búsqueda activa para limpiar", ephemeral=True)
             return
@@ -1634,103 +2359,44 @@ class PaymentView(discord.ui.View):
         try:
             await interaction.response.defer()
 
-            # Determinar el tipo de filtro basado en el nombre del rol
-            if "Gold" in self.role_name:
-                def filter_func(member, data):
-                    if not member:
-                        return False
-                    if GOLD_ROLE_ID:
-                        for role in member.roles:
-                            if role.id == GOLD_ROLE_ID:
-                                return True
-                    role_type = get_user_role_type(member)
-                    return role_type == "gold"
-            else:  # Reclutas
-                def filter_func(member, data):
-                    if not member:
-                        return True
-                    role_type = get_user_role_type(member)
-                    return role_type == "normal"
-
-            # Recargar datos sin filtro de búsqueda
-            all_users = get_users_by_role_filter(filter_func, self.role_name, interaction)
-
-            if not all_users:
+            # Crear nueva vista sin filtro de búsqueda
+            await complete_tier_index(self.guild)
+            new_view = PaymentView.open(self.guild, self.tier.name)
+
+            if not new_view.get_rows():
                 await interaction.edit_original_response(content="❌ No se encontraron usuarios para mostrar")
                 return
 
-            # Crear nueva vista sin filtro de búsqueda
-            new_view = PaymentView(all_users, self.role_name, self.guild)
-            embed = new_view.get_embed()
+            embeds = new_view.get_embeds()
 
-            await interaction.edit_original_response(embed=embed, view=new_view)
+            message = await interaction.edit_original_response(embeds=embeds, view=new_view)
+            register_list_message(new_view, message)
 
         except Exception as e:
             await interaction.edit_original_response(content=f"❌ Error al recargar: {e}")
 
-    @discord.ui.select(
-        placeholder="Cambiar tipo de usuarios...",
-        options=[
-            discord.SelectOption(
-                label="Reclutas (Sin Rol)",
-                value="reclutas",
-                description="Ver usuarios sin rol específico",
-                emoji="👤"
-            ),
-            discord.SelectOption(
-                label="Gold",
-                value="gold",
-                description="Ver usuarios con rol Gold",
-                emoji="🏆"
-            )
-        ]
-    )
-    async def select_payment_type(self, interaction: discord.Interaction, select: discord.ui.Select):
-        selected_type = select.values[0]
-
+    async def select_payment_type(self, interaction: discord.Interaction, selected_type: str):
         try:
             await interaction.response.defer()
 
-            if selected_type == "reclutas":
-                # Lógica de reclutas
-                def filter_normal_users(member, data):
-                    if not member:
-                        return True
-                    role_type = get_user_role_type(member)
-                    return role_type == "normal"
-
-                filtered_users = get_users_by_role_filter(filter_normal_users, "Reclutas (Sin Rol)", interaction)
-                role_name = "Reclutas (Sin Rol)"
-
-            else:  # reclutas
-                # Lógica de Gold
-                def filter_gold_users(member, data):
-                    if not member:
-                        return False
-                    if GOLD_ROLE_ID:
-                        for role in member.roles:
-                            if role.id == GOLD_ROLE_ID:
-                                return True
-                    role_type = get_user_role_type(member)
-                    return role_type == "gold"
-
-                filtered_users = get_users_by_role_filter(filter_gold_users, "Gold", interaction)
-                role_name = "Gold"
-
-            if not filtered_users:
+            tier = payment_tier(selected_type)
+            await complete_tier_index(self.guild)
+            new_view = PaymentView.open(self.guild, tier.name)
+
+            if not new_view.get_rows():
                 error_embed = discord.Embed(
                     title="❌ Sin Resultados",
-                    description=f"No se encontraron usuarios para {role_name} con tiempo registrado",
+                    description=f"No se encontraron usuarios para {tier.label} con tiempo registrado",
                     color=discord.Color.red()
                 )
                 # Mantener la vista actual pero con mensaje de error
                 await interaction.edit_original_response(embed=error_embed, view=self)
                 return
 
-            # Actualizar datos internos y crear nueva vista
-            new_view = PaymentView(filtered_users, role_name, self.guild)
-            embed = new_view.get_embed()
-            await interaction.edit_original_response(embed=embed, view=new_view)
+            # Reemplazar la vista actual
+            embeds = new_view.get_embeds()
+            message = await interaction.edit_original_response(embeds=embeds, view=new_view)
+            register_list_message(new_view, message)
 
         except Exception as e:
             error_embed = discord.Embed(
@@ -1740,55 +2406,38 @@ class PaymentView(discord.ui.View):
             )
             await interaction.edit_original_response(embed=error_embed, view=self)
 
-    @discord.ui.button(label='🔙 Volver al Menú', style=discord.ButtonStyle.secondary)
-    async def back_to_menu(self, interaction: discord.Interaction, button: discord.ui.Button):
+    async def back_to_menu(self, interaction: discord.Interaction):
         try:
             await interaction.response.defer()
 
-            # Crear embed del menú principal
-            embed = discord.Embed(
-                title="💰 Sistema de Pagos",
-                description="Selecciona el tipo de usuarios que deseas ver:",
-                color=discord.Color.gold(),
-                timestamp=datetime.now()
-            )
-
-            embed.add_field(
-                name="👤 Reclutas (Sin Rol)",
-                value="• Límite: 1 hora\n• Créditos: 3 por hora completada",
-                inline=True
-            )
-
-            embed.add_field(
-                name="🏆 Gold",
-                value="• Límite: 2 horas\n• 1 hora: 5 créditos\n• 2 horas: 10 créditos",
-                inline=True
-            )
-
-            embed.add_field(
-                name="ℹ️ Instrucciones",
-                value="Usa el menú desplegable para seleccionar qué usuarios ver",
-                inline=False
-            )
-
-            embed.set_footer(text="Sistema de créditos simplificado")
-
             # Volver a la vista del menú principal
             main_view = PaymentMainView(self.guild)
-            await interaction.edit_original_response(embed=embed, view=main_view)
+            main_view.stop()  # El menú lo atiende la instancia registrada con bot.add_view
+            await interaction.edit_original_response(embed=build_payment_menu_embed(), view=main_view)
+            if interaction.message:
+                view_registry.close(interaction.message.id)
 
         except Exception as e:
             await interaction.followup.send(f"❌ Error al volver al menú: {e}", ephemeral=True)
 
     def update_buttons(self):
-        """Actualizar estado de los botones"""
-        self.children[0].disabled = (self.current_page == 0)
-        self.children[1].disabled = (self.current_page >= self.total_pages - 1)
-
-    async def on_timeout(self):
-        """Deshabilitar botones cuando expire"""
-        for item in self.children:
-            item.disabled = True
+        """Reconstruir los componentes con la página actual codificada en sus custom_id"""
+        total_pages = self.total_pages
+        token = self.state.to_token()
+
+        self.clear_items()
+        self.add_item(ListButton(self.kind, "prev", token, '◀️ Anterior', disabled=(self.current_page == 0)))
+        self.add_item(ListButton(self.kind, "next", token, '▶️ Siguiente',
+                                 disabled=(self.current_page >= total_pages - 1)))
+        self.add_item(ListButton(self.kind, "search", token, '🔍 Buscar Usuario', discord.ButtonStyle.primary))
+        self.add_item(ListButton(self.kind, "refresh", token, '🔄 Actualizar', discord.ButtonStyle.success))
+        self.add_item(ListButton(self.kind, "clear", token, '🔄 Limpiar búsqueda'))
+        self.add_item(ListSelect(self.kind, "type", token, "Cambiar tipo de usuarios...", PAYMENT_TYPE_OPTIONS))
+        self.add_item(ListButton(self.kind, "back", token, '🔙 Volver al Menú'))
+
+        # Las interacciones se enrutan por custom_id (add_dynamic_items), así que
+        # la vista no debe quedar retenida en el ViewStore del bot
+        self.stop()
 
 class SearchUserModal(discord.ui.Modal):
     def __init__(self, payment_view):
@@ -1805,111 +2454,337 @@ class SearchUserModal(discord.ui.Modal):
     async def on_submit(self, interaction: discord.Interaction):
         search_term = self.search_term.value.lower().strip()
 
-        matching_users = []
-        for user_data in self.payment_view.filtered_users:
-            user_name = user_data.get('name', '').lower()
-            if search_term in user_name:
-                matching_users.append(user_data)
+        # Buscar sobre las filas ya resueltas de la vista actual
+        new_view = PaymentView.open(self.payment_view.guild, self.payment_view.tier.name,
+                                    search_term, base_rows=self.payment_view.get_rows())
 
-        if not matching_users:
+        if not new_view.get_rows():
             await interaction.response.send_message(
                 f"❌ No se encontraron usuarios con '{self.search_term.value}' en {self.payment_view.role_name}",
                 ephemeral=True
             )
             return
 
-        new_view = PaymentView(matching_users, self.payment_view.role_name, self.payment_view.guild, search_term)
-        embed = new_view.get_embed()
-
-        await interaction.response.edit_message(embed=embed, view=new_view)
-
-def get_users_by_role_filter(role_filter_func, role_name: str, interaction: discord.Interaction):
-    """Función auxiliar para obtener usuarios filtrados por rol"""
-    try:
-        tracked_users = time_tracker.get_all_tracked_users()
-        filtered_users = []
-
-        for user_id_str, data in tracked_users.items():
-            try:
-                user_id = int(user_id_str)
-                member = interaction.guild.get_member(user_id) if interaction.guild else None
-
-                if not role_filter_func(member, data):
-                    continue
-
-                total_time = time_tracker.get_total_time(user_id)
+        embeds = new_view.get_embeds()
 
-                if total_time <= 0:
-                    continue
+        await interaction.response.edit_message(embeds=embeds, view=new_view)
+        register_list_message(new_view, interaction.message)
 
-                if member:
-                    role_type = get_user_role_type(member)
-                else:
-                    role_type = "normal"
-
-                credits = calculate_credits(total_time, role_type)
+def build_payment_rows(guild, tier_name: str, search_term=None, base_rows=None):
+    """Construir filas compactas de pago: (user_id, nombre, tiempo, créditos, nivel)"""
+    if base_rows is None:
+        base_rows = [
+            (user_info['user_id'], user_info['name'], user_info['total_time'],
+             user_info['credits'], user_info['role_type'])
+            for user_info in get_users_by_tier(tier_name, guild)
+        ]
 
-                user_info = {
-                    'user_id': user_id,
-                    'name': data.get('name', f'Usuario {user_id}'),
-                    'total_time': total_time,
-                    'credits': credits,
-                    'role_type': role_type,
-                    'data': data
-                }
+    # Aplicar filtro de búsqueda si existe
+    if search_term:
+        search_term = search_term.lower()
+        return [row for row in base_rows if search_term in row[1].lower()]
+    return list(base_rows)
 
-                filtered_users.append(user_info)
+async def complete_tier_index(guild):
+    """Perfil lean: cargar a los usuarios registrados cuyo nivel el índice todavía no conoce"""
+    if guild is None or not tier_index.partial_seeds:
+        return
+    tracker = trackers.for_guild(guild)
+    missing = tier_index.resolve_cached(guild, [int(user_id) for user_id in tracker.get_all_tracked_users()])
+    # Los que no están en el servidor quedan como del nivel predeterminado
+    await load_missing_members(guild, missing)
+    tier_index.resolve_cached(guild, missing)
+
+def get_users_by_tier(tier_name: str, guild):
+    """Obtener usuarios registrados de un nivel con el índice de niveles"""
+    tracker = trackers.for_guild(guild)
+    try:
+        tracked_users = tracker.get_all_tracked_users()
+        tier = tier_rules.tier(tier_name)
+        role_type = tier.name
+        indexed = {}
+        if guild:
+            # Índice parcial: completar con los miembros en caché (complete_tier_index carga el resto)
+            tier_index.resolve_cached(guild, (int(user_id) for user_id in tracked_users))
+            indexed = tier_index.members_of(guild)
+
+        # El filtro por nivel es una intersección de conjuntos de IDs; el nivel
+        # predeterminado es quien no está en el índice
+        if tier is tier_rules.default:
+            user_ids = tracked_users.keys() - {str(member_id) for member_id in indexed}
+        else:
+            user_ids = tracked_users.keys() & {str(member_id) for member_id, name in indexed.items() if name == role_type}
 
+        totals = {}
+        for user_id_str in user_ids:
+            try:
+                total_time = tracker.get_total_time(int(user_id_str))
+                if total_time > 0:
+                    totals[user_id_str] = total_time
             except Exception as e:
                 print(f"Error procesando usuario {user_id_str}: {e}")
-                continue
+
+        # Créditos de todo el nivel en una sola evaluación de las reglas
+        evaluations = tier_rules.evaluate_many(
+            (user_id_str, role_type, total_time) for user_id_str, total_time in totals.items()
+        )
+
+        filtered_users = []
+        for user_id_str, total_time in totals.items():
+            data = tracked_users[user_id_str]
+            filtered_users.append({
+                'user_id': int(user_id_str),
+                'name': data.get('name', f'Usuario {user_id_str}'),
+                'total_time': total_time,
+                'credits': evaluations[user_id_str]['credits'],
+                'role_type': role_type,
+                'data': data
+            })
 
         filtered_users.sort(key=lambda x: x['name'].lower())
         return filtered_users
 
     except Exception as e:
-        print(f"Error en get_users_by_role_filter: {e}")
+        print(f"Error en get_users_by_tier: {e}")
         return []
 
 
 
+def build_payment_menu_embed():
+    """Crear el embed del menú principal de pagos"""
+    embed = discord.Embed(
+        title="💰 Sistema de Pagos",
+        description="Selecciona el tipo de usuarios que deseas ver:",
+        color=discord.Color.gold(),
+        timestamp=datetime.now()
+    )
+
+    for tier in tier_rules.tiers:
+        lines = [f"• Límite: {format_hours(tier.max_hours)}"]
+        lines += [f"• {format_hours(hours)}: {credits} créditos" for hours, credits in tier.credit_steps()]
+        embed.add_field(name=f"{tier.emoji} {tier.label}", value="\n".join(lines), inline=True)
+
+    embed.add_field(
+        name="ℹ️ Instrucciones",
+        value="Usa el menú desplegable para seleccionar qué usuarios ver",
+        inline=False
+    )
+
+    embed.set_footer(text="Sistema de créditos simplificado")
+    return embed
+
 @bot.tree.command(name="pagas", description="Ver sistema de pagos con dropdown de opciones")
 @is_admin()
 async def pagas(interaction: discord.Interaction):
     """Comando principal de pagos con dropdown para seleccionar tipo de usuario"""
     try:
-        embed = discord.Embed(
-            title="💰 Sistema de Pagos",
-            description="Selecciona el tipo de usuarios que deseas ver:",
-            color=discord.Color.gold(),
-            timestamp=datetime.now()
-        )
+        view = PaymentMainView(interaction.guild)
+        view.stop()  # El menú lo atiende la instancia registrada con bot.add_view
+        await interaction.response.send_message(embed=build_payment_menu_embed(), view=view)
 
-        embed.add_field(
-            name="👤 Reclutas (Sin Rol)",
-            value="• Límite: 1 hora\n• Créditos: 3 por hora completada",
-            inline=True
-        )
+    except Exception as e:
+        await interaction.response.send_message(f"❌ Error al mostrar sistema de pagos: {e}", ephemeral=True)
+
+creditos_group = discord.app_commands.Group(name="creditos", description="Créditos ganados por milestones y pendientes de pago")
+
+@creditos_group.command(name="pendientes", description="Ver los usuarios con créditos pendientes de pago")
+@is_admin()
+async def creditos_pendientes(interaction: discord.Interaction):
+    tracker = trackers.for_guild(interaction.guild)
+    report = await tracker.call('get_owed_credits')
+    if not report:
+        await interaction.response.send_message("✅ No hay créditos pendientes de pago", ephemeral=True)
+        return
+
+    lines = [f"<@{item['user_id']}> ({item['name']}): **{item['owed']}** créditos" for item in report]
+    description = "\n".join(lines)
+    if len(description) > 4000:
+        shown = []
+        length = 0
+        for line in lines:
+            length += len(line) + 1
+            if length > 3900:
+                break
+            shown.append(line)
+        description = "\n".join(shown) + f"\n… y {len(lines) - len(shown)} más"
+
+    embed = discord.Embed(
+        title="💳 Créditos pendientes de pago",
+        description=description,
+        color=discord.Color.gold(),
+        timestamp=datetime.now()
+    )
+    embed.set_footer(text=f"{len(report)} usuario(s) • {sum(item['owed'] for item in report)} créditos en total")
+    await interaction.response.send_message(embed=embed)
+
+@creditos_group.command(name="pagar", description="Marcar como pagados los créditos pendientes de un usuario")
+@discord.app_commands.describe(usuario="El usuario al que se le pagaron los créditos")
+@is_admin()
+async def creditos_pagar(interaction: discord.Interaction, usuario: discord.Member):
+    tracker = trackers.for_guild(interaction.guild)
+    paid = await tracker.call('mark_credits_paid', usuario.id, interaction.user.display_name)
+    if paid > 0:
+        await interaction.response.send_message(f"💳 {paid} créditos de {usuario.mention} marcados como pagados por {interaction.user.mention}")
+    else:
+        await interaction.response.send_message(f"❌ {usuario.mention} no tiene créditos pendientes", ephemeral=True)
+
+@creditos_group.command(name="ver", description="Ver los créditos ganados, pagados y pendientes de un usuario")
+@discord.app_commands.describe(usuario="El usuario a consultar")
+@is_admin()
+async def creditos_ver(interaction: discord.Interaction, usuario: discord.Member):
+    tracker = trackers.for_guild(interaction.guild)
+    balance = await tracker.call('get_credit_balance', usuario.id)
+    if balance is None:
+        await interaction.response.send_message(f"❌ {usuario.mention} no tiene créditos registrados", ephemeral=True)
+        return
+    await interaction.response.send_message(
+        f"💳 **{usuario.display_name}**\n"
+        f"• Ganados: {balance['earned']}\n"
+        f"• Pagados: {balance['paid']}\n"
+        f"• Pendientes: **{balance['owed']}**",
+        ephemeral=True
+    )
+
+bot.tree.add_command(creditos_group)
+
+HISTORY_PAGE_SIZE = 10
+
+def parse_history_date(value: str):
+    """'YYYY-MM-DD' -> datetime (None si no se indicó); ValueError si el formato es inválido"""
+    return datetime.strptime(value.strip(), "%Y-%m-%d") if value else None
+
+@bot.tree.command(name="historial", description="Ver las sesiones de un usuario entre dos fechas")
+@discord.app_commands.describe(
+    usuario="El usuario a consultar",
+    desde="Fecha inicial (YYYY-MM-DD)",
+    hasta="Fecha final, incluida (YYYY-MM-DD)",
+    pagina="Página de sesiones (10 por página, de la más reciente a la más antigua)"
+)
+@is_admin()
+async def historial(interaction: discord.Interaction, usuario: discord.Member,
+                    desde: str = None, hasta: str = None, pagina: int = 1):
+    try:
+        since = parse_history_date(desde)
+        until = parse_history_date(hasta)
+    except ValueError:
+        await interaction.response.send_message("❌ Las fechas deben tener el formato YYYY-MM-DD", ephemeral=True)
+        return
+    if since and until and until < since:
+        await interaction.response.send_message("❌ La fecha final es anterior a la inicial", ephemeral=True)
+        return
+
+    await interaction.response.defer(ephemeral=True)
+    tracker = trackers.for_guild(interaction.guild)
+    since_ts = since.timestamp() if since else None
+    # "hasta" incluye todo ese día
+    until_ts = (until + timedelta(days=1)).timestamp() if until else None
+
+    # La primera consulta construye el índice de sesiones (fuera del event loop)
+    stats = await tracker.call('get_session_stats', usuario.id, since_ts, until_ts)
+    if stats['count'] == 0:
+        await interaction.followup.send(f"❌ {usuario.mention} no tiene sesiones en ese rango", ephemeral=True)
+        return
+
+    pages = (stats['count'] + HISTORY_PAGE_SIZE - 1) // HISTORY_PAGE_SIZE
+    pagina = max(1, min(pagina, pages))
+    sessions = await tracker.call(
+        'get_sessions', usuario.id, since_ts, until_ts, (pagina - 1) * HISTORY_PAGE_SIZE, HISTORY_PAGE_SIZE
+    )
 
+    def session_line(session):
+        end = datetime.fromtimestamp(session['end'])
+        start = datetime.fromtimestamp(session['start']).strftime('%H:%M') if session['start'] else "?"
+        return f"`{end.strftime('%d/%m/%Y')}` {start} - {end.strftime('%H:%M')} • {tracker.format_time_human(session['duration'])}"
+
+    range_text = f"{desde or 'el inicio'} → {hasta or 'hoy'}"
+    embed = discord.Embed(
+        title=f"📜 Historial de {usuario.display_name}",
+        description="\n".join(session_line(session) for session in sessions),
+        color=discord.Color.blue(),
+        timestamp=datetime.now()
+    )
+    embed.add_field(name="📅 Rango", value=range_text, inline=False)
+    embed.add_field(name="⏱️ Tiempo Total", value=tracker.format_time_human(stats['total']), inline=True)
+    embed.add_field(name="🔢 Sesiones", value=str(stats['count']), inline=True)
+    embed.add_field(name="🏅 Sesión más larga", value=session_line(stats['longest']), inline=False)
+    embed.set_footer(text=f"Página {pagina}/{pages}")
+    await interaction.followup.send(embed=embed, ephemeral=True)
+
+resumen_group = discord.app_commands.Group(name="resumen", description="Resúmenes diarios y semanales precalculados")
+
+def build_rollup_embed(title: str, row, tracker: TimeTracker):
+    """Embed de una fila de resumen: totales por nivel y los usuarios con más tiempo"""
+    embed = discord.Embed(title=title, color=discord.Color.purple(), timestamp=datetime.now())
+    if not row:
+        embed.description = "Sin actividad registrada"
+        return embed
+
+    for tier_name, totals in sorted(row['tiers'].items()):
+        tier = tier_rules.tier(tier_name)
         embed.add_field(
-            name="🏆 Gold",
-            value="• Límite: 2 horas\n• 1 hora: 5 créditos\n• 2 horas: 10 créditos",
+            name=f"{tier.emoji} {tier.label}",
+            value=(
+                f"⏱️ {tracker.format_time_human(totals['seconds'])}\n"
+                f"🔢 {totals['sessions']} sesiones • ⏸️ {totals['pauses']} pausas "
+                f"({tracker.format_time_human(totals.get('paused_seconds', 0))} en pausa)\n"
+                f"❌ {totals['cancellations']} cancelaciones • 💳 {totals['credits']} créditos"
+            ),
             inline=True
         )
 
+    leaders = Rollups.leaderboard(row, 'seconds')
+    if leaders:
         embed.add_field(
-            name="ℹ️ Instrucciones",
-            value="Usa el menú desplegable para seleccionar qué usuarios ver",
+            name="🏆 Más tiempo",
+            value="\n".join(
+                f"{position}. <@{user_id_str}> • {tracker.format_time_human(counters['seconds'])}"
+                for position, (user_id_str, counters) in enumerate(leaders, 1)
+            ),
             inline=False
         )
+    embed.set_footer(text=f"{len(row['users'])} usuario(s) con actividad")
+    return embed
 
-        embed.set_footer(text="Sistema de créditos simplificado")
+async def send_rollup(interaction: discord.Interaction, kind: str, fecha: str):
+    try:
+        day = parse_history_date(fecha) or datetime.now()
+    except ValueError:
+        await interaction.response.send_message("❌ La fecha debe tener el formato YYYY-MM-DD", ephemeral=True)
+        return
+    tracker = trackers.for_guild(interaction.guild)
+    row = await tracker.call('get_rollup', kind, day.date().isoformat())
+    if kind == 'week':
+        monday = day - timedelta(days=day.weekday())
+        title = f"📈 Resumen de la semana del {monday.strftime('%d/%m/%Y')}"
+    else:
+        title = f"📈 Resumen del {day.strftime('%d/%m/%Y')}"
+    await interaction.response.send_message(embed=build_rollup_embed(title, row, tracker))
 
-        view = PaymentMainView(interaction.guild)
-        await interaction.response.send_message(embed=embed, view=view)
+@resumen_group.command(name="dia", description="Resumen de un día: tiempo, sesiones, pausas, cancelaciones y créditos")
+@discord.app_commands.describe(fecha="Día a consultar (YYYY-MM-DD, hoy si se omite)")
+@is_admin()
+async def resumen_dia(interaction: discord.Interaction, fecha: str = None):
+    await send_rollup(interaction, 'day', fecha)
 
-    except Exception as e:
-        await interaction.response.send_message(f"❌ Error al mostrar sistema de pagos: {e}", ephemeral=True)
+@resumen_group.command(name="semana", description="Resumen de una semana (lunes a domingo)")
+@discord.app_commands.describe(fecha="Cualquier día de la semana a consultar (YYYY-MM-DD, esta semana si se omite)")
+@is_admin()
+async def resumen_semana(interaction: discord.Interaction, fecha: str = None):
+    await send_rollup(interaction, 'week', fecha)
+
+@resumen_group.command(name="reconstruir", description="Recalcular los resúmenes desde el historial de sesiones y créditos")
+@is_admin()
+async def resumen_reconstruir(interaction: discord.Interaction):
+    await interaction.response.defer(ephemeral=True, thinking=True)
+    tracker = trackers.for_guild(interaction.guild)
+    try:
+        rows = await tracker.call('rebuild_rollups')
+    except RuntimeError as e:
+        await interaction.followup.send(f"⚠️ No se pudieron reconstruir los resúmenes: {e}", ephemeral=True)
+        return
+    await interaction.followup.send(f"✅ Resúmenes reconstruidos: {rows} filas (días y semanas)", ephemeral=True)
+
+bot.tree.add_command(resumen_group)
 
 # =================== NOTIFICACIONES ===================
 
@@ -1921,30 +2796,19 @@ async def send_milestone_notification(user_name: str, member, is_external_user:
             print(f"❌ Canal de notificaciones no encontrado: {NOTIFICATION_CHANNEL_ID}")
             return
 
-        # Determinar tipo de rol y calcular créditos
-        role_type = "normal"
-        if member:
-            role_type = get_user_role_type(member)
-
-        # Calcular créditos basado en las horas y tipo de rol
-        credits = calculate_credits(total_time, role_type)
+        # Nivel del usuario y créditos según el tiempo alcanzado
+        tier = tier_rules.tier_for_member(member)
+        credits = tier.credits_for(total_time)
 
         # Crear mención del usuario si es posible
         user_mention = member.mention if member else f"**{user_name}**"
 
-        # Crear mensaje según el tipo de usuario SIN mostrar tiempo total detallado
-        if role_type == "gold":
-            if hours == 1:
-                message = f"{user_mention} ha completado **1 hora** ( {credits} Créditos / Gold )\n🔄 **¡Puede continuar 1 hora más!**"
-            elif hours == 2:
-                message = f"{user_mention} ha completado **2 horas** ( {credits} Créditos / Gold )\n✅ **¡Máximo alcanzado!**"
-            else:
-                message = f"{user_mention} ha completado **{hours} hora{'s' if hours != 1 else ''}** ( {credits} Créditos / Gold )\n🔄 **Puede continuar hasta 2 horas**"
+        # Crear mensaje según el nivel SIN mostrar tiempo total detallado
+        message = f"{user_mention} ha completado **{format_hours(hours)}** ( {credits} Créditos / {tier.label} )"
+        if hours >= tier.max_hours:
+            message += "\n✅ **¡Máximo alcanzado!**"
         else:
-            if hours == 1:
-                message = f"{user_mention} ha completado **1 hora** ( {credits} Créditos / Recluta )\n✅ **¡Máximo alcanzado!**"
-            else:
-                message = f"{user_mention} ha completado **{hours} hora{'s' if hours != 1 else ''}** ( {credits} Créditos / Recluta )"
+            message += f"\n🔄 **¡Puede continuar {format_hours(tier.max_hours - hours)} más!**"
 
         await channel.send(message)
 
@@ -1952,7 +2816,7 @@ async def send_milestone_notification(user_name: str, member, is_external_user:
         print(f"❌ Error enviando notificación de milestone para {user_name}: {e}")
 
 async def send_auto_cancellation_notification(user_name: str, total_time: str, cancelled_by: str, pause_count: int, time_lost: float = 0):
-    """Enviar notificación cuando un usuario es cancelado automáticamente por 3 pausas"""
+    """Enviar notificación cuando un usuario es cancelado automáticamente por el límite de pausas"""
     max_retries = 3
 
     for attempt in range(max_retries):
@@ -1962,8 +2826,8 @@ async def send_auto_cancellation_notification(user_name: str, total_time: str, c
                 print(f"❌ Canal de cancelaciones no encontrado: {CANCELLATION_NOTIFICATION_CHANNEL_ID}")
                 return
 
-            formatted_time_lost = time_tracker.format_time_human(time_lost) if time_lost > 0 else "0 Segundos"
-            message = f"🚫 **Tiempo Cancelado Automáticamente**\n**{user_name}** ha sido cancelado automáticamente por exceder el límite de pausas\n**Tiempo conservado:** {total_time} (solo horas completas)\n**Tiempo perdido:** {formatted_time_lost}\n**Pausas alcanzadas:** {pause_count}/3\n**Última pausa ejecutada por:** {cancelled_by}"
+            formatted_time_lost = TimeTracker.format_time_human(time_lost) if time_lost > 0 else "0 Segundos"
+            message = f"🚫 **Tiempo Cancelado Automáticamente**\n**{user_name}** ha sido cancelado automáticamente por exceder el límite de pausas\n**Tiempo conservado:** {total_time} (solo horas completas)\n**Tiempo perdido:** {formatted_time_lost}\n**Pausas alcanzadas:** {pause_count}/{pause_count}\n**Última pausa ejecutada por:** {cancelled_by}"
 
             await asyncio.wait_for(channel.send(message), timeout=10.0)
             print(f"✅ Notificación de cancelación automática enviada para {user_name} al canal {CANCELLATION_NOTIFICATION_CHANNEL_ID}")
@@ -1997,6 +2861,26 @@ async def send_cancellation_notification(user_name: str, cancelled_by: str, tota
         except Exception as e:
             print(f"❌ Error enviando notificación de cancelación: {e}")
 
+async def send_bulk_notification(channel_id: int, channel_kind: str, title: str, heading: str,
+                                 lines, done_by: str, color):
+    """Enviar a un canal de notificaciones el resumen de un comando masivo en un solo mensaje"""
+    if not lines:
+        return
+    channel = bot.get_channel(channel_id)
+    if not channel:
+        print(f"❌ Canal de {channel_kind} no encontrado: {channel_id}")
+        return
+
+    embed = bulk_summary_embed(title, [(heading, lines)], [], color)
+    embed.description = f"**Ejecutado por:** {done_by}"
+    try:
+        await asyncio.wait_for(channel.send(embed=embed), timeout=15.0)
+        print(f"✅ Resumen masivo enviado al canal de {channel_kind} ({len(lines)} usuarios)")
+    except asyncio.TimeoutError:
+        print(f"⚠️ Timeout enviando resumen masivo al canal de {channel_kind}")
+    except Exception as e:
+        print(f"⚠️ Error enviando resumen masivo al canal de {channel_kind}: {e}")
+
 async def send_pause_notification(user_name: str, total_time: float, paused_by: str, session_time: str = "", pause_count: int = 0, role_type: str = "normal"):
     """Enviar notificación cuando un usuario es pausado"""
     max_retries = 3
@@ -2008,20 +2892,21 @@ async def send_pause_notification(user_name: str, total_time: float, paused_by:
                 print(f"❌ Canal de pausas no encontrado: {PAUSE_NOTIFICATION_CHANNEL_ID}")
                 return
 
-            formatted_total_time = time_tracker.format_time_human(total_time)
+            formatted_total_time = TimeTracker.format_time_human(total_time)
+            tier = tier_rules.tier(role_type)
 
-            # Mensaje específico para usuarios Gold
-            if role_type == "gold":
-                message = f"⏸️ El tiempo de **{user_name}** ha sido pausado por {paused_by}\n**Tiempo total acumulado:** {formatted_total_time}\n📊 **{user_name}** Pausas Ilimitadas sin penalización (Gold)"
+            # Mensaje para niveles cuyas pausas no cuentan
+            if tier.max_pauses is None:
+                message = f"⏸️ El tiempo de **{user_name}** ha sido pausado por {paused_by}\n**Tiempo total acumulado:** {formatted_total_time}\n📊 **{user_name}** Pausas Ilimitadas sin penalización ({tier.label})"
             else:
-                # Mensaje para usuarios normales/reclutas con formato X/3
+                # Mensaje con formato X/límite del nivel
                 if session_time and session_time != "0 Segundos":
-                    message = f"⏸️ El tiempo de **{user_name}** ha sido pausado\n**Tiempo de sesión pausado:** {session_time}\n**Tiempo total acumulado:** {formatted_total_time}\n**Pausado por:** {paused_by}\n📊 **{user_name}** lleva {pause_count}/3 pausas"
+                    message = f"⏸️ El tiempo de **{user_name}** ha sido pausado\n**Tiempo de sesión pausado:** {session_time}\n**Tiempo total acumulado:** {formatted_total_time}\n**Pausado por:** {paused_by}\n📊 **{user_name}** lleva {pause_count}/{tier.max_pauses} pausas"
                 else:
-                    message = f"⏸️ El tiempo de **{user_name}** ha sido pausado por {paused_by}\n**Tiempo total acumulado:** {formatted_total_time}\n📊 **{user_name}** lleva {pause_count}/3 pausas"
+                    message = f"⏸️ El tiempo de **{user_name}** ha sido pausado por {paused_by}\n**Tiempo total acumulado:** {formatted_total_time}\n📊 **{user_name}** lleva {pause_count}/{tier.max_pauses} pausas"
 
-                # Agregar advertencia cuando llegue a 2/3 pausas
-                if pause_count == 2:
+                # Agregar advertencia en la penúltima pausa
+                if pause_count == tier.max_pauses - 1:
                     message += f"\n⚠️ **ADVERTENCIA:** Si se pausa **{user_name}** una vez más, se eliminarán los minutos acumulados y solo se conservarán las horas completas."
 
             await channel.send(message)
@@ -2042,7 +2927,7 @@ async def send_unpause_notification(user_name: str, total_time: float, unpaused_
         if not channel:
             return
 
-        formatted_total_time = time_tracker.format_time_human(total_time)
+        formatted_total_time = TimeTracker.format_time_human(total_time)
 
         if paused_duration:
             message = f"⏸️ El tiempo de **{user_name}** ha sido despausado\n**Tiempo total acumulado:** {formatted_total_time}\n**Tiempo pausado:** {paused_duration}\n**Despausado por:** {unpaused_by}"
@@ -2056,127 +2941,170 @@ async def send_unpause_notification(user_name: str, total_time: float, unpaused_
     except Exception as e:
         print(f"⚠️ Error enviando notificación de despausa para {user_name}: {e}")
 
-async def check_time_milestone_for_gold_users(user_id: int, user_name: str, member, user_data: dict):
-    """Lógica específica para usuarios Gold - Detener automáticamente a las 2 horas"""
+async def check_time_milestone_for_tier(tracker: TimeTracker, user_id: int, user_name: str, member, user_data: dict, tier):
+    """Notificar los milestones alcanzados y detener automáticamente al llegar al límite del nivel"""
     try:
         if not user_data.get('is_active', False) or not user_data.get('last_start'):
             return
 
-        total_time = time_tracker.get_total_time(user_id)
-        total_hours = total_time / 3600
-
-        if 'notified_milestones' not in user_data:
-            user_data['notified_milestones'] = []
-            time_tracker.save_data()
-
-        notified_milestones = user_data.get('notified_milestones', [])
-
-        # Verificar si completó 2 horas EXACTAS y detener automáticamente
-        if total_hours >= 2.0 and 7200 not in notified_milestones:
-            # Detener el seguimiento
-            time_tracker.stop_tracking(user_id)
+        total_time = tracker.get_total_time(user_id)
+        notified_milestones = list(user_data.get('notified_milestones', []))
 
-            # Marcar como completado
-            user_data_refresh = time_tracker.get_user_data(user_id)
-            if user_data_refresh:
-                user_data_refresh['milestone_completed'] = True
-                user_data_refresh['notified_milestones'].append(7200)
-                time_tracker.save_data()
+        # Verificar si completó su límite y detener automáticamente
+        if tier.limit_reached(total_time) and tier.limit_seconds not in notified_milestones:
+            # Detener, marcar como completado y anotar los créditos en una sola llamada;
+            # si otro comando ya lo detuvo, el tracker la rechaza
+            result = await tracker.call('finish_time_limit', user_id, tier.limit_seconds,
+                                        tier.milestone_credits(tier.limit_seconds, notified_milestones), tier.name)
+            if not result:
+                return
 
             # Enviar notificación de completado
-            await send_milestone_notification(user_name, member, False, 2, total_time)
+            await send_milestone_notification(user_name, member, False, tier.max_hours, result.total_after)
             return
 
-        # Notificar milestone de 1 hora si no se ha notificado
-        if total_hours >= 1.0 and 3600 not in notified_milestones:
-            notified_milestones.append(3600)
-            user_data['notified_milestones'] = notified_milestones
-            time_tracker.save_data()
-            await send_milestone_notification(user_name, member, False, 1, total_time)
+        # Notificar los milestones intermedios que no se han notificado
+        for milestone in tier.due_milestones(total_time, notified_milestones):
+            result = await tracker.call('mark_milestone', user_id, milestone,
+                                        credits=tier.milestone_credits(milestone, notified_milestones), role_type=tier.name)
+            notified_milestones.append(milestone)
+            # Otra comprobación pudo notificarlo mientras tanto
+            if result:
+                await send_milestone_notification(user_name, member, False, milestone / 3600, total_time)
 
     except Exception as e:
-        print(f"❌ Error en check_time_milestone_for_gold_users para {user_name}: {e}")
+        print(f"❌ Error en check_time_milestone_for_tier para {user_name}: {e}")
         import traceback
         traceback.print_exc()
 
-async def check_time_milestone_for_normal_users(user_id: int, user_name: str, member, user_data: dict):
-    """Lógica específica para usuarios normales/reclutas - Detener automáticamente a 1 hora"""
+async def check_time_milestone(guild, user_id: int, user_name: str):
+    """Verificar milestones y dirigir a la función específica según el tipo de usuario"""
     try:
-        if not user_data.get('is_active', False) or not user_data.get('last_start'):
+        tracker = trackers.for_guild(guild)
+        if not tracker.get_user_data(user_id):
             return
 
-        total_time = time_tracker.get_total_time(user_id)
-        total_hours = total_time / 3600
-
-        if 'notified_milestones' not in user_data:
-            user_data['notified_milestones'] = []
-            time_tracker.save_data()
-
-        notified_milestones = user_data.get('notified_milestones', [])
-
-        # Verificar si completó 1 hora EXACTA y detener automáticamente
-        if total_hours >= 1.0 and 3600 not in notified_milestones:
-            # Detener el seguimiento
-            time_tracker.stop_tracking(user_id)
+        # Sin candado durante la búsqueda en la API: finish_time_limit y mark_milestone
+        # vuelven a comprobar el estado con el candado del usuario
+        member = None
+        try:
+            member = await get_or_fetch_member(guild, user_id)
+        except Exception as e:
+            print(f"⚠️ Error obteniendo miembro del servidor para {user_name}: {e}")
 
-            # Marcar como completado
-            user_data_refresh = time_tracker.get_user_data(user_id)
-            if user_data_refresh:
-                user_data_refresh['milestone_completed'] = True
-                user_data_refresh['notified_milestones'].append(3600)
-                time_tracker.save_data()
+        # Datos leídos después de la espera: un comando pudo cambiarlos
+        user_data = tracker.get_user_data(user_id)
+        if not user_data:
+            return
 
-            # Enviar notificación de completado
-            await send_milestone_notification(user_name, member, False, 1, total_time)
+        # Nivel del usuario (sin miembro, el nivel predeterminado) y sus reglas
+        tier = tier_rules.tier_for_member(member)
+        await check_time_milestone_for_tier(tracker, user_id, user_name, member, user_data, tier)
 
     except Exception as e:
-        print(f"❌ Error en check_time_milestone_for_normal_users para {user_name}: {e}")
+        print(f"❌ Error crítico en check_time_milestone para {user_name}: {e}")
         import traceback
         traceback.print_exc()
 
+def local_guilds():
+    """Servidores de los shards de este proceso cuya conexión está activa"""
+    if not isinstance(bot, commands.AutoShardedBot):
+        return list(bot.guilds)
 
+    guilds = []
+    for guild in bot.guilds:
+        shard = bot.get_shard(guild.shard_id)
+        # Un shard caído no recibe eventos ni puede enviar: sus servidores esperan
+        if shard is None or shard.is_closed():
+            continue
+        guilds.append(guild)
+    return guilds
 
-async def check_time_milestone(user_id: int, user_name: str):
-    """Verificar milestones y dirigir a la función específica según el tipo de usuario"""
+def get_guild_schedule(guild_id: int):
+    """Horarios (hora México) de inicio y detención automática de un servidor"""
+    return guild_schedule(config, guild_id, (START_TIME_HOUR, START_TIME_MINUTE), (21, 21))
+
+# Tareas en curso por servidor: cada partición avanza sin esperar a las demás
+partition_jobs = set()
+
+def spawn_partition_job(coro):
+    """Lanzar el trabajo de un servidor como tarea independiente"""
+    task = asyncio.create_task(coro)
+    partition_jobs.add(task)
+    task.add_done_callback(partition_jobs.discard)
+    return task
+
+async def check_guild_milestones(guild, tracker: TimeTracker):
+    """Verificar milestones de los usuarios activos de un servidor"""
     try:
-        user_data = time_tracker.get_user_data(user_id)
-        if not user_data:
+        tracked_users = await asyncio.wait_for(
+            asyncio.to_thread(tracker.get_all_tracked_users),
+            timeout=30.0
+        )
+
+        # Filtrar solo usuarios realmente activos
+        active_users = [
+            (user_id_str, data) for user_id_str, data in tracked_users.items()
+            if data.get('is_active', False) and not data.get('is_paused', False)
+        ]
+
+        # Límite aumentado pero con mejor control
+        max_active_users = 120
+        active_users = active_users[:max_active_users]
+
+        if not active_users:
             return
 
-        guild = None
-        member = None
-        try:
-            guild = bot.guilds[0] if bot.guilds else None
-            if guild:
-                member = guild.get_member(user_id)
-        except Exception as e:
-            print(f"⚠️ Error obteniendo miembro del servidor para {user_name}: {e}")
+        # Usar semáforo para controlar concurrencia (por servidor)
+        semaphore = asyncio.Semaphore(6)  # Máximo 6 operaciones concurrentes
 
-        # Determinar tipo de usuario y dirigir a función específica
-        if member:
-            role_type = get_user_role_type(member)
+        async def process_user_milestone(user_id_str, data):
+            async with semaphore:
+                try:
+                    user_id = int(user_id_str)
+                    user_name = data.get('name', f'Usuario {user_id}')
 
-            if role_type == "gold":
-                # Usuario Gold - hasta 2 horas
-                await check_time_milestone_for_gold_users(user_id, user_name, member, user_data)
-            else:
-                # Usuario normal/recluta - hasta 1 hora
-                await check_time_milestone_for_normal_users(user_id, user_name, member, user_data)
-        else:
-            # Si no se puede obtener el miembro, asumir usuario normal
-            await check_time_milestone_for_normal_users(user_id, user_name, None, user_data)
+                    await asyncio.wait_for(
+                        check_time_milestone(guild, user_id, user_name),
+                        timeout=20.0
+                    )
+                except asyncio.TimeoutError:
+                    print(f"⚠️ Timeout verificando milestone para {user_id_str}")
+                except Exception as e:
+                    print(f"⚠️ Error verificando milestone para {user_id_str}: {e}")
+
+        # Procesar en lotes controlados
+        batch_size = 15
+        for i in range(0, len(active_users), batch_size):
+            batch = active_users[i:i + batch_size]
+
+            tasks = [
+                process_user_milestone(user_id_str, data)
+                for user_id_str, data in batch
+            ]
+
+            try:
+                await asyncio.wait_for(
+                    asyncio.gather(*tasks, return_exceptions=True),
+                    timeout=45.0
+                )
+            except asyncio.TimeoutError:
+                print(f"⚠️ Timeout en lote {i//batch_size + 1} de milestones ({guild.name})")
+
+            # Pausa entre lotes para no sobrecargar
+            if i + batch_size < len(active_users):
+                await asyncio.sleep(0.3)
 
+    except asyncio.TimeoutError:
+        print(f"⚠️ Timeout obteniendo usuarios activos ({guild.name})")
     except Exception as e:
-        print(f"❌ Error crítico en check_time_milestone para {user_name}: {e}")
-        import traceback
-        traceback.print_exc()
+        print(f"⚠️ Error obteniendo usuarios activos ({guild.name}): {e}")
 
 async def periodic_milestone_check():
-    """Verificar milestones periódicamente para usuarios activos con optimización de recursos"""
-    milestone_check_count = 0
+    """Verificar milestones periódicamente, una ronda independiente por servidor"""
+    running = {}
     error_count = 0
     max_errors = 3
-    last_check_time = 0
 
     while True:
         try:
@@ -2184,83 +3112,12 @@ async def periodic_milestone_check():
             sleep_interval = 15 if error_count == 0 else min(30 + (error_count * 10), 60)
             await asyncio.sleep(sleep_interval)
 
-            current_time = asyncio.get_event_loop().time()
-            milestone_check_count += 1
-
-            # Verificación de milestones perdidos cada 2 minutos - función removida por simplicidad
-            # if milestone_check_count % 8 == 1:
-            #     print("⚠️ Verificación de milestones perdidos deshabilitada")
-
-            # Optimización: solo verificar usuarios activos si ha pasado suficiente tiempo
-            if current_time - last_check_time < 10:
-                continue
-
-            try:
-                tracked_users = await asyncio.wait_for(
-                    asyncio.to_thread(time_tracker.get_all_tracked_users),
-                    timeout=30.0
-                )
-
-                # Filtrar solo usuarios realmente activos
-                active_users = [
-                    (user_id_str, data) for user_id_str, data in tracked_users.items()
-                    if data.get('is_active', False) and not data.get('is_paused', False)
-                ]
-
-                # Límite aumentado pero con mejor control
-                max_active_users = 120
-                active_users = active_users[:max_active_users]
-
-                if not active_users:
-                    last_check_time = current_time
+            for guild in local_guilds():
+                # Si un servidor sigue con su ronda anterior, no se acumulan rondas
+                task = running.get(guild.id)
+                if task is not None and not task.done():
                     continue
-
-                # Usar semáforo para controlar concurrencia
-                semaphore = asyncio.Semaphore(6)  # Máximo 6 operaciones concurrentes
-
-                async def process_user_milestone(user_id_str, data):
-                    async with semaphore:
-                        try:
-                            user_id = int(user_id_str)
-                            user_name = data.get('name', f'Usuario {user_id}')
-
-                            await asyncio.wait_for(
-                                check_time_milestone(user_id, user_name),
-                                timeout=20.0
-                            )
-                        except asyncio.TimeoutError:
-                            print(f"⚠️ Timeout verificando milestone para {user_id_str}")
-                        except Exception as e:
-                            print(f"⚠️ Error verificando milestone para {user_id_str}: {e}")
-
-                # Procesar en lotes controlados
-                batch_size = 15
-                for i in range(0, len(active_users), batch_size):
-                    batch = active_users[i:i + batch_size]
-
-                    tasks = [
-                        process_user_milestone(user_id_str, data)
-                        for user_id_str, data in batch
-                    ]
-
-                    try:
-                        await asyncio.wait_for(
-                            asyncio.gather(*tasks, return_exceptions=True),
-                            timeout=45.0
-                        )
-                    except asyncio.TimeoutError:
-                        print(f"⚠️ Timeout en lote {i//batch_size + 1} de milestones")
-
-                    # Pausa entre lotes para no sobrecargar
-                    if i + batch_size < len(active_users):
-                        await asyncio.sleep(0.3)
-
-                last_check_time = current_time
-
-            except asyncio.TimeoutError:
-                print("⚠️ Timeout obteniendo usuarios activos")
-            except Exception as e:
-                print(f"⚠️ Error obteniendo usuarios activos: {e}")
+                running[guild.id] = spawn_partition_job(check_guild_milestones(guild, trackers.for_guild(guild)))
 
             error_count = 0
 
@@ -2276,116 +3133,275 @@ async def periodic_milestone_check():
                 sleep_time = min(20 * (2 ** error_count), 120)
                 await asyncio.sleep(sleep_time)
 
+async def auto_start_guild(guild, tracker: TimeTracker):
+    """Iniciar automáticamente los tiempos pre-registrados de un servidor"""
+    try:
+        # Obtener usuarios pre-registrados
+        pre_registered_users = tracker.get_pre_registered_users()
+
+        if pre_registered_users:
+            started_users = []
+
+            for user_id_str, data in pre_registered_users.items():
+                user_id = int(user_id_str)
+                user_name = data.get('name', f'Usuario {user_id}')
+
+                # Obtener información del admin que hizo el pre-registro
+                initiator_info = tracker.get_pre_register_initiator(user_id)
+
+                # Iniciar tiempo automáticamente
+                success = await tracker.call('start_tracking_from_pre_register', user_id)
+                if success:
+                    # Intentar obtener el objeto del miembro para la mención
+                    member = None
+                    try:
+                        member = await get_or_fetch_member(guild, user_id)
+                    except Exception as e:
+                        print(f"⚠️ Error obteniendo miembro para notificación: {e}")
+
+                    # Usar mención si es posible, sino usar nombre
+                    if member:
+                        user_reference = member.mention
+                    else:
+                        user_reference = f"**{user_name}**"
+
+                    if initiator_info:
+                        admin_name = initiator_info.get('admin_name', 'Admin desconocido')
+                        started_users.append(f"• {user_reference} - Pre-registrado por: {admin_name}")
+                    else:
+                        started_users.append(f"• {user_reference} - Pre-registrado por: Admin desconocido")
+
+            if started_users:
+                # Notificación automática deshabilitada
+                # await send_auto_start_notification(started_users, mexico_now)
+                print(f"✅ Iniciados automáticamente {len(started_users)} usuarios en {guild.name} (sin notificación)")
+
+    except Exception as e:
+        print(f"❌ Error en auto-inicio de {guild.name}: {e}")
+
 async def auto_start_at_1pm():
-    """Verificar y iniciar automáticamente tiempos a las 19:00 México"""
+    """Verificar y iniciar automáticamente tiempos a la hora de inicio de cada servidor (19:00 México por defecto)"""
+    last_runs = {}
+
     while True:
         try:
             await asyncio.sleep(30)  # Verificar cada 30 segundos
 
             mexico_now = datetime.now(MEXICO_TZ)
-            current_hour = mexico_now.hour
-            current_minute = mexico_now.minute
-
-            # Verificar si son exactamente las 19:00 (solo en el minuto exacto)
-            if current_hour == START_TIME_HOUR and current_minute == START_TIME_MINUTE:
-                print(f"🕐 Son las {START_TIME_HOUR}:{START_TIME_MINUTE:02d} México - Iniciando tiempos automáticamente...")
-
-                # Obtener usuarios pre-registrados
-                pre_registered_users = time_tracker.get_pre_registered_users()
-
-                if pre_registered_users:
-                    started_users = []
-
-                    for user_id_str, data in pre_registered_users.items():
-                        user_id = int(user_id_str)
-                        user_name = data.get('name', f'Usuario {user_id}')
-
-                        # Obtener información del admin que hizo el pre-registro
-                        initiator_info = time_tracker.get_pre_register_initiator(user_id)
-
-                        # Iniciar tiempo automáticamente
-                        success = time_tracker.start_tracking_from_pre_register(user_id)
-                        if success:
-                            # Intentar obtener el objeto del miembro para la mención
-                            member = None
-                            try:
-                                if bot.guilds:
-                                    guild = bot.guilds[0]
-                                    member = guild.get_member(user_id)
-                            except Exception as e:
-                                print(f"⚠️ Error obteniendo miembro para notificación: {e}")
-
-                            # Usar mención si es posible, sino usar nombre
-                            if member:
-                                user_reference = member.mention
-                            else:
-                                user_reference = f"**{user_name}**"
-
-                            if initiator_info:
-                                admin_name = initiator_info.get('admin_name', 'Admin desconocido')
-                                started_users.append(f"• {user_reference} - Pre-registrado por: {admin_name}")
-                            else:
-                                started_users.append(f"• {user_reference} - Pre-registrado por: Admin desconocido")
-
-                    if started_users:
-                        # Notificación automática deshabilitada
-                        # await send_auto_start_notification(started_users, mexico_now)
-                        print(f"✅ Iniciados automáticamente {len(started_users)} usuarios a las 19:00 México (sin notificación)")
-
-                # Esperar 70 segundos para evitar múltiples ejecuciones
-                await asyncio.sleep(70)
+            minute_key = mexico_now.strftime("%Y-%m-%d %H:%M")
+
+            for guild in local_guilds():
+                (start_hour, start_minute), _ = get_guild_schedule(guild.id)
+
+                # Solo en el minuto exacto y una vez por minuto para cada servidor
+                if (mexico_now.hour, mexico_now.minute) != (start_hour, start_minute):
+                    continue
+                if last_runs.get(guild.id) == minute_key:
+                    continue
+                last_runs[guild.id] = minute_key
+
+                print(f"🕐 Son las {start_hour}:{start_minute:02d} México - Iniciando tiempos de {guild.name}...")
+                spawn_partition_job(auto_start_guild(guild, trackers.for_guild(guild)))
 
         except Exception as e:
-            print(f"❌ Error en auto-inicio a las 19:00 México: {e}")
+            print(f"❌ Error en auto-inicio programado: {e}")
             await asyncio.sleep(30)
 
+async def auto_stop_guild(guild, tracker: TimeTracker):
+    """Detener todos los tiempos activos o pausados de un servidor"""
+    try:
+        # Obtener todos los usuarios con tiempo activo
+        tracked_users = tracker.get_all_tracked_users()
+        stopped_count = 0
+
+        for user_id_str, data in tracked_users.items():
+            if data.get('is_active', False) or data.get('is_paused', False):
+                user_id = int(user_id_str)
+
+                # Detener el tiempo
+                success = await tracker.call('stop_tracking', user_id)
+                if success:
+                    stopped_count += 1
+                    user_name = data.get('name', f'Usuario {user_id}')
+                    print(f"  ✅ Detenido tiempo de {user_name}")
+
+        if stopped_count > 0:
+            print(f"✅ Detenidos automáticamente {stopped_count} usuarios en {guild.name}")
+
+    except Exception as e:
+        print(f"❌ Error en detención automática de {guild.name}: {e}")
+
 async def auto_stop_at_2225():
-    """Detener automáticamente todos los tiempos a las 21:21 (21:20 PM) hora México"""
+    """Detener automáticamente todos los tiempos a la hora de cierre de cada servidor (21:21 México por defecto)"""
+    last_runs = {}
+
     while True:
         try:
             await asyncio.sleep(30)  # Verificar cada 30 segundos
 
             mexico_now = datetime.now(MEXICO_TZ)
-            current_hour = mexico_now.hour
-            current_minute = mexico_now.minute
-
-            # Verificar si son exactamente las 22:25 (10:25 PM)
-            if current_hour == 21 and current_minute == 21:
-                print(f"🛑 Son las 22:25 México - Deteniendo todos los tiempos automáticamente...")
-
-                # Obtener todos los usuarios con tiempo activo
-                tracked_users = time_tracker.get_all_tracked_users()
-                stopped_count = 0
-
-                for user_id_str, data in tracked_users.items():
-                    if data.get('is_active', False) or data.get('is_paused', False):
-                        user_id = int(user_id_str)
-                        
-                        # Detener el tiempo
-                        success = time_tracker.stop_tracking(user_id)
-                        if success:
-                            stopped_count += 1
-                            user_name = data.get('name', f'Usuario {user_id}')
-                            print(f"  ✅ Detenido tiempo de {user_name}")
-
-                if stopped_count > 0:
-                    print(f"✅ Detenidos automáticamente {stopped_count} usuarios a las 22:25 México")
-
-                # Esperar 70 segundos para evitar múltiples ejecuciones
-                await asyncio.sleep(70)
+            minute_key = mexico_now.strftime("%Y-%m-%d %H:%M")
+
+            for guild in local_guilds():
+                _, (stop_hour, stop_minute) = get_guild_schedule(guild.id)
+
+                # Solo en el minuto exacto y una vez por minuto para cada servidor
+                if (mexico_now.hour, mexico_now.minute) != (stop_hour, stop_minute):
+                    continue
+                if last_runs.get(guild.id) == minute_key:
+                    continue
+                last_runs[guild.id] = minute_key
+
+                print(f"🛑 Son las {stop_hour}:{stop_minute:02d} México - Deteniendo tiempos de {guild.name}...")
+                spawn_partition_job(auto_stop_guild(guild, trackers.for_guild(guild)))
 
         except Exception as e:
-            print(f"❌ Error en detención automática a las 22:25 México: {e}")
+            print(f"❌ Error en detención automática programada: {e}")
             await asyncio.sleep(30)
 
+# =================== CACHÉ DE MIEMBROS ===================
+
+async def get_or_fetch_member(guild, user_id: int):
+    """Miembro desde la caché o, si no está, desde la API (recordando los que no existen)"""
+    if guild is None:
+        return None
+    return await member_misses.get_or_fetch(guild, user_id)
+
+async def load_missing_members(guild, user_ids):
+    """Cargar en la caché los miembros indicados que falten, recordando los que no existen"""
+    if guild is None:
+        return
+    missing = [user_id for user_id in user_ids
+               if guild.get_member(user_id) is None and not member_misses.is_missing(guild.id, user_id)]
+    if not missing:
+        return
+    await warm_members(guild, missing)
+    for user_id in missing:
+        if guild.get_member(user_id) is None:
+            member_misses.add(guild.id, user_id)
+
+async def load_tracked_members(guild, tracked_users):
+    """Perfil lean: cargar los miembros de una lista antes de renderizarla (menciones y nivel)"""
+    if LEAN_MEMORY:
+        await load_missing_members(guild, [int(user_id) for user_id in tracked_users])
+
+async def member_warmup_loop():
+    """Perfil lean: mantener en caché a los usuarios registrados y el índice de niveles al día"""
+    await bot.wait_until_ready()
+    while True:
+        try:
+            for guild in local_guilds():
+                tracker = trackers.for_guild(guild)
+                user_ids = [int(user_id) for user_id in tracker.get_all_tracked_users()]
+                loaded = await warm_members(guild, user_ids)
+                if loaded or not tier_index.is_seeded(guild.id):
+                    tier_index.seed(guild)
+                if loaded:
+                    print(f"👥 {len(loaded)} miembros registrados cargados en {guild.name}")
+            member_misses.prune()
+        except Exception as e:
+            print(f"❌ Error cargando miembros registrados: {e}")
+        await asyncio.sleep(memory_profile.get('warmup_interval_seconds', 300))
+
+# =================== SEGUIMIENTO POR VOZ ===================
+
+@bot.event
+async def on_voice_state_update(member: discord.Member, before: discord.VoiceState, after: discord.VoiceState):
+    """Programar el inicio o la pausa de un miembro al entrar o salir de los canales de evento"""
+    if not voice_settings.get('enabled') or member.bot:
+        return
+
+    was_in = before.channel is not None and before.channel.id in VOICE_TRACKING_CHANNELS
+    is_in = after.channel is not None and after.channel.id in VOICE_TRACKING_CHANNELS
+    if was_in == is_in:
+        return
+
+    # Solo se programa: el tracker se modifica en process_voice_transitions
+    voice_debouncer.submit((member.guild.id, member.id), JOIN if is_in else LEAVE, member)
+
+def voice_join(tracker: TimeTracker, member: discord.Member, before_start: bool, after_cutoff: bool):
+    """Entrada a un canal de evento: despausar, iniciar o pre-registrar (la llamada a aplicar)
+
+    El tracker vuelve a comprobar el estado con el candado tomado: si cambió, la llamada se rechaza.
+    """
+    user_data = tracker.get_user_data(member.id)
+    if user_data and user_data.get('is_paused', False):
+        return 'resume_tracking', (member.id,)
+    if user_data and (user_data.get('is_active', False) or user_data.get('is_pre_registered', False)):
+        return None
+    if after_cutoff or start_rejection_reason(member):
+        return None
+    return start_call(member, before_start)
+
+def voice_leave(tracker: TimeTracker, member: discord.Member):
+    """Salida de los canales de evento: pausar si tenía tiempo activo (la llamada a aplicar)"""
+    user_data = tracker.get_user_data(member.id)
+    if not user_data or not user_data.get('is_active', False):
+        return None
+    return pause_call(member)
+
+async def process_voice_transitions():
+    """Aplicar por lotes las transiciones de voz ya estabilizadas"""
+    async for batch in voice_debouncer.batches():
+        try:
+            mexico_now = datetime.now(MEXICO_TZ)
+            now = (mexico_now.hour, mexico_now.minute)
+
+            by_guild = {}
+            for (guild_id, _), state, member in batch:
+                by_guild.setdefault(guild_id, {})[member.id] = (member, state)
+
+            for guild_id, entries in by_guild.items():
+                guild = bot.get_guild(guild_id)
+                if guild is None:
+                    continue
+                tracker = trackers.for_guild(guild)
+                start, _ = get_guild_schedule(guild_id)
+                before_start = now < start
+                after_cutoff = now >= (20, 20)
+
+                def plan(tracker, member):
+                    if entries[member.id][1] == JOIN:
+                        return voice_join(tracker, member, before_start, after_cutoff)
+                    return voice_leave(tracker, member)
+
+                results = await apply_batch(tracker, [member for member, _ in entries.values()], plan)
+
+                changed = [(member, result) for member, result in results if result]
+                if changed:
+                    print(f"🎙️ Voz en {guild.name}: {len(changed)} cambio(s) de {len(results)} transición(es)")
+                for member, result in changed:
+                    if isinstance(result, TransitionResult) and result.action == 'auto_cancelled':
+                        await send_auto_cancellation_notification(
+                            member.display_name, tracker.format_time_human(result.total_after),
+                            "salida del canal de voz", result.pause_count, result.time_lost
+                        )
+
+        except Exception as e:
+            print(f"❌ Error procesando transiciones de voz: {e}")
+
 async def start_periodic_checks():
     """Iniciar las verificaciones periódicas"""
-    global milestone_check_task, auto_start_task, auto_stop_task
+    global milestone_check_task, auto_start_task, auto_stop_task, voice_task, member_warmup_task
+
+    await trackers.wait_ready()
 
     if milestone_check_task is None:
         milestone_check_task = bot.loop.create_task(periodic_milestone_check())
         print('✅ Task de verificación de milestones iniciado')
 
+    if LEAN_MEMORY and member_warmup_task is None:
+        member_warmup_task = bot.loop.create_task(member_warmup_loop())
+        print('✅ Carga de miembros registrados en segundo plano iniciada')
+
+    if voice_settings.get('enabled') and voice_task is None:
+        voice_task = bot.loop.create_task(process_voice_transitions())
+        print(f'✅ Seguimiento por voz iniciado en {len(VOICE_TRACKING_CHANNELS)} canal(es)')
+
+    # En modo worker los horarios automáticos se ejecutan en el proceso del worker
+    if isinstance(trackers, RemoteGuildTrackers):
+        return
+
     if auto_start_task is None:
         auto_start_task = bot.loop.create_task(auto_start_at_1pm())
         print('✅ Task de inicio automático a las 19:00 México iniciado')
@@ -2399,6 +3415,40 @@ async def on_connect():
     """Evento que se ejecuta cuando el bot se conecta"""
     await start_periodic_checks()
 
+# =================== ÍNDICE DE NIVELES ===================
+
+@bot.event
+async def on_member_update(before: discord.Member, after: discord.Member):
+    tier_index.update_member(before, after)
+
+@bot.event
+async def on_member_join(member: discord.Member):
+    tier_index.add_member(member)
+
+@bot.event
+async def on_member_remove(member: discord.Member):
+    tier_index.remove_member(member.guild.id, member.id)
+
+@bot.event
+async def on_guild_role_create(role: discord.Role):
+    if tier_index.is_tier_role(role):
+        tier_index.forget_guild(role.guild.id)
+
+@bot.event
+async def on_guild_role_update(before: discord.Role, after: discord.Role):
+    # Un rol renombrado puede empezar, dejar de dar un nivel o pasar a dar otro
+    if before.name != after.name and (tier_index.is_tier_role(before) or tier_index.is_tier_role(after)):
+        tier_index.forget_guild(after.guild.id)
+
+@bot.event
+async def on_guild_role_delete(role: discord.Role):
+    if tier_index.is_tier_role(role):
+        tier_index.forget_guild(role.guild.id)
+
+@bot.event
+async def on_guild_remove(guild: discord.Guild):
+    tier_index.forget_guild(guild.id)
+
 # =================== MANEJO DE ERRORES ===================
 
 @bot.tree.error
@@ -2477,23 +3527,14 @@ def get_discord_token():
     print("└─")
     return None
 
-if __name__ == "__main__":
-    print("🤖 Iniciando Discord Time Tracker Bot SIMPLIFICADO...")
-    print("📋 Cargando configuración...")
-
-    token = get_discord_token()
-    if not token:
-        exit(1)
-
-    print("🔗 Conectando a Discord...")
-    try:
-        bot.run(token)
-    except discord.LoginFailure:
-        print("❌ Error: Token de Discord inválido")
-        print("   Verifica que el token sea correcto en config.json")
-        print("   O en las variables de entorno si usas esa opción")
-    except KeyboardInterrupt:
-        print("🛑 Bot detenido por el usuario")
-    except Exception as e:
-        print(f"❌ Error al iniciar el bot: {e}")
-        print("   Revisa la configuración y vuelve a intentar")
\ No newline at end of file
+def start_worker_process():
+    """Lanzar el proceso worker del tracker y esperar a que acepte conexiones"""
+    global worker_process
+    import subprocess
+    import sys
+    worker_process = subprocess.Popen([
+        sys.executable, os.path.join(os.path.dirname(os.path.abspath(__file__)), 'tracker_worker.py'),
+        '--socket', trackers.client.socket_path
+    ])
+    trackers.client.wait_until_ready()
+    print(f"✅ Worker del tracker iniciado (PID {worker_process.pid})")
@@ -0,0 +1,63 @@
+"""
+Sincronización del árbol de comandos solo cuando cambia.
+
+Se calcula un hash de los comandos tal como se envían a Discord (global y
+por servidor) y se guarda en command_sync.json. Al conectar, un alcance
+cuyo hash coincide con el guardado no se vuelve a sincronizar.
+"""
+
+import hashlib
+import json
+import os
+from typing import Dict, Optional
+
+GLOBAL_SCOPE = "global"
+
+
+def tree_hash(tree, guild=None) -> str:
+    """Hash de los comandos de un alcance (global si guild es None)"""
+    payload = [command.to_dict(tree) for command in tree.get_commands(guild=guild)]
+    payload.sort(key=lambda command: (command.get('type', 1), command['name']))
+    serialized = json.dumps(payload, sort_keys=True, ensure_ascii=False, default=str)
+    return hashlib.sha256(serialized.encode('utf-8')).hexdigest()
+
+
+def scope_key(application_id: Optional[int], guild=None) -> str:
+    scope = GLOBAL_SCOPE if guild is None else f"guild_{guild.id}"
+    return f"{application_id}:{scope}"
+
+
+class CommandSyncState:
+    """Hashes de la última sincronización de cada alcance, guardados en disco"""
+
+    def __init__(self, state_file: str = "command_sync.json"):
+        self.state_file = state_file
+        self.hashes: Dict[str, str] = self.load()
+
+    def load(self) -> Dict[str, str]:
+        try:
+            if os.path.exists(self.state_file):
+                with open(self.state_file, 'r', encoding='utf-8') as f:
+                    return json.load(f)
+        except Exception as e:
+            print(f"Error cargando estado de sincronización: {e}")
+        return {}
+
+    def save(self) -> None:
+        try:
+            with open(self.state_file, 'w', encoding='utf-8') as f:
+                json.dump(self.hashes, f, indent=2)
+        except Exception as e:
+            print(f"Error guardando estado de sincronización: {e}")
+
+    async def sync(self, tree, guild=None, force: bool = False):
+        """Sincronizar un alcance si sus comandos cambiaron; None si se omitió"""
+        key = scope_key(tree.client.application_id, guild)
+        current = tree_hash(tree, guild)
+        if not force and self.hashes.get(key) == current:
+            return None
+
+        synced = await tree.sync(guild=guild)
+        self.hashes[key] = current
+        self.save()
+        return synced
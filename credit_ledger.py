@@ -0,0 +1,117 @@
+"""
+Libro de créditos: registro de créditos ganados y pagados.
+
+Cada milestone alcanzado añade una línea "earn" y cada pago una línea
+"paid" al archivo JSON Lines (junto a user_times.json); nunca se reescribe,
+así que el historial sobrevive a los reinicios de tiempos:
+
+    {"type": "earn", "user_id": "123", "name": "...", "credits": 3, "milestone": 3600, ...}
+    {"type": "paid", "user_id": "123", "credits": 3, "by": "...", "at": ...}
+
+Al cargar se recorre una vez para calcular el saldo de cada usuario; a
+partir de ahí los saldos se actualizan con cada línea y el reporte de
+pagos solo mira a los usuarios con saldo pendiente.
+"""
+
+import json
+import os
+import threading
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Set
+
+
+def ledger_path_for(data_file: str) -> str:
+    """user_times.json -> user_times_credits.jsonl (en la misma carpeta)"""
+    return f"{os.path.splitext(data_file)[0]}_credits.jsonl"
+
+
+class CreditLedger:
+    """Créditos de un servidor con saldo acumulado por usuario"""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+        self._file = None
+        # user_id -> {'name', 'earned', 'paid'}
+        self.balances: Dict[str, Dict[str, Any]] = {}
+        # Usuarios con créditos sin pagar
+        self._owed: Set[str] = set()
+        self._replay()
+
+    def _replay(self) -> None:
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                for line in f:
+                    if line.strip():
+                        self._apply(json.loads(line))
+        except FileNotFoundError:
+            pass
+        except Exception as e:
+            print(f"Error cargando créditos desde {self.path}: {e}")
+
+    def _apply(self, entry: Dict[str, Any]) -> None:
+        user_id_str = entry['user_id']
+        balance = self.balances.setdefault(user_id_str, {'name': entry.get('name', ''), 'earned': 0, 'paid': 0})
+        if entry['type'] == 'earn':
+            balance['earned'] += entry['credits']
+            if entry.get('name'):
+                balance['name'] = entry['name']
+        elif entry['type'] == 'paid':
+            balance['paid'] += entry['credits']
+        if balance['earned'] > balance['paid']:
+            self._owed.add(user_id_str)
+        else:
+            self._owed.discard(user_id_str)
+
+    def _append(self, entry: Dict[str, Any]) -> None:
+        with self._lock:
+            if self._file is None:
+                self._file = open(self.path, 'a', encoding='utf-8')
+            self._file.write(json.dumps(entry, ensure_ascii=False) + "\n")
+            self._file.flush()
+        self._apply(entry)
+
+    def earn(self, user_id, name: str, credits: int, milestone: int, role_type: str, period: int = 0) -> None:
+        """Registrar créditos ganados al alcanzar un milestone"""
+        if credits <= 0:
+            return
+        self._append({
+            'type': 'earn',
+            'user_id': str(user_id),
+            'name': name,
+            'credits': credits,
+            'milestone': milestone,
+            'role_type': role_type,
+            'period': period,
+            'at': datetime.now().isoformat()
+        })
+
+    def mark_paid(self, user_id, paid_by: str) -> int:
+        """Marcar como pagado todo el saldo de un usuario; devuelve los créditos pagados"""
+        owed = self.owed(user_id)
+        if owed > 0:
+            self._append({
+                'type': 'paid',
+                'user_id': str(user_id),
+                'credits': owed,
+                'by': paid_by,
+                'at': datetime.now().isoformat()
+            })
+        return owed
+
+    def owed(self, user_id) -> int:
+        balance = self.balances.get(str(user_id))
+        return balance['earned'] - balance['paid'] if balance else 0
+
+    def balance(self, user_id) -> Optional[Dict[str, Any]]:
+        balance = self.balances.get(str(user_id))
+        return dict(balance, owed=balance['earned'] - balance['paid']) if balance else None
+
+    def owed_report(self) -> List[Dict[str, Any]]:
+        """Usuarios con saldo pendiente, de mayor a menor saldo"""
+        report = [
+            {'user_id': user_id_str, 'name': self.balances[user_id_str]['name'], 'owed': self.owed(user_id_str)}
+            for user_id_str in self._owed
+        ]
+        report.sort(key=lambda item: (-item['owed'], item['name'].lower()))
+        return report
@@ -0,0 +1,200 @@
+#!/usr/bin/env python3
+"""
+Lanzador único del Discord Time Tracker Bot (start.py, run.py, main.py y
+wispbyte_start.py lo usan).
+
+Las dependencias se verifican una sola vez por intérprete y versión de
+requirements.txt: el resultado queda en .deps_stamp.json y en los arranques
+siguientes no se hace ninguna comprobación ni se ejecuta pip.
+"""
+
+import hashlib
+import importlib
+import importlib.util
+import json
+import os
+import subprocess
+import sys
+
+from boot_timing import boot
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+REQUIREMENTS_FILE = os.path.join(BASE_DIR, "requirements.txt")
+STAMP_FILE = os.path.join(BASE_DIR, ".deps_stamp.json")
+
+# Módulo que se importa por cada paquete de requirements.txt
+REQUIRED_MODULES = {
+    "discord.py": "discord",
+    "pytz": "pytz",
+}
+
+
+def requirements_text() -> str:
+    try:
+        with open(REQUIREMENTS_FILE, 'r', encoding='utf-8') as f:
+            return f.read()
+    except OSError:
+        return "\n".join(REQUIRED_MODULES)
+
+
+def stamp_key() -> str:
+    """Clave del entorno: intérprete, versión de Python y contenido de requirements.txt"""
+    source = f"{sys.executable}\n{sys.version}\n{requirements_text()}"
+    return hashlib.sha256(source.encode('utf-8')).hexdigest()
+
+
+def stamp_is_valid() -> bool:
+    try:
+        with open(STAMP_FILE, 'r', encoding='utf-8') as f:
+            return json.load(f).get('key') == stamp_key()
+    except (OSError, ValueError):
+        return False
+
+
+def write_stamp() -> None:
+    try:
+        with open(STAMP_FILE, 'w', encoding='utf-8') as f:
+            json.dump({'key': stamp_key(), 'python': sys.version.split()[0]}, f, indent=2)
+    except OSError as e:
+        print(f"⚠️ No se pudo guardar {STAMP_FILE}: {e}")
+
+
+def clear_stamp() -> None:
+    try:
+        os.remove(STAMP_FILE)
+    except OSError:
+        pass
+
+
+def missing_modules():
+    return [package for package, module in REQUIRED_MODULES.items()
+            if importlib.util.find_spec(module) is None]
+
+
+def install_requirements() -> bool:
+    """Instalar requirements.txt probando varios métodos de pip"""
+    target = ["-r", REQUIREMENTS_FILE] if os.path.exists(REQUIREMENTS_FILE) else list(REQUIRED_MODULES)
+    methods = [
+        [sys.executable, "-m", "pip", "install", *target],
+        [sys.executable, "-m", "pip", "install", "--user", *target],
+        [sys.executable, "-m", "pip", "install", "--break-system-packages", *target],
+        ["pip3", "install", *target],
+    ]
+
+    for i, method in enumerate(methods, 1):
+        print(f"🔄 Método {i}/{len(methods)}: {' '.join(method)}")
+        try:
+            result = subprocess.run(method, capture_output=True, text=True, timeout=300)
+            if result.returncode == 0:
+                print(f"✅ Dependencias instaladas con método {i}")
+                return True
+            print(f"❌ Método {i} falló: {result.stderr[:200]}")
+        except subprocess.TimeoutExpired:
+            print(f"⏰ Timeout en método {i}")
+        except Exception as e:
+            print(f"❌ Método {i} error: {e}")
+    return False
+
+
+def ensure_dependencies(force: bool = False) -> bool:
+    """Verificar (e instalar si falta) lo necesario; con sello válido no hace nada"""
+    if not force and stamp_is_valid():
+        return True
+
+    print("🔍 Verificando dependencias...")
+    missing = missing_modules()
+    if missing:
+        print(f"📦 Faltan dependencias: {', '.join(missing)}")
+        if not install_requirements():
+            print("❌ No se pudieron instalar las dependencias")
+            print("🔧 Instala manualmente con: pip install -r requirements.txt")
+            return False
+        importlib.invalidate_caches()
+        missing = missing_modules()
+        if missing:
+            print(f"❌ Siguen sin estar disponibles: {', '.join(missing)}")
+            return False
+
+    print("✅ Todas las dependencias verificadas")
+    write_stamp()
+    return True
+
+
+def create_minimal_config() -> None:
+    """Crear config.json mínimo si no existe"""
+    if os.path.exists('config.json'):
+        return
+    minimal_config = {
+        "discord_bot_token": "tu_token_aqui",
+        "unlimited_time_role_id": None,
+        "notification_channels": {
+            "milestones": 1382195219939852500,
+            "pauses": 1385005232685318282,
+            "cancellations": 1385005232685318284,
+            "attendances": 1385005232685318281
+        }
+    }
+    try:
+        with open('config.json', 'w') as f:
+            json.dump(minimal_config, f, indent=2)
+        print("✅ Archivo config.json creado")
+    except Exception as e:
+        print(f"⚠️ No se pudo crear config.json: {e}")
+
+
+def import_bot():
+    """Importar bot.py; si el sello mentía (entorno borrado), verificar de nuevo una vez"""
+    try:
+        import bot
+        return bot
+    except ImportError as e:
+        print(f"⚠️ Error de importación con dependencias ya verificadas: {e}")
+        clear_stamp()
+        if not ensure_dependencies(force=True):
+            raise
+        import bot
+        return bot
+
+
+def main(missing_token_code: int = 1) -> int:
+    """Función principal"""
+    print("🚀 Iniciando Discord Time Tracker Bot...")
+    sys.path.insert(0, BASE_DIR)
+    create_minimal_config()
+
+    if not ensure_dependencies():
+        return 1
+    boot.mark('dependencies')
+
+    try:
+        bot = import_bot()
+    except ImportError as e:
+        print(f"❌ Error de importación: {e}")
+        print("🔧 Verifica que todos los archivos estén presentes")
+        return 1
+
+    token = bot.get_discord_token()
+    if not token:
+        return missing_token_code
+
+    if bot.worker_settings.get('enabled') and bot.worker_settings.get('spawn', True):
+        bot.start_worker_process()
+
+    print("🔗 Conectando a Discord...")
+    try:
+        bot.bot.run(token)
+    except bot.discord.LoginFailure:
+        print("❌ Error: Token de Discord inválido")
+        print("   Verifica que el token sea correcto en config.json")
+        return 1
+    except KeyboardInterrupt:
+        print("🛑 Bot detenido por el usuario")
+    except Exception as e:
+        print(f"❌ Error crítico: {e}")
+        print("📋 Verifica la configuración y logs")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
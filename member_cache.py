@@ -0,0 +1,113 @@
+"""
+Perfil de memoria para servidores grandes.
+
+Con el perfil "lean" el bot no recibe eventos de mensajes (todo funciona con
+comandos slash), no guarda mensajes en caché y solo guarda los miembros que
+están en voz, que entran durante la sesión o que se piden a propósito: los
+usuarios registrados en el tracker se cargan en segundo plano con
+query_members y el resto se busca con fetch_member cuando hace falta,
+recordando por un rato los que no existen.
+"""
+
+import time
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+import discord
+
+# Intents que el bot no usa: solo responde a comandos slash e interacciones
+LEAN_DISABLED_INTENTS = (
+    'messages', 'message_content', 'typing', 'invites', 'webhooks',
+    'integrations', 'emojis_and_stickers', 'guild_scheduled_events',
+)
+QUERY_MEMBERS_LIMIT = 100
+
+
+def client_options(profile: Dict[str, Any], intents: discord.Intents) -> Dict[str, Any]:
+    """Argumentos del bot según el perfil de memoria configurado"""
+    if profile.get('mode', 'default') != 'lean':
+        return {'intents': intents}
+
+    for name in LEAN_DISABLED_INTENTS:
+        setattr(intents, name, False)
+
+    member_cache_flags = discord.MemberCacheFlags.none()
+    member_cache_flags.voice = True
+    member_cache_flags.joined = True
+
+    return {
+        'intents': intents,
+        'member_cache_flags': member_cache_flags,
+        'chunk_guilds_at_startup': False,
+        'max_messages': None,
+    }
+
+
+class MemberMissCache:
+    """IDs de miembros que no se encontraron, para no repetir fetch_member por un tiempo"""
+
+    def __init__(self, ttl_seconds: float = 300.0, max_entries: int = 10000):
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self._misses: Dict[Tuple[int, int], float] = {}
+        self.fetches = 0
+        self.skipped = 0
+
+    def is_missing(self, guild_id: int, user_id: int) -> bool:
+        expires = self._misses.get((guild_id, user_id))
+        if expires is None:
+            return False
+        if expires < time.monotonic():
+            del self._misses[(guild_id, user_id)]
+            return False
+        return True
+
+    def add(self, guild_id: int, user_id: int) -> None:
+        if len(self._misses) >= self.max_entries:
+            self.prune()
+            if len(self._misses) >= self.max_entries:
+                # Descartar la entrada más antigua (el diccionario conserva el orden)
+                self._misses.pop(next(iter(self._misses)))
+        self._misses[(guild_id, user_id)] = time.monotonic() + self.ttl_seconds
+
+    def discard(self, guild_id: int, user_id: int) -> None:
+        self._misses.pop((guild_id, user_id), None)
+
+    def prune(self) -> None:
+        now = time.monotonic()
+        for key in [key for key, expires in self._misses.items() if expires < now]:
+            del self._misses[key]
+
+    def __len__(self) -> int:
+        return len(self._misses)
+
+    async def get_or_fetch(self, guild, user_id: int) -> Optional[discord.Member]:
+        """Miembro desde la caché o la API; None si no está en el servidor"""
+        member = guild.get_member(user_id)
+        if member is not None:
+            return member
+        if self.is_missing(guild.id, user_id):
+            self.skipped += 1
+            return None
+
+        self.fetches += 1
+        try:
+            return await guild.fetch_member(user_id)
+        except discord.NotFound:
+            self.add(guild.id, user_id)
+        except discord.HTTPException as e:
+            print(f"⚠️ Error obteniendo miembro {user_id}: {e}")
+        return None
+
+
+async def warm_members(guild, user_ids: Iterable[int]) -> List[discord.Member]:
+    """Cargar en la caché los miembros indicados que falten (por lotes de 100)"""
+    missing = [user_id for user_id in user_ids if guild.get_member(user_id) is None]
+    loaded = []
+    for start in range(0, len(missing), QUERY_MEMBERS_LIMIT):
+        batch = missing[start:start + QUERY_MEMBERS_LIMIT]
+        try:
+            loaded.extend(await guild.query_members(user_ids=batch, limit=len(batch), cache=True))
+        except Exception as e:
+            print(f"⚠️ Error cargando miembros de {guild.name}: {e}")
+            break
+    return loaded
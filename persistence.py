@@ -0,0 +1,245 @@
+"""
+Escritura de los archivos JSON en un hilo dedicado.
+
+Las modificaciones del tracker ocurren en el loop de eventos; en lugar de
+volcar el archivo completo ahí, cada cambio se serializa (solo el registro
+que cambió) y se encola; un contenido completo (replace) se entrega sin
+serializar y pasa a ser del hilo escritor. Un único hilo escritor aplica los
+cambios en orden sobre su propia copia de cada archivo y lo reescribe de
+forma atómica, juntando los cambios que se acumularon mientras escribía.
+
+Quien necesite saber que un cambio ya está en disco (reinicios de pago,
+limpieza de la base de datos) puede esperar a barrier().
+
+iter_json_object() lee archivos grandes clave a clave para que la carga no
+necesite el documento completo en memoria.
+"""
+
+import atexit
+import concurrent.futures
+import json
+import os
+import queue
+import threading
+import time
+from typing import Any, Dict, Iterator, Optional, Tuple
+
+_STOP = object()
+
+
+def write_json_atomic(path: str, payload: str) -> None:
+    """Escribir un archivo completo sin dejarlo a medias si el proceso se corta"""
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        f.write(payload)
+    os.replace(tmp_path, path)
+
+
+def iter_json_object(path: str, chunk_size: int = 1 << 20) -> Iterator[Tuple[str, Any]]:
+    """Recorrer un objeto JSON de primer nivel clave a clave sin tener el documento entero en memoria
+
+    Solo se mantiene en memoria el trozo del archivo que aún no se leyó y el
+    valor que se está devolviendo; un archivo vacío se trata como {}.
+    """
+    decoder = json.JSONDecoder()
+    with open(path, 'r', encoding='utf-8') as f:
+        buf = ''
+        pos = 0
+        eof = False
+
+        def fill() -> None:
+            nonlocal buf, pos, eof
+            # Leer al menos tanto como lo que ya hay: un valor muy grande no se decodifica O(n²)
+            chunk = f.read(max(chunk_size, len(buf) - pos))
+            if not chunk:
+                eof = True
+            buf = buf[pos:] + chunk
+            pos = 0
+
+        def next_char() -> str:
+            nonlocal pos
+            while True:
+                while pos < len(buf) and buf[pos] in ' \t\n\r':
+                    pos += 1
+                if pos < len(buf) or eof:
+                    return buf[pos] if pos < len(buf) else ''
+                fill()
+
+        def decode() -> Any:
+            nonlocal pos
+            while True:
+                try:
+                    value, end = decoder.raw_decode(buf, pos)
+                    # Un número al final del trozo puede seguir en el siguiente
+                    if end < len(buf) or eof:
+                        pos = end
+                        return value
+                except json.JSONDecodeError:
+                    if eof:
+                        raise
+                fill()
+
+        char = next_char()
+        if char == '':
+            return
+        if char != '{':
+            raise ValueError(f"{path}: se esperaba un objeto JSON")
+        pos += 1
+        if next_char() == '}':
+            return
+        while True:
+            if next_char() != '"':
+                raise ValueError(f"{path}: clave inválida en la posición {f.tell()}")
+            key = decode()
+            if next_char() != ':':
+                raise ValueError(f"{path}: falta ':' tras la clave {key!r}")
+            pos += 1
+            next_char()
+            yield key, decode()
+            char = next_char()
+            pos += 1
+            if char == '}':
+                return
+            if char != ',':
+                raise ValueError(f"{path}: se esperaba ',' o '}}' tras la clave {key!r}")
+
+
+def write_json_in_background(path: str, data: Dict[str, Any]) -> threading.Thread:
+    """Escribir un archivo grande en otro hilo; data no debe modificarse mientras tanto"""
+    def run() -> None:
+        try:
+            write_json_atomic(path, json.dumps(data, ensure_ascii=False))
+        except Exception as e:
+            print(f"❌ Error guardando {path}: {e}")
+
+    thread = threading.Thread(target=run, name=f"snapshot-{os.path.basename(path)}")
+    thread.start()
+    return thread
+
+
+class JsonStoreWriter:
+    """Hilo escritor único: aplica los cambios encolados en orden y guarda cada archivo"""
+
+    def __init__(self, name: str = "json-writer"):
+        self._queue: "queue.Queue" = queue.Queue()
+        # Copia durable de cada archivo: lo que ya se escribió o se va a escribir
+        self._stores: Dict[str, Dict[str, Any]] = {}
+        self.commits = 0
+        self.failures = 0
+        self.last_latency = 0.0
+        self.max_latency = 0.0
+        self._latency_total = 0.0
+        self._thread = threading.Thread(target=self._run, name=name, daemon=True)
+        self._thread.start()
+
+    def register(self, path: str, data: Dict[str, Any], rewrite: bool = False) -> None:
+        """Registrar un archivo con su contenido actual (copia serializada); rewrite lo reescribe"""
+        self._queue.put(('load', path, (json.dumps(data, ensure_ascii=False), rewrite), time.monotonic()))
+
+    def put_record(self, path: str, key: str, record: Optional[Dict[str, Any]]) -> None:
+        """Encolar el nuevo valor de una clave (None la elimina)"""
+        payload = None if record is None else json.dumps(record, ensure_ascii=False)
+        self._queue.put(('record', path, (key, payload), time.monotonic()))
+
+    def replace(self, path: str, data: Dict[str, Any]) -> None:
+        """Encolar el contenido completo de un archivo
+
+        data pasa a ser del hilo escritor, que lo serializa: quien llama no
+        debe volver a modificarlo (ni nada de lo que contiene).
+        """
+        self._queue.put(('replace', path, data, time.monotonic()))
+
+    def barrier(self) -> concurrent.futures.Future:
+        """Futuro que se resuelve (True/False) cuando todo lo encolado antes está en disco"""
+        future = concurrent.futures.Future()
+        self._queue.put(('barrier', None, future, time.monotonic()))
+        return future
+
+    def pending(self) -> int:
+        return self._queue.qsize()
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            'commits': self.commits,
+            'failures': self.failures,
+            'pending': self.pending(),
+            'last_latency_ms': self.last_latency * 1000,
+            'max_latency_ms': self.max_latency * 1000,
+            'avg_latency_ms': self._latency_total / self.commits * 1000 if self.commits else 0.0,
+        }
+
+    def close(self, timeout: float = 10.0) -> None:
+        """Escribir lo pendiente y detener el hilo"""
+        if self._thread.is_alive():
+            self._queue.put((_STOP, None, None, time.monotonic()))
+            self._thread.join(timeout)
+
+    def _run(self) -> None:
+        while True:
+            batch = [self._queue.get()]
+            # Juntar todo lo que llegó mientras se escribía el lote anterior
+            while True:
+                try:
+                    batch.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+
+            dirty = set()
+            barriers = []
+            stop = False
+            for kind, path, payload, _ in batch:
+                if kind is _STOP:
+                    stop = True
+                elif kind == 'barrier':
+                    barriers.append(payload)
+                elif kind == 'load':
+                    serialized, rewrite = payload
+                    self._stores[path] = json.loads(serialized)
+                    if rewrite:
+                        dirty.add(path)
+                elif kind == 'replace':
+                    self._stores[path] = payload
+                    dirty.add(path)
+                else:
+                    key, record = payload
+                    store = self._stores.setdefault(path, {})
+                    if record is None:
+                        store.pop(key, None)
+                    else:
+                        store[key] = json.loads(record)
+                    dirty.add(path)
+
+            ok = True
+            for path in dirty:
+                try:
+                    write_json_atomic(path, json.dumps(self._stores[path], indent=2, ensure_ascii=False))
+                except Exception as e:
+                    ok = False
+                    self.failures += 1
+                    print(f"❌ Error guardando {path}: {e}")
+
+            if dirty:
+                latency = time.monotonic() - batch[0][3]
+                self.commits += 1
+                self.last_latency = latency
+                self.max_latency = max(self.max_latency, latency)
+                self._latency_total += latency
+
+            for future in barriers:
+                future.set_result(ok)
+            if stop:
+                return
+
+
+_shared_writer: Optional[JsonStoreWriter] = None
+_shared_lock = threading.Lock()
+
+
+def shared_writer() -> JsonStoreWriter:
+    """Escritor compartido por todos los trackers del proceso"""
+    global _shared_writer
+    with _shared_lock:
+        if _shared_writer is None:
+            _shared_writer = JsonStoreWriter("tracker-writer")
+            atexit.register(_shared_writer.close)
+        return _shared_writer
@@ -0,0 +1,285 @@
+"""
+Resúmenes diarios y semanales precalculados.
+
+Cada cambio relevante del tracker (sesión cerrada, pausa, cancelación,
+créditos ganados) suma sus contadores en la fila del día y en la de la
+semana (lunes a domingo), por usuario y por nivel. Los reportes leen esas
+filas en lugar de recorrer el historial de sesiones:
+
+    "day:2026-10-18": {"users": {"123": {"seconds": 3600, "sessions": 1, ..., "tier": "gold"}},
+                       "tiers": {"gold": {"seconds": 3600, "sessions": 1, ...}}}
+    "week:2026-10-12": {...}
+
+En user_times_rollups.json cada usuario y cada nivel de una fila es una
+clave de primer nivel ("day:2026-10-18|user:123", "day:2026-10-18|tier:gold"),
+así que por cada evento solo se serializan los contadores que cambiaron y
+no la fila entera de la semana.
+
+rebuild() recalcula las sesiones, su tiempo y los créditos a partir del
+historial de sesiones (que tiene cada tramo, termine en una detención, una
+pausa o una cancelación) y del libro de créditos; las pausas, el tiempo en pausa
+("paused_seconds", medido al reanudar) y las cancelaciones no tienen otra
+fuente y se conservan al reconstruir.
+
+La reconstrucción lee el historial en otro hilo: begin_rebuild() fija hasta
+dónde se lee cada archivo y empieza a anotar los eventos nuevos;
+finish_rebuild() instala el resultado y vuelve a sumar esos eventos.
+"""
+
+import json
+import os
+import threading
+from datetime import date, datetime, timedelta
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from persistence import JsonStoreWriter, iter_json_object
+
+# "seconds" y "sessions" cuentan los tramos del historial (cada uno es una sesión)
+COUNTERS = ('seconds', 'sessions', 'pauses', 'paused_seconds', 'cancellations', 'credits')
+# Contadores que se pueden recalcular desde el historial
+REBUILT_COUNTERS = ('seconds', 'sessions', 'credits')
+
+
+def rollups_path_for(data_file: str) -> str:
+    """user_times.json -> user_times_rollups.json (en la misma carpeta)"""
+    return f"{os.path.splitext(data_file)[0]}_rollups.json"
+
+
+def day_key(day: date) -> str:
+    return f"day:{day.isoformat()}"
+
+
+def week_key(day: date) -> str:
+    return f"week:{(day - timedelta(days=day.weekday())).isoformat()}"
+
+
+def _new_counters() -> Dict[str, Any]:
+    return {counter: 0 for counter in COUNTERS}
+
+
+def _new_row() -> Dict[str, Any]:
+    return {'users': {}, 'tiers': {}}
+
+
+def _member_keys(key: str, user_id_str: str, tier: str) -> Tuple[str, str]:
+    """Claves en el archivo de los contadores de un usuario y de su nivel en una fila"""
+    return f"{key}|user:{user_id_str}", f"{key}|tier:{tier}"
+
+
+def flatten_rows(rows: Dict[str, Dict[str, Any]]) -> Dict[str, Dict[str, Any]]:
+    """Filas -> claves del archivo (una por usuario y por nivel de cada fila), con copias de los contadores"""
+    flat = {}
+    for key, row in rows.items():
+        for user_id_str, counters in row['users'].items():
+            flat[f"{key}|user:{user_id_str}"] = dict(counters)
+        for tier, counters in row['tiers'].items():
+            flat[f"{key}|tier:{tier}"] = dict(counters)
+    return flat
+
+
+def _read_lines(f, size: int) -> Iterator[str]:
+    """Líneas de un archivo abierto en binario hasta el byte size"""
+    read = 0
+    for line in f:
+        read += len(line)
+        if read > size:
+            break
+        yield line.decode('utf-8')
+
+
+class RebuildSources:
+    """Archivos del historial abiertos al empezar la reconstrucción, con el tamaño que tenían"""
+
+    def __init__(self, closed_paths: Iterable[str], current_path: str, ledger_path: str,
+                 tiers: Dict[str, str]):
+        self.closed_paths = list(closed_paths)
+        # El historial actual se abre ya: si se cierra el periodo mientras tanto, se sigue leyendo
+        self.current = self._open(current_path)
+        self.ledger = self._open(ledger_path)
+        # Nivel de cada usuario al empezar (los registros pueden cambiar mientras se lee)
+        self.tiers = tiers
+
+    @staticmethod
+    def _open(path: str):
+        try:
+            f = open(path, 'rb')
+        except FileNotFoundError:
+            return None
+        return f, os.fstat(f.fileno()).st_size
+
+    def sessions(self) -> Iterator[Tuple[str, Dict[str, Any]]]:
+        yield from iter_archived_sessions(self.closed_paths)
+        if self.current:
+            yield from _session_pairs(_read_lines(*self.current))
+
+    def credits(self) -> Iterator[Dict[str, Any]]:
+        if self.ledger:
+            for line in _read_lines(*self.ledger):
+                if line.strip():
+                    entry = json.loads(line)
+                    if entry['type'] == 'earn':
+                        yield entry
+
+    def close(self) -> None:
+        for opened in (self.current, self.ledger):
+            if opened:
+                opened[0].close()
+
+
+class Rollups:
+    """Filas de resumen por día y por semana de un servidor"""
+
+    def __init__(self, path: str, writer: JsonStoreWriter):
+        self.path = path
+        self.writer = writer
+        self._legacy_rows = False
+        self.rows: Dict[str, Dict[str, Any]] = self._load()
+        # Un archivo con filas enteras (formato anterior) se reescribe con una clave por contador
+        self.writer.register(self.path, flatten_rows(self.rows), rewrite=self._legacy_rows)
+        self._lock = threading.Lock()
+        # Eventos anotados durante una reconstrucción (None si no hay ninguna en curso)
+        self._captured: Optional[List[Tuple[date, str, str, Dict[str, float]]]] = None
+
+    def _load(self) -> Dict[str, Dict[str, Any]]:
+        rows: Dict[str, Dict[str, Any]] = {}
+        try:
+            if os.path.exists(self.path):
+                for file_key, value in iter_json_object(self.path):
+                    key, _, member = file_key.partition('|')
+                    if not member:
+                        self._legacy_rows = True
+                        rows[key] = value
+                        continue
+                    kind, _, name = member.partition(':')
+                    row = rows.setdefault(key, _new_row())
+                    row['users' if kind == 'user' else 'tiers'][name] = value
+        except Exception as e:
+            print(f"Error cargando resúmenes desde {self.path}: {e}")
+        return rows
+
+    def _row(self, key: str) -> Dict[str, Any]:
+        row = self.rows.get(key)
+        if row is None:
+            row = self.rows[key] = _new_row()
+        return row
+
+    @staticmethod
+    def _add(row: Dict[str, Any], user_id_str: str, tier: str, deltas: Dict[str, float]) -> None:
+        user = row['users'].setdefault(user_id_str, _new_counters())
+        user['tier'] = tier
+        totals = row['tiers'].setdefault(tier, _new_counters())
+        for counter, value in deltas.items():
+            # Las filas anteriores a un contador nuevo no lo tienen
+            user[counter] = user.get(counter, 0) + value
+            totals[counter] = totals.get(counter, 0) + value
+
+    def record(self, user_id, tier: str, when: Optional[datetime] = None, **deltas: float) -> None:
+        """Sumar contadores (seconds=..., sessions=1, ...) al día y a la semana de un evento"""
+        deltas = {counter: value for counter, value in deltas.items() if value}
+        if not deltas:
+            return
+        day = (when or datetime.now()).date()
+        with self._lock:
+            if self._captured is not None:
+                self._captured.append((day, str(user_id), tier, deltas))
+            user_id_str = str(user_id)
+            for key in (day_key(day), week_key(day)):
+                row = self._row(key)
+                self._add(row, user_id_str, tier, deltas)
+                user_key, tier_key = _member_keys(key, user_id_str, tier)
+                self.writer.put_record(self.path, user_key, row['users'][user_id_str])
+                self.writer.put_record(self.path, tier_key, row['tiers'][tier])
+
+    def day(self, day: date) -> Optional[Dict[str, Any]]:
+        return self.rows.get(day_key(day))
+
+    def week(self, day: date) -> Optional[Dict[str, Any]]:
+        """Fila de la semana que contiene ese día"""
+        return self.rows.get(week_key(day))
+
+    @staticmethod
+    def leaderboard(row: Optional[Dict[str, Any]], counter: str = 'seconds',
+                    limit: int = 10) -> List[Tuple[str, Dict[str, Any]]]:
+        """Usuarios de una fila ordenados por un contador, de mayor a menor"""
+        if not row:
+            return []
+        users = [(user_id_str, counters) for user_id_str, counters in row['users'].items() if counters[counter]]
+        users.sort(key=lambda item: -item[1][counter])
+        return users[:limit]
+
+    def begin_rebuild(self, sources: RebuildSources) -> RebuildSources:
+        """Empezar a anotar eventos; sources ya fijó hasta dónde se lee el historial"""
+        with self._lock:
+            if self._captured is not None:
+                sources.close()
+                raise RuntimeError("Ya hay una reconstrucción de resúmenes en curso")
+            self._captured = []
+        return sources
+
+    @classmethod
+    def build(cls, sources: RebuildSources) -> Dict[str, Dict[str, Any]]:
+        """Segundos, sesiones y créditos por día y semana según el historial (sin tocar las filas actuales)"""
+        rows: Dict[str, Dict[str, Any]] = {}
+
+        def add(day: date, user_id_str: str, tier: str, deltas: Dict[str, float]) -> None:
+            for key in (day_key(day), week_key(day)):
+                cls._add(rows.setdefault(key, _new_row()), user_id_str, tier, deltas)
+
+        try:
+            for user_id_str, session in sources.sessions():
+                if session.get('end'):
+                    add(datetime.fromisoformat(session['end']).date(), user_id_str,
+                        sources.tiers.get(user_id_str, 'normal'),
+                        {'seconds': session.get('duration', 0) or 0, 'sessions': 1})
+            for entry in sources.credits():
+                add(datetime.fromisoformat(entry['at']).date(), entry['user_id'],
+                    entry.get('role_type', 'normal'), {'credits': entry['credits']})
+        finally:
+            sources.close()
+        return rows
+
+    def finish_rebuild(self, rebuilt: Optional[Dict[str, Dict[str, Any]]]) -> int:
+        """Instalar lo reconstruido (None: se abandonó) con lo que pasó mientras tanto; devuelve las filas"""
+        with self._lock:
+            captured, self._captured = self._captured, None
+            if rebuilt is None:
+                return len(self.rows)
+
+            # Eventos posteriores al corte: su parte recalculable no está en el historial leído
+            for day, user_id_str, tier, deltas in captured or []:
+                replay = {counter: deltas[counter] for counter in REBUILT_COUNTERS if deltas.get(counter)}
+                if replay:
+                    for key in (day_key(day), week_key(day)):
+                        self._add(rebuilt.setdefault(key, _new_row()), user_id_str, tier, replay)
+
+            # Pausas, tiempo en pausa y cancelaciones de las filas actuales (no hay otra fuente)
+            for key, row in self.rows.items():
+                for user_id_str, counters in row['users'].items():
+                    kept = {counter: counters.get(counter, 0) for counter in COUNTERS if counter not in REBUILT_COUNTERS}
+                    if any(kept.values()):
+                        new_row = rebuilt.setdefault(key, _new_row())
+                        self._add(new_row, user_id_str, counters.get('tier', 'normal'), kept)
+
+            self.rows = rebuilt
+            # El escritor se queda con su propia copia: las filas siguen cambiando aquí
+            self.writer.replace(self.path, flatten_rows(rebuilt))
+            return len(self.rows)
+
+
+def _session_pairs(lines: Iterable[str]) -> Iterator[Tuple[str, Dict[str, Any]]]:
+    for line in lines:
+        if '"session"' not in line:
+            continue
+        entry = json.loads(line)
+        if entry.get('session'):
+            yield entry['user_id'], entry['session']
+
+
+def iter_archived_sessions(paths: Iterable[str]) -> Iterator[Tuple[str, Dict[str, Any]]]:
+    """Pares (user_id, sesión) de varios archivos de historial (ignorando los reinicios)"""
+    for path in paths:
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                yield from _session_pairs(f)
+        except FileNotFoundError:
+            continue
@@ -0,0 +1,283 @@
+"""
+Historial de sesiones en almacenamiento frío.
+
+Las sesiones terminadas no se guardan dentro de user_times.json (que se
+reescribe y se tiene entero en memoria) sino en un archivo JSON Lines junto
+a él, al que solo se añaden líneas:
+
+    {"user_id": "123", "session": {"start": ..., "end": ..., "duration": ..., "end_reason": "pause"}}
+    {"user_id": "123", "reset": "2025-06-01T12:00:00"}
+
+Cada tramo de trabajo que termina es una sesión: end_reason dice si terminó
+en una detención ("stop"), una pausa ("pause") o una cancelación ("cancel",
+"auto_cancel"); las sesiones antiguas no lo tienen.
+
+Una línea "reset" descarta las sesiones anteriores de ese usuario (reinicio
+de tiempo o cancelación); quien lea el historial debe respetarla.
+
+SessionIndex ordena las sesiones de cada usuario por fecha de fin para
+responder consultas por rango (total, cantidad, sesión más larga) en tiempo
+logarítmico. Es un registro de lo trabajado: incluye los periodos cerrados e
+ignora los reinicios.
+"""
+
+import bisect
+import json
+import os
+import threading
+from datetime import datetime
+from typing import Any, Dict, Iterable, Iterator, List, Optional
+
+
+def archive_path_for(data_file: str) -> str:
+    """user_times.json -> user_times_sessions.jsonl (en la misma carpeta)"""
+    return f"{os.path.splitext(data_file)[0]}_sessions.jsonl"
+
+
+def _timestamp(value: Optional[str]) -> Optional[float]:
+    return datetime.fromisoformat(value).timestamp() if value else None
+
+
+class _UserSessions:
+    """Sesiones de un usuario ordenadas por fin, con sumas acumuladas y tabla de máximos"""
+
+    __slots__ = ('ends', 'starts', 'durations', 'prefix', 'sparse')
+
+    def __init__(self):
+        self.ends: List[float] = []
+        self.starts: List[Optional[float]] = []
+        self.durations: List[float] = []
+        # prefix[i] = suma de las primeras i duraciones
+        self.prefix: List[float] = [0.0]
+        # sparse[k][i] = índice de la sesión más larga entre i e i + 2**k - 1
+        self.sparse: List[List[int]] = [[]]
+
+    def append(self, end: float, start: Optional[float], duration: float) -> None:
+        """Añadir una sesión que termina después de todas las demás (O(log n))"""
+        i = len(self.ends)
+        self.ends.append(end)
+        self.starts.append(start)
+        self.durations.append(duration)
+        self.prefix.append(self.prefix[-1] + duration)
+        self.sparse[0].append(i)
+        k = 1
+        while (1 << k) <= i + 1:
+            if len(self.sparse) == k:
+                self.sparse.append([])
+            left = self.sparse[k - 1][i - (1 << k) + 1]
+            right = self.sparse[k - 1][i - (1 << (k - 1)) + 1]
+            self.sparse[k].append(left if self.durations[left] >= self.durations[right] else right)
+            k += 1
+
+    def longest(self, lo: int, hi: int) -> Optional[int]:
+        """Índice de la sesión más larga en [lo, hi) (O(1))"""
+        if lo >= hi:
+            return None
+        k = (hi - lo).bit_length() - 1
+        left = self.sparse[k][lo]
+        right = self.sparse[k][hi - (1 << k)]
+        return left if self.durations[left] >= self.durations[right] else right
+
+
+class SessionIndex:
+    """Sesiones de todos los usuarios indexadas por fecha de fin"""
+
+    def __init__(self):
+        self._users: Dict[str, _UserSessions] = {}
+        self._lock = threading.Lock()
+
+    def add(self, user_id, session: Dict[str, Any]) -> None:
+        end = _timestamp(session.get('end'))
+        if end is None:
+            return
+        with self._lock:
+            self._insert(str(user_id), end, _timestamp(session.get('start')), session.get('duration', 0) or 0)
+
+    def _insert(self, user_id_str: str, end: float, start: Optional[float], duration: float) -> None:
+        sessions = self._users.get(user_id_str)
+        if sessions is None:
+            sessions = self._users[user_id_str] = _UserSessions()
+        if not sessions.ends or end >= sessions.ends[-1]:
+            sessions.append(end, start, duration)
+            return
+        # Fuera de orden (reloj ajustado o archivo antiguo): reconstruir las de este usuario
+        rows = sorted(zip(sessions.ends, sessions.starts, sessions.durations))
+        bisect.insort(rows, (end, start, duration))
+        rebuilt = self._users[user_id_str] = _UserSessions()
+        for row in rows:
+            rebuilt.append(*row)
+
+    def _range(self, sessions: _UserSessions, since: Optional[float], until: Optional[float]):
+        lo = 0 if since is None else bisect.bisect_left(sessions.ends, since)
+        hi = len(sessions.ends) if until is None else bisect.bisect_left(sessions.ends, until)
+        return lo, max(lo, hi)
+
+    def stats(self, user_id, since: Optional[float] = None, until: Optional[float] = None) -> Dict[str, Any]:
+        """Cantidad, total y sesión más larga de las sesiones terminadas en [since, until)"""
+        with self._lock:
+            sessions = self._users.get(str(user_id))
+            if sessions is None:
+                return {'count': 0, 'total': 0.0, 'longest': None}
+            lo, hi = self._range(sessions, since, until)
+            longest = sessions.longest(lo, hi)
+            return {
+                'count': hi - lo,
+                'total': sessions.prefix[hi] - sessions.prefix[lo],
+                'longest': None if longest is None else self._row(sessions, longest),
+            }
+
+    def sessions(self, user_id, since: Optional[float] = None, until: Optional[float] = None,
+                 offset: int = 0, limit: int = 10) -> List[Dict[str, Any]]:
+        """Sesiones del rango, de la más reciente a la más antigua, paginadas"""
+        with self._lock:
+            sessions = self._users.get(str(user_id))
+            if sessions is None:
+                return []
+            lo, hi = self._range(sessions, since, until)
+            newest = hi - 1 - offset
+            oldest = max(lo, newest - limit + 1)
+            return [self._row(sessions, i) for i in range(newest, oldest - 1, -1)]
+
+    @staticmethod
+    def _row(sessions: _UserSessions, i: int) -> Dict[str, Any]:
+        return {'start': sessions.starts[i], 'end': sessions.ends[i], 'duration': sessions.durations[i]}
+
+    def load_lines(self, lines: Iterable[str]) -> None:
+        for line in lines:
+            if '"session"' not in line:
+                continue
+            entry = json.loads(line)
+            session = entry.get('session')
+            if session:
+                self.add(entry['user_id'], session)
+
+
+class SessionArchive:
+    """Archivo de sesiones de un servidor: solo se añaden líneas"""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+        self._file = None
+        # Índice de consultas; se construye la primera vez que se pide
+        self.index: Optional[SessionIndex] = None
+
+    def _append_lines(self, lines: Iterable[Dict[str, Any]], sync: bool = False) -> int:
+        count = 0
+        with self._lock:
+            if self._file is None:
+                self._file = open(self.path, 'a', encoding='utf-8')
+            for line in lines:
+                self._file.write(json.dumps(line, ensure_ascii=False) + "\n")
+                count += 1
+            self._file.flush()
+            if sync:
+                os.fsync(self._file.fileno())
+        return count
+
+    def append(self, user_id, session: Dict[str, Any]) -> None:
+        """Añadir una sesión terminada"""
+        try:
+            self._append_lines([{'user_id': str(user_id), 'session': session}])
+        except OSError as e:
+            print(f"❌ Error guardando sesión en {self.path}: {e}")
+        # Con el índice ya construido, se mantiene al día
+        index = self.index
+        if index is not None:
+            index.add(user_id, session)
+
+    def load_index(self, closed_paths: Iterable[str] = ()) -> SessionIndex:
+        """Construir (una sola vez) el índice con los periodos cerrados y el historial actual"""
+        if self.index is not None:
+            return self.index
+        index = SessionIndex()
+        for path in closed_paths:
+            try:
+                with open(path, 'r', encoding='utf-8') as f:
+                    index.load_lines(f)
+            except FileNotFoundError:
+                pass
+        try:
+            f = open(self.path, 'r', encoding='utf-8')
+        except FileNotFoundError:
+            f = None
+        try:
+            if f is not None:
+                index.load_lines(f)
+            # Lo que se añada mientras tanto se lee con el candado tomado: ni se pierde ni se duplica
+            with self._lock:
+                if self.index is None:
+                    if self._file is not None:
+                        self._file.flush()
+                    if f is not None:
+                        index.load_lines(f)
+                        # Si el periodo se cerró mientras tanto, falta el historial nuevo
+                        if os.path.exists(self.path) and not os.path.samefile(self.path, f.name):
+                            f.close()
+                            f = None
+                    if f is None and os.path.exists(self.path):
+                        f = open(self.path, 'r', encoding='utf-8')
+                        index.load_lines(f)
+                    self.index = index
+        finally:
+            if f is not None:
+                f.close()
+        return self.index
+
+    def spool(self, user_id, sessions: Iterable[Dict[str, Any]]) -> int:
+        """Mover al archivo las sesiones que venían dentro de user_times.json"""
+        user_id_str = str(user_id)
+        return self._append_lines(({'user_id': user_id_str, 'session': session} for session in sessions))
+
+    def reset_user(self, user_id) -> None:
+        """Descartar el historial de un usuario"""
+        try:
+            self._append_lines([{'user_id': str(user_id), 'reset': datetime.now().isoformat()}])
+        except OSError as e:
+            print(f"❌ Error guardando reinicio de sesiones en {self.path}: {e}")
+
+    def sync(self) -> None:
+        """Asegurar en disco lo añadido hasta ahora"""
+        with self._lock:
+            if self._file is not None:
+                self._file.flush()
+                os.fsync(self._file.fileno())
+
+    def rotate(self, closed_path: str) -> None:
+        """Mover el historial a closed_path (periodo cerrado) y empezar uno vacío"""
+        with self._lock:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+            try:
+                os.replace(self.path, closed_path)
+            except FileNotFoundError:
+                pass
+
+    def iter_sessions(self, user_id: Optional[int] = None) -> Iterator[Dict[str, Any]]:
+        """Recorrer el historial vigente (respetando los reinicios), opcionalmente de un usuario"""
+        wanted = None if user_id is None else str(user_id)
+        self.sync()
+        try:
+            f = open(self.path, 'r', encoding='utf-8')
+        except FileNotFoundError:
+            return
+        # Las líneas anteriores al último reinicio de cada usuario no cuentan
+        last_reset: Dict[str, int] = {}
+        with f:
+            for number, line in enumerate(f):
+                if '"reset"' in line:
+                    entry = json.loads(line)
+                    if 'reset' in entry and (wanted is None or entry['user_id'] == wanted):
+                        last_reset[entry['user_id']] = number
+            f.seek(0)
+            for number, line in enumerate(f):
+                if not line.strip():
+                    continue
+                entry = json.loads(line)
+                session = entry.get('session')
+                if session is None or (wanted is not None and entry['user_id'] != wanted):
+                    continue
+                if number < last_reset.get(entry['user_id'], -1):
+                    continue
+                yield {'user_id': entry['user_id'], **session}
@@ -0,0 +1,108 @@
+"""
+Métricas por shard de la conexión al gateway.
+
+Cuenta los eventos despachados por cada shard (en ventanas de un segundo)
+y los eventos de conexión, desconexión y reanudación, para ver la latencia
+y la carga de cada conexión con /estado_shards.
+"""
+
+import time
+from collections import Counter, deque
+from typing import Deque, Dict, Iterable, List, Optional, Tuple
+
+# Eventos del ciclo de vida de la conexión (en bots con y sin shards)
+LIFECYCLE_EVENTS = {
+    'shard_connect': 'connects', 'connect': 'connects',
+    'shard_disconnect': 'disconnects', 'disconnect': 'disconnects',
+    'shard_resumed': 'resumes', 'resumed': 'resumes',
+}
+
+
+class ShardMetrics:
+    """Eventos por minuto, reconexiones y último evento de cada shard"""
+
+    def __init__(self, window_seconds: int = 60):
+        self.window_seconds = window_seconds
+        self._buckets: Dict[int, Deque[List[int]]] = {}
+        self._totals: Counter = Counter()
+        self._lifecycle: Dict[str, Counter] = {kind: Counter() for kind in set(LIFECYCLE_EVENTS.values())}
+        self._last_event: Dict[int, float] = {}
+
+    def record_event(self, shard_id: int) -> None:
+        """Contar un evento despachado por un shard"""
+        second = int(time.monotonic())
+        buckets = self._buckets.setdefault(shard_id, deque())
+        if buckets and buckets[-1][0] == second:
+            buckets[-1][1] += 1
+        else:
+            buckets.append([second, 1])
+            self._trim(buckets, second)
+        self._totals[shard_id] += 1
+        self._last_event[shard_id] = time.time()
+
+    def record_lifecycle(self, event_name: str, shard_id: int) -> None:
+        kind = LIFECYCLE_EVENTS.get(event_name)
+        if kind:
+            self._lifecycle[kind][shard_id] += 1
+
+    def _trim(self, buckets: Deque[List[int]], now_second: int) -> None:
+        while buckets and now_second - buckets[0][0] >= self.window_seconds:
+            buckets.popleft()
+
+    def events_per_minute(self, shard_id: int) -> float:
+        """Eventos por minuto del shard según la ventana reciente"""
+        buckets = self._buckets.get(shard_id)
+        if not buckets:
+            return 0.0
+        self._trim(buckets, int(time.monotonic()))
+        return sum(count for _, count in buckets) * 60.0 / self.window_seconds
+
+    def report(self, latencies: Iterable[Tuple[int, float]], guild_counts: Dict[int, int]) -> List[dict]:
+        """Resumen por shard combinando latencias del gateway y contadores"""
+        rows = []
+        for shard_id, latency in sorted(latencies):
+            rows.append({
+                'shard_id': shard_id,
+                'latency_ms': None if latency != latency or latency == float('inf') else latency * 1000,
+                'guilds': guild_counts.get(shard_id, 0),
+                'events_per_minute': self.events_per_minute(shard_id),
+                'total_events': self._totals[shard_id],
+                'connects': self._lifecycle['connects'][shard_id],
+                'disconnects': self._lifecycle['disconnects'][shard_id],
+                'resumes': self._lifecycle['resumes'][shard_id],
+                'last_event': self._last_event.get(shard_id),
+            })
+        return rows
+
+
+def shard_for_event(args: tuple, shard_count: Optional[int]) -> int:
+    """Shard al que pertenece un evento según el servidor de sus argumentos"""
+    shard_count = shard_count or 1
+    for arg in args:
+        shard_id = getattr(arg, 'shard_id', None)
+        if isinstance(shard_id, int):
+            return shard_id
+        guild = getattr(arg, 'guild', None)
+        shard_id = getattr(guild, 'shard_id', None)
+        if isinstance(shard_id, int):
+            return shard_id
+        guild_id = getattr(arg, 'guild_id', None)
+        if isinstance(guild_id, int):
+            return (guild_id >> 22) % shard_count
+    # Los mensajes directos y eventos sin servidor llegan por el shard 0
+    return 0
+
+
+class ShardMetricsMixin:
+    """Mezcla para el bot: registra cada evento despachado en shard_metrics"""
+
+    shard_metrics: ShardMetrics
+
+    def dispatch(self, event_name: str, /, *args, **kwargs) -> None:
+        if not event_name.startswith('socket_'):
+            if event_name in LIFECYCLE_EVENTS:
+                shard_id = args[0] if args and isinstance(args[0], int) else 0
+                self.shard_metrics.record_lifecycle(event_name, shard_id)
+            else:
+                self.shard_metrics.record_event(shard_for_event(args, self.shard_count))
+        super().dispatch(event_name, *args, **kwargs)
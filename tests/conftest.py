@@ -0,0 +1,16 @@
+import pytest
+
+from persistence import JsonStoreWriter
+from time_tracker import TimeTracker
+
+
+@pytest.fixture
+def writer():
+    writer = JsonStoreWriter("test-writer")
+    yield writer
+    writer.close()
+
+
+@pytest.fixture
+def tracker(tmp_path, writer):
+    return TimeTracker(str(tmp_path / "user_times.json"), str(tmp_path / "attendance_data.json"), writer=writer)
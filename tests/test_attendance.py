@@ -0,0 +1,78 @@
+import json
+from datetime import date, timedelta
+
+from time_tracker import ATTENDANCE_RING_DAYS, TimeTracker
+
+MONDAY = date(2026, 10, 12)
+
+
+def test_days_leaving_the_ring_move_to_the_monthly_archive():
+    record = TimeTracker._new_attendance_record("admin")
+    first = date(2026, 9, 28)
+    for offset in range(ATTENDANCE_RING_DAYS + 3):
+        TimeTracker._add_day_attendance(record, first + timedelta(days=offset), 2)
+
+    # Los 3 primeros días (septiembre) salieron del anillo
+    assert record['monthly'] == {'2026-09': 6}
+    assert TimeTracker._day_attendance(record, first) == 0
+    assert TimeTracker._day_attendance(record, first + timedelta(days=ATTENDANCE_RING_DAYS + 2)) == 2
+
+
+def test_week_counter_only_counts_weekdays_of_the_current_week():
+    record = TimeTracker._new_attendance_record("admin")
+    for offset in range(7):
+        TimeTracker._add_day_attendance(record, MONDAY + timedelta(days=offset), 1)
+
+    assert TimeTracker._week_attendance(record, MONDAY + timedelta(days=6)) == 5
+    assert TimeTracker._week_attendance(record, MONDAY + timedelta(days=7)) == 0
+
+    TimeTracker._add_day_attendance(record, MONDAY + timedelta(days=8), 2)
+    assert TimeTracker._week_attendance(record, MONDAY + timedelta(days=8)) == 2
+
+
+def test_manual_weekly_attendance_expires_with_its_week():
+    record = TimeTracker._new_attendance_record("admin")
+    record['manual_weekly_attendance'] = 4
+    record['manual_week'] = TimeTracker._week_stamp(MONDAY)
+
+    assert TimeTracker._manual_weekly_attendance(record, MONDAY + timedelta(days=4)) == 4
+    assert TimeTracker._manual_weekly_attendance(record, MONDAY + timedelta(days=7)) == 0
+
+
+def test_old_daily_attendance_is_migrated_to_the_ring(tmp_path, writer):
+    today = date.today()
+    # Mismo lugar del anillo que hoy: al migrar, hoy lo desplaza al archivo mensual
+    old = today - timedelta(days=4 * ATTENDANCE_RING_DAYS)
+    attendance_file = tmp_path / "attendance_data.json"
+    attendance_file.write_text(json.dumps({'9': {
+        'name': 'admin', 'total_attendance': 5,
+        'daily_attendance': {old.isoformat(): 2, today.isoformat(): 3},
+        'transferred_today': True, 'transfer_date': today.isoformat(),
+    }}), encoding='utf-8')
+
+    tracker = TimeTracker(str(tmp_path / "user_times.json"), str(attendance_file), writer=writer)
+    record = tracker.attendance_data['9']
+    assert 'daily_attendance' not in record
+    assert tracker.get_daily_attendance(9) == 3
+    assert record['monthly'] == {old.strftime("%Y-%m"): 2}
+    assert not tracker.can_receive_daily_attendance(9)
+
+
+def test_add_attendance_caps_the_day_at_three(tracker):
+    assert tracker.add_attendance(9, "admin", 2)
+    tracker.add_attendance(9, "admin", 2)
+
+    assert tracker.get_daily_attendance(9) == 3
+    assert tracker.get_total_attendance(9) == 3
+
+
+def test_transfer_block_expires_with_the_day(tracker):
+    tracker.add_attendance(9, "admin", 3)
+    assert tracker.transfer_attendances(9, 8, "otro", 2)
+    assert tracker.get_daily_attendance(8) == 2
+    assert not tracker.can_receive_daily_attendance(9)
+    assert not tracker.add_attendance(9, "admin", 1)
+
+    # Sello del día anterior: el bloqueo ya no vale
+    tracker.attendance_data['9']['transfer_day'] -= 1
+    assert tracker.can_receive_daily_attendance(9)
@@ -0,0 +1,38 @@
+import boot_timing
+import launcher
+from boot_timing import BootTimings
+
+
+def test_each_phase_is_measured_once_from_the_previous_one(monkeypatch, capsys):
+    clock = iter([10.0, 11.5, 12.0, 15.0])
+    monkeypatch.setattr(boot_timing.time, "perf_counter", lambda: next(clock))
+    timings = BootTimings()
+    timings.mark('imports')
+    timings.mark('login')
+    timings.mark('imports')
+    timings.mark('state')
+
+    timings.report()
+    timings.report()
+    timings.mark('command_sync')
+
+    assert timings.phases == [('imports', 1.5), ('login', 0.5), ('state', 3.0)]
+    assert capsys.readouterr().out == "⏱️ Arranque en 5.00s: imports 1.50s, conexión 0.50s, datos 3.00s\n"
+
+
+def test_dependency_check_is_skipped_while_the_stamp_matches(tmp_path, monkeypatch):
+    monkeypatch.setattr(launcher, "STAMP_FILE", str(tmp_path / ".deps_stamp.json"))
+    requirements = tmp_path / "requirements.txt"
+    requirements.write_text("discord.py\n", encoding='utf-8')
+    monkeypatch.setattr(launcher, "REQUIREMENTS_FILE", str(requirements))
+    checks = []
+    monkeypatch.setattr(launcher, "missing_modules", lambda: checks.append(1) or [])
+
+    assert launcher.ensure_dependencies()
+    assert launcher.ensure_dependencies()
+    assert len(checks) == 1
+
+    # Cambiar requirements.txt invalida el sello
+    requirements.write_text("discord.py\npytz\n", encoding='utf-8')
+    assert launcher.ensure_dependencies()
+    assert len(checks) == 2
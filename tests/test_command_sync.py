@@ -0,0 +1,52 @@
+import asyncio
+from types import SimpleNamespace
+
+from command_sync import CommandSyncState, scope_key
+
+
+class FakeCommand:
+    def __init__(self, name, description="..."):
+        self.name = name
+        self.description = description
+
+    def to_dict(self, tree):
+        return {'name': self.name, 'description': self.description, 'type': 1}
+
+
+class FakeTree:
+    def __init__(self, commands):
+        self.commands = commands
+        self.client = SimpleNamespace(application_id=99)
+        self.synced = []
+
+    def get_commands(self, guild=None):
+        return list(self.commands)
+
+    async def sync(self, guild=None):
+        self.synced.append(guild)
+        return list(self.commands)
+
+
+def test_unchanged_trees_are_not_synced_again(tmp_path):
+    state_file = str(tmp_path / "command_sync.json")
+    tree = FakeTree([FakeCommand("tiempo"), FakeCommand("pausar")])
+
+    assert asyncio.run(CommandSyncState(state_file).sync(tree)) is not None
+    # Otro proceso con el mismo estado guardado (y otro orden de registro)
+    tree.commands.reverse()
+    assert asyncio.run(CommandSyncState(state_file).sync(tree)) is None
+
+    tree.commands[0].description = "cambiada"
+    assert asyncio.run(CommandSyncState(state_file).sync(tree)) is not None
+    assert asyncio.run(CommandSyncState(state_file).sync(tree, force=True)) is not None
+    assert len(tree.synced) == 3
+
+
+def test_each_scope_has_its_own_hash(tmp_path):
+    state = CommandSyncState(str(tmp_path / "command_sync.json"))
+    tree = FakeTree([FakeCommand("tiempo")])
+    server = SimpleNamespace(id=5)
+
+    asyncio.run(state.sync(tree))
+    assert asyncio.run(state.sync(tree, guild=server)) is not None
+    assert set(state.hashes) == {scope_key(99), scope_key(99, server)} == {"99:global", "99:guild_5"}
@@ -0,0 +1,37 @@
+from credit_ledger import CreditLedger
+
+
+def test_balances_survive_a_reload(tmp_path):
+    path = str(tmp_path / "credits.jsonl")
+    ledger = CreditLedger(path)
+    ledger.earn(1, "ana", 3, 3600, 'normal')
+    ledger.earn(1, "Ana", 2, 7200, 'normal')
+    ledger.earn(2, "beto", 5, 3600, 'gold')
+    ledger.earn(3, "caro", 0, 3600, 'normal')
+    assert ledger.mark_paid(2, "admin") == 5
+    assert ledger.mark_paid(2, "admin") == 0
+
+    reloaded = CreditLedger(path)
+    assert reloaded.balance(1) == {'name': 'Ana', 'earned': 5, 'paid': 0, 'owed': 5}
+    assert reloaded.owed(2) == 0
+    assert reloaded.balance(3) is None
+    assert reloaded.owed_report() == [{'user_id': '1', 'name': 'Ana', 'owed': 5}]
+
+
+def test_owed_report_is_sorted_by_balance_then_name(tmp_path):
+    ledger = CreditLedger(str(tmp_path / "credits.jsonl"))
+    ledger.earn(1, "beto", 3, 3600, 'normal')
+    ledger.earn(2, "Ana", 3, 3600, 'normal')
+    ledger.earn(3, "caro", 10, 7200, 'gold')
+
+    assert [row['user_id'] for row in ledger.owed_report()] == ['3', '2', '1']
+
+
+def test_milestone_credits_reach_the_ledger_once(tracker):
+    tracker.start_tracking(1, "ana", 7200)
+    assert tracker.mark_milestone(1, 3600, credits=3).action == 'milestone'
+    assert tracker.mark_milestone(1, 3600, credits=3).action == 'already_notified'
+    tracker.mark_milestone(1, 7200, completed=True, credits=2)
+
+    assert tracker.credits.balance(1) == {'name': 'ana', 'earned': 5, 'paid': 0, 'owed': 5}
+    assert tracker.get_rollup('day')['users']['1']['credits'] == 5
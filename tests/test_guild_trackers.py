@@ -0,0 +1,58 @@
+import asyncio
+import os
+
+import pytest
+
+from time_tracker import GuildTrackers
+
+
+@pytest.fixture
+def trackers(tmp_path, monkeypatch):
+    # El servidor principal guarda en user_times.json del directorio actual
+    monkeypatch.chdir(tmp_path)
+    trackers = GuildTrackers(data_dir="guild_data", state_file="guild_partitions.json")
+    yield trackers
+    for _, tracker in trackers.loaded():
+        assert tracker.writer.barrier().result(5)
+
+
+def test_each_guild_has_its_own_partition(trackers):
+    trackers.adopt_primary(111)
+    primary = trackers.for_guild(111)
+    other = trackers.for_guild(222)
+    primary.start_tracking(1, "ana", 3600)
+
+    assert trackers.for_guild(None) is primary
+    assert other is not primary
+    assert '1' not in other.data
+    assert primary.data_file == "user_times.json"
+    assert other.data_file == os.path.join("guild_data", "guild_222", "user_times.json")
+    assert trackers.known_guild_ids() == [111, 222]
+
+
+def test_data_loaded_before_the_primary_is_known_becomes_its_partition(trackers):
+    early = trackers.for_guild(None)
+    trackers.adopt_primary(111)
+    trackers.adopt_primary(222)
+
+    assert trackers.primary_guild_id == 111
+    assert trackers.for_guild(111) is early
+    assert GuildTrackers(data_dir="guild_data", state_file="guild_partitions.json").primary_guild_id == 111
+
+
+def test_not_ready_until_preload_finishes(trackers):
+    trackers.adopt_primary(111)
+    trackers.for_guild(222)
+    # Un arranque nuevo: las particiones están en disco pero no en memoria
+    trackers = GuildTrackers(data_dir="guild_data", state_file="guild_partitions.json")
+    assert trackers.loaded() == []
+
+    async def scenario():
+        assert not trackers.is_ready()
+        assert not await trackers.wait_ready(timeout=0.01)
+        waiter = asyncio.create_task(trackers.wait_ready(timeout=5, guild=333))
+        await trackers.preload()
+        return trackers.is_ready(), await waiter
+
+    assert asyncio.run(scenario()) == (True, True)
+    assert sorted(guild_id for guild_id, _ in trackers.loaded()) == [111, 222, 333]
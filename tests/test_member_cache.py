@@ -0,0 +1,81 @@
+import asyncio
+from types import SimpleNamespace
+
+import discord
+
+import member_cache
+from member_cache import MemberMissCache, client_options, warm_members
+
+
+class FakeGuild:
+    """Servidor con caché de miembros y una API que solo conoce a known"""
+
+    def __init__(self, cached, known):
+        self.id = 1
+        self.name = "servidor"
+        self.cached = dict(cached)
+        self.known = known
+        self.fetched = []
+        self.queried = []
+
+    def get_member(self, user_id):
+        return self.cached.get(user_id)
+
+    async def fetch_member(self, user_id):
+        self.fetched.append(user_id)
+        if user_id not in self.known:
+            raise discord.NotFound(SimpleNamespace(status=404, reason="Not Found"), "Unknown Member")
+        return self.known[user_id]
+
+    async def query_members(self, user_ids, limit, cache):
+        self.queried.append(list(user_ids))
+        found = [self.known[user_id] for user_id in user_ids if user_id in self.known]
+        for found_member in found:
+            self.cached[found_member.id] = found_member
+        return found
+
+
+def test_missing_members_are_not_fetched_again():
+    cache = MemberMissCache()
+    ana = SimpleNamespace(id=2)
+    guild = FakeGuild({}, {2: ana})
+
+    async def scenario():
+        return [await cache.get_or_fetch(guild, 3), await cache.get_or_fetch(guild, 3),
+                await cache.get_or_fetch(guild, 2)]
+
+    assert asyncio.run(scenario()) == [None, None, ana]
+    assert guild.fetched == [3, 2]
+    assert (cache.fetches, cache.skipped) == (2, 1)
+
+
+def test_misses_expire_and_stay_bounded(monkeypatch):
+    now = [100.0]
+    monkeypatch.setattr(member_cache.time, "monotonic", lambda: now[0])
+    cache = MemberMissCache(ttl_seconds=10, max_entries=2)
+    cache.add(1, 1)
+    cache.add(1, 2)
+    cache.add(1, 3)
+    assert len(cache) == 2
+    assert not cache.is_missing(1, 1)
+    assert cache.is_missing(1, 3)
+
+    now[0] += 11
+    assert not cache.is_missing(1, 3)
+
+
+def test_warm_members_queries_only_uncached_ids_in_batches():
+    known = {user_id: SimpleNamespace(id=user_id) for user_id in range(250)}
+    guild = FakeGuild({0: known[0]}, known)
+
+    loaded = asyncio.run(warm_members(guild, range(250)))
+    assert len(loaded) == 249
+    assert [len(batch) for batch in guild.queried] == [100, 100, 49]
+
+
+def test_lean_profile_disables_message_caches():
+    options = client_options({'mode': 'lean'}, discord.Intents.default())
+    assert not options['intents'].messages
+    assert options['max_messages'] is None
+    assert options['member_cache_flags'].voice
+    assert client_options({}, discord.Intents.default()).keys() == {'intents'}
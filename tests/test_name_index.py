@@ -0,0 +1,27 @@
+def names(results):
+    return sorted(name for _, name in results)
+
+
+def test_search_matches_any_word_prefix_and_filters_by_state(tracker):
+    tracker.start_tracking(1, "Ana María", 3600)
+    tracker.start_tracking(2, "mario_bros", 3600)
+    tracker.start_tracking(3, "Beto", 3600)
+    tracker.pause_tracking(2, "normal", 3)
+
+    assert names(tracker.search_users("mar")) == ["Ana María", "mario_bros"]
+    assert names(tracker.search_users("BROS")) == ["mario_bros"]
+    assert names(tracker.search_users("mar", state="active")) == ["Ana María"]
+    assert names(tracker.search_users("mar", state="paused")) == ["mario_bros"]
+    assert tracker.search_users("zz") == []
+    assert len(tracker.search_users("", limit=2)) == 2
+
+
+def test_renamed_and_cancelled_users_leave_the_index(tracker):
+    tracker.start_tracking(1, "Ana", 3600)
+    tracker.stop_tracking(1)
+    tracker.start_tracking(1, "Zoe", 3600)
+    tracker.start_tracking(2, "Anabel", 3600)
+    tracker.cancel_user_tracking(2)
+
+    assert tracker.search_users("an") == []
+    assert tracker.search_users("zo") == [('1', "Zoe")]
@@ -0,0 +1,49 @@
+import os
+import time
+
+from time_tracker import TimeTracker
+
+
+def wait_for(path, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while not os.path.exists(path) and time.monotonic() < deadline:
+        time.sleep(0.01)
+
+
+def test_reset_closes_the_period_without_touching_records(tracker):
+    tracker.start_tracking(1, "ana", 7200)
+    tracker.add_minutes(1, "ana", 30)
+    tracker.stop_tracking(1)
+    record = tracker.data['1']
+
+    assert tracker.reset_all_user_times() == 1
+    # Las lecturas ven el registro reiniciado, pero no lo modifican
+    assert tracker.get_total_time(1) == 0
+    assert tracker.get_user_data(1)['total_time'] == 0
+    assert tracker.data['1'] is record
+    assert record['total_time'] >= 1800
+
+    # La primera modificación reinicia el registro
+    tracker.add_minutes(1, "ana", 5)
+    assert tracker.get_total_time(1) == 300
+    assert tracker.data['1']['period'] == tracker.period
+
+
+def test_closed_period_keeps_its_snapshot_and_survives_a_reload(writer, tracker):
+    tracker.start_tracking(1, "ana", 7200)
+    tracker.add_minutes(1, "ana", 30)
+    tracker.stop_tracking(1)
+    tracker.start_tracking(2, "beto", 7200)
+    tracker.reset_all_user_times()
+
+    entry, = tracker.period_history
+    wait_for(entry['snapshot'])
+    users = tracker.get_period_users(entry['period'])
+    assert users['1']['total_time'] >= 1800
+    assert users['2']['is_active']
+
+    assert writer.barrier().result(5)
+    reloaded = TimeTracker(tracker.data_file, tracker.attendance_file, writer=writer)
+    assert reloaded.period == tracker.period
+    assert reloaded.get_total_time(1) == 0
+    assert not reloaded.get_user_data(2)['is_active']
@@ -0,0 +1,106 @@
+import json
+
+import pytest
+
+from persistence import JsonStoreWriter, iter_json_object
+
+
+def read(path):
+    with open(path, encoding='utf-8') as f:
+        return json.load(f)
+
+
+def test_put_record_updates_only_that_key(tmp_path, writer):
+    path = str(tmp_path / "data.json")
+    writer.register(path, {'1': {'total_time': 10}, '2': {'total_time': 20}})
+    writer.put_record(path, '2', {'total_time': 25})
+    writer.put_record(path, '3', {'total_time': 1})
+    writer.put_record(path, '1', None)
+    assert writer.barrier().result(5)
+
+    assert read(path) == {'2': {'total_time': 25}, '3': {'total_time': 1}}
+
+
+def test_put_record_copies_the_record_when_called(tmp_path, writer):
+    path = str(tmp_path / "data.json")
+    writer.register(path, {})
+    record = {'total_time': 10}
+    writer.put_record(path, '1', record)
+    record['total_time'] = 99
+    assert writer.barrier().result(5)
+
+    assert read(path) == {'1': {'total_time': 10}}
+
+
+def test_register_only_writes_when_asked(tmp_path, writer):
+    kept = tmp_path / "kept.json"
+    kept.write_text('{"old": 1}', encoding='utf-8')
+    writer.register(str(kept), {'new': 1})
+    rewritten = str(tmp_path / "rewritten.json")
+    writer.register(rewritten, {'new': 1}, rewrite=True)
+    assert writer.barrier().result(5)
+
+    assert read(kept) == {'old': 1}
+    assert read(rewritten) == {'new': 1}
+
+
+def test_replace_then_records_apply_in_order(tmp_path, writer):
+    path = str(tmp_path / "data.json")
+    writer.register(path, {'1': {'total_time': 10}})
+    writer.replace(path, {})
+    writer.put_record(path, '2', {'total_time': 5})
+    assert writer.barrier().result(5)
+
+    assert read(path) == {'2': {'total_time': 5}}
+    assert writer.stats()['failures'] == 0
+
+
+def test_close_flushes_pending_changes(tmp_path):
+    path = str(tmp_path / "data.json")
+    writer = JsonStoreWriter("test-close")
+    writer.register(path, {})
+    writer.put_record(path, '1', {'total_time': 1})
+    writer.close()
+
+    assert read(path) == {'1': {'total_time': 1}}
+
+
+DOCUMENT = {
+    '1': {'name': 'Ána 😀', 'total_time': 3600.25, 'sessions': [{'duration': 12}, {'duration': 1e3}]},
+    '22': {'name': 'beto', 'total_time': 123456789, 'is_active': True, 'pause_start': None},
+    'vacío': {},
+    '333': -0.5,
+}
+
+
+@pytest.mark.parametrize('chunk_size', [1, 2, 3, 7, 64, 1 << 20])
+def test_iter_json_object_round_trips_any_chunk_size(tmp_path, chunk_size):
+    path = tmp_path / "data.json"
+    path.write_text(json.dumps(DOCUMENT, indent=2, ensure_ascii=False), encoding='utf-8')
+
+    assert list(iter_json_object(str(path), chunk_size)) == list(DOCUMENT.items())
+
+
+def test_iter_json_object_keeps_numbers_split_across_chunks(tmp_path):
+    path = tmp_path / "data.json"
+    path.write_text('{"a":1234567,"b":89}', encoding='utf-8')
+
+    for chunk_size in range(1, 12):
+        assert dict(iter_json_object(str(path), chunk_size)) == {'a': 1234567, 'b': 89}
+
+
+@pytest.mark.parametrize('content', ['', '  \n', '{}', ' { \n } '])
+def test_iter_json_object_empty_documents(tmp_path, content):
+    path = tmp_path / "data.json"
+    path.write_text(content, encoding='utf-8')
+
+    assert list(iter_json_object(str(path))) == []
+
+
+@pytest.mark.parametrize('content', ['[1, 2]', '{"a" 1}', '{"a": 1 "b": 2}', '{1: 2}', '{"a": tru'])
+def test_iter_json_object_rejects_invalid_documents(tmp_path, content):
+    path = tmp_path / "data.json"
+    path.write_text(content, encoding='utf-8')
+
+    with pytest.raises(ValueError):
+        list(iter_json_object(str(path), chunk_size=4))
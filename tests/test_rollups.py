@@ -0,0 +1,105 @@
+import asyncio
+import json
+from datetime import date, datetime, timedelta
+
+import pytest
+
+from rollups import RebuildSources, Rollups, day_key, week_key
+
+
+def work(tracker, user_id, seconds):
+    """Simular que el tramo en curso empezó hace `seconds` segundos"""
+    tracker.data[str(user_id)]['last_start'] = (datetime.now() - timedelta(seconds=seconds)).isoformat()
+
+
+def paused_for(tracker, user_id, seconds):
+    """Simular que la pausa en curso empezó hace `seconds` segundos"""
+    tracker.data[str(user_id)]['pause_start'] = (datetime.now() - timedelta(seconds=seconds)).isoformat()
+
+
+def test_record_persists_one_key_per_user_and_tier(tmp_path, writer):
+    path = str(tmp_path / "rollups.json")
+    rollups = Rollups(path, writer)
+    when = datetime(2026, 10, 14, 12, 0)
+    rollups.record(1, 'gold', when=when, seconds=600, sessions=1)
+    rollups.record(2, 'gold', when=when, seconds=300, sessions=1)
+    assert writer.barrier().result(5)
+
+    with open(path, encoding='utf-8') as f:
+        stored = json.load(f)
+    day = day_key(when.date())
+    assert set(stored) == {f"{day}|user:1", f"{day}|user:2", f"{day}|tier:gold",
+                           "week:2026-10-12|user:1", "week:2026-10-12|user:2", "week:2026-10-12|tier:gold"}
+    assert stored[f"{day}|tier:gold"]['seconds'] == 900
+
+    reloaded = Rollups(path, writer)
+    assert reloaded.rows == rollups.rows
+    assert reloaded.week(date(2026, 10, 18))['tiers']['gold']['sessions'] == 2
+
+
+def test_legacy_whole_rows_are_rewritten_flat(tmp_path, writer):
+    path = tmp_path / "rollups.json"
+    row = {'users': {'1': {'seconds': 60, 'sessions': 1, 'tier': 'normal'}},
+           'tiers': {'normal': {'seconds': 60, 'sessions': 1}}}
+    path.write_text(json.dumps({"day:2026-10-14": row}), encoding='utf-8')
+
+    rollups = Rollups(str(path), writer)
+    assert rollups.day(date(2026, 10, 14)) == row
+    assert writer.barrier().result(5)
+    assert set(json.loads(path.read_text(encoding='utf-8'))) == {"day:2026-10-14|user:1",
+                                                                 "day:2026-10-14|tier:normal"}
+
+
+def test_resume_records_the_real_pause_duration(tracker):
+    tracker.start_tracking(1, "ana", 7200)
+    work(tracker, 1, 600)
+    tracker.pause_tracking(1, "normal", 3)
+    paused_for(tracker, 1, 120)
+    tracker.resume_tracking(1)
+
+    counters = tracker.get_rollup('day')['users']['1']
+    assert counters['pauses'] == 1
+    assert counters['paused_seconds'] == pytest.approx(120, abs=1)
+    assert counters['seconds'] == pytest.approx(600, abs=1)
+
+
+def test_rebuild_recomputes_history_and_keeps_pauses(tracker):
+    tracker.start_tracking(1, "ana", 7200)
+    work(tracker, 1, 600)
+    tracker.pause_tracking(1, "normal", 3)
+    paused_for(tracker, 1, 90)
+    tracker.resume_tracking(1)
+    work(tracker, 1, 300)
+    tracker.stop_tracking(1)
+    before = tracker.get_rollup('week')['users']['1']
+
+    # Filas sin tiempo (como las de días anteriores a los resúmenes): el historial lo repone
+    for row in tracker.rollups.rows.values():
+        for counters in list(row['users'].values()) + list(row['tiers'].values()):
+            counters['seconds'] = counters['sessions'] = 0
+
+    asyncio.run(tracker.rebuild_rollups())
+
+    after = tracker.get_rollup('week')['users']['1']
+    assert after['sessions'] == 2
+    assert after['seconds'] == pytest.approx(tracker.get_total_time(1))
+    assert after['pauses'] == before['pauses'] == 1
+    assert after['paused_seconds'] == pytest.approx(before['paused_seconds'])
+
+
+def test_events_during_rebuild_are_added_again(tmp_path, writer):
+    archive = tmp_path / "sessions.jsonl"
+    end = datetime(2026, 10, 14, 12, 0)
+    archive.write_text(json.dumps({'user_id': '1', 'session': {
+        'start': (end - timedelta(seconds=600)).isoformat(), 'end': end.isoformat(), 'duration': 600}}) + "\n",
+        encoding='utf-8')
+    rollups = Rollups(str(tmp_path / "rollups.json"), writer)
+
+    sources = rollups.begin_rebuild(RebuildSources([], str(archive), str(tmp_path / "credits.jsonl"), {'1': 'gold'}))
+    rebuilt = Rollups.build(sources)
+    rollups.record(1, 'gold', when=end, seconds=60, sessions=1, pauses=1)
+    rollups.finish_rebuild(rebuilt)
+
+    counters = rollups.rows[week_key(end.date())]['users']['1']
+    assert (counters['seconds'], counters['sessions'], counters['pauses']) == (660, 2, 1)
+    assert rollups.rows[day_key(end.date())]['tiers']['gold']['seconds'] == 660
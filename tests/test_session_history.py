@@ -0,0 +1,93 @@
+import json
+from datetime import datetime, timedelta
+
+import pytest
+
+from time_tracker import TimeTracker
+
+
+def work(tracker, user_id, seconds):
+    """Simular que el tramo en curso empezó hace `seconds` segundos"""
+    record = tracker.data[str(user_id)]
+    record['last_start'] = (datetime.now() - timedelta(seconds=seconds)).isoformat()
+
+
+def test_pause_resume_stop_sessions_add_up_to_total_time(tracker):
+    tracker.start_tracking(1, "ana", 7200)
+    work(tracker, 1, 600)
+    assert tracker.pause_tracking(1, "normal", 3).action == 'paused'
+    assert tracker.resume_tracking(1).action == 'resumed'
+    work(tracker, 1, 300)
+    assert tracker.stop_tracking(1).action == 'stopped'
+
+    stats = tracker.get_session_stats(1)
+    assert stats['count'] == 2
+    assert stats['total'] == pytest.approx(tracker.get_total_time(1))
+    assert stats['longest']['duration'] == pytest.approx(600, abs=1)
+
+    reasons = [session['end_reason'] for session in tracker.sessions.iter_sessions(1)]
+    assert reasons == ['pause', 'stop']
+
+
+def test_unlimited_pauses_are_archived(tracker):
+    tracker.start_tracking(2, "beto", 7200)
+    work(tracker, 2, 120)
+    tracker.pause_tracking(2, "gold", None)
+    tracker.resume_tracking(2)
+    work(tracker, 2, 60)
+    tracker.pause_tracking(2, "gold", None)
+
+    assert tracker.get_session_stats(2)['total'] == pytest.approx(tracker.get_total_time(2))
+
+
+def test_keep_hours_cancel_archives_the_open_segment(tracker):
+    tracker.start_tracking(3, "caro", 7200)
+    work(tracker, 3, 3900)
+    result = tracker.cancel_user_tracking_keep_hours(3)
+
+    assert result.total_after == 3600
+    sessions = list(tracker.sessions.iter_sessions(3))
+    assert [session['end_reason'] for session in sessions] == ['cancel']
+    assert sessions[0]['duration'] == pytest.approx(3900, abs=1)
+
+
+def test_finish_time_limit_archives_the_final_segment(tracker):
+    tracker.start_tracking(4, "dani", 3600)
+    work(tracker, 4, 1800)
+    tracker.pause_tracking(4, "normal", 3)
+    tracker.resume_tracking(4)
+    work(tracker, 4, 1900)
+
+    assert tracker.finish_time_limit(4, 3600).action == 'limit_finished'
+    stats = tracker.get_session_stats(4)
+    assert stats['count'] == 2
+    assert stats['total'] == pytest.approx(tracker.get_total_time(4))
+
+
+def test_auto_cancel_archives_the_lost_segment(tracker):
+    tracker.start_tracking(5, "eli", 7200)
+    for seconds in (100, 100):
+        work(tracker, 5, seconds)
+        tracker.pause_tracking(5, "normal", 3)
+        tracker.resume_tracking(5)
+    work(tracker, 5, 50)
+    result = tracker.pause_tracking(5, "normal", 3)
+
+    assert result.action == 'auto_cancelled'
+    assert result.time_lost == pytest.approx(50, abs=1)
+    reasons = [session['end_reason'] for session in tracker.sessions.iter_sessions(5)]
+    assert reasons == ['pause', 'pause', 'auto_cancel']
+
+
+def test_old_data_file_sessions_move_to_the_archive(tmp_path, writer):
+    data_file = tmp_path / "user_times.json"
+    sessions = [{'start': '2026-10-01T10:00:00', 'end': '2026-10-01T11:00:00', 'duration': 3600}]
+    data_file.write_text(json.dumps({'7': {'name': 'eli', 'total_time': 3600, 'sessions': sessions}}),
+                         encoding='utf-8')
+
+    tracker = TimeTracker(str(data_file), str(tmp_path / "attendance_data.json"), writer=writer)
+    assert 'sessions' not in tracker.data['7']
+    assert list(tracker.sessions.iter_sessions(7)) == [{'user_id': '7', **sessions[0]}]
+
+    assert writer.barrier().result(5)
+    assert 'sessions' not in json.loads(data_file.read_text(encoding='utf-8'))['7']
@@ -0,0 +1,94 @@
+import random
+from datetime import datetime, timedelta
+
+import pytest
+
+from session_archive import SessionArchive, SessionIndex
+
+BASE = datetime(2026, 10, 1)
+
+
+def session(end_offset, duration):
+    end = BASE + timedelta(seconds=end_offset)
+    return {'start': (end - timedelta(seconds=duration)).isoformat(), 'end': end.isoformat(), 'duration': duration}
+
+
+def brute_force(rows, since, until):
+    """(fin, duración) de las sesiones en [since, until)"""
+    return [(end, duration) for end, duration in rows
+            if (since is None or end >= since) and (until is None or end < until)]
+
+
+@pytest.mark.parametrize('seed', range(5))
+def test_stats_match_brute_force(seed):
+    rng = random.Random(seed)
+    index = SessionIndex()
+    rows = []
+    offset = 0
+    for _ in range(rng.randint(1, 70)):
+        offset += rng.randint(0, 500)
+        duration = rng.randint(0, 4000)
+        index.add(1, session(offset, duration))
+        rows.append(((BASE + timedelta(seconds=offset)).timestamp(), duration))
+
+    ends = [end for end, _ in rows]
+    for _ in range(100):
+        since = rng.choice([None, rng.uniform(ends[0] - 10, ends[-1] + 10)])
+        until = rng.choice([None, rng.uniform(ends[0] - 10, ends[-1] + 10)])
+        expected = brute_force(rows, since, until)
+        stats = index.stats(1, since, until)
+
+        assert stats['count'] == len(expected)
+        assert stats['total'] == pytest.approx(sum(duration for _, duration in expected))
+        if expected:
+            assert stats['longest']['duration'] == max(duration for _, duration in expected)
+        else:
+            assert stats['longest'] is None
+
+
+def test_out_of_order_sessions_are_indexed_by_end():
+    index = SessionIndex()
+    index.add(1, session(300, 30))
+    index.add(1, session(100, 10))
+    index.add(1, session(200, 50))
+
+    assert [row['duration'] for row in index.sessions(1)] == [30, 50, 10]
+    assert index.stats(1)['longest']['duration'] == 50
+    since = (BASE + timedelta(seconds=150)).timestamp()
+    assert index.stats(1, since=since)['total'] == 80
+
+
+def test_sessions_are_paginated_newest_first():
+    index = SessionIndex()
+    for i in range(25):
+        index.add(1, session(i * 60, i))
+
+    assert [row['duration'] for row in index.sessions(1, limit=10)] == list(range(24, 14, -1))
+    assert [row['duration'] for row in index.sessions(1, offset=20, limit=10)] == list(range(4, -1, -1))
+    assert index.sessions(1, offset=30) == []
+    assert index.sessions(2) == []
+
+
+def test_index_covers_closed_periods_and_later_appends(tmp_path):
+    closed = SessionArchive(str(tmp_path / "closed.jsonl"))
+    closed.append(1, session(0, 100))
+    closed.sync()
+    archive = SessionArchive(str(tmp_path / "sessions.jsonl"))
+    archive.append(1, session(60, 200))
+
+    index = archive.load_index([closed.path])
+    archive.append(1, session(120, 300))
+
+    assert index.stats(1) == {'count': 3, 'total': 600,
+                              'longest': index.sessions(1, limit=1)[0]}
+
+
+def test_iter_sessions_skips_lines_before_a_reset(tmp_path):
+    archive = SessionArchive(str(tmp_path / "sessions.jsonl"))
+    archive.append(1, session(0, 10))
+    archive.append(2, session(10, 20))
+    archive.reset_user(1)
+    archive.append(1, session(20, 30))
+
+    assert [row['duration'] for row in archive.iter_sessions(1)] == [30]
+    assert [row['duration'] for row in archive.iter_sessions()] == [20, 30]
@@ -0,0 +1,53 @@
+from types import SimpleNamespace
+
+import shard_metrics
+from shard_metrics import ShardMetrics, ShardMetricsMixin, shard_for_event
+
+
+def test_shard_for_event_reads_the_guild_of_the_arguments():
+    assert shard_for_event((SimpleNamespace(shard_id=2),), 4) == 2
+    assert shard_for_event(("texto", SimpleNamespace(guild=SimpleNamespace(shard_id=3))), 4) == 3
+    guild_id = (7 << 22) | 123
+    assert shard_for_event((SimpleNamespace(guild_id=guild_id),), 4) == 7 % 4
+    assert shard_for_event((SimpleNamespace(),), None) == 0
+
+
+def test_events_per_minute_use_the_recent_window(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(shard_metrics.time, "monotonic", lambda: now[0])
+    metrics = ShardMetrics(window_seconds=60)
+    for _ in range(30):
+        metrics.record_event(0)
+    now[0] += 30
+    for _ in range(30):
+        metrics.record_event(0)
+    assert metrics.events_per_minute(0) == 60
+
+    now[0] += 45
+    assert metrics.events_per_minute(0) == 30
+    assert metrics.events_per_minute(1) == 0
+
+
+def test_mixin_counts_lifecycle_and_dispatched_events():
+    class Base:
+        def dispatch(self, event_name, *args, **kwargs):
+            self.dispatched.append(event_name)
+
+    class Bot(ShardMetricsMixin, Base):
+        shard_count = 2
+
+        def __init__(self):
+            self.shard_metrics = ShardMetrics()
+            self.dispatched = []
+
+    bot = Bot()
+    bot.dispatch('shard_connect', 1)
+    bot.dispatch('shard_resumed', 1)
+    bot.dispatch('voice_state_update', SimpleNamespace(guild=SimpleNamespace(shard_id=1)))
+    bot.dispatch('socket_raw_receive', "{}")
+
+    row, = bot.shard_metrics.report([(1, 0.05)], {1: 10})
+    assert (row['connects'], row['resumes'], row['total_events'], row['guilds']) == (1, 1, 1, 10)
+    assert row['latency_ms'] == 50
+    assert bot.shard_metrics.report([(0, float('inf'))], {})[0]['latency_ms'] is None
+    assert len(bot.dispatched) == 4
@@ -0,0 +1,55 @@
+from types import SimpleNamespace
+
+from tier_index import TierMembershipIndex
+from tier_rules import TierRules
+
+GOLD_ROLE = SimpleNamespace(id=10, name="Gold", members=[])
+OTHER_ROLE = SimpleNamespace(id=20, name="Otro", members=[])
+
+
+def member(member_id, *roles, guild_id=1):
+    return SimpleNamespace(id=member_id, roles=list(roles), guild=SimpleNamespace(id=guild_id))
+
+
+def guild(members, guild_id=1):
+    gold = SimpleNamespace(id=GOLD_ROLE.id, name=GOLD_ROLE.name,
+                           members=[m for m in members if GOLD_ROLE in m.roles])
+    cached = {m.id: m for m in members}
+    return SimpleNamespace(id=guild_id, roles=[gold, OTHER_ROLE], get_member=cached.get)
+
+
+def rules():
+    return TierRules([{'name': 'gold', 'role_ids': [10], 'max_hours': 2},
+                      {'name': 'normal', 'max_hours': 1}])
+
+
+def test_seed_and_events_keep_the_index_current():
+    ana, beto = member(1, GOLD_ROLE), member(2, OTHER_ROLE)
+    index = TierMembershipIndex(rules())
+    server = guild([ana, beto])
+
+    assert index.tier_members(server, 'gold') == {1}
+    index.update_member(beto, member(2, OTHER_ROLE, GOLD_ROLE))
+    index.add_member(member(3, GOLD_ROLE))
+    index.update_member(ana, member(1))
+    assert index.tier_members(server, 'gold') == {2, 3}
+
+    index.remove_member(1, 3)
+    assert index.get(1) == {2: 'gold'}
+    index.forget_guild(1)
+    assert not index.is_seeded(1)
+    assert index.unchecked(server, [1, 2]) == []
+
+
+def test_partial_seeds_resolve_members_from_the_cache():
+    ana = member(1, GOLD_ROLE)
+    # beto es Gold pero no estaba en caché al sembrar
+    beto = member(2, GOLD_ROLE)
+    index = TierMembershipIndex(rules(), partial_seeds=True)
+    server = guild([ana])
+
+    assert index.unchecked(server, [1, 2, 3]) == [2, 3]
+    server.get_member = {1: ana, 2: beto}.get
+    assert index.resolve_cached(server, [1, 2, 3]) == [3]
+    assert index.tier_members(server, 'gold') == {1, 2}
+    assert index.unchecked(server, [1, 2, 3]) == [3]
@@ -0,0 +1,86 @@
+from types import SimpleNamespace
+
+import pytest
+
+from tier_rules import DEFAULT_TIERS, TierRules
+
+HOUR = 3600
+
+
+def role(role_id, name="rol"):
+    return SimpleNamespace(id=role_id, name=name)
+
+
+def member(*roles):
+    return SimpleNamespace(roles=list(roles))
+
+
+@pytest.fixture
+def rules():
+    return TierRules([
+        {'name': 'gold', 'role_ids': [10], 'role_name_contains': 'gold', 'max_hours': 2,
+         'milestone_hours': [1, 2], 'credits': {'1': 5, '2': 10}, 'max_pauses': None},
+        {'name': 'plata', 'role_ids': [20], 'max_hours': 1.5, 'milestone_hours': [0.5, 1.5],
+         'credits': {'0.5': 1, '1.5': 4}},
+        {'name': 'normal', 'max_hours': 1, 'credits': {'1': 3}},
+    ])
+
+
+@pytest.mark.parametrize('seconds, credits', [(0, 0), (HOUR - 1, 0), (HOUR, 5), (1.5 * HOUR, 5), (2 * HOUR, 10),
+                                              (10 * HOUR, 10)])
+def test_credits_for_uses_the_highest_threshold_reached(rules, seconds, credits):
+    assert rules.tier('gold').credits_for(seconds) == credits
+
+
+def test_due_milestones_skip_the_notified_ones(rules):
+    plata = rules.tier('plata')
+    assert plata.milestones == [1800, 5400]
+    assert plata.due_milestones(1799, []) == []
+    assert plata.due_milestones(6000, []) == [1800, 5400]
+    assert plata.due_milestones(6000, [1800]) == [5400]
+
+
+def test_milestone_credits_add_the_difference(rules):
+    gold = rules.tier('gold')
+    assert gold.milestone_credits(HOUR, []) == 5
+    assert gold.milestone_credits(2 * HOUR, [HOUR]) == 5
+    # Si se salta el primero, el segundo suma todo
+    assert gold.milestone_credits(2 * HOUR, []) == 10
+
+
+def test_defaults_for_missing_fields(rules):
+    normal = rules.tier('normal')
+    assert normal.milestones == [HOUR]
+    assert normal.max_pauses == 3
+    assert normal.label == 'Normal'
+    assert rules.tier('gold').max_pauses is None
+    assert rules.tier('desconocido') is rules.default is normal
+
+
+def test_tier_for_member_follows_priority(rules):
+    assert rules.tier_for_member(member(role(20), role(10))).name == 'gold'
+    assert rules.tier_for_member(member(role(99, "Socio GOLD"))).name == 'gold'
+    assert rules.tier_for_member(member(role(20))).name == 'plata'
+    assert rules.tier_for_member(member(role(99))).name == 'normal'
+    assert rules.tier_for_member(None).name == 'normal'
+    assert rules.is_tier_role(role(20))
+    assert not rules.is_tier_role(role(99))
+
+
+def test_evaluate(rules):
+    result = rules.evaluate('plata', 5400, notified=[1800])
+    assert result == {'tier': 'plata', 'credits': 4, 'finished': True, 'due_milestones': [5400]}
+    assert rules.evaluate_many([(1, 'normal', 60)])[1]['finished'] is False
+
+
+def test_from_config_without_tiers_uses_the_gold_role_id():
+    rules = TierRules.from_config({'gold_role_id': 42})
+    assert rules.tier_for_member(member(role(42))).name == 'gold'
+    # Los predeterminados no se modifican
+    assert 42 not in DEFAULT_TIERS[0]['role_ids']
+
+
+def test_from_config_with_invalid_tiers_falls_back(capsys):
+    rules = TierRules.from_config({'tiers': [{'name': 'roto'}]})
+    assert [tier.name for tier in rules.tiers] == ['gold', 'normal']
+    assert "Reglas de niveles inválidas" in capsys.readouterr().out
@@ -0,0 +1,47 @@
+import asyncio
+
+from tracker_worker import RemoteGuildTrackers, RemoteTracker, TrackerWorker, WorkerClient
+
+
+def test_replicas_load_lazily_and_follow_their_calls(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    socket_path = str(tmp_path / "w.sock")
+    worker = TrackerWorker(socket_path)
+
+    async def scenario():
+        server = await asyncio.start_unix_server(worker.handle_connection, path=socket_path)
+        try:
+            trackers = RemoteGuildTrackers(WorkerClient(socket_path))
+            # Pedida antes de conocer el servidor principal: pasa a ser la suya
+            early = trackers.for_guild(None)
+            await trackers.claim_primary(111)
+            assert trackers.for_guild(111) is early
+
+            await trackers.load_guilds([111, 222])
+            assert sorted(guild_id for guild_id, _ in trackers.loaded()) == [111, 222]
+
+            result = await early.call('start_tracking', 5, "ana", 3600)
+            assert result.ok and result.action == 'started'
+            assert early.data['5']['is_active']
+            assert '5' in worker.trackers.for_guild(111).data
+            assert '5' not in trackers.for_guild(222).data
+
+            assert await trackers.wait_ready(timeout=5, guild=333)
+            assert await early.flush()
+        finally:
+            server.close()
+            await server.wait_closed()
+
+    asyncio.run(scenario())
+
+
+def test_snapshot_keeps_newer_changes_that_arrived_while_loading():
+    replica = RemoteTracker(client=None, guild_id=1)
+    replica.apply_changes({'generation': 5, 'users': {'1': {'name': 'nuevo'}, '2': None},
+                           'versions': {'1': 5, '2': 5}})
+    replica.apply_snapshot({'data': {'1': {'name': 'viejo'}, '2': {'name': 'borrado'}, '3': {'name': 'otro'}},
+                            'versions': {'1': 3, '2': 3, '3': 3}, 'attendance': {}, 'generation': 4})
+
+    assert replica.data == {'1': {'name': 'nuevo'}, '3': {'name': 'otro'}}
+    assert replica.generation == 5
+    assert [user_id for user_id, _ in replica.search_users("o")] == ['3']
@@ -0,0 +1,28 @@
+import asyncio
+
+
+def test_calls_for_one_user_wait_for_its_lock_only(tracker):
+    async def scenario():
+        async with tracker.user_lock(1):
+            blocked = asyncio.create_task(tracker.call('start_tracking', 1, "ana", 3600))
+            other = await asyncio.wait_for(tracker.call('start_tracking', 2, "beto", 3600), 1)
+            await asyncio.sleep(0)
+            assert not blocked.done()
+        return other, await asyncio.wait_for(blocked, 1)
+
+    other, started = asyncio.run(scenario())
+    assert other.action == started.action == 'started'
+
+
+def test_call_many_saves_once_and_returns_each_result(tracker):
+    async def scenario():
+        return await tracker.call_many([('start_tracking', (2, "beto", 3600)),
+                                        ('start_tracking', (1, "ana", 3600)),
+                                        ('pause_tracking', (1, "normal", 3))])
+
+    generation = tracker.generation
+    results = asyncio.run(scenario())
+    assert [result.action for result in results] == ['started', 'started', 'paused']
+    assert tracker.generation == generation + 1
+    assert tracker.writer.barrier().result(5)
+    assert tracker.get_user_data(1)['is_paused']
@@ -0,0 +1,161 @@
+import json
+import os
+import random
+from datetime import datetime
+
+import discord
+import pytest
+
+import view_state
+from tier_rules import TierRules
+from view_state import (FILTER_CODES, RowRenderCache, SnapshotCache, ViewState, ViewStateRegistry, pack_pages,
+                        page_digest)
+
+CONFIG_PATH = os.path.join(os.path.dirname(os.path.dirname(__file__)), "config.json")
+
+
+def configured_tiers():
+    with open(CONFIG_PATH, encoding="utf-8") as f:
+        return TierRules.from_config(json.load(f)).tiers
+
+
+def round_trip(state):
+    return ViewState.from_token(state.kind, state.guild_id, state.generation, state.to_token())
+
+
+@pytest.mark.parametrize("tier", configured_tiers(), ids=lambda tier: tier.name)
+def test_every_configured_tier_round_trips(tier):
+    state = ViewState("pagos", 1, 0, filter_status=tier.name, search_term="ana", page=3)
+    decoded = round_trip(state)
+    assert decoded.filter_status == tier.name
+    assert decoded.search_term == "ana"
+    assert decoded.page == 3
+
+
+@pytest.mark.parametrize("filter_status", list(FILTER_CODES))
+def test_coded_filters_round_trip(filter_status):
+    state = ViewState("tiempos", 1, 0, filter_status=filter_status)
+    assert round_trip(state).filter_status == filter_status
+
+
+def test_named_filter_with_separator_round_trips():
+    state = ViewState("pagos", 1, 0, filter_status="nivel: plata ~", search_term="a:b")
+    decoded = round_trip(state)
+    assert decoded.filter_status == "nivel: plata ~"
+    assert decoded.search_term == "a:b"
+
+
+def test_long_search_is_trimmed_to_fit():
+    state = ViewState("pagos", 1, 0, filter_status="gold", search_term="ñ" * 100)
+    token = state.to_token(max_length=40)
+    assert len(token) <= 40
+    decoded = ViewState.from_token("pagos", 1, 0, token)
+    assert decoded.filter_status == "gold"
+    assert "ñ" * len(decoded.search_term) == decoded.search_term
+
+
+def test_legacy_tokens_still_decode():
+    assert ViewState.from_token("pagos", 1, 0, "2:g:").filter_status == "Gold"
+    assert ViewState.from_token("pagos", 1, 0, "0:r:").filter_status == "Reclutas (Sin Rol)"
+    assert ViewState.from_token("pagos", 1, 0, "x:?:").page == 0
+
+
+def test_views_with_the_same_filter_share_one_snapshot():
+    registry = ViewStateRegistry(SnapshotCache())
+    builds = []
+
+    def builder():
+        builds.append(1)
+        return ["ana", "beto"]
+
+    first = ViewState("tiempos", 1, 0, filter_status="gold", search_term="A")
+    second = ViewState("tiempos", 1, 0, filter_status="gold", search_term="a", page=2)
+    rows = registry.resolve(first, builder)
+    assert registry.resolve(second, builder) is rows
+    assert rows == ("ana", "beto")
+    assert len(builds) == 1
+
+    # Refrescar avanza a la generación actual y reconstruye
+    registry.resolve(second, builder, current_generation=5, refresh=True)
+    assert second.generation == 5
+    assert len(builds) == 2
+
+
+def test_snapshot_cache_evicts_least_recently_used():
+    cache = SnapshotCache(max_entries=2)
+    cache.put("a", [1])
+    cache.put("b", [2])
+    cache.get("a")
+    cache.put("c", [3])
+
+    assert cache.get("b") is None
+    assert cache.get("a") == (1,)
+    assert cache.row_count() == 2
+
+
+def test_expired_views_and_snapshots_are_dropped(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(view_state.time, "monotonic", lambda: now[0])
+    registry = ViewStateRegistry(SnapshotCache(ttl_seconds=60), max_views=2, ttl_seconds=60)
+    key = registry.open(ViewState("pagos", 1, 0))
+    registry.snapshots.put("rows", ["ana"])
+
+    now[0] += 61
+    assert registry.get(key) is None
+    assert registry.snapshots.get("rows") is None
+
+    keys = [registry.open(ViewState("pagos", 1, 0)) for _ in range(3)]
+    assert registry.get(keys[0]) is None
+    assert len(registry) == 2
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_pack_pages_respects_every_budget(seed):
+    rng = random.Random(seed)
+    lengths = [rng.randint(1, 900) for _ in range(rng.randint(0, 300))]
+    pages = pack_pages(lengths, page_budget=5000, embed_budget=1500, max_embeds=4)
+
+    ranges = [chunk for page in pages for chunk in page]
+    # Todas las filas, en orden y sin repetir
+    assert [index for start, end in ranges for index in range(start, end)] == list(range(len(lengths)))
+    for page in pages:
+        assert 1 <= len(page) <= 4
+        assert sum(lengths[i] + 1 for start, end in page for i in range(start, end)) <= 5000
+        for start, end in page:
+            assert sum(lengths[i] + 1 for i in range(start, end)) <= 1500
+
+
+def test_pack_pages_gives_an_oversized_row_its_own_embed():
+    assert pack_pages([10, 5000, 10], page_budget=6000, embed_budget=4096) == (((0, 1), (1, 2), (2, 3)),)
+    assert pack_pages([], page_budget=6000) == ()
+
+
+def test_rows_are_rendered_again_only_when_their_version_changes():
+    cache = RowRenderCache(max_entries=2)
+    renders = []
+
+    def render(text):
+        def run():
+            renders.append(text)
+            return text
+        return run
+
+    assert cache.get_or_render(1, 1, render("a")) == "a"
+    assert cache.get_or_render(1, 1, render("b")) == "a"
+    assert cache.get_or_render(1, 2, render("c")) == "c"
+    cache.get_or_render(2, 1, render("d"))
+    cache.get_or_render(3, 1, render("e"))
+
+    assert renders == ["a", "c", "d", "e"]
+    assert len(cache) == 2
+    assert (cache.hits, cache.misses) == (1, 4)
+
+
+def test_page_digest_ignores_the_timestamp():
+    first = discord.Embed(title="Tiempos", description="ana 1h", timestamp=datetime(2026, 1, 1))
+    second = discord.Embed(title="Tiempos", description="ana 1h", timestamp=datetime(2026, 1, 2))
+    changed = discord.Embed(title="Tiempos", description="ana 2h")
+
+    assert page_digest([first]) == page_digest([second])
+    assert page_digest([first]) != page_digest([changed])
+    assert page_digest([first, first]) != page_digest([first])
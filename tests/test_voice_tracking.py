@@ -0,0 +1,57 @@
+import asyncio
+
+from voice_tracking import JOIN, LEAVE, VoiceTransitionDebouncer
+
+
+async def next_batch(debouncer, timeout=1.0):
+    batches = debouncer.batches()
+    try:
+        return await asyncio.wait_for(batches.__anext__(), timeout)
+    finally:
+        await batches.aclose()
+
+
+def test_only_the_last_transition_is_delivered():
+    async def scenario():
+        debouncer = VoiceTransitionDebouncer(delay=0.02)
+        debouncer.submit((1, 10), JOIN, "a")
+        debouncer.submit((1, 10), LEAVE, "b")
+        debouncer.submit((1, 10), JOIN, "c")
+        assert debouncer.pending() == 1
+        batch = await next_batch(debouncer)
+        return debouncer, batch
+
+    debouncer, batch = asyncio.run(scenario())
+    assert batch == [((1, 10), JOIN, "c")]
+    assert (debouncer.submitted, debouncer.coalesced, debouncer.delivered) == (3, 2, 1)
+    assert debouncer.pending() == 0
+
+
+def test_nothing_is_delivered_before_the_delay():
+    async def scenario():
+        debouncer = VoiceTransitionDebouncer(delay=0.2)
+        debouncer.submit(1, JOIN, None)
+        try:
+            await next_batch(debouncer, timeout=0.05)
+        except asyncio.TimeoutError:
+            return debouncer.pending()
+        return None
+
+    assert asyncio.run(scenario()) == 1
+
+
+def test_ready_transitions_are_batched_up_to_max_batch():
+    async def scenario():
+        debouncer = VoiceTransitionDebouncer(delay=0.01, max_batch=3)
+        for member_id in range(5):
+            debouncer.submit(member_id, JOIN, member_id)
+        await asyncio.sleep(0.05)
+        batches = debouncer.batches()
+        first = await batches.__anext__()
+        second = await batches.__anext__()
+        await batches.aclose()
+        return first, second
+
+    first, second = asyncio.run(scenario())
+    assert [key for key, _, _ in first] == [0, 1, 2]
+    assert [key for key, _, _ in second] == [3, 4]
@@ -0,0 +1,118 @@
+"""
+Índice de niveles por servidor.
+
+Guarda el nivel de cada miembro que tiene algún rol de nivel (por ID
+configurado o por nombre, con las mismas reglas que tier_for_member). Se
+siembra una vez desde los miembros de esos roles y se mantiene con los
+eventos de miembros y roles, así filtrar por nivel no recorre el servidor;
+quien no está en el índice es del nivel predeterminado.
+
+Con la caché de miembros parcial (perfil lean) los roles solo listan a los
+miembros cargados, así que la ausencia no prueba nada: el índice anota a
+quién comprobó y resolve_cached() busca el nivel de los demás uno por uno.
+"""
+
+from typing import Dict, Iterable, List, Optional, Set
+
+from tier_rules import TierRules
+
+
+class TierMembershipIndex:
+    """Nivel de los miembros con rol de nivel por servidor, mantenido con eventos"""
+
+    def __init__(self, tier_rules: TierRules, partial_seeds: bool = False):
+        self.tier_rules = tier_rules
+        self.partial_seeds = partial_seeds
+        self._members: Dict[int, Dict[int, str]] = {}
+        # Solo con partial_seeds: miembros cuyo nivel se comprobó con sus roles, por servidor
+        self._checked: Dict[int, Set[int]] = {}
+
+    def is_tier_role(self, role) -> bool:
+        """Saber si un rol da algún nivel"""
+        return self.tier_rules.is_tier_role(role)
+
+    def _assign(self, guild_id: int, members: Dict[int, str], member) -> None:
+        tier = self.tier_rules.tier_for_member(member)
+        if tier is self.tier_rules.default:
+            members.pop(member.id, None)
+        else:
+            members[member.id] = tier.name
+        if self.partial_seeds:
+            self._checked.setdefault(guild_id, set()).add(member.id)
+
+    def seed(self, guild) -> Dict[int, str]:
+        """Construir el índice de un servidor desde los miembros de sus roles de nivel"""
+        members: Dict[int, str] = {}
+        self._checked.pop(guild.id, None)
+        for role in guild.roles:
+            if self.is_tier_role(role):
+                for member in role.members:
+                    if member.id not in members:
+                        self._assign(guild.id, members, member)
+        self._members[guild.id] = members
+        return members
+
+    def members_of(self, guild) -> Dict[int, str]:
+        """ID de miembro -> nivel en un servidor (se siembra en el primer uso)"""
+        members = self._members.get(guild.id)
+        if members is None:
+            members = self.seed(guild)
+        return members
+
+    def unchecked(self, guild, user_ids: Iterable[int]) -> List[int]:
+        """IDs cuyo nivel el índice no conoce (siempre ninguno si se sembró con todos los miembros)"""
+        if not self.partial_seeds:
+            return []
+        self.members_of(guild)
+        checked = self._checked.get(guild.id, set())
+        return [user_id for user_id in user_ids if user_id not in checked]
+
+    def resolve_cached(self, guild, user_ids: Iterable[int]) -> List[int]:
+        """Anotar el nivel de los IDs sin comprobar que están en la caché; devuelve los que no están"""
+        missing = []
+        for user_id in self.unchecked(guild, user_ids):
+            member = guild.get_member(user_id)
+            if member is None:
+                missing.append(user_id)
+            else:
+                self._assign(guild.id, self._members[guild.id], member)
+        return missing
+
+    def tier_members(self, guild, tier_name: str) -> Set[int]:
+        """IDs de los miembros de un nivel con roles"""
+        return {member_id for member_id, name in self.members_of(guild).items() if name == tier_name}
+
+    def is_seeded(self, guild_id: int) -> bool:
+        return guild_id in self._members
+
+    def update_member(self, before, after) -> None:
+        """Actualizar un miembro tras un cambio de roles"""
+        members = self._members.get(after.guild.id)
+        if members is None:
+            return
+        if [role.id for role in before.roles] == [role.id for role in after.roles]:
+            return
+        self._assign(after.guild.id, members, after)
+
+    def add_member(self, member) -> None:
+        """Registrar un miembro que entra al servidor (puede traer roles)"""
+        members = self._members.get(member.guild.id)
+        if members is not None:
+            self._assign(member.guild.id, members, member)
+
+    def remove_member(self, guild_id: int, member_id: int) -> None:
+        members = self._members.get(guild_id)
+        if members is not None:
+            members.pop(member_id, None)
+        self._checked.get(guild_id, set()).discard(member_id)
+
+    def forget_guild(self, guild_id: int) -> None:
+        """Descartar el índice de un servidor (se vuelve a sembrar al usarlo)"""
+        self._members.pop(guild_id, None)
+        self._checked.pop(guild_id, None)
+
+    def stats(self) -> Dict[int, int]:
+        return {guild_id: len(members) for guild_id, members in self._members.items()}
+
+    def get(self, guild_id: int) -> Optional[Dict[int, str]]:
+        return self._members.get(guild_id)
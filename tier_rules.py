@@ -0,0 +1,161 @@
+"""
+Niveles de usuario (Gold, Recluta, ...) y sus reglas de tiempo y créditos.
+
+Las reglas se leen de la clave "tiers" de config.json; el orden de la lista
+es la prioridad (el primer nivel cuyo rol tenga el miembro es el suyo) y el
+nivel sin roles es el de quien no tiene ninguno:
+
+    "tiers": [
+        {"name": "gold", "label": "Gold", "role_ids": [1382198935971430440],
+         "role_name_contains": "gold", "max_hours": 2, "milestone_hours": [1, 2],
+         "credits": {"1": 5, "2": 10}, "max_pauses": null},
+        {"name": "normal", "label": "Recluta", "max_hours": 1, "milestone_hours": [1],
+         "credits": {"1": 3}, "max_pauses": 3}
+    ]
+
+"credits" asigna a cada cantidad de horas los créditos totales que se tienen
+al alcanzarla. Al iniciar se compilan en umbrales ordenados (en segundos)
+que se consultan con bisect. "max_pauses" es la pausa con la que el tiempo
+se cancela automáticamente (3 si no se indica); con null las pausas no
+cuentan.
+"""
+
+import bisect
+import copy
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+DEFAULT_TIERS = [
+    {
+        'name': 'gold',
+        'label': 'Gold',
+        'emoji': '🏆',
+        'role_ids': [1382198935971430440],
+        'role_name_contains': 'gold',
+        'max_hours': 2,
+        'milestone_hours': [1, 2],
+        'credits': {'1': 5, '2': 10},
+        'max_pauses': None,
+    },
+    {
+        'name': 'normal',
+        'label': 'Recluta',
+        'emoji': '👤',
+        'max_hours': 1,
+        'milestone_hours': [1],
+        'credits': {'1': 3},
+        'max_pauses': 3,
+    },
+]
+
+
+class Tier:
+    """Reglas compiladas de un nivel"""
+
+    def __init__(self, rule: Dict[str, Any]):
+        self.name = rule['name']
+        self.label = rule.get('label', self.name.capitalize())
+        self.emoji = rule.get('emoji', '👤')
+        self.role_ids = {int(role_id) for role_id in rule.get('role_ids', [])}
+        self.role_name_contains = (rule.get('role_name_contains') or '').lower()
+        self.max_hours = rule['max_hours']
+        self.limit_seconds = int(self.max_hours * 3600)
+        self.milestones = sorted(int(hours * 3600) for hours in rule.get('milestone_hours', [self.max_hours]))
+        credit_steps = sorted((int(float(hours) * 3600), credits) for hours, credits in rule.get('credits', {}).items())
+        self._credit_thresholds = [seconds for seconds, _ in credit_steps]
+        self._credit_values = [credits for _, credits in credit_steps]
+        # None: pausas sin límite ni penalización
+        self.max_pauses = rule.get('max_pauses', 3) or None
+
+    def __repr__(self) -> str:
+        return f"Tier({self.name!r}, max_hours={self.max_hours})"
+
+    def credits_for(self, total_seconds: float) -> int:
+        """Créditos totales que corresponden a un tiempo acumulado"""
+        index = bisect.bisect_right(self._credit_thresholds, total_seconds)
+        return self._credit_values[index - 1] if index else 0
+
+    def credit_steps(self) -> List[Tuple[float, int]]:
+        """(horas, créditos totales) de cada umbral, de menor a mayor"""
+        return [(seconds / 3600, credits) for seconds, credits in zip(self._credit_thresholds, self._credit_values)]
+
+    def limit_reached(self, total_seconds: float) -> bool:
+        return total_seconds >= self.limit_seconds
+
+    def due_milestones(self, total_seconds: float, notified: Iterable[int]) -> List[int]:
+        """Milestones alcanzados que todavía no se notificaron, de menor a mayor"""
+        notified = set(notified)
+        reached = self.milestones[:bisect.bisect_right(self.milestones, total_seconds)]
+        return [milestone for milestone in reached if milestone not in notified]
+
+    def milestone_credits(self, milestone_seconds: int, notified: Iterable[int]) -> int:
+        """Créditos que suma un milestone: los de su nivel menos los que ya sumaron los anteriores"""
+        earned = max((self.credits_for(milestone) for milestone in notified), default=0)
+        return max(0, self.credits_for(milestone_seconds) - earned)
+
+    @property
+    def has_roles(self) -> bool:
+        return bool(self.role_ids or self.role_name_contains)
+
+    def matches(self, role) -> bool:
+        if role.id in self.role_ids:
+            return True
+        return bool(self.role_name_contains) and self.role_name_contains in role.name.lower()
+
+
+class TierRules:
+    """Todos los niveles: a qué nivel pertenece cada miembro y evaluación de tiempos"""
+
+    def __init__(self, rules: Optional[List[Dict[str, Any]]] = None):
+        self.tiers = [Tier(rule) for rule in (rules or DEFAULT_TIERS)]
+        self._by_name = {tier.name: tier for tier in self.tiers}
+        # Nivel de quien no tiene ningún rol de nivel: el último sin roles configurados
+        fallback = [tier for tier in self.tiers if not tier.has_roles]
+        self.default = fallback[-1] if fallback else self.tiers[-1]
+
+    @classmethod
+    def from_config(cls, config: Dict[str, Any]) -> "TierRules":
+        rules = config.get('tiers')
+        if rules is None:
+            # Sin tabla de niveles: los predeterminados, con el rol Gold de "gold_role_id" si existe
+            rules = copy.deepcopy(DEFAULT_TIERS)
+            if config.get('gold_role_id'):
+                rules[0]['role_ids'].append(config['gold_role_id'])
+        try:
+            return cls(rules)
+        except (KeyError, TypeError, ValueError) as e:
+            print(f"⚠️ Reglas de niveles inválidas en config.json ({e}); se usan las predeterminadas")
+            return cls()
+
+    def tier(self, name: Optional[str]) -> Tier:
+        return self._by_name.get(name, self.default)
+
+    def is_tier_role(self, role) -> bool:
+        """Saber si un rol da algún nivel"""
+        return any(tier.matches(role) for tier in self.tiers)
+
+    def tier_for_member(self, member) -> Tier:
+        """Nivel de un miembro según sus roles (el de mayor prioridad)"""
+        if not member:
+            return self.default
+        member_role_ids = {role.id for role in member.roles}
+        for tier in self.tiers:
+            if tier.role_ids & member_role_ids:
+                return tier
+            if tier.role_name_contains and any(tier.matches(role) for role in member.roles):
+                return tier
+        return self.default
+
+    def evaluate(self, tier_name: Optional[str], total_seconds: float,
+                 notified: Iterable[int] = (), completed: bool = False) -> Dict[str, Any]:
+        """Créditos, límite y milestones pendientes de un usuario"""
+        tier = self.tier(tier_name)
+        return {
+            'tier': tier.name,
+            'credits': tier.credits_for(total_seconds),
+            'finished': completed or tier.limit_reached(total_seconds),
+            'due_milestones': tier.due_milestones(total_seconds, notified),
+        }
+
+    def evaluate_many(self, users: Iterable[Tuple[Any, Optional[str], float]]) -> Dict[Any, Dict[str, Any]]:
+        """evaluate() para muchos usuarios a la vez: (user_id, nivel, segundos) -> resultado"""
+        return {user_id: self.evaluate(tier_name, total_seconds) for user_id, tier_name, total_seconds in users}
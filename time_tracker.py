@@ -1,45 +1,402 @@
 
+import asyncio
+import bisect
 import json
 import os
-from datetime import datetime, timedelta
-from typing import Dict, Any, Optional, Tuple
+import re
+import threading
+from contextlib import AsyncExitStack, contextmanager
+from datetime import date, datetime
+from typing import Dict, Any, List, Optional, Set, Tuple
+
+from persistence import JsonStoreWriter, iter_json_object, shared_writer, write_json_in_background
+from credit_ledger import CreditLedger, ledger_path_for
+from rollups import RebuildSources, Rollups, rollups_path_for
+from session_archive import SessionArchive, archive_path_for
+
+class TransitionResult:
+    """Resultado de un cambio de estado de un usuario: qué pasó y con qué tiempos"""
+
+    __slots__ = ('ok', 'action', 'total_before', 'total_after', 'session_time',
+                 'pause_count', 'time_lost', 'paused_duration')
+
+    def __init__(self, ok: bool, action: str, total_before: float = 0.0, total_after: float = 0.0,
+                 session_time: float = 0.0, pause_count: int = 0, time_lost: float = 0.0,
+                 paused_duration: float = 0.0):
+        self.ok = ok
+        self.action = action
+        self.total_before = total_before
+        self.total_after = total_after
+        self.session_time = session_time
+        self.pause_count = pause_count
+        self.time_lost = time_lost
+        self.paused_duration = paused_duration
+
+    def __bool__(self) -> bool:
+        return self.ok
+
+    def __repr__(self) -> str:
+        return f"TransitionResult({self.action!r}, ok={self.ok})"
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {slot: getattr(self, slot) for slot in self.__slots__}
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "TransitionResult":
+        return cls(**data)
+
+# Días recientes que se guardan por admin; los anteriores se acumulan por mes
+ATTENDANCE_RING_DAYS = 7
+
+# Operaciones que pueden tardar (construyen el índice o leen historiales): call() las lleva a un hilo
+# y el worker las responde sin frenar las demás peticiones
+BACKGROUND_METHODS = {'get_session_stats', 'get_sessions', 'rebuild_rollups'}
+
+# Modificaciones de un usuario (su ID es el primer argumento): call() y call_many() toman su candado
+USER_METHODS = {
+    'pre_register_user', 'start_tracking', 'start_tracking_from_pre_register', 'stop_tracking',
+    'pause_tracking', 'resume_tracking', 'reset_user_time', 'cancel_user_tracking',
+    'cancel_user_tracking_keep_hours', 'add_minutes', 'subtract_minutes', 'mark_milestone',
+    'finish_time_limit', 'mark_credits_paid', 'set_time_initiator', 'clear_time_initiator',
+    'set_pre_register_initiator', 'clear_pre_register_initiator',
+}
 
 class TimeTracker:
-    def __init__(self, data_file: str = "user_times.json"):
+    def __init__(self, data_file: str = "user_times.json", attendance_file: str = "attendance_data.json",
+                 writer: Optional[JsonStoreWriter] = None):
         self.data_file = data_file
+        # Periodo actual: los registros de un periodo anterior cuentan como reiniciados
+        self.periods_file = f"{os.path.splitext(data_file)[0]}_periods.json"
+        self.periods_dir = os.path.join(os.path.dirname(data_file), "periods")
+        self.period, self.period_history = self.load_periods()
+        # Generación del último reinicio global: invalida las versiones de todos los usuarios
+        self._reset_version = 0
+        # Historial de sesiones fuera de user_times.json (ver session_archive.py)
+        self.sessions = SessionArchive(archive_path_for(data_file))
+        # Créditos ganados y pagados (ver credit_ledger.py)
+        self.credits = CreditLedger(ledger_path_for(data_file))
+        self._spooled_sessions = 0
         self.data = self.load_data()
-        self.attendance_file = "attendance_data.json"
+        # Los archivos se escriben en el hilo escritor; aquí solo se encolan los cambios
+        self.writer = writer or shared_writer()
+        if self._spooled_sessions:
+            # Las sesiones ya están en el historial: el archivo se reescribe sin ellas
+            self.sessions.sync()
+            print(f"📦 {self._spooled_sessions} sesiones movidas de {self.data_file} a {self.sessions.path}")
+        self.writer.register(self.data_file, self.data, rewrite=bool(self._spooled_sessions))
+        # Resúmenes por día y semana (ver rollups.py)
+        self.rollups = Rollups(rollups_path_for(data_file), self.writer)
+        self._unsaved_users: Set[str] = set()
+        # Lotes de modificaciones (batch): se guardan una sola vez al terminar
+        self._batch_depth = 0
+        self._batch_dirty = False
+        # Generación de los datos: cambia con cada modificación guardada
+        self.generation = 0
+        # Versión por usuario: generación en la que cambiaron sus datos por última vez
+        self.user_versions: Dict[str, int] = {}
+        # Usuarios modificados desde la última vez que alguien vació este conjunto
+        self.changed_users: Set[str] = set()
+        # Índice de nombres ordenado (token, user_id) para búsquedas por prefijo
+        self._name_index: List[Tuple[str, str]] = []
+        self._indexed_tokens: Dict[str, Tuple[str, ...]] = {}
+        self._rebuild_name_index()
+        self.attendance_file = attendance_file
         self.attendance_data = self.load_attendance_data()
+        # Un candado por usuario: los comandos sobre el mismo usuario no se intercalan
+        self._user_locks: Dict[str, asyncio.Lock] = {}
 
     def load_data(self) -> Dict[str, Any]:
-        """Cargar datos desde el archivo JSON"""
+        """Cargar datos desde el archivo JSON usuario a usuario, moviendo las sesiones al historial"""
+        data: Dict[str, Any] = {}
         try:
             if os.path.exists(self.data_file):
-                with open(self.data_file, 'r', encoding='utf-8') as f:
-                    return json.load(f)
-            return {}
+                for user_id_str, user_data in iter_json_object(self.data_file):
+                    sessions = user_data.pop('sessions', None) if isinstance(user_data, dict) else None
+                    if sessions:
+                        self._spooled_sessions += self.sessions.spool(user_id_str, sessions)
+                    data[user_id_str] = user_data
+            return data
         except Exception as e:
             print(f"Error cargando datos: {e}")
             return {}
 
     def save_data(self) -> None:
-        """Guardar datos al archivo JSON"""
+        """Encolar para guardar los registros de los usuarios modificados"""
+        if self._batch_depth:
+            self._batch_dirty = True
+            return
+        self.generation += 1
         try:
-            with open(self.data_file, 'w', encoding='utf-8') as f:
-                json.dump(self.data, f, indent=2, ensure_ascii=False)
+            for user_id_str in self._unsaved_users:
+                self.writer.put_record(self.data_file, user_id_str, self.data.get(user_id_str))
+            self._unsaved_users.clear()
         except Exception as e:
             print(f"Error guardando datos: {e}")
 
-    def pre_register_user(self, user_id: int, user_name: str) -> bool:
-        """Pre-registrar usuario para inicio automático"""
+    @contextmanager
+    def batch(self):
+        """Agrupar varias modificaciones en una sola generación y un solo guardado"""
+        self._batch_depth += 1
+        try:
+            yield self
+        finally:
+            self._batch_depth -= 1
+            if self._batch_depth == 0 and self._batch_dirty:
+                self._batch_dirty = False
+                self.save_data()
+
+    async def call(self, method: str, *args, **kwargs):
+        """Ejecutar un método del tracker desde el event loop
+
+        Las modificaciones de un usuario se hacen con su candado tomado, que se
+        suelta al volver: lo que se haga después (responder en Discord) no lo retiene.
+        """
+        if method not in USER_METHODS:
+            return await self._call(method, *args, **kwargs)
+        async with self.user_lock(args[0]):
+            return await self._call(method, *args, **kwargs)
+
+    async def call_many(self, calls: List[Tuple[str, tuple]]) -> List[Any]:
+        """Varias llamadas (método, argumentos) en un solo lote: un guardado y, en modo worker, una petición"""
+        # Candados en orden de ID: dos lotes nunca se bloquean entre sí
+        user_ids = sorted({str(args[0]) for method, args in calls if method in USER_METHODS})
+        async with AsyncExitStack() as stack:
+            for user_id_str in user_ids:
+                await stack.enter_async_context(self.user_lock(user_id_str))
+            return await self._call_many(calls)
+
+    async def _call(self, method: str, *args, **kwargs):
+        """Aquí los métodos son inmediatos (las consultas lentas van a un hilo);
+        RemoteTracker lo redefine para enviarlo al worker sin bloquear el loop"""
+        function = getattr(self, method)
+        if asyncio.iscoroutinefunction(function):
+            return await function(*args, **kwargs)
+        if method in BACKGROUND_METHODS:
+            return await asyncio.to_thread(function, *args, **kwargs)
+        return function(*args, **kwargs)
+
+    async def _call_many(self, calls: List[Tuple[str, tuple]]) -> List[Any]:
+        with self.batch():
+            return [getattr(self, method)(*args) for method, args in calls]
+
+    async def flush(self) -> bool:
+        """Esperar a que los cambios guardados hasta ahora estén escritos en disco"""
+        return await asyncio.wrap_future(self.writer.barrier())
+
+    def touch_user(self, user_id) -> None:
+        """Marcar los datos de un usuario como modificados en la próxima generación"""
+        self.user_versions[str(user_id)] = self.generation + 1
+        self.changed_users.add(str(user_id))
+        self._unsaved_users.add(str(user_id))
+
+    def user_lock(self, user_id) -> asyncio.Lock:
+        """Candado de un usuario; usuarios distintos no se esperan entre sí"""
+        user_id_str = str(user_id)
+        lock = self._user_locks.get(user_id_str)
+        if lock is None:
+            lock = self._user_locks[user_id_str] = asyncio.Lock()
+        return lock
+
+    def get_user_version(self, user_id) -> int:
+        """Versión de los datos de un usuario (0 si no cambió desde que se cargó)"""
+        return max(self.user_versions.get(str(user_id), 0), self._reset_version)
+
+    def load_periods(self) -> Tuple[int, List[Dict[str, Any]]]:
+        """Leer el periodo actual y los periodos cerrados"""
+        try:
+            if os.path.exists(self.periods_file):
+                with open(self.periods_file, 'r', encoding='utf-8') as f:
+                    meta = json.load(f)
+                return meta.get('period', 0), meta.get('history', [])
+        except Exception as e:
+            print(f"Error cargando periodos: {e}")
+        return 0, []
+
+    def _user_record(self, user_id_str: str) -> Optional[Dict[str, Any]]:
+        """Registro de un usuario para modificarlo (uno de un periodo anterior se reinicia en self.data)"""
+        user_data = self.data.get(user_id_str)
+        if user_data is not None and user_data.get('period', 0) != self.period:
+            # Registro nuevo: el anterior puede estar referenciado por la copia del periodo cerrado
+            user_data = dict(user_data)
+            self._zero_record(user_data)
+            user_data['period'] = self.period
+            self.data[user_id_str] = user_data
+        return user_data
+
+    def _read_record(self, user_id_str: str) -> Optional[Dict[str, Any]]:
+        """Registro de un usuario visto desde el periodo actual, sin modificar self.data
+
+        Las consultas (también las que corren en otro hilo) usan este; el
+        reinicio perezoso de _user_record() solo ocurre en las modificaciones,
+        que corren en el event loop con el candado del usuario.
+        """
+        user_data = self.data.get(user_id_str)
+        if user_data is not None and user_data.get('period', 0) != self.period:
+            user_data = dict(user_data)
+            self._zero_record(user_data)
+            user_data['period'] = self.period
+        return user_data
+
+    @staticmethod
+    def _zero_record(user_data: Dict[str, Any]) -> None:
+        """Dejar el tiempo y el estado de un registro como recién reiniciado"""
+        user_data['total_time'] = 0
+        user_data['is_active'] = False
+        user_data['is_paused'] = False
+        user_data['pause_count'] = 0
+        user_data['notified_milestones'] = []
+        user_data['milestone_completed'] = False
+        user_data['is_pre_registered'] = False
+
+        # Limpiar campos de seguimiento
+        for field in ('last_start', 'pause_start', 'pre_register_time'):
+            user_data.pop(field, None)
+
+    def _close_period(self, kind: str) -> None:
+        """Cerrar el periodo actual: su estado se archiva en segundo plano y empieza uno nuevo"""
+        closed = self.period
+        stem = os.path.splitext(os.path.basename(self.data_file))[0]
+        os.makedirs(self.periods_dir or ".", exist_ok=True)
+        snapshot_file = os.path.join(self.periods_dir, f"{stem}_period_{closed}.json")
+        sessions_file = os.path.join(self.periods_dir, f"{stem}_sessions_period_{closed}.jsonl")
+
+        # Copia superficial: los registros no se modifican, _user_record los reemplaza
+        write_json_in_background(snapshot_file, {'period': closed, 'users': dict(self.data)})
+        self.sessions.rotate(sessions_file)
+
+        self.period += 1
+        self.period_history.append({
+            'period': closed,
+            'kind': kind,
+            'closed_at': datetime.now().isoformat(),
+            'users': len(self.data),
+            'snapshot': snapshot_file,
+            'sessions': sessions_file
+        })
+        self.writer.replace(self.periods_file, {'period': self.period, 'history': list(self.period_history)})
+        self.generation += 1
+        self._reset_version = self.generation
+
+    def get_period_users(self, period: int) -> Optional[Dict[str, Any]]:
+        """Usuarios de un periodo cerrado tal como quedaron al cerrarlo (para auditorías)"""
+        entry = next((item for item in self.period_history if item['period'] == period), None)
+        if entry is None:
+            return None
+        try:
+            with open(entry['snapshot'], 'r', encoding='utf-8') as f:
+                users = json.load(f)['users']
+        except Exception as e:
+            print(f"Error cargando el periodo {period}: {e}")
+            return None
+        # Los registros que no se tocaron en ese periodo venían de uno anterior: estaban en cero
+        for user_data in users.values():
+            if user_data.get('period', 0) != period:
+                self._zero_record(user_data)
+                user_data['period'] = period
+        return users
+
+    @staticmethod
+    def _name_tokens(name: str) -> Tuple[str, ...]:
+        """Tokens indexables de un nombre: el nombre completo y cada palabra"""
+        normalized = name.lower().strip()
+        if not normalized:
+            return ()
+        words = [word for word in re.split(r"[\s_\-.]+", normalized) if word]
+        return tuple(dict.fromkeys([normalized] + words))
+
+    def _rebuild_name_index(self) -> None:
+        """Reconstruir completamente el índice de nombres"""
+        self._indexed_tokens = {}
+        entries = []
+        for user_id_str, user_data in self.data.items():
+            tokens = self._name_tokens(user_data.get('name', ''))
+            self._indexed_tokens[user_id_str] = tokens
+            entries.extend((token, user_id_str) for token in tokens)
+        entries.sort()
+        self._name_index = entries
+
+    def _unindex_user(self, user_id_str: str) -> None:
+        """Quitar a un usuario del índice de nombres"""
+        for token in self._indexed_tokens.pop(user_id_str, ()):
+            pos = bisect.bisect_left(self._name_index, (token, user_id_str))
+            if pos < len(self._name_index) and self._name_index[pos] == (token, user_id_str):
+                del self._name_index[pos]
+
+    def _index_user(self, user_id_str: str) -> None:
+        """Actualizar el índice de nombres de un usuario (no hace nada si el nombre no cambió)"""
+        user_data = self.data.get(user_id_str)
+        if user_data is None:
+            self._unindex_user(user_id_str)
+            return
+        tokens = self._name_tokens(user_data.get('name', ''))
+        if self._indexed_tokens.get(user_id_str) == tokens:
+            return
+        self._unindex_user(user_id_str)
+        self._indexed_tokens[user_id_str] = tokens
+        for token in tokens:
+            bisect.insort(self._name_index, (token, user_id_str))
+
+    def search_users(self, prefix: str, state: Optional[str] = None, limit: int = 25,
+                     max_scan: int = 5000) -> List[Tuple[str, str]]:
+        """Buscar usuarios por prefijo de nombre usando el índice en memoria.
+
+        state puede ser 'active', 'paused' o 'inactive' (ni activo ni pausado).
+        Devuelve una lista de (user_id, nombre).
+        """
+        prefix = prefix.lower().strip()
+        results = []
+        seen = set()
+        pos = bisect.bisect_left(self._name_index, (prefix, ""))
+        end = min(len(self._name_index), pos + max_scan)
+
+        while pos < end and len(results) < limit:
+            token, user_id_str = self._name_index[pos]
+            pos += 1
+            if not token.startswith(prefix):
+                break
+            if user_id_str in seen:
+                continue
+            seen.add(user_id_str)
+
+            user_data = self._read_record(user_id_str)
+            if user_data is None:
+                continue
+            is_active = user_data.get('is_active', False)
+            is_paused = user_data.get('is_paused', False)
+            if state == "active" and not is_active:
+                continue
+            if state == "paused" and not is_paused:
+                continue
+            if state == "inactive" and (is_active or is_paused):
+                continue
+
+            results.append((user_id_str, user_data.get('name', f'Usuario {user_id_str}')))
+
+        return results
+
+    def _start_blocker(self, user_id: int, user_data: Dict[str, Any], limit_seconds: Optional[float]) -> Optional[str]:
+        """Motivo por el que no se puede iniciar ni pre-registrar a un usuario (None si se puede)"""
+        if user_data.get('milestone_completed', False):
+            return 'completed'
+        if limit_seconds is not None and self.get_total_time(user_id) >= limit_seconds:
+            return 'limit_reached'
+        if user_data.get('is_paused', False):
+            return 'paused'
+        if user_data.get('is_active', False):
+            return 'already_active'
+        return None
+
+    def pre_register_user(self, user_id: int, user_name: str, limit_seconds: Optional[float] = None,
+                          admin_id: Optional[int] = None, admin_name: Optional[str] = None) -> TransitionResult:
+        """Pre-registrar usuario para inicio automático (con el límite de su nivel y quién lo pre-registra)"""
         user_id_str = str(user_id)
         current_time = datetime.now().isoformat()
 
         if user_id_str not in self.data:
             self.data[user_id_str] = {
                 'name': user_name,
+                'period': self.period,
                 'total_time': 0,
-                'sessions': [],
                 'is_active': False,
                 'is_paused': False,
                 'pause_count': 0,
@@ -48,34 +405,42 @@ class TimeTracker:
                 'is_pre_registered': False
             }
 
-        user_data = self.data[user_id_str]
-
-        # Si ya está activo o pre-registrado, no hacer nada
-        if user_data.get('is_active', False) or user_data.get('is_pre_registered', False):
-            return False
+        user_data = self._user_record(user_id_str)
+        total_time = self.get_total_time(user_id)
 
-        # Si está pausado, no permitir pre-registro
-        if user_data.get('is_paused', False):
-            return False
+        # Completado, pausado, activo o ya pre-registrado: no hacer nada
+        blocker = self._start_blocker(user_id, user_data, limit_seconds)
+        if blocker is None and user_data.get('is_pre_registered', False):
+            blocker = 'already_registered'
+        if blocker:
+            return TransitionResult(False, blocker, total_time, total_time)
 
         # Pre-registrar usuario
         user_data['is_pre_registered'] = True
         user_data['pre_register_time'] = current_time
         user_data['name'] = user_name  # Actualizar nombre
+        if admin_id is not None:
+            user_data['pre_register_initiator'] = {
+                'admin_id': admin_id,
+                'admin_name': admin_name,
+                'timestamp': current_time
+            }
+        self._index_user(user_id_str)
 
+        self.touch_user(user_id_str)
         self.save_data()
-        return True
+        return TransitionResult(True, 'pre_registered', total_time, total_time)
 
-    def start_tracking(self, user_id: int, user_name: str) -> bool:
-        """Iniciar seguimiento de tiempo para un usuario"""
+    def start_tracking(self, user_id: int, user_name: str, limit_seconds: Optional[float] = None) -> TransitionResult:
+        """Iniciar seguimiento de tiempo para un usuario (sin pasar del límite de su nivel)"""
         user_id_str = str(user_id)
         current_time = datetime.now().isoformat()
 
         if user_id_str not in self.data:
             self.data[user_id_str] = {
                 'name': user_name,
+                'period': self.period,
                 'total_time': 0,
-                'sessions': [],
                 'is_active': False,
                 'is_paused': False,
                 'pause_count': 0,
@@ -84,15 +449,13 @@ class TimeTracker:
                 'is_pre_registered': False
             }
 
-        user_data = self.data[user_id_str]
-
-        # Si ya está activo, no hacer nada
-        if user_data.get('is_active', False):
-            return False
+        user_data = self._user_record(user_id_str)
+        total_time = self.get_total_time(user_id)
 
-        # Si está pausado, no permitir iniciar nuevo tracking
-        if user_data.get('is_paused', False):
-            return False
+        # Completado, pausado o ya activo: no iniciar nuevo tracking
+        blocker = self._start_blocker(user_id, user_data, limit_seconds)
+        if blocker:
+            return TransitionResult(False, blocker, total_time, total_time)
 
         # Limpiar pre-registro si existe
         if user_data.get('is_pre_registered', False):
@@ -107,27 +470,30 @@ class TimeTracker:
         user_data['is_paused'] = False
         user_data['last_start'] = current_time
         user_data['name'] = user_name  # Actualizar nombre
+        self._index_user(user_id_str)
 
+        self.touch_user(user_id_str)
         self.save_data()
-        return True
+        return TransitionResult(True, 'started', total_time, total_time)
 
-    def start_tracking_from_pre_register(self, user_id: int) -> bool:
+    def start_tracking_from_pre_register(self, user_id: int) -> TransitionResult:
         """Iniciar seguimiento desde pre-registro (para inicio automático a las 8 PM)"""
         user_id_str = str(user_id)
         current_time = datetime.now().isoformat()
 
         if user_id_str not in self.data:
-            return False
+            return TransitionResult(False, 'not_found')
 
-        user_data = self.data[user_id_str]
+        user_data = self._user_record(user_id_str)
+        total_time = user_data.get('total_time', 0)
 
         # Solo funciona si está pre-registrado
         if not user_data.get('is_pre_registered', False):
-            return False
+            return TransitionResult(False, 'not_pre_registered', total_time, total_time)
 
         # Si ya está activo, no hacer nada
         if user_data.get('is_active', False):
-            return False
+            return TransitionResult(False, 'already_active', total_time, total_time)
 
         # Iniciar desde pre-registro
         user_data['is_active'] = True
@@ -143,78 +509,101 @@ class TimeTracker:
         if 'pre_register_initiator' in user_data:
             del user_data['pre_register_initiator']
 
+        self.touch_user(user_id_str)
         self.save_data()
-        return True
+        return TransitionResult(True, 'started', total_time, total_time)
 
     def get_pre_registered_users(self) -> Dict[str, Any]:
         """Obtener usuarios pre-registrados"""
         pre_registered = {}
-        for user_id_str, data in self.data.items():
+        for user_id_str in list(self.data):
+            data = self._read_record(user_id_str)
             if data.get('is_pre_registered', False):
                 pre_registered[user_id_str] = data
         return pre_registered
 
-    def stop_tracking(self, user_id: int) -> bool:
+    def _tier(self, user_data: Dict[str, Any], role_type: Optional[str] = None) -> str:
+        """Nivel para los resúmenes: el indicado (y se recuerda) o el último conocido"""
+        if role_type:
+            user_data['tier'] = role_type
+            return role_type
+        return user_data.get('tier', 'normal')
+
+    def _close_segment(self, user_id_str: str, user_data: Dict[str, Any], end_reason: str,
+                       role_type: Optional[str] = None) -> float:
+        """Cerrar el tramo en curso de un usuario: se anota en el historial y en los resúmenes
+
+        Devuelve su duración (0 si no había tramo en curso). Cada tramo que
+        termina (detención, pausa o cancelación) es una sesión del historial.
+        """
+        if not user_data.get('last_start'):
+            return 0.0
+        end = datetime.now()
+        duration = (end - datetime.fromisoformat(user_data['last_start'])).total_seconds()
+        self.sessions.append(user_id_str, {
+            'start': user_data['last_start'],
+            'end': end.isoformat(),
+            'duration': duration,
+            'end_reason': end_reason,
+        })
+        self.rollups.record(user_id_str, self._tier(user_data, role_type), when=end, seconds=duration, sessions=1)
+        return duration
+
+    def stop_tracking(self, user_id: int, role_type: Optional[str] = None) -> TransitionResult:
         """Detener seguimiento de tiempo para un usuario"""
         user_id_str = str(user_id)
 
         if user_id_str not in self.data:
-            return False
+            return TransitionResult(False, 'not_found')
 
-        user_data = self.data[user_id_str]
+        user_data = self._user_record(user_id_str)
 
         if not user_data.get('is_active', False):
-            return False
+            return TransitionResult(False, 'not_active', user_data.get('total_time', 0),
+                                    user_data.get('total_time', 0))
 
-        # Calcular tiempo de sesión
-        session_time = 0
-        if user_data.get('last_start'):
-            session_start = datetime.fromisoformat(user_data['last_start'])
-            session_time = (datetime.now() - session_start).total_seconds()
-            
-            # Añadir tiempo de sesión al total
-            user_data['total_time'] = user_data.get('total_time', 0) + session_time
+        total_before = user_data.get('total_time', 0)
+
+        # Cerrar la sesión (queda en el historial) y añadir su tiempo al total
+        session_time = self._close_segment(user_id_str, user_data, 'stop', role_type)
+        user_data['total_time'] = user_data.get('total_time', 0) + session_time
 
         # Marcar como inactivo
         user_data['is_active'] = False
         user_data['is_paused'] = False
 
-        # Agregar sesión al historial
-        if 'sessions' not in user_data:
-            user_data['sessions'] = []
-
-        session_record = {
-            'start': user_data.get('last_start'),
-            'end': datetime.now().isoformat(),
-            'duration': session_time if user_data.get('last_start') else 0
-        }
-        user_data['sessions'].append(session_record)
-
+        self.touch_user(user_id_str)
         self.save_data()
-        return True
+        return TransitionResult(True, 'stopped', total_before, user_data.get('total_time', 0), session_time,
+                                user_data.get('pause_count', 0))
 
-    def pause_tracking(self, user_id: int, user_role_type: str = "normal") -> bool:
-        """Pausar seguimiento de tiempo para un usuario"""
+    def pause_tracking(self, user_id: int, user_role_type: str = "normal",
+                       max_pauses: Optional[int] = 3) -> TransitionResult:
+        """Pausar seguimiento de tiempo para un usuario (max_pauses None: las pausas no cuentan)"""
         user_id_str = str(user_id)
 
         if user_id_str not in self.data:
-            return False
+            return TransitionResult(False, 'not_found')
 
-        user_data = self.data[user_id_str]
+        user_data = self._user_record(user_id_str)
 
         if not user_data.get('is_active', False):
-            return False
-
-        # Lógica especial para usuarios Gold: NO contar pausas
-        if user_role_type == "gold":
-            # Para usuarios Gold: añadir tiempo de sesión actual al total
-            if user_data.get('last_start'):
-                session_start = datetime.fromisoformat(user_data['last_start'])
-                session_time = (datetime.now() - session_start).total_seconds()
-                user_data['total_time'] = user_data.get('total_time', 0) + session_time
+            return TransitionResult(False, 'not_active', user_data.get('total_time', 0),
+                                    user_data.get('total_time', 0))
+
+        total_before = self.get_total_time(user_id)
+        action = 'paused'
+        time_lost = 0.0
+        session_time = 0.0
+
+        # Niveles cuyas pausas no cuentan (max_pauses None en su regla)
+        if not max_pauses:
+            # Añadir tiempo de sesión actual al total
+            session_time = self._close_segment(user_id_str, user_data, 'pause', user_role_type)
+            user_data['total_time'] = user_data.get('total_time', 0) + session_time
 
-            # NO incrementar contador de pausas para Gold
-            user_data['pause_count'] = 0  # Siempre mantener en 0 para Gold
+            # NO incrementar contador de pausas
+            user_data['pause_count'] = 0
             
             # Marcar como pausado normalmente
             user_data['is_active'] = False
@@ -224,14 +613,12 @@ class TimeTracker:
             # Para usuarios normales: incrementar contador de pausas
             user_data['pause_count'] = user_data.get('pause_count', 0) + 1
 
-            if user_data['pause_count'] >= 3:
+            if user_data['pause_count'] >= max_pauses:
                 # Para usuarios normales: cancelar automáticamente
                 # Calcular tiempo perdido ANTES de modificar el total
                 current_total = user_data.get('total_time', 0)
-                session_time_lost = 0
-                if user_data.get('last_start'):
-                    session_start = datetime.fromisoformat(user_data['last_start'])
-                    session_time_lost = (datetime.now() - session_start).total_seconds()
+                # El tramo se trabajó (queda en el historial) pero no se acredita
+                session_time_lost = self._close_segment(user_id_str, user_data, 'auto_cancel', user_role_type)
                 
                 # Conservar solo las horas completas del tiempo total actual
                 hours_only = int(current_total // 3600) * 3600  # Solo horas completas en segundos
@@ -239,6 +626,8 @@ class TimeTracker:
                 
                 # Guardar información del tiempo perdido para notificación
                 user_data['time_lost_on_cancellation'] = session_time_lost
+                action = 'auto_cancelled'
+                time_lost = session_time_lost
                 
                 # Limpiar estado completamente - cancelación automática
                 user_data['is_active'] = False
@@ -252,30 +641,39 @@ class TimeTracker:
                     del user_data['pause_start']
             else:
                 # Comportamiento normal: añadir tiempo de sesión actual al total
-                if user_data.get('last_start'):
-                    session_start = datetime.fromisoformat(user_data['last_start'])
-                    session_time = (datetime.now() - session_start).total_seconds()
-                    user_data['total_time'] = user_data.get('total_time', 0) + session_time
+                session_time = self._close_segment(user_id_str, user_data, 'pause', user_role_type)
+                user_data['total_time'] = user_data.get('total_time', 0) + session_time
 
                 # Marcar como pausado normalmente
                 user_data['is_active'] = False
                 user_data['is_paused'] = True
                 user_data['pause_start'] = datetime.now().isoformat()
 
+        self.rollups.record(user_id_str, self._tier(user_data, user_role_type),
+                            pauses=1, cancellations=int(action == 'auto_cancelled'))
+
+        self.touch_user(user_id_str)
         self.save_data()
-        return True
+        total_after = self.get_total_time(user_id)
+        # En la cancelación automática el contador ya volvió a 0: informar la pausa que la causó
+        pause_count = max_pauses if action == 'auto_cancelled' else user_data.get('pause_count', 0)
+        return TransitionResult(True, action, total_before, total_after, max(total_after - total_before, 0.0),
+                                pause_count, time_lost)
 
-    def resume_tracking(self, user_id: int) -> bool:
+    def resume_tracking(self, user_id: int) -> TransitionResult:
         """Reanudar seguimiento de tiempo para un usuario pausado"""
         user_id_str = str(user_id)
 
         if user_id_str not in self.data:
-            return False
+            return TransitionResult(False, 'not_found')
 
-        user_data = self.data[user_id_str]
+        user_data = self._user_record(user_id_str)
 
         if not user_data.get('is_paused', False):
-            return False
+            return TransitionResult(False, 'not_paused', user_data.get('total_time', 0),
+                                    user_data.get('total_time', 0))
+
+        paused_duration = self.get_paused_duration(user_id)
 
         # Reanudar seguimiento
         user_data['is_active'] = True
@@ -285,9 +683,13 @@ class TimeTracker:
         # Limpiar pause_start
         if 'pause_start' in user_data:
             del user_data['pause_start']
+        self.rollups.record(user_id_str, self._tier(user_data), paused_seconds=paused_duration)
 
+        self.touch_user(user_id_str)
         self.save_data()
-        return True
+        total_time = user_data.get('total_time', 0)
+        return TransitionResult(True, 'resumed', total_time, total_time,
+                                pause_count=user_data.get('pause_count', 0), paused_duration=paused_duration)
 
     def get_total_time(self, user_id: int) -> float:
         """Obtener tiempo total acumulado de un usuario"""
@@ -296,7 +698,7 @@ class TimeTracker:
         if user_id_str not in self.data:
             return 0.0
 
-        user_data = self.data[user_id_str]
+        user_data = self._read_record(user_id_str)
         total_time = user_data.get('total_time', 0)
 
         # Si está activo, añadir tiempo de sesión actual
@@ -310,72 +712,66 @@ class TimeTracker:
     def get_user_data(self, user_id: int) -> Optional[Dict[str, Any]]:
         """Obtener datos completos de un usuario"""
         user_id_str = str(user_id)
-        return self.data.get(user_id_str)
+        return self._read_record(user_id_str)
 
     def get_all_tracked_users(self) -> Dict[str, Any]:
         """Obtener todos los usuarios con seguimiento"""
-        return self.data.copy()
+        return {user_id_str: self._read_record(user_id_str) for user_id_str in list(self.data)}
 
-    def reset_user_time(self, user_id: int) -> bool:
+    def reset_user_time(self, user_id: int) -> TransitionResult:
         """Reiniciar tiempo de un usuario a cero"""
         user_id_str = str(user_id)
 
         if user_id_str not in self.data:
-            return False
-
-        user_data = self.data[user_id_str]
-        user_data['total_time'] = 0
-        user_data['is_active'] = False
-        user_data['is_paused'] = False
-        user_data['pause_count'] = 0
-        user_data['sessions'] = []
-        user_data['notified_milestones'] = []
-        user_data['milestone_completed'] = False
-        user_data['is_pre_registered'] = False
+            return TransitionResult(False, 'not_found')
 
-        # Limpiar campos de seguimiento
-        if 'last_start' in user_data:
-            del user_data['last_start']
-        if 'pause_start' in user_data:
-            del user_data['pause_start']
-        if 'pre_register_time' in user_data:
-            del user_data['pre_register_time']
+        total_before = self.get_total_time(user_id)
+        user_data = self._user_record(user_id_str)
+        self._zero_record(user_data)
+        self.sessions.reset_user(user_id_str)
 
+        self.touch_user(user_id_str)
         self.save_data()
-        return True
+        return TransitionResult(True, 'reset', total_before, 0.0, time_lost=total_before)
 
     def reset_all_user_times(self) -> int:
-        """Reiniciar todos los tiempos de usuarios"""
-        count = 0
-        for user_id_str in list(self.data.keys()):
-            user_id = int(user_id_str)
-            if self.reset_user_time(user_id):
-                count += 1
+        """Reiniciar todos los tiempos de usuarios: se cierra el periodo y cada registro se reinicia al usarlo"""
+        count = len(self.data)
+        if count:
+            self._close_period('reset')
         return count
 
-    def cancel_user_tracking(self, user_id: int) -> bool:
+    def cancel_user_tracking(self, user_id: int) -> TransitionResult:
         """Cancelar completamente el seguimiento de un usuario"""
         user_id_str = str(user_id)
 
         if user_id_str not in self.data:
-            return False
+            return TransitionResult(False, 'not_found')
+
+        total_before = self.get_total_time(user_id)
+        self.rollups.record(user_id_str, self._tier(self._user_record(user_id_str)), cancellations=1)
 
         # Eliminar completamente al usuario
         del self.data[user_id_str]
+        self.sessions.reset_user(user_id_str)
+        self._unindex_user(user_id_str)
+        self.touch_user(user_id_str)
         self.save_data()
-        return True
+        return TransitionResult(True, 'cancelled', total_before, 0.0, time_lost=total_before)
 
-    def cancel_user_tracking_keep_hours(self, user_id: int) -> bool:
+    def cancel_user_tracking_keep_hours(self, user_id: int) -> TransitionResult:
         """Cancelar seguimiento conservando solo las horas completas"""
         user_id_str = str(user_id)
 
         if user_id_str not in self.data:
-            return False
+            return TransitionResult(False, 'not_found')
 
-        user_data = self.data[user_id_str]
+        user_data = self._user_record(user_id_str)
         
-        # Obtener tiempo total actual
+        # Obtener tiempo total actual y cerrar el tramo en curso (queda en el historial)
         total_time = self.get_total_time(user_id)
+        if user_data.get('is_active', False):
+            self._close_segment(user_id_str, user_data, 'cancel')
         
         # Calcular solo las horas completas
         total_hours = int(total_time // 3600)
@@ -394,56 +790,169 @@ class TimeTracker:
             del user_data['last_start']
         if 'pause_start' in user_data:
             del user_data['pause_start']
-            
+        self.rollups.record(user_id_str, self._tier(user_data), cancellations=1)
+
+        self.touch_user(user_id_str)
         self.save_data()
-        return True
+        return TransitionResult(True, 'cancelled', total_time, hours_only, time_lost=total_time - hours_only)
 
     def clear_all_data(self) -> bool:
         """Limpiar completamente todos los datos"""
         try:
+            # El periodo cerrado conserva el diccionario anterior tal cual
+            self._close_period('clear')
             self.data = {}
+            self._unsaved_users.clear()
+            self._rebuild_name_index()
+            self.writer.replace(self.data_file, {})
             self.save_data()
             return True
         except Exception as e:
             print(f"Error limpiando datos: {e}")
             return False
 
-    def add_minutes(self, user_id: int, user_name: str, minutes: int) -> bool:
+    def add_minutes(self, user_id: int, user_name: str, minutes: int) -> TransitionResult:
         """Añadir minutos al tiempo de un usuario (solo si ya existe)"""
         user_id_str = str(user_id)
 
         # Solo permitir si el usuario ya existe
         if user_id_str not in self.data:
-            return False
+            return TransitionResult(False, 'not_found')
 
-        user_data = self.data[user_id_str]
+        total_before = self.get_total_time(user_id)
+        user_data = self._user_record(user_id_str)
         user_data['total_time'] = user_data.get('total_time', 0) + (minutes * 60)
         user_data['name'] = user_name  # Actualizar nombre
+        self._index_user(user_id_str)
 
+        self.touch_user(user_id_str)
         self.save_data()
-        return True
+        return TransitionResult(True, 'added', total_before, self.get_total_time(user_id))
 
-    def subtract_minutes(self, user_id: int, minutes: int) -> bool:
+    def subtract_minutes(self, user_id: int, minutes: int) -> TransitionResult:
         """Restar minutos del tiempo de un usuario"""
         user_id_str = str(user_id)
 
         if user_id_str not in self.data:
-            return False
+            return TransitionResult(False, 'not_found')
 
-        user_data = self.data[user_id_str]
+        total_before = self.get_total_time(user_id)
+        user_data = self._user_record(user_id_str)
         current_time = user_data.get('total_time', 0)
         new_time = max(0, current_time - (minutes * 60))
         user_data['total_time'] = new_time
 
+        self.touch_user(user_id_str)
         self.save_data()
-        return True
+        return TransitionResult(True, 'subtracted', total_before, self.get_total_time(user_id))
+
+    def mark_milestone(self, user_id: int, milestone_seconds: int, completed: bool = False,
+                       credits: int = 0, role_type: str = "normal") -> TransitionResult:
+        """Registrar un milestone notificado (y opcionalmente el tiempo como completado)
+
+        Los créditos se anotan en el libro solo la primera vez que se marca el milestone;
+        las siguientes devuelven 'already_notified' para no repetir la notificación.
+        """
+        user_id_str = str(user_id)
+
+        if user_id_str not in self.data:
+            return TransitionResult(False, 'not_found')
+
+        user_data = self._user_record(user_id_str)
+        total_time = self.get_total_time(user_id)
+        notified_milestones = user_data.setdefault('notified_milestones', [])
+        if milestone_seconds in notified_milestones and (not completed or user_data.get('milestone_completed')):
+            return TransitionResult(False, 'already_notified', total_time, total_time)
+        if milestone_seconds not in notified_milestones:
+            notified_milestones.append(milestone_seconds)
+            self.credits.earn(user_id_str, user_data.get('name', ''), credits, milestone_seconds,
+                              role_type, self.period)
+            self.rollups.record(user_id_str, self._tier(user_data, role_type), credits=credits)
+        if completed:
+            user_data['milestone_completed'] = True
+
+        self.touch_user(user_id_str)
+        self.save_data()
+        return TransitionResult(True, 'milestone', total_time, total_time)
+
+    def finish_time_limit(self, user_id: int, limit_seconds: int, credits: int = 0,
+                          role_type: str = "normal") -> TransitionResult:
+        """Detener a un usuario activo que llegó al límite de su nivel y marcarlo como completado"""
+        user_id_str = str(user_id)
+
+        if user_id_str not in self.data:
+            return TransitionResult(False, 'not_found')
+
+        user_data = self._user_record(user_id_str)
+        total_time = self.get_total_time(user_id)
+        if not user_data.get('is_active', False):
+            return TransitionResult(False, 'not_active', total_time, total_time)
+        if total_time < limit_seconds or limit_seconds in user_data.get('notified_milestones', []):
+            return TransitionResult(False, 'below_limit', total_time, total_time)
+
+        with self.batch():
+            result = self.stop_tracking(user_id, role_type)
+            self.mark_milestone(user_id, limit_seconds, completed=True, credits=credits, role_type=role_type)
+        result.action = 'limit_finished'
+        return result
+
+    def mark_credits_paid(self, user_id: int, paid_by: str) -> int:
+        """Marcar como pagados los créditos pendientes de un usuario"""
+        return self.credits.mark_paid(user_id, paid_by)
+
+    def get_credit_balance(self, user_id: int) -> Optional[Dict[str, Any]]:
+        """Créditos ganados, pagados y pendientes de un usuario"""
+        return self.credits.balance(user_id)
+
+    def get_owed_credits(self) -> List[Dict[str, Any]]:
+        """Usuarios con créditos pendientes de pago"""
+        return self.credits.owed_report()
+
+    def _session_index(self):
+        closed = [entry['sessions'] for entry in self.period_history if entry.get('sessions')]
+        return self.sessions.load_index(closed)
+
+    def get_session_stats(self, user_id: int, since: Optional[float] = None,
+                          until: Optional[float] = None) -> Dict[str, Any]:
+        """Cantidad, tiempo total y sesión más larga de un usuario entre dos fechas (timestamps)"""
+        return self._session_index().stats(user_id, since, until)
+
+    def get_sessions(self, user_id: int, since: Optional[float] = None, until: Optional[float] = None,
+                     offset: int = 0, limit: int = 10) -> List[Dict[str, Any]]:
+        """Sesiones de un usuario entre dos fechas, de la más reciente a la más antigua"""
+        return self._session_index().sessions(user_id, since, until, offset, limit)
+
+    def get_rollup(self, kind: str, day: Optional[str] = None) -> Optional[Dict[str, Any]]:
+        """Fila de resumen 'day' o 'week' que contiene esa fecha (YYYY-MM-DD; hoy si no se indica)"""
+        when = date.fromisoformat(day) if day else date.today()
+        return self.rollups.week(when) if kind == 'week' else self.rollups.day(when)
+
+    async def rebuild_rollups(self) -> int:
+        """Recalcular los resúmenes desde el historial de sesiones (todos los periodos) y el libro de créditos
+
+        El corte se toma en el event loop; el historial se lee en un hilo y lo que
+        ocurra mientras tanto se vuelve a sumar al instalar el resultado.
+        """
+        self.sessions.sync()
+        sources = self.rollups.begin_rebuild(RebuildSources(
+            [entry['sessions'] for entry in self.period_history if entry.get('sessions')],
+            self.sessions.path,
+            self.credits.path,
+            {user_id_str: user_data.get('tier', 'normal') for user_id_str, user_data in self.data.items()}
+        ))
+        rebuilt = None
+        try:
+            rebuilt = await asyncio.to_thread(Rollups.build, sources)
+        finally:
+            rows = self.rollups.finish_rebuild(rebuilt)
+        return rows
 
     def get_pause_count(self, user_id: int) -> int:
         """Obtener número de pausas de un usuario"""
         user_id_str = str(user_id)
         if user_id_str not in self.data:
             return 0
-        return self.data[user_id_str].get('pause_count', 0)
+        return self._read_record(user_id_str).get('pause_count', 0)
 
     def get_paused_duration(self, user_id: int) -> float:
         """Obtener duración pausada actual de un usuario"""
@@ -452,7 +961,7 @@ class TimeTracker:
         if user_id_str not in self.data:
             return 0.0
 
-        user_data = self.data[user_id_str]
+        user_data = self._read_record(user_id_str)
 
         if not user_data.get('is_paused', False) or not user_data.get('pause_start'):
             return 0.0
@@ -460,7 +969,8 @@ class TimeTracker:
         pause_start = datetime.fromisoformat(user_data['pause_start'])
         return (datetime.now() - pause_start).total_seconds()
 
-    def format_time_human(self, seconds: float) -> str:
+    @staticmethod
+    def format_time_human(seconds: float) -> str:
         """Formatear tiempo en formato humano legible"""
         if seconds < 0:
             return "0 Segundos"
@@ -484,17 +994,103 @@ class TimeTracker:
         try:
             if os.path.exists(self.attendance_file):
                 with open(self.attendance_file, 'r', encoding='utf-8') as f:
-                    return json.load(f)
+                    attendance_data = json.load(f)
+                for admin_data in attendance_data.values():
+                    self._migrate_attendance_record(admin_data)
+                return attendance_data
             return {}
         except Exception as e:
             print(f"Error cargando datos de asistencias: {e}")
             return {}
 
-    def save_attendance_data(self) -> None:
-        """Guardar datos de asistencias al archivo JSON"""
+    @staticmethod
+    def _new_attendance_record(name: str) -> Dict[str, Any]:
+        """Registro de asistencias: últimos días en anillo, contador semanal y archivo mensual"""
+        return {
+            'name': name,
+            # recent_days[ordinal % ATTENDANCE_RING_DAYS] = [ordinal del día, asistencias]
+            'recent_days': [[0, 0] for _ in range(ATTENDANCE_RING_DAYS)],
+            # [ordinal del lunes, asistencias de lunes a viernes de esa semana]
+            'week': [0, 0],
+            'monthly': {},
+            'total_attendance': 0,
+            # Asistencias manuales de la semana cuyo lunes es manual_week (caducan solas)
+            'manual_weekly_attendance': 0,
+            'manual_week': 0
+        }
+
+    def _migrate_attendance_record(self, admin_data: Dict[str, Any]) -> None:
+        """Pasar el formato antiguo (daily_attendance con una clave por día) al anillo"""
+        admin_data.setdefault('recent_days', [[0, 0] for _ in range(ATTENDANCE_RING_DAYS)])
+        admin_data.setdefault('week', [0, 0])
+        admin_data.setdefault('monthly', {})
+        if 'manual_week' not in admin_data:
+            # Sin sello no se sabe de qué semana son: se conservan para la semana actual
+            admin_data['manual_week'] = self._week_stamp(date.today())
+        admin_data.pop('transferred_today', None)
+        transfer_date = admin_data.pop('transfer_date', None)
+        if transfer_date:
+            try:
+                admin_data['transfer_day'] = date.fromisoformat(transfer_date).toordinal()
+            except ValueError:
+                pass
+        daily_attendance = admin_data.pop('daily_attendance', None) or {}
+        for day_str in sorted(daily_attendance):
+            try:
+                day = date.fromisoformat(day_str)
+            except ValueError:
+                continue
+            self._add_day_attendance(admin_data, day, daily_attendance[day_str])
+
+    @staticmethod
+    def _week_stamp(day: date) -> int:
+        """Sello de la semana de day: ordinal de su lunes"""
+        return day.toordinal() - day.weekday()
+
+    @classmethod
+    def _manual_weekly_attendance(cls, admin_data: Dict[str, Any], day: date) -> int:
+        """Asistencias manuales de la semana de day (0 si son de otra semana)"""
+        if admin_data.get('manual_week') != cls._week_stamp(day):
+            return 0
+        return admin_data.get('manual_weekly_attendance', 0)
+
+    @staticmethod
+    def _day_attendance(admin_data: Dict[str, Any], day: date) -> int:
+        ordinal = day.toordinal()
+        slot = admin_data['recent_days'][ordinal % ATTENDANCE_RING_DAYS]
+        return slot[1] if slot[0] == ordinal else 0
+
+    @staticmethod
+    def _week_attendance(admin_data: Dict[str, Any], day: date) -> int:
+        """Asistencias diarias de lunes a viernes de la semana de day"""
+        week = admin_data['week']
+        return week[1] if week[0] == TimeTracker._week_stamp(day) else 0
+
+    @staticmethod
+    def _add_day_attendance(admin_data: Dict[str, Any], day: date, quantity: int) -> None:
+        """Sumar (o restar) asistencias de un día; el día que sale del anillo pasa al archivo mensual"""
+        ordinal = day.toordinal()
+        slot = admin_data['recent_days'][ordinal % ATTENDANCE_RING_DAYS]
+        if slot[0] != ordinal:
+            if slot[1]:
+                month = date.fromordinal(slot[0]).strftime("%Y-%m")
+                admin_data['monthly'][month] = admin_data['monthly'].get(month, 0) + slot[1]
+            slot[0], slot[1] = ordinal, 0
+        slot[1] += quantity
+
+        # Solo cuentan para la semana los días de lunes a viernes
+        if day.weekday() < 5:
+            week = admin_data['week']
+            monday = TimeTracker._week_stamp(day)
+            if week[0] != monday:
+                week[0], week[1] = monday, 0
+            week[1] += quantity
+
+    def save_attendance_data(self, *admin_ids: str) -> None:
+        """Encolar para guardar los registros de asistencias de los admins indicados (sin IDs: todos)"""
         try:
-            with open(self.attendance_file, 'w', encoding='utf-8') as f:
-                json.dump(self.attendance_data, f, indent=2, ensure_ascii=False)
+            for admin_id_str in admin_ids or list(self.attendance_data):
+                self.writer.put_record(self.attendance_file, admin_id_str, self.attendance_data.get(admin_id_str))
         except Exception as e:
             print(f"Error guardando datos de asistencias: {e}")
 
@@ -508,30 +1104,27 @@ class TimeTracker:
         
         # Inicializar datos del admin si no existen
         if admin_id_str not in self.attendance_data:
-            self.attendance_data[admin_id_str] = {
-                'name': admin_name,
-                'daily_attendance': {},
-                'total_attendance': 0,
-                'manual_weekly_attendance': 0  # Nuevo campo para asistencias manuales semanales
-            }
+            self.attendance_data[admin_id_str] = self._new_attendance_record(admin_name)
         
         admin_data = self.attendance_data[admin_id_str]
         admin_data['name'] = admin_name  # Actualizar nombre
         
-        # Inicializar campo manual semanal si no existe
-        if 'manual_weekly_attendance' not in admin_data:
+        # Empezar de cero si el contador manual es de otra semana
+        week = self._week_stamp(date.today())
+        if admin_data.get('manual_week') != week:
+            admin_data['manual_week'] = week
             admin_data['manual_weekly_attendance'] = 0
         
         # Solo agregar al total y al contador semanal manual (NO al diario)
         admin_data['manual_weekly_attendance'] += quantity
         admin_data['total_attendance'] = admin_data.get('total_attendance', 0) + quantity
-        self.save_attendance_data()
+        self.save_attendance_data(admin_id_str)
         return True
 
     def add_daily_manual_attendance(self, admin_id: int, admin_name: str, quantity: int) -> bool:
         """Agregar asistencias diarias manualmente (para comando /agregar_asistencias_diarias) - máximo 3 por día"""
         admin_id_str = str(admin_id)
-        today = datetime.now().strftime("%Y-%m-%d")
+        today = date.today()
         
         # Verificar que la cantidad esté entre 1 y 3
         if quantity < 1 or quantity > 3:
@@ -539,40 +1132,26 @@ class TimeTracker:
         
         # Inicializar datos del admin si no existen
         if admin_id_str not in self.attendance_data:
-            self.attendance_data[admin_id_str] = {
-                'name': admin_name,
-                'daily_attendance': {},
-                'total_attendance': 0,
-                'manual_weekly_attendance': 0
-            }
+            self.attendance_data[admin_id_str] = self._new_attendance_record(admin_name)
         
         admin_data = self.attendance_data[admin_id_str]
         admin_data['name'] = admin_name  # Actualizar nombre
         
-        # Inicializar día si no existe
-        if today not in admin_data['daily_attendance']:
-            admin_data['daily_attendance'][today] = 0
-        
         # Verificar que no exceda 3 asistencias diarias
-        if admin_data['daily_attendance'][today] + quantity > 3:
+        if self._day_attendance(admin_data, today) + quantity > 3:
             return False
         
         # SOLO agregar a diarias y totales
-        # NO agregar a manual_weekly_attendance porque get_weekly_attendance ya cuenta las diarias
-        admin_data['daily_attendance'][today] += quantity
+        # NO agregar a manual_weekly_attendance porque el contador semanal ya cuenta las diarias
+        self._add_day_attendance(admin_data, today, quantity)
         admin_data['total_attendance'] = admin_data.get('total_attendance', 0) + quantity
-        
-        # Inicializar campo manual semanal si no existe (pero no sumar aquí)
-        if 'manual_weekly_attendance' not in admin_data:
-            admin_data['manual_weekly_attendance'] = 0
-        
-        self.save_attendance_data()
+        self.save_attendance_data(admin_id_str)
         return True
 
     def add_attendance(self, admin_id: int, admin_name: str, attendances_to_add: int = 1) -> bool:
         """Agregar asistencia para un administrador (por defecto 1 asistencia)"""
         admin_id_str = str(admin_id)
-        today = datetime.now().strftime("%Y-%m-%d")
+        today = date.today()
         
         # Verificar si puede recibir asistencias diarias (no ha transferido hoy)
         if not self.can_receive_daily_attendance(admin_id):
@@ -580,40 +1159,33 @@ class TimeTracker:
         
         # Inicializar datos del admin si no existen
         if admin_id_str not in self.attendance_data:
-            self.attendance_data[admin_id_str] = {
-                'name': admin_name,
-                'daily_attendance': {},
-                'total_attendance': 0
-            }
+            self.attendance_data[admin_id_str] = self._new_attendance_record(admin_name)
         
         admin_data = self.attendance_data[admin_id_str]
         admin_data['name'] = admin_name  # Actualizar nombre
-        
-        # Inicializar día si no existe
-        if today not in admin_data['daily_attendance']:
-            admin_data['daily_attendance'][today] = 0
+        daily_count = self._day_attendance(admin_data, today)
         
         # Verificar límite diario (máximo 3 por día)
-        if admin_data['daily_attendance'][today] >= 3:
+        if daily_count >= 3:
             return False
         
         # Verificar límite semanal (máximo 15 por semana)
-        weekly_count = self.get_weekly_attendance(admin_id)
+        weekly_count = self._week_attendance(admin_data, today) + self._manual_weekly_attendance(admin_data, today)
         if weekly_count >= 15:
             return False
         
         # Verificar que no exceda el límite diario
-        if admin_data['daily_attendance'][today] + attendances_to_add > 3:
-            attendances_to_add = 3 - admin_data['daily_attendance'][today]
+        if daily_count + attendances_to_add > 3:
+            attendances_to_add = 3 - daily_count
         
         # Verificar que no exceda el límite semanal
         if weekly_count + attendances_to_add > 15:
             attendances_to_add = 15 - weekly_count
         
         if attendances_to_add > 0:
-            admin_data['daily_attendance'][today] += attendances_to_add
+            self._add_day_attendance(admin_data, today, attendances_to_add)
             admin_data['total_attendance'] = admin_data.get('total_attendance', 0) + attendances_to_add
-            self.save_attendance_data()
+            self.save_attendance_data(admin_id_str)
             return True
         
         return False
@@ -621,12 +1193,11 @@ class TimeTracker:
     def get_daily_attendance(self, admin_id: int) -> int:
         """Obtener asistencias del día actual"""
         admin_id_str = str(admin_id)
-        today = datetime.now().strftime("%Y-%m-%d")
         
         if admin_id_str not in self.attendance_data:
             return 0
         
-        return self.attendance_data[admin_id_str]['daily_attendance'].get(today, 0)
+        return self._day_attendance(self.attendance_data[admin_id_str], date.today())
 
     def get_weekly_attendance(self, admin_id: int) -> int:
         """Obtener asistencias de la semana actual"""
@@ -637,17 +1208,12 @@ class TimeTracker:
         
         admin_data = self.attendance_data[admin_id_str]
         
-        # Calcular fechas de la semana actual (lunes a viernes)
-        today = datetime.now()
-        start_of_week = today - timedelta(days=today.weekday())
-        
-        weekly_count = 0
-        for i in range(5):  # Solo 5 días: lunes a viernes
-            date = (start_of_week + timedelta(days=i)).strftime("%Y-%m-%d")
-            weekly_count += admin_data['daily_attendance'].get(date, 0)
+        # Asistencias diarias de lunes a viernes de la semana actual
+        today = date.today()
+        weekly_count = self._week_attendance(admin_data, today)
         
         # Agregar asistencias manuales semanales
-        weekly_count += admin_data.get('manual_weekly_attendance', 0)
+        weekly_count += self._manual_weekly_attendance(admin_data, today)
         
         return weekly_count
 
@@ -672,49 +1238,46 @@ class TimeTracker:
         """Registrar quién inició el tiempo para un usuario"""
         user_id_str = str(user_id)
         if user_id_str in self.data:
-            self.data[user_id_str]['time_initiator'] = {
+            self._user_record(user_id_str)['time_initiator'] = {
                 'admin_id': admin_id,
                 'admin_name': admin_name,
                 'timestamp': datetime.now().isoformat()
             }
+            self.touch_user(user_id_str)
             self.save_data()
 
     def get_time_initiator(self, user_id: int) -> Optional[Dict[str, Any]]:
         """Obtener información de quién inició el tiempo para un usuario"""
         user_id_str = str(user_id)
         if user_id_str in self.data:
-            return self.data[user_id_str].get('time_initiator')
+            return self._read_record(user_id_str).get('time_initiator')
         return None
 
     def clear_time_initiator(self, user_id: int) -> None:
         """Limpiar información del iniciador del tiempo"""
         user_id_str = str(user_id)
-        if user_id_str in self.data and 'time_initiator' in self.data[user_id_str]:
-            del self.data[user_id_str]['time_initiator']
+        if user_id_str in self.data and 'time_initiator' in self._read_record(user_id_str):
+            del self._user_record(user_id_str)['time_initiator']
+            self.touch_user(user_id_str)
             self.save_data()
 
     def reset_weekly_manual_attendances(self) -> None:
-        """Resetear solo las asistencias manuales semanales (para nueva semana)"""
+        """Resetear las asistencias manuales semanales ya (al empezar la semana caducan solas)"""
         for admin_id_str in self.attendance_data:
             self.attendance_data[admin_id_str]['manual_weekly_attendance'] = 0
         self.save_attendance_data()
 
     def reset_daily_transfer_blocks(self) -> None:
-        """Resetear bloqueos de transferencia diarios (para nuevo día a las 00:00)"""
+        """Quitar ya los bloqueos de transferencia de hoy (al cambiar de día caducan solos)"""
         for admin_id_str in self.attendance_data:
-            admin_data = self.attendance_data[admin_id_str]
-            # Limpiar marcadores de transferencia del día anterior
-            if 'transferred_today' in admin_data:
-                del admin_data['transferred_today']
-            if 'transfer_date' in admin_data:
-                del admin_data['transfer_date']
+            self.attendance_data[admin_id_str].pop('transfer_day', None)
         self.save_attendance_data()
 
     def transfer_attendances(self, from_user_id: int, to_user_id: int, to_user_name: str, quantity: int) -> bool:
         """Transferir asistencias de un usuario a otro - CEDE asistencias diarias del día actual"""
         from_user_id_str = str(from_user_id)
         to_user_id_str = str(to_user_id)
-        today = datetime.now().strftime("%Y-%m-%d")
+        today = date.today()
         
         # Verificar que el transferidor tenga datos
         if from_user_id_str not in self.attendance_data:
@@ -733,74 +1296,52 @@ class TimeTracker:
         
         # Inicializar datos del receptor si no existen
         if to_user_id_str not in self.attendance_data:
-            self.attendance_data[to_user_id_str] = {
-                'name': to_user_name,
-                'daily_attendance': {},
-                'total_attendance': 0,
-                'manual_weekly_attendance': 0
-            }
+            self.attendance_data[to_user_id_str] = self._new_attendance_record(to_user_name)
         
         to_user_data = self.attendance_data[to_user_id_str]
         to_user_data['name'] = to_user_name  # Actualizar nombre
         
-        # Inicializar día del receptor si no existe
-        if today not in to_user_data['daily_attendance']:
-            to_user_data['daily_attendance'][today] = 0
-        
         # Verificar límites del receptor
-        if to_user_data['daily_attendance'][today] + quantity > 3:
+        if self._day_attendance(to_user_data, today) + quantity > 3:
             return False
         
-        to_weekly_count = self.get_weekly_attendance(to_user_id)
+        to_weekly_count = self._week_attendance(to_user_data, today) + self._manual_weekly_attendance(to_user_data, today)
         if to_weekly_count + quantity > 15:
             return False
         
         # LÓGICA CORRECTA FINAL:
         # 1. Restar del transferidor (diarias, semanales Y totales - es la misma asistencia)
-        from_user_data['daily_attendance'][today] -= quantity
+        self._add_day_attendance(from_user_data, today, -quantity)
         from_user_data['total_attendance'] = max(0, from_user_data.get('total_attendance', 0) - quantity)
         
         # 2. Agregar al receptor (diario y total solamente)
         # NO agregar a manual_weekly_attendance porque son asistencias diarias transferidas
-        # que ya se contarán automáticamente en get_weekly_attendance()
-        to_user_data['daily_attendance'][today] += quantity
-        
-        # Inicializar manual_weekly_attendance si no existe (pero no sumar aquí)
-        if 'manual_weekly_attendance' not in to_user_data:
-            to_user_data['manual_weekly_attendance'] = 0
+        # que ya se cuentan en el contador semanal
+        self._add_day_attendance(to_user_data, today, quantity)
         
         to_user_data['total_attendance'] = to_user_data.get('total_attendance', 0) + quantity
         
         # 3. Marcar al transferidor como "no puede obtener más asistencias hoy"
-        from_user_data['transferred_today'] = True
-        from_user_data['transfer_date'] = today
+        from_user_data['transfer_day'] = today.toordinal()
         
-        self.save_attendance_data()
+        self.save_attendance_data(from_user_id_str, to_user_id_str)
         return True
 
     def can_receive_daily_attendance(self, user_id: int) -> bool:
         """Verificar si un usuario puede recibir asistencias diarias (no ha transferido hoy)"""
         user_id_str = str(user_id)
-        today = datetime.now().strftime("%Y-%m-%d")
         
         if user_id_str not in self.attendance_data:
             return True
         
-        user_data = self.attendance_data[user_id_str]
-        
-        # Verificar si transfirió hoy
-        if user_data.get('transferred_today', False):
-            transfer_date = user_data.get('transfer_date', '')
-            if transfer_date == today:
-                return False
-        
-        return True
+        # El bloqueo solo vale el día en que se transfirió
+        return self.attendance_data[user_id_str].get('transfer_day') != date.today().toordinal()
 
     def reset_all_attendances(self) -> bool:
         """Resetear completamente todas las asistencias de todos los usuarios"""
         try:
             self.attendance_data = {}
-            self.save_attendance_data()
+            self.writer.replace(self.attendance_file, {})
             return True
         except Exception as e:
             print(f"Error reseteando asistencias: {e}")
@@ -810,23 +1351,154 @@ class TimeTracker:
         """Registrar quién hizo el pre-registro para un usuario"""
         user_id_str = str(user_id)
         if user_id_str in self.data:
-            self.data[user_id_str]['pre_register_initiator'] = {
+            self._user_record(user_id_str)['pre_register_initiator'] = {
                 'admin_id': admin_id,
                 'admin_name': admin_name,
                 'timestamp': datetime.now().isoformat()
             }
+            self.touch_user(user_id_str)
             self.save_data()
 
     def get_pre_register_initiator(self, user_id: int) -> Optional[Dict[str, Any]]:
         """Obtener información de quién hizo el pre-registro para un usuario"""
         user_id_str = str(user_id)
         if user_id_str in self.data:
-            return self.data[user_id_str].get('pre_register_initiator')
+            return self._read_record(user_id_str).get('pre_register_initiator')
         return None
 
     def clear_pre_register_initiator(self, user_id: int) -> None:
         """Limpiar información del admin que hizo el pre-registro"""
         user_id_str = str(user_id)
-        if user_id_str in self.data and 'pre_register_initiator' in self.data[user_id_str]:
-            del self.data[user_id_str]['pre_register_initiator']
+        if user_id_str in self.data and 'pre_register_initiator' in self._read_record(user_id_str):
+            del self._user_record(user_id_str)['pre_register_initiator']
+            self.touch_user(user_id_str)
             self.save_data()
+
+
+class GuildTrackers:
+    """Particiones del tracker por servidor: cada una con sus datos, índices y archivos.
+
+    El servidor principal conserva los archivos originales (user_times.json y
+    attendance_data.json); los demás guardan en data_dir/guild_<id>/.
+    """
+
+    def __init__(self, primary_guild_id: Optional[int] = None, data_dir: str = "guild_data",
+                 state_file: str = "guild_partitions.json"):
+        self.data_dir = data_dir
+        self.state_file = state_file
+        self.primary_guild_id = primary_guild_id or self._load_primary_guild_id()
+        self._trackers: Dict[Optional[int], TimeTracker] = {}
+        # La carga inicial corre en un hilo mientras el bot se conecta
+        self._lock = threading.Lock()
+        self._ready: Optional[asyncio.Event] = None
+
+    def _load_primary_guild_id(self) -> Optional[int]:
+        """Leer el servidor principal guardado en una ejecución anterior"""
+        try:
+            if os.path.exists(self.state_file):
+                with open(self.state_file, 'r', encoding='utf-8') as f:
+                    return json.load(f).get('primary_guild_id')
+        except Exception as e:
+            print(f"Error cargando particiones de servidores: {e}")
+        return None
+
+    def adopt_primary(self, guild_id: int) -> None:
+        """Fijar el servidor dueño de los archivos originales si aún no hay uno"""
+        if self.primary_guild_id is not None:
+            return
+        self.primary_guild_id = guild_id
+        # Los datos cargados antes de conocer el servidor principal son los suyos
+        if None in self._trackers:
+            self._trackers[guild_id] = self._trackers.pop(None)
+        try:
+            with open(self.state_file, 'w', encoding='utf-8') as f:
+                json.dump({'primary_guild_id': guild_id}, f, indent=2)
+        except Exception as e:
+            print(f"Error guardando particiones de servidores: {e}")
+
+    def _paths_for(self, guild_id: Optional[int]) -> Tuple[str, str]:
+        if guild_id is None or guild_id == self.primary_guild_id:
+            return "user_times.json", "attendance_data.json"
+        guild_dir = os.path.join(self.data_dir, f"guild_{guild_id}")
+        os.makedirs(guild_dir, exist_ok=True)
+        return os.path.join(guild_dir, "user_times.json"), os.path.join(guild_dir, "attendance_data.json")
+
+    def for_guild(self, guild) -> TimeTracker:
+        """Tracker de un servidor (acepta el objeto del servidor, su ID o None)"""
+        guild_id = getattr(guild, 'id', guild)
+        if guild_id is None:
+            guild_id = self.primary_guild_id
+
+        tracker = self._trackers.get(guild_id)
+        if tracker is None:
+            with self._lock:
+                tracker = self._trackers.get(guild_id)
+                if tracker is None:
+                    data_file, attendance_file = self._paths_for(guild_id)
+                    tracker = TimeTracker(data_file, attendance_file)
+                    self._trackers[guild_id] = tracker
+        return tracker
+
+    def loaded(self) -> List[Tuple[Optional[int], TimeTracker]]:
+        """Particiones ya cargadas en memoria"""
+        return list(self._trackers.items())
+
+    def known_guild_ids(self) -> List[Optional[int]]:
+        """Servidores con datos en disco: el principal y cada carpeta guild_<id>"""
+        guild_ids: List[Optional[int]] = [self.primary_guild_id]
+        try:
+            for name in sorted(os.listdir(self.data_dir)):
+                match = re.fullmatch(r"guild_(\d+)", name)
+                if match and int(match.group(1)) != self.primary_guild_id:
+                    guild_ids.append(int(match.group(1)))
+        except OSError:
+            pass
+        return guild_ids
+
+    async def preload(self) -> None:
+        """Cargar en segundo plano las particiones conocidas y marcar los datos como listos"""
+        ready = self._ready_event()
+        try:
+            await self.load_guilds(self.known_guild_ids())
+            total_users = sum(len(tracker.data) for tracker in self._trackers.values())
+            print(f"✅ Datos cargados: {len(self._trackers)} partición(es), {total_users} usuarios")
+        except Exception as e:
+            print(f"❌ Error cargando datos en segundo plano: {e}")
+        finally:
+            ready.set()
+
+    async def load_guilds(self, guild_ids) -> None:
+        """Cargar en un hilo las particiones que todavía no están en memoria"""
+        for guild_id in guild_ids:
+            if guild_id is None:
+                guild_id = self.primary_guild_id
+            if guild_id not in self._trackers:
+                await asyncio.to_thread(self.for_guild, guild_id)
+
+    async def claim_primary(self, guild_id: int) -> None:
+        """adopt_primary() sin escribir el archivo de particiones en el event loop"""
+        await asyncio.to_thread(self.adopt_primary, guild_id)
+
+    def _ready_event(self) -> asyncio.Event:
+        if self._ready is None:
+            self._ready = asyncio.Event()
+        return self._ready
+
+    def is_ready(self) -> bool:
+        """True cuando terminó la carga inicial (False si todavía no empezó)"""
+        return self._ready is not None and self._ready.is_set()
+
+    async def wait_ready(self, timeout: Optional[float] = None, guild=None) -> bool:
+        """Esperar a que termine la carga inicial y a la partición del servidor indicado (True si ya están)"""
+        if self.is_ready() and (guild is None or getattr(guild, 'id', guild) in self._trackers):
+            return True
+        try:
+            await asyncio.wait_for(self._wait_loaded(guild), timeout)
+            return True
+        except asyncio.TimeoutError:
+            return False
+
+    async def _wait_loaded(self, guild) -> None:
+        await self._ready_event().wait()
+        if guild is not None:
+            await self.load_guilds([getattr(guild, 'id', guild)])
@@ -0,0 +1,677 @@
+"""
+Proceso worker del tracker.
+
+En el modo de dos procesos, este worker es el dueño de los datos de tiempo
+(GuildTrackers), guarda los archivos JSON (con el hilo escritor) y ejecuta el inicio y la detención
+automáticos. El proceso del gateway (bot.py) le habla por un socket Unix local
+con mensajes JSON de una línea:
+
+    {"id": 1, "guild": 123, "method": "stop_tracking", "args": [456], "kwargs": {}}
+    {"id": 1, "result": true, "changes": {...}}
+
+El gateway mantiene una réplica en memoria (RemoteTracker): las lecturas son
+locales y las modificaciones viajan al worker, que responde con los registros
+que cambiaron. Las réplicas se piden con await y se llenan en segundo plano. Desde el event loop se usa await tracker.call(...): las
+peticiones van por una conexión asyncio y se emparejan con su respuesta por
+id, así que varias pueden estar en curso sin bloquear el loop. Los cambios
+que origina el propio worker se envían a las conexiones suscritas.
+
+Uso: python tracker_worker.py [--socket tracker_worker.sock]
+"""
+
+import argparse
+import asyncio
+import itertools
+import json
+import os
+import socket
+import sys
+import threading
+from datetime import datetime
+from typing import Any, Dict, Optional, Set
+from zoneinfo import ZoneInfo
+
+from persistence import shared_writer
+from time_tracker import BACKGROUND_METHODS, GuildTrackers, TimeTracker, TransitionResult
+
+MEXICO_TZ = ZoneInfo("America/Mexico_City")
+DEFAULT_SOCKET_PATH = "tracker_worker.sock"
+DEFAULT_AUTO_START = (19, 0)
+DEFAULT_AUTO_STOP = (21, 21)
+
+# Métodos del tracker que modifican datos y por eso se ejecutan en el worker
+MUTATING_METHODS = (
+    'pre_register_user', 'start_tracking', 'start_tracking_from_pre_register', 'stop_tracking',
+    'pause_tracking', 'resume_tracking', 'reset_user_time', 'reset_all_user_times',
+    'cancel_user_tracking', 'cancel_user_tracking_keep_hours', 'clear_all_data',
+    'add_minutes', 'subtract_minutes', 'mark_milestone', 'finish_time_limit', 'mark_credits_paid',
+    'set_time_initiator', 'clear_time_initiator', 'set_pre_register_initiator', 'clear_pre_register_initiator',
+    'add_manual_attendance', 'add_daily_manual_attendance', 'add_attendance', 'transfer_attendances',
+    'reset_weekly_manual_attendances', 'reset_daily_transfer_blocks', 'reset_all_attendances',
+)
+# Métodos que devuelven un TransitionResult (viaja como diccionario)
+TRANSITION_METHODS = {
+    'pre_register_user', 'start_tracking', 'start_tracking_from_pre_register', 'stop_tracking',
+    'pause_tracking', 'resume_tracking', 'reset_user_time', 'cancel_user_tracking',
+    'cancel_user_tracking_keep_hours', 'add_minutes', 'subtract_minutes', 'mark_milestone',
+    'finish_time_limit',
+}
+# Consultas que se responden con los datos del worker (el gateway no tiene copia)
+# (y operaciones que no cambian la réplica, como reconstruir los resúmenes)
+QUERY_METHODS = ('get_credit_balance', 'get_owed_credits', 'get_session_stats', 'get_sessions',
+                 'get_rollup', 'rebuild_rollups')
+# Métodos que cierran el periodo (reinicio global o limpieza de la base de datos)
+PERIOD_METHODS = {'reset_all_user_times', 'clear_all_data'}
+ATTENDANCE_METHODS = {
+    'add_manual_attendance', 'add_daily_manual_attendance', 'add_attendance', 'transfer_attendances',
+    'reset_weekly_manual_attendances', 'reset_daily_transfer_blocks', 'reset_all_attendances',
+}
+
+
+def guild_schedule(config: Dict[str, Any], guild_id: Optional[int],
+                   default_start=DEFAULT_AUTO_START, default_stop=DEFAULT_AUTO_STOP):
+    """Horarios (hora México) de inicio y detención automática de un servidor"""
+    schedule = config.get('guild_schedules', {}).get(str(guild_id), {})
+
+    def parse(value, default):
+        try:
+            hour, minute = value.split(":")
+            return int(hour), int(minute)
+        except (AttributeError, ValueError):
+            return default
+
+    return parse(schedule.get('auto_start'), default_start), parse(schedule.get('auto_stop'), default_stop)
+
+
+# =================== WORKER ===================
+
+class TrackerWorker:
+    """Servidor del socket Unix que atiende las peticiones del gateway"""
+
+    def __init__(self, socket_path: str = DEFAULT_SOCKET_PATH, config: Optional[Dict[str, Any]] = None):
+        self.socket_path = socket_path
+        self.config = config or {}
+        self.trackers = GuildTrackers(self.config.get('primary_guild_id'))
+        self.attached_guilds: Set[int] = set()
+        self.subscribers: Set[asyncio.StreamWriter] = set()
+        # Consultas lentas en curso (se responden cuando terminan, sin frenar la conexión)
+        self._background: Set[asyncio.Task] = set()
+
+    async def serve(self) -> None:
+        if os.path.exists(self.socket_path):
+            os.remove(self.socket_path)
+        server = await asyncio.start_unix_server(self.handle_connection, path=self.socket_path,
+                                                 limit=64 * 1024 * 1024)
+        print(f"✅ Worker del tracker escuchando en {self.socket_path}")
+
+        schedule_task = asyncio.create_task(self.schedule_loop())
+        try:
+            async with server:
+                await server.serve_forever()
+        finally:
+            schedule_task.cancel()
+            shared_writer().close()
+
+    async def handle_connection(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        try:
+            while True:
+                line = await reader.readline()
+                if not line:
+                    break
+                request = json.loads(line)
+                if request.get('method') == 'subscribe':
+                    self.subscribers.add(writer)
+                    continue
+                if request.get('method') in BACKGROUND_METHODS or request.get('method') == 'flush':
+                    # Las respuestas llevan el id: pueden llegar en otro orden
+                    task = asyncio.create_task(self.respond(writer, request))
+                    self._background.add(task)
+                    task.add_done_callback(self._background.discard)
+                else:
+                    await self.respond(writer, request)
+        except (ConnectionError, json.JSONDecodeError) as e:
+            print(f"⚠️ Conexión con el gateway cerrada: {e}")
+        finally:
+            self.subscribers.discard(writer)
+            writer.close()
+
+    async def respond(self, writer: asyncio.StreamWriter, request: Dict[str, Any]) -> None:
+        if request.get('method') == 'flush':
+            durable = await asyncio.wrap_future(shared_writer().barrier())
+            response = {'id': request.get('id'), 'result': durable}
+        else:
+            response = await self.handle_request(request)
+        try:
+            writer.write(json.dumps(response, ensure_ascii=False).encode('utf-8') + b"\n")
+            await writer.drain()
+        except ConnectionError:
+            pass
+
+    async def handle_request(self, request: Dict[str, Any]) -> Dict[str, Any]:
+        """Ejecutar una petición y devolver el resultado con los cambios producidos"""
+        request_id = request.get('id')
+        method = request.get('method')
+        guild_id = request.get('guild')
+        args = request.get('args', [])
+        kwargs = request.get('kwargs') or {}
+
+        try:
+            if method == 'snapshot':
+                return {'id': request_id, 'result': self.snapshot(guild_id)}
+            if method == 'adopt_primary':
+                self.trackers.adopt_primary(args[0])
+                return {'id': request_id, 'result': self.trackers.primary_guild_id}
+            if method == 'attach_guilds':
+                self.attached_guilds.update(args[0])
+                for attached_id in args[0]:
+                    self.trackers.for_guild(attached_id)
+                return {'id': request_id, 'result': len(self.attached_guilds)}
+            if method in QUERY_METHODS:
+                result = await self.trackers.for_guild(guild_id).call(method, *args, **kwargs)
+                return {'id': request_id, 'result': result}
+            if method == 'call_many':
+                calls = [(name, call_args, call_kwargs) for name, call_args, call_kwargs in args]
+            else:
+                calls = [(method, args, kwargs)]
+            for name, _, _ in calls:
+                if name not in MUTATING_METHODS:
+                    return {'id': request_id, 'error': f"Método no permitido: {name}"}
+
+            tracker = self.trackers.for_guild(guild_id)
+            results, changes = self.apply_calls(tracker, calls)
+            self.broadcast(guild_id, changes)
+            results = [result.as_dict() if isinstance(result, TransitionResult) else result for result in results]
+            return {'id': request_id, 'result': results if method == 'call_many' else results[0], 'changes': changes}
+
+        except Exception as e:
+            print(f"❌ Error atendiendo {method}: {e}")
+            return {'id': request_id, 'error': str(e)}
+
+    def apply(self, tracker: TimeTracker, method: str, args, kwargs=None):
+        """Ejecutar un método del tracker y recoger los registros que cambió"""
+        results, changes = self.apply_calls(tracker, [(method, args, kwargs or {})])
+        return results[0], changes
+
+    def apply_calls(self, tracker: TimeTracker, calls):
+        """Ejecutar varias llamadas (método, args, kwargs) en un lote y recoger los registros que cambiaron"""
+        tracker.changed_users.clear()
+        with tracker.batch():
+            results = [getattr(tracker, method)(*args, **kwargs) for method, args, kwargs in calls]
+        methods = {method for method, _, _ in calls}
+        users = {
+            user_id_str: tracker.data.get(user_id_str)
+            for user_id_str in tracker.changed_users
+        }
+        tracker.changed_users.clear()
+        changes = {
+            'generation': tracker.generation,
+            'users': users,
+            'versions': {user_id_str: tracker.get_user_version(user_id_str) for user_id_str in users},
+        }
+        if methods & ATTENDANCE_METHODS:
+            changes['attendance'] = tracker.attendance_data
+        if methods & PERIOD_METHODS:
+            changes['period'] = {
+                'period': tracker.period,
+                'reset_version': tracker._reset_version,
+                'cleared': 'clear_all_data' in methods,
+            }
+        return results, changes
+
+    def snapshot(self, guild_id: Optional[int]) -> Dict[str, Any]:
+        tracker = self.trackers.for_guild(guild_id)
+        return {
+            'data': tracker.data,
+            'attendance': tracker.attendance_data,
+            'generation': tracker.generation,
+            'versions': tracker.user_versions,
+            'period': tracker.period,
+            'reset_version': tracker._reset_version,
+            'primary_guild_id': self.trackers.primary_guild_id,
+        }
+
+    def broadcast(self, guild_id: Optional[int], changes: Dict[str, Any]) -> None:
+        """Enviar cambios a los gateways suscritos (réplicas en otros procesos o shards)"""
+        if not self.subscribers or not changes['users'] and 'attendance' not in changes and 'period' not in changes:
+            return
+        message = json.dumps({'event': 'changes', 'guild': guild_id, 'changes': changes},
+                             ensure_ascii=False).encode('utf-8') + b"\n"
+        for writer in list(self.subscribers):
+            try:
+                writer.write(message)
+            except Exception:
+                self.subscribers.discard(writer)
+
+    async def schedule_loop(self) -> None:
+        """Inicio y detención automáticos de los servidores conectados"""
+        last_runs = {}
+        while True:
+            try:
+                await asyncio.sleep(30)  # Verificar cada 30 segundos
+
+                mexico_now = datetime.now(MEXICO_TZ)
+                minute_key = mexico_now.strftime("%Y-%m-%d %H:%M")
+                now = (mexico_now.hour, mexico_now.minute)
+
+                for guild_id in sorted(self.attached_guilds):
+                    start, stop = guild_schedule(self.config, guild_id)
+                    if now not in (start, stop) or last_runs.get(guild_id) == minute_key:
+                        continue
+                    last_runs[guild_id] = minute_key
+
+                    tracker = self.trackers.for_guild(guild_id)
+                    if now == start:
+                        self.auto_start(guild_id, tracker)
+                    else:
+                        self.auto_stop(guild_id, tracker)
+
+            except Exception as e:
+                print(f"❌ Error en tareas programadas del worker: {e}")
+
+    def auto_start(self, guild_id: int, tracker: TimeTracker) -> None:
+        started = 0
+        for user_id_str in list(tracker.get_pre_registered_users()):
+            result, changes = self.apply(tracker, 'start_tracking_from_pre_register', [int(user_id_str)])
+            if result:
+                started += 1
+                self.broadcast(guild_id, changes)
+        if started:
+            print(f"✅ Iniciados automáticamente {started} usuarios en el servidor {guild_id} (sin notificación)")
+
+    def auto_stop(self, guild_id: int, tracker: TimeTracker) -> None:
+        stopped = 0
+        for user_id_str, data in list(tracker.get_all_tracked_users().items()):
+            if data.get('is_active', False) or data.get('is_paused', False):
+                result, changes = self.apply(tracker, 'stop_tracking', [int(user_id_str)])
+                if result:
+                    stopped += 1
+                    self.broadcast(guild_id, changes)
+        if stopped:
+            print(f"✅ Detenidos automáticamente {stopped} usuarios en el servidor {guild_id}")
+
+
+# =================== CLIENTE (GATEWAY) ===================
+
+class WorkerClient:
+    """Conexiones al worker: asíncrona para el event loop y síncrona para el arranque y otros hilos"""
+
+    def __init__(self, socket_path: str = DEFAULT_SOCKET_PATH, timeout: float = 5.0):
+        self.socket_path = socket_path
+        self.timeout = timeout
+        self._lock = threading.Lock()
+        self._sock: Optional[socket.socket] = None
+        self._file = None
+        self._ids = itertools.count(1)
+        # Conexión asyncio: respuestas pendientes por id y la tarea que las lee
+        self._writer: Optional[asyncio.StreamWriter] = None
+        self._reader_task: Optional[asyncio.Task] = None
+        self._connect_lock: Optional[asyncio.Lock] = None
+        self._pending: Dict[int, asyncio.Future] = {}
+
+    def _connect(self) -> None:
+        sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        sock.settimeout(self.timeout)
+        sock.connect(self.socket_path)
+        self._sock = sock
+        self._file = sock.makefile('rb')
+
+    def _close(self) -> None:
+        if self._sock is not None:
+            try:
+                self._sock.close()
+            except OSError:
+                pass
+        self._sock = None
+        self._file = None
+
+    async def _async_connection(self) -> asyncio.StreamWriter:
+        if self._connect_lock is None:
+            self._connect_lock = asyncio.Lock()
+        async with self._connect_lock:
+            if self._writer is None or self._writer.is_closing():
+                reader, self._writer = await asyncio.open_unix_connection(self.socket_path,
+                                                                          limit=64 * 1024 * 1024)
+                self._reader_task = asyncio.create_task(self._read_responses(reader, self._writer))
+            return self._writer
+
+    async def _read_responses(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        """Entregar cada respuesta a la petición que la espera"""
+        error: Exception = ConnectionError("El worker cerró la conexión")
+        try:
+            while True:
+                line = await reader.readline()
+                if not line:
+                    break
+                response = json.loads(line)
+                future = self._pending.pop(response.get('id'), None)
+                if future is not None and not future.done():
+                    future.set_result(response)
+        except (OSError, ValueError) as e:
+            error = ConnectionError(f"Conexión con el worker interrumpida: {e}")
+        finally:
+            if self._writer is writer:
+                self._writer = None
+            writer.close()
+            # Las peticiones en curso no van a tener respuesta
+            for future in self._pending.values():
+                if not future.done():
+                    future.set_exception(error)
+            self._pending.clear()
+
+    async def call(self, guild_id: Optional[int], method: str, args=(), kwargs=None,
+                   timeout: Optional[float] = -1) -> Dict[str, Any]:
+        """Enviar una petición desde el event loop y esperar su respuesta sin bloquearlo
+
+        timeout=None espera lo que haga falta (consultas lentas); por omisión, self.timeout.
+        """
+        writer = await self._async_connection()
+        request_id = next(self._ids)
+        future = asyncio.get_running_loop().create_future()
+        self._pending[request_id] = future
+        payload = {'id': request_id, 'guild': guild_id, 'method': method,
+                   'args': list(args), 'kwargs': kwargs or {}}
+        try:
+            writer.write(json.dumps(payload, ensure_ascii=False).encode('utf-8') + b"\n")
+            await writer.drain()
+            response = await asyncio.wait_for(future, self.timeout if timeout == -1 else timeout)
+        finally:
+            self._pending.pop(request_id, None)
+        if 'error' in response:
+            raise RuntimeError(f"Worker: {response['error']}")
+        return response
+
+    def request(self, guild_id: Optional[int], method: str, args=()) -> Dict[str, Any]:
+        """Enviar una petición bloqueando hasta la respuesta (reintenta una vez si se cortó)
+
+        Solo para el arranque (réplicas, servidor principal) y hilos fuera del event loop.
+        """
+        with self._lock:
+            for attempt in range(2):
+                try:
+                    if self._sock is None:
+                        self._connect()
+                    payload = {'id': next(self._ids), 'guild': guild_id, 'method': method, 'args': list(args)}
+                    self._sock.sendall(json.dumps(payload, ensure_ascii=False).encode('utf-8') + b"\n")
+                    line = self._file.readline()
+                    if not line:
+                        raise ConnectionError("El worker cerró la conexión")
+                    response = json.loads(line)
+                    if 'error' in response:
+                        raise RuntimeError(f"Worker: {response['error']}")
+                    return response
+                except (OSError, ConnectionError):
+                    self._close()
+                    if attempt == 1:
+                        raise
+
+    def wait_until_ready(self, attempts: int = 50, delay: float = 0.1) -> None:
+        """Esperar a que el socket del worker acepte conexiones"""
+        import time
+        for _ in range(attempts):
+            try:
+                with self._lock:
+                    if self._sock is None:
+                        self._connect()
+                return
+            except OSError:
+                time.sleep(delay)
+        raise ConnectionError(f"No se pudo conectar al worker en {self.socket_path}")
+
+
+class RemoteTracker(TimeTracker):
+    """Réplica en memoria del tracker de un servidor; las modificaciones van al worker
+
+    Se crea vacía y se llena con load(), que pide el snapshot al worker sin
+    bloquear el event loop.
+    """
+
+    def __init__(self, client: WorkerClient, guild_id: Optional[int]):
+        self.client = client
+        self.guild_id = guild_id
+        self.data_file = None
+        self.attendance_file = None
+        self.data = {}
+        self.attendance_data = {}
+        self.generation = 0
+        self.user_versions = {}
+        self.period = 0
+        self._reset_version = 0
+        self.changed_users = set()
+        self._user_locks = {}
+        self._batch_depth = 0
+        self._batch_dirty = False
+        self._name_index = []
+        self._indexed_tokens = {}
+        self._load_task: Optional[asyncio.Task] = None
+
+    @property
+    def is_loaded(self) -> bool:
+        task = self._load_task
+        return task is not None and task.done() and not task.cancelled() and task.exception() is None
+
+    def start_loading(self) -> Optional[asyncio.Task]:
+        """Pedir el snapshot en segundo plano (solo desde el event loop; reintenta si falló)"""
+        task = self._load_task
+        if task is None or task.done() and not self.is_loaded:
+            try:
+                asyncio.get_running_loop()
+            except RuntimeError:
+                return None
+            self._load_task = asyncio.create_task(self._load())
+        return self._load_task
+
+    async def load(self) -> None:
+        """Esperar a que la réplica tenga el snapshot del worker"""
+        await asyncio.shield(self.start_loading())
+
+    async def _load(self) -> None:
+        response = await self.client.call(self.guild_id, 'snapshot', timeout=None)
+        self.apply_snapshot(response['result'])
+
+    def apply_snapshot(self, snapshot: Dict[str, Any]) -> None:
+        """Cargar un snapshot sin perder los cambios más nuevos que llegaron mientras tanto"""
+        data = snapshot['data']
+        versions = snapshot['versions']
+        for user_id_str, version in self.user_versions.items():
+            if version > versions.get(user_id_str, 0):
+                if user_id_str in self.data:
+                    data[user_id_str] = self.data[user_id_str]
+                else:
+                    data.pop(user_id_str, None)
+                versions[user_id_str] = version
+        self.data = data
+        self.user_versions = versions
+        self.attendance_data = snapshot['attendance']
+        self.generation = max(self.generation, snapshot['generation'])
+        if snapshot.get('period', 0) >= self.period:
+            self.period = snapshot.get('period', 0)
+            self._reset_version = snapshot.get('reset_version', 0)
+        self._rebuild_name_index()
+
+    def save_data(self) -> None:
+        # Los datos los guarda el worker
+        pass
+
+    def save_attendance_data(self, *admin_ids: str) -> None:
+        pass
+
+    async def flush(self) -> bool:
+        """Esperar a que el worker tenga en disco los cambios enviados hasta ahora"""
+        response = await self.client.call(self.guild_id, 'flush', timeout=None)
+        return response['result']
+
+    async def _call(self, method: str, *args, **kwargs):
+        """Ejecutar un método en el worker sin bloquear el event loop"""
+        timeout = None if method in BACKGROUND_METHODS else -1
+        response = await self.client.call(self.guild_id, method, args, kwargs, timeout)
+        if 'changes' in response:
+            self.apply_changes(response['changes'])
+        return self._result(method, response['result'])
+
+    async def _call_many(self, calls) -> list:
+        """Varias llamadas en una sola petición; el worker las aplica en un lote"""
+        response = await self.client.call(self.guild_id, 'call_many',
+                                          [[method, list(args), {}] for method, args in calls])
+        self.apply_changes(response['changes'])
+        return [self._result(method, result) for (method, _), result in zip(calls, response['result'])]
+
+    @staticmethod
+    def _result(method: str, result):
+        if method in TRANSITION_METHODS:
+            return TransitionResult.from_dict(result)
+        return result
+
+    def apply_changes(self, changes: Dict[str, Any]) -> None:
+        """Aplicar a la réplica los registros que cambiaron en el worker"""
+        period = changes.get('period')
+        if period and period['period'] > self.period:
+            self.period = period['period']
+            self._reset_version = period['reset_version']
+            if period['cleared']:
+                self.data = {}
+                self._rebuild_name_index()
+        versions = changes.get('versions', {})
+        for user_id_str, record in changes.get('users', {}).items():
+            version = versions.get(user_id_str, changes['generation'])
+            # Un cambio antiguo que llega tarde no pisa uno más reciente
+            if version < self.user_versions.get(user_id_str, 0):
+                continue
+            if record is None:
+                self.data.pop(user_id_str, None)
+            else:
+                self.data[user_id_str] = record
+            self.user_versions[user_id_str] = version
+            self._index_user(user_id_str)
+        if 'attendance' in changes:
+            self.attendance_data = changes['attendance']
+        self.generation = max(self.generation, changes['generation'])
+
+    def _remote_call(self, method: str, *args):
+        response = self.client.request(self.guild_id, method, args)
+        if 'changes' in response:
+            self.apply_changes(response['changes'])
+        return self._result(method, response['result'])
+
+
+def _make_remote_method(name: str):
+    def method(self, *args):
+        return self._remote_call(name, *args)
+    method.__name__ = name
+    method.__doc__ = f"{name} ejecutado en el worker (bloquea: desde el event loop usar await tracker.call)"
+    return method
+
+
+for _name in MUTATING_METHODS + QUERY_METHODS:
+    setattr(RemoteTracker, _name, _make_remote_method(_name))
+
+
+class RemoteGuildTrackers:
+    """Equivalente de GuildTrackers para el gateway: réplicas servidas por el worker"""
+
+    def __init__(self, client: WorkerClient):
+        self.client = client
+        self.primary_guild_id = None
+        self._trackers: Dict[Optional[int], RemoteTracker] = {}
+
+    async def claim_primary(self, guild_id: int) -> None:
+        """Fijar en el worker el servidor dueño de los archivos originales si aún no hay uno"""
+        response = await self.client.call(None, 'adopt_primary', [guild_id])
+        self.primary_guild_id = response['result']
+        # Una réplica pedida antes de conocer el servidor principal es la suya
+        if None in self._trackers and self.primary_guild_id not in self._trackers:
+            tracker = self._trackers.pop(None)
+            tracker.guild_id = self.primary_guild_id
+            self._trackers[self.primary_guild_id] = tracker
+
+    async def attach(self, guild_ids) -> None:
+        """Avisar al worker de qué servidores atiende este gateway (para sus tareas programadas)"""
+        await self.client.call(None, 'attach_guilds', [list(guild_ids)])
+
+    def for_guild(self, guild) -> RemoteTracker:
+        """Réplica de un servidor; si es nueva, se llena en segundo plano"""
+        guild_id = getattr(guild, 'id', guild)
+        if guild_id is None:
+            guild_id = self.primary_guild_id
+
+        tracker = self._trackers.get(guild_id)
+        if tracker is None:
+            tracker = RemoteTracker(self.client, guild_id)
+            self._trackers[guild_id] = tracker
+        if not tracker.is_loaded:
+            tracker.start_loading()
+        return tracker
+
+    def loaded(self):
+        return [(guild_id, tracker) for guild_id, tracker in self._trackers.items() if tracker.is_loaded]
+
+    async def load_guilds(self, guild_ids) -> None:
+        """Pedir al worker las réplicas de varios servidores a la vez"""
+        await asyncio.gather(*(self.for_guild(guild_id).load() for guild_id in guild_ids))
+
+    async def preload(self) -> None:
+        # Las réplicas se piden al worker al conocer cada servidor
+        pass
+
+    def is_ready(self) -> bool:
+        return True
+
+    async def wait_ready(self, timeout: Optional[float] = None, guild=None) -> bool:
+        """Esperar a la réplica de un servidor (True si ya está cargada)"""
+        if guild is None:
+            return True
+        try:
+            await asyncio.wait_for(self.for_guild(guild).load(), timeout)
+            return True
+        except asyncio.TimeoutError:
+            return False
+        except (OSError, RuntimeError) as e:
+            print(f"⚠️ No se pudo obtener la réplica del servidor {getattr(guild, 'id', guild)}: {e}")
+            return False
+
+    async def follow_changes(self) -> None:
+        """Aplicar a las réplicas los cambios que origina el worker (inicio/detención automáticos)"""
+        while True:
+            try:
+                reader, writer = await asyncio.open_unix_connection(self.client.socket_path,
+                                                                    limit=64 * 1024 * 1024)
+                writer.write(b'{"method": "subscribe"}\n')
+                await writer.drain()
+                while True:
+                    line = await reader.readline()
+                    if not line:
+                        break
+                    message = json.loads(line)
+                    guild_id = message.get('guild')
+                    if guild_id is None:
+                        guild_id = self.primary_guild_id
+                    tracker = self._trackers.get(guild_id)
+                    if tracker is not None:
+                        tracker.apply_changes(message['changes'])
+            except (OSError, ConnectionError, json.JSONDecodeError) as e:
+                print(f"⚠️ Suscripción al worker interrumpida: {e}")
+            await asyncio.sleep(1)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Worker del tracker de tiempos")
+    parser.add_argument('--socket', default=None, help="Ruta del socket Unix")
+    options = parser.parse_args()
+
+    config = {}
+    try:
+        with open('config.json', 'r') as f:
+            config = json.load(f)
+    except Exception as e:
+        print(f"⚠️ No se pudo cargar configuración: {e}")
+
+    socket_path = options.socket or config.get('worker', {}).get('socket_path', DEFAULT_SOCKET_PATH)
+    worker = TrackerWorker(socket_path, config)
+    try:
+        asyncio.run(worker.serve())
+    except KeyboardInterrupt:
+        print("🛑 Worker detenido")
+        sys.exit(0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,375 @@
+"""
+Registro de estado de vistas paginadas y caché compartida de snapshots.
+
+Cada mensaje con paginación guarda solo su estado mínimo (generación del
+snapshot, filtro, búsqueda, orden y página). Las filas se resuelven desde
+una caché compartida con límite LRU/TTL, así varias vistas con el mismo
+filtro comparten una sola copia de la lista. Los límites de página se
+calculan una vez por snapshot según el largo real de cada fila, y las filas
+renderizadas se reutilizan mientras la versión del usuario no cambie.
+"""
+
+import hashlib
+import itertools
+import sys
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, Iterable, Optional, Tuple
+from urllib.parse import quote, unquote
+
+# Códigos de un carácter para codificar filtros dentro de un custom_id.
+# "Gold" y "Reclutas (Sin Rol)" son los filtros que guardaban los mensajes
+# antiguos de pagos; los niveles actuales se codifican con su nombre.
+FILTER_CODES = {
+    None: "-",
+    "active": "a",
+    "paused": "p",
+    "finished": "f",
+    "inactive": "i",
+    "Gold": "g",
+    "Reclutas (Sin Rol)": "r",
+}
+FILTERS_BY_CODE = {code: value for value, code in FILTER_CODES.items()}
+# Prefijo de un filtro sin código propio (p. ej. el nombre de un nivel)
+NAMED_FILTER_PREFIX = "~"
+
+
+def encode_filter(filter_status: Optional[str]) -> str:
+    """Código de un filtro para un custom_id; los que no tienen código van por nombre"""
+    code = FILTER_CODES.get(filter_status)
+    if code is not None:
+        return code
+    return NAMED_FILTER_PREFIX + quote(filter_status, safe="")
+
+
+def decode_filter(code: str) -> Optional[str]:
+    """Filtro que corresponde a un código de encode_filter()"""
+    if code.startswith(NAMED_FILTER_PREFIX):
+        return unquote(code[len(NAMED_FILTER_PREFIX):]) or None
+    return FILTERS_BY_CODE.get(code)
+
+
+# Límites de Discord para los embeds de un mensaje
+EMBED_DESCRIPTION_LIMIT = 4096
+MESSAGE_EMBEDS_TOTAL_LIMIT = 6000
+MAX_EMBEDS_PER_MESSAGE = 10
+
+
+def pack_pages(row_lengths: Iterable[int], page_budget: int,
+               embed_budget: int = EMBED_DESCRIPTION_LIMIT,
+               max_embeds: int = MAX_EMBEDS_PER_MESSAGE) -> Tuple[Tuple[Tuple[int, int], ...], ...]:
+    """Agrupar filas en páginas que quepan en los límites de embeds.
+
+    row_lengths son los largos estimados de cada fila renderizada. Cada página
+    es una tupla de rangos (inicio, fin) de filas, uno por embed.
+    """
+    pages = []
+    chunks = []
+    chunk_start = 0
+    chunk_used = 0
+    page_used = 0
+    count = 0
+
+    for index, length in enumerate(row_lengths):
+        count = index + 1
+        cost = length + 1  # salto de línea
+        if index > chunk_start and (chunk_used + cost > embed_budget or page_used + cost > page_budget):
+            chunks.append((chunk_start, index))
+            if page_used + cost > page_budget or len(chunks) >= max_embeds:
+                pages.append(tuple(chunks))
+                chunks = []
+                page_used = 0
+            chunk_start = index
+            chunk_used = 0
+        chunk_used += cost
+        page_used += cost
+
+    if count > chunk_start:
+        chunks.append((chunk_start, count))
+    if chunks:
+        pages.append(tuple(chunks))
+    return tuple(pages)
+
+
+class ViewState:
+    """Estado mínimo de una vista paginada (sin filas)"""
+
+    __slots__ = ('kind', 'guild_id', 'generation', 'filter_status', 'search_term',
+                 'sort_key', 'page', 'touched_at', 'rendered_digest')
+
+    def __init__(self, kind: str, guild_id: Optional[int], generation: int,
+                 filter_status: Optional[str] = None, search_term: Optional[str] = None,
+                 sort_key: str = "name", page: int = 0):
+        self.kind = kind
+        self.guild_id = guild_id
+        self.generation = generation
+        self.filter_status = filter_status
+        self.search_term = search_term
+        self.sort_key = sort_key
+        self.page = page
+        self.touched_at = time.monotonic()
+        # Huella de la última página renderizada para este mensaje
+        self.rendered_digest: Optional[str] = None
+
+    def to_token(self, max_length: int = 80) -> str:
+        """Codificar página, filtro y búsqueda para guardarlos en un custom_id.
+
+        Si la búsqueda no cabe se recorta: al ser una búsqueda por subcadena,
+        un término más corto solo amplía los resultados.
+        """
+        prefix = f"{self.page}:{encode_filter(self.filter_status)}:"
+        search = self.search_term or ""
+        encoded = quote(search, safe="")
+        while search and len(prefix) + len(encoded) > max_length:
+            search = search[:-1]
+            encoded = quote(search, safe="")
+        return prefix + encoded
+
+    @classmethod
+    def from_token(cls, kind: str, guild_id: Optional[int], generation: int, token: str) -> "ViewState":
+        """Reconstruir un estado desde el token de un custom_id"""
+        page_str, _, rest = token.partition(":")
+        filter_code, _, search = rest.partition(":")
+        try:
+            page = max(0, int(page_str))
+        except ValueError:
+            page = 0
+        return cls(kind, guild_id, generation,
+                   filter_status=decode_filter(filter_code),
+                   search_term=unquote(search) or None,
+                   page=page)
+
+    def snapshot_key(self) -> Tuple[Hashable, ...]:
+        """Clave del snapshot compartido que corresponde a este estado"""
+        return (self.kind, self.guild_id, self.generation, self.filter_status,
+                (self.search_term or "").lower(), self.sort_key)
+
+
+def page_digest(embeds) -> str:
+    """Huella del contenido visible de una página (sin la marca de tiempo)"""
+    digest = hashlib.blake2b(digest_size=16)
+    for embed in embeds:
+        parts = [embed.title, embed.description, embed.footer.text]
+        for field in embed.fields:
+            parts.extend((field.name, field.value))
+        for part in parts:
+            digest.update((part or "").encode("utf-8"))
+            digest.update(b"\0")
+        digest.update(b"\1")
+    return digest.hexdigest()
+
+
+class RowRenderCache:
+    """Líneas ya renderizadas, reutilizables mientras la versión de su fila no cambie"""
+
+    def __init__(self, max_entries: int = 5000):
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[Hashable, Tuple[Hashable, str]]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def get_or_render(self, key: Hashable, version: Hashable, render: Callable[[], Optional[str]]) -> Optional[str]:
+        """Devolver la línea guardada si la versión coincide; si no, renderizarla"""
+        entry = self._entries.get(key)
+        if entry is not None and entry[0] == version:
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+
+        self.misses += 1
+        line = render()
+        if line is None:
+            self._entries.pop(key, None)
+            return None
+        self._entries[key] = (version, line)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+        return line
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+    def memory_bytes(self) -> int:
+        total = sys.getsizeof(self._entries)
+        for _, line in self._entries.values():
+            total += sys.getsizeof(line)
+        return total
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+class SnapshotCache:
+    """Caché LRU/TTL de filas ya filtradas y ordenadas, compartida entre vistas"""
+
+    def __init__(self, max_entries: int = 32, ttl_seconds: float = 300.0):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._entries: "OrderedDict[Hashable, Tuple[float, tuple]]" = OrderedDict()
+        self._bounds: Dict[Hashable, tuple] = {}
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: Hashable) -> Optional[tuple]:
+        """Obtener filas de un snapshot si siguen vigentes"""
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        created_at, rows = entry
+        if time.monotonic() - created_at > self.ttl_seconds:
+            del self._entries[key]
+            self._bounds.pop(key, None)
+            return None
+        self._entries.move_to_end(key)
+        return rows
+
+    def put(self, key: Hashable, rows) -> tuple:
+        """Guardar filas de un snapshot (se almacenan como tupla inmutable)"""
+        rows = tuple(rows)
+        self._entries[key] = (time.monotonic(), rows)
+        self._bounds.pop(key, None)
+        self._entries.move_to_end(key)
+        self._evict()
+        return rows
+
+    def get_or_build(self, key: Hashable, builder: Callable[[], Any], refresh: bool = False) -> tuple:
+        """Obtener un snapshot o construirlo una sola vez para todas las vistas"""
+        if not refresh:
+            rows = self.get(key)
+            if rows is not None:
+                self.hits += 1
+                return rows
+        self.misses += 1
+        return self.put(key, builder())
+
+    def page_bounds(self, key: Hashable, rows: tuple, packer: Callable[[tuple], tuple]) -> tuple:
+        """Límites de página de un snapshot, calculados una sola vez por snapshot"""
+        bounds = self._bounds.get(key)
+        if bounds is not None:
+            return bounds
+        bounds = tuple(packer(rows))
+        entry = self._entries.get(key)
+        if entry is not None and entry[1] is rows:
+            self._bounds[key] = bounds
+        return bounds
+
+    def _evict(self) -> None:
+        """Eliminar snapshots expirados y los menos usados por encima del límite"""
+        now = time.monotonic()
+        expired = [key for key, (created_at, _) in self._entries.items()
+                   if now - created_at > self.ttl_seconds]
+        for key in expired:
+            del self._entries[key]
+            self._bounds.pop(key, None)
+        while len(self._entries) > self.max_entries:
+            key, _ = self._entries.popitem(last=False)
+            self._bounds.pop(key, None)
+
+    def clear(self) -> None:
+        self._entries.clear()
+        self._bounds.clear()
+
+    def row_count(self) -> int:
+        return sum(len(rows) for _, rows in self._entries.values())
+
+    def memory_bytes(self) -> int:
+        """Memoria aproximada de los snapshots (tuplas y sus filas)"""
+        total = sys.getsizeof(self._entries)
+        for _, rows in self._entries.values():
+            total += sys.getsizeof(rows)
+            for row in rows:
+                total += sys.getsizeof(row)
+        for bounds in self._bounds.values():
+            total += sys.getsizeof(bounds)
+        return total
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+class ViewStateRegistry:
+    """Registro de estados de vistas abiertas, acotado por cantidad y TTL"""
+
+    def __init__(self, snapshots: SnapshotCache, max_views: int = 500, ttl_seconds: float = 300.0):
+        self.snapshots = snapshots
+        self.max_views = max_views
+        self.ttl_seconds = ttl_seconds
+        self._states: "OrderedDict[Hashable, ViewState]" = OrderedDict()
+        self._keys = itertools.count(1)
+
+    def open(self, state: ViewState, key: Optional[Hashable] = None) -> Hashable:
+        """Registrar el estado de una vista nueva y devolver su clave"""
+        if key is None:
+            key = next(self._keys)
+        state.touched_at = time.monotonic()
+        self._states[key] = state
+        self._states.move_to_end(key)
+        self._evict()
+        return key
+
+    def get(self, key: Hashable) -> Optional[ViewState]:
+        """Obtener el estado de una vista (None si expiró o fue desalojado)"""
+        state = self._states.get(key)
+        if state is None:
+            return None
+        if time.monotonic() - state.touched_at > self.ttl_seconds:
+            del self._states[key]
+            return None
+        state.touched_at = time.monotonic()
+        self._states.move_to_end(key)
+        return state
+
+    def close(self, key: Hashable) -> None:
+        self._states.pop(key, None)
+
+    def resolve(self, state: ViewState, builder: Callable[[], Any],
+                current_generation: Optional[int] = None, refresh: bool = False) -> tuple:
+        """Resolver las filas de una vista desde el snapshot compartido.
+
+        Si el snapshot ya no está en caché (o se pide refrescar), el estado
+        avanza a la generación actual antes de reconstruirlo, para que otras
+        vistas con el mismo filtro puedan reutilizarlo.
+        """
+        if not refresh:
+            rows = self.snapshots.get(state.snapshot_key())
+            if rows is not None:
+                self.snapshots.hits += 1
+                return rows
+        if current_generation is not None:
+            state.generation = current_generation
+        return self.snapshots.get_or_build(state.snapshot_key(), builder, refresh=refresh)
+
+    def page_bounds(self, state: ViewState, rows: tuple, packer: Callable[[tuple], tuple]) -> tuple:
+        """Límites de página del snapshot que usa una vista"""
+        return self.snapshots.page_bounds(state.snapshot_key(), rows, packer)
+
+    def _evict(self) -> None:
+        now = time.monotonic()
+        expired = [key for key, state in self._states.items()
+                   if now - state.touched_at > self.ttl_seconds]
+        for key in expired:
+            del self._states[key]
+        while len(self._states) > self.max_views:
+            self._states.popitem(last=False)
+
+    def memory_report(self) -> Dict[str, int]:
+        """Informe de memoria retenida por las vistas abiertas"""
+        self._evict()
+        state_bytes = sys.getsizeof(self._states)
+        for state in self._states.values():
+            state_bytes += sys.getsizeof(state)
+        snapshot_bytes = self.snapshots.memory_bytes()
+        return {
+            'open_views': len(self._states),
+            'snapshots': len(self.snapshots),
+            'snapshot_rows': self.snapshots.row_count(),
+            'state_bytes': state_bytes,
+            'snapshot_bytes': snapshot_bytes,
+            'total_bytes': state_bytes + snapshot_bytes,
+            'cache_hits': self.snapshots.hits,
+            'cache_misses': self.snapshots.misses,
+        }
+
+    def __len__(self) -> int:
+        return len(self._states)
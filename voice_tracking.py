@@ -0,0 +1,63 @@
+"""
+Seguimiento automático por canales de voz.
+
+Cada entrada o salida de un canal de voz configurado programa una
+transición para el miembro; si llega otra antes de que pase el tiempo de
+espera (una reconexión, un cambio rápido de canal), solo cuenta la última.
+Las transiciones listas se entregan por lotes a una sola tarea consumidora,
+así el evento de voz nunca espera al tracker aunque entren cientos de
+miembros a la vez.
+"""
+
+import asyncio
+from typing import Any, AsyncIterator, Dict, Hashable, List, Optional, Tuple
+
+JOIN = "join"
+LEAVE = "leave"
+
+
+class VoiceTransitionDebouncer:
+    """Junta las entradas y salidas de cada miembro y entrega solo el estado final"""
+
+    def __init__(self, delay: float = 5.0, max_batch: int = 200):
+        self.delay = delay
+        self.max_batch = max_batch
+        self._pending: Dict[Hashable, Tuple[str, Any, asyncio.TimerHandle]] = {}
+        self._ready: Optional[asyncio.Queue] = None
+        self.submitted = 0
+        self.coalesced = 0
+        self.delivered = 0
+
+    def _queue(self) -> asyncio.Queue:
+        if self._ready is None:
+            self._ready = asyncio.Queue()
+        return self._ready
+
+    def submit(self, key: Hashable, state: str, payload: Any) -> None:
+        """Programar la transición de un miembro (reemplaza la que estuviera esperando)"""
+        self.submitted += 1
+        previous = self._pending.pop(key, None)
+        if previous is not None:
+            previous[2].cancel()
+            self.coalesced += 1
+        handle = asyncio.get_running_loop().call_later(self.delay, self._fire, key)
+        self._pending[key] = (state, payload, handle)
+
+    def _fire(self, key: Hashable) -> None:
+        entry = self._pending.pop(key, None)
+        if entry is not None:
+            state, payload, _ = entry
+            self._queue().put_nowait((key, state, payload))
+
+    def pending(self) -> int:
+        return len(self._pending)
+
+    async def batches(self) -> AsyncIterator[List[Tuple[Hashable, str, Any]]]:
+        """Transiciones listas, en lotes de hasta max_batch"""
+        queue = self._queue()
+        while True:
+            batch = [await queue.get()]
+            while len(batch) < self.max_batch and not queue.empty():
+                batch.append(queue.get_nowait())
+            self.delivered += len(batch)
+            yield batch